@@ -19,6 +19,9 @@ from .auth import (
 from .material_routes import materials_router  # NEW: Import delle route materiali
 from database.services import cleanup_expired_sessions
 from database.config import get_database_info
+from utils.coordinate_frame import LocalFrame, frame_from_session
+from utils.preview_generator import build_preview_scene_graph
+from utils.vector_scene import scene_to_vector
 from pathlib import Path
 import logging
 import os
@@ -242,6 +245,20 @@ async def get_admin_stats(admin_user: User = Depends(get_current_admin_user)):
         "timestamp": datetime.utcnow().isoformat()
     }
     
+    # Cache condivisa dei parametri enhanced (se il modulo è disponibile)
+    try:
+        from core.enhanced_packing import get_enhanced_cache_stats
+        stats["enhanced_packing_cache"] = get_enhanced_cache_stats()
+    except ImportError:
+        pass
+    
+    # Cache del catalogo materiali/guide/template
+    try:
+        from database.catalogue_cache import catalogue_cache
+        stats["catalogue_cache"] = catalogue_cache.stats()
+    except ImportError:
+        pass
+    
     return {
         "success": True,
         "data": stats
@@ -465,6 +482,9 @@ async def save_project(
                 if session_id in SESSIONS:
                     session = SESSIONS[session_id]
                     
+                    # 📍 Origine locale: necessaria per riesportare in coordinate disegno
+                    extended_config["local_frame"] = frame_from_session(session).to_dict()
+                    
                     print(f"🎨 Generazione preview per progetto '{project_data.get('name')}'...")
                     
                     # Recupera dati dalla sessione
@@ -499,6 +519,13 @@ async def save_project(
                             "production_parameters": data.get("production_parameters", {}),
                             "enhanced": True
                         }
+                        if session.get("wall_polygon_original") is not None:
+                            enhanced_info["wall_original"] = session["wall_polygon_original"]
+                        
+                        # 🧩 Grafo di scena della sessione (già calcolato da preview/export)
+                        scene_graph = build_preview_scene_graph(
+                            wall_polygon, placed, customs, apertures, config, enhanced_info, session=session
+                        )
                         
                         preview_base64 = generate_preview_image(
                             wall_polygon,
@@ -507,8 +534,12 @@ async def save_project(
                             apertures,
                             color_theme,
                             config,
-                            enhanced_info=enhanced_info
+                            enhanced_info=enhanced_info,
+                            scene_graph=scene_graph
                         )
+                        
+                        # 🖌️ Scena vettoriale: il progetto si ridisegna nel browser con qualsiasi tema
+                        extended_config["preview_scene"] = data.get("preview_scene") or scene_to_vector(scene_graph)
                     else:
                         # Standard session format
                         blocks_standard = session.get("placed", [])
@@ -525,6 +556,20 @@ async def save_project(
                             apertures_geometry = [mapping(ap) for ap in apertures]
                             print(f"✅ Geometrie aperture salvate: {len(apertures_geometry)}")
                         
+                        enhanced_info = {"enhanced": False}
+                        if session.get("wall_polygon_original") is not None:
+                            enhanced_info["wall_original"] = session["wall_polygon_original"]
+                        
+                        scene_graph = build_preview_scene_graph(
+                            session["wall_polygon"],
+                            session["placed"],
+                            session["customs"],
+                            session.get("apertures", []),
+                            session["config"],
+                            enhanced_info,
+                            session=session
+                        )
+                        
                         preview_base64 = generate_preview_image(
                             session["wall_polygon"],
                             session["placed"],
@@ -532,8 +577,12 @@ async def save_project(
                             session.get("apertures", []),
                             session["config"].get("color_theme", {}),
                             session["config"],
-                            enhanced_info={"enhanced": False}
+                            enhanced_info=enhanced_info,
+                            scene_graph=scene_graph
                         )
+                        
+                        # 🖌️ Scena vettoriale: il progetto si ridisegna nel browser con qualsiasi tema
+                        extended_config["preview_scene"] = scene_to_vector(scene_graph)
                     
                     if preview_base64:
                         print(f"✅ Preview generata con successo (size: ~{len(preview_base64)//1024}KB)")
@@ -746,6 +795,7 @@ async def get_saved_project(
                     "snapshot_info": snapshot_info,  # NEW: Info sullo snapshot
                     # ===== NUOVO: Dati per ripristino Step 5 =====
                     "preview_image": project.preview_image,  # Base64 PNG
+                    "preview_scene": extended_config.get("preview_scene"),  # Scena vettoriale (se salvata)
                     "blocks_standard": blocks_standard       # Array blocchi con posizioni
                 }
             }
@@ -832,6 +882,7 @@ async def restore_session_from_project(
                 "customs": results_summary.get("blocks_custom", []),  # Alias per compatibilità
                 "config": packing_config,
                 "enhanced": True,
+                "local_frame": LocalFrame.from_dict(extended_config.get("local_frame")),
                 "restored_from_project": project_id,
                 "restored_at": datetime.now().isoformat()
             }
@@ -88,6 +88,13 @@ class CalculationResponse(BaseModel):
     insertion_sequence: dict
     technical_notes: List[str]
 
+class EstimateRequest(BaseModel):
+    walls: List[dict]                            # width_mm/height_mm o wall_bounds (+ ceiling_height_mm)
+    material_ids: Optional[List[int]] = None     # default: tutto il catalogo
+    guide_ids: Optional[List[int]] = None
+    thicknesses_mm: Optional[List[int]] = None
+    limit: Optional[int] = 20
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Endpoints Materiali
 # ────────────────────────────────────────────────────────────────────────────────
@@ -333,6 +340,37 @@ async def validate_material_guide_combination(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore validazione: {str(e)}")
 
+@materials_router.post("/estimate")
+async def estimate_material_options(
+    estimate_request: EstimateRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Confronta tutte le combinazioni materiale × spessore × guida del catalogo
+    sulle pareti del progetto: tabella ordinata con costi, quantità e punteggi.
+    """
+    try:
+        from core.cost_estimator import estimate_project_grid, options_from_catalogue
+        
+        materials = MaterialService.get_all_materials()
+        guides = GuideService.get_all_guides()
+        if estimate_request.material_ids:
+            materials = [m for m in materials if m["id"] in estimate_request.material_ids]
+        if estimate_request.guide_ids:
+            guides = [g for g in guides if g["id"] in estimate_request.guide_ids]
+        
+        material_options, guide_options = options_from_catalogue(
+            materials, guides, estimate_request.thicknesses_mm
+        )
+        table = estimate_project_grid(
+            estimate_request.walls, material_options, guide_options, limit=estimate_request.limit
+        )
+        return table.to_dict()
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore stima combinazioni: {str(e)}")
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Endpoints Template
 # ────────────────────────────────────────────────────────────────────────────────
@@ -66,6 +66,7 @@ async def pack_from_file(file: UploadFile = File(...),
         BLOCK_WIDTHS, BLOCK_HEIGHT, parse_wall_file, pack_wall, 
         opt_pass, summarize_blocks, export_to_json, build_run_params
     )
+    from utils.coordinate_frame import normalize_to_local_origin
     
     try:
         # Validazione formato
@@ -80,6 +81,8 @@ async def pack_from_file(file: UploadFile = File(...),
         
         file_bytes = await file.read()
         wall, apertures = parse_wall_file(file_bytes, file.filename)
+        # 📍 Coordinate locali: evita perdita di precisione su disegni georeferenziati
+        wall, apertures, local_frame = normalize_to_local_origin(wall, apertures)
         widths = BLOCK_WIDTHS
         height = BLOCK_HEIGHT
 
@@ -88,7 +91,8 @@ async def pack_from_file(file: UploadFile = File(...),
                                    starting_direction='left')
         placed, custom = opt_pass(placed, custom, widths)
         summary = summarize_blocks(placed)
-        out_path = export_to_json(summary, custom, placed, out_path="distinta_wall.json", params=build_run_params(row_offset=row_offset))
+        out_path = export_to_json(summary, custom, placed, out_path="distinta_wall.json",
+                                  params=build_run_params(row_offset=row_offset), local_frame=local_frame)
         return JSONResponse({"summary": summary, "custom_count": len(custom), "json_path": out_path})
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=400)
@@ -11,22 +11,216 @@ from fastapi.responses import JSONResponse
 
 from api.auth import get_current_active_user
 from api.models import User
+from core.structural_verification import verify_wall_structure
 from core.wall_builder import pack_wall
 from utils.block_utils import summarize_blocks
-from parsers import parse_wall_file  # Import parser
+from parsers import parse_wall_file, parse_wall_file_multi  # Import parser
+from utils.coordinate_frame import normalize_to_local_origin
+from utils.shape_descriptor import describe_wall, get_shape_descriptor
+from utils.preview_generator import build_preview_scene_graph
+from utils.scene_graph import get_scene_graph
+from utils.vector_scene import normalize_preview_format, scene_to_vector
 
 router = APIRouter()
 
+
+def _scene_starting_point(data: Dict) -> Optional[str]:
+    """Punto di partenza del montaggio (freccia INIZIO) per i risultati enhanced."""
+    if not data.get("enhanced", False):
+        return None
+    measurements = data.get("automatic_measurements", {}) or {}
+    return measurements.get("mounting_strategy", {}).get("starting_point", "bottom")
+
+
+def _structural_check(placed, customs, wall, apertures, block_widths, block_height,
+                      moraletti_config: Optional[Dict] = None) -> Optional[Dict]:
+    """Verifica moraletti/sfalsamento del layout finale (None se la configurazione non è verificabile)."""
+    try:
+        report = verify_wall_structure(placed, customs, wall, apertures, moraletti_config,
+                                       block_widths, block_height)
+    except ValueError as e:
+        print(f"⚠️ Verifica strutturale non eseguita: {e}")
+        return None
+    print(f"🏗️ Verifica strutturale: {report.uncovered_moraletti} moraletti scoperti, "
+          f"{report.aligned_joints} giunti allineati ({report.elapsed_ms:.1f}ms)")
+    return report.to_dict()
+
+
+# Formati accettati dalle route di upload e dimensione massima del file
+UPLOAD_FORMATS = ['svg', 'dwg', 'dxf']
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Valida formato e dimensione del file caricato e ne restituisce il contenuto."""
+    file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else ''
+    if file_ext not in UPLOAD_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato file non supportato. Formati accettati: {', '.join(UPLOAD_FORMATS).upper()}"
+        )
+    
+    if file.size and file.size > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=400, detail="File troppo grande (max 10MB)")
+    
+    file_bytes = await file.read()
+    if not file_bytes:
+        raise HTTPException(status_code=400, detail="File vuoto")
+    return file_bytes
+
+
+def _parse_upload_config(block_dimensions: Optional[str], color_theme: Optional[str],
+                         vertical_spaces: Optional[str]) -> Dict:
+    """Schema blocchi, tema colori e spazi verticali dai campi del form di upload."""
+    from main import (
+        get_block_schema_from_frontend, get_default_block_schema,
+        BLOCK_WIDTHS, BLOCK_HEIGHT, SIZE_TO_LETTER
+    )
+    
+    # Dimensioni blocchi personalizzate → schema standard o custom
+    try:
+        block_config = json.loads(block_dimensions) if block_dimensions else {}
+        print(f"📦 [DEBUG] Block dimensions received: {block_config}")
+        block_schema = get_block_schema_from_frontend(block_config)
+        config = {
+            "block_schema": block_schema,
+            "block_widths": block_schema["block_widths"],
+            "block_height": block_schema["block_height"],
+            "size_to_letter": block_schema["size_to_letter"]
+        }
+        print(f"🎯 Schema blocchi scelto: {block_schema['schema_type']}")
+        print(f"   📏 Dimensioni: {config['block_widths']}×{config['block_height']}")
+        print(f"   🔤 Mappatura: {config['size_to_letter']}")
+    except (ValueError, json.JSONDecodeError):
+        print("⚠️ Block dimensions parsing failed, using defaults")
+        config = {
+            "block_schema": get_default_block_schema(),
+            "block_widths": BLOCK_WIDTHS,
+            "block_height": BLOCK_HEIGHT,
+            "size_to_letter": SIZE_TO_LETTER
+        }
+    
+    # Tema colori
+    try:
+        config["color_theme"] = json.loads(color_theme) if color_theme else {}
+        print(f"🎨 [DEBUG] Color theme received: {config['color_theme']}")
+    except (ValueError, json.JSONDecodeError):
+        config["color_theme"] = {}
+        print("⚠️ Color theme parsing failed, using defaults")
+    
+    # Spazi verticali (offset da terra / spazio soffitto)
+    config["vertical_config"] = None
+    if vertical_spaces:
+        try:
+            config["vertical_config"] = json.loads(vertical_spaces)
+            print(f"🔺 Vertical Spaces Config: {config['vertical_config']}")
+        except json.JSONDecodeError:
+            print(f"⚠️ Errore parsing vertical_spaces, usando default")
+            config["vertical_config"] = {
+                'enableGroundOffset': False,
+                'groundOffsetValue': 0,
+                'enableCeilingSpace': False,
+                'ceilingSpaceValue': 0
+            }
+    return config
+
+
+def _response_config(upload_config: Dict, row_offset: int, project_name: str) -> Dict:
+    """Sezione "config" delle risposte di upload."""
+    return {
+        "block_widths": upload_config["block_widths"],
+        "block_height": upload_config["block_height"],
+        "size_to_letter": upload_config["size_to_letter"],
+        "block_schema": upload_config["block_schema"],
+        "row_offset": row_offset,
+        "project_name": project_name
+    }
+
+
+def _pack_and_store_wall(wall, apertures, local_frame, upload_config: Dict, *,
+                         row_offset: int, project_name: str, current_user: User,
+                         filename: str, file_bytes: bytes, wall_original=None,
+                         offset_applied_mm: float = 0, offset_error: Optional[str] = None,
+                         session_extra: Optional[Dict] = None) -> Dict:
+    """
+    Packing di una parete già in origine locale, metriche, verifica strutturale
+    e salvataggio in SESSIONS. Condiviso da upload singolo e multi-parete.
+    
+    Returns:
+        Dict con session_id, placed, customs, summary, metrics, structural_check
+        e shape_descriptor
+    """
+    from main import SESSIONS, opt_pass, calculate_metrics
+    
+    block_widths = upload_config["block_widths"]
+    block_height = upload_config["block_height"]
+    size_to_letter = upload_config["size_to_letter"]
+    shape_descriptor = describe_wall(wall, apertures, block_height)
+    
+    placed, custom = pack_wall(
+        wall,  # Poligono con o senza offset applicato
+        block_widths,
+        block_height,
+        row_offset=row_offset,
+        apertures=apertures if apertures else None,  # Aperture sempre invariate!
+        starting_direction='left',
+        vertical_config=upload_config["vertical_config"],
+        shape_descriptor=shape_descriptor
+    )
+    placed, custom = opt_pass(placed, custom, block_widths)
+    
+    summary = summarize_blocks(placed, size_to_letter)
+    metrics = calculate_metrics(placed, custom, wall.area)
+    structural_check = _structural_check(placed, custom, wall, apertures, block_widths, block_height)
+    
+    # Salva in sessione (con info utente e file bytes per salvare dopo)
+    session_id = str(uuid.uuid4())
+    SESSIONS[session_id] = {
+        "wall_polygon": wall,  # Poligono usato per packing (con offset se applicato)
+        "wall_polygon_original": wall if wall_original is None else wall_original,
+        "offset_applied_mm": offset_applied_mm,
+        "offset_error": offset_error,
+        "apertures": apertures,
+        "placed": placed,
+        "customs": custom,
+        "summary": summary,
+        "config": dict(_response_config(upload_config, row_offset, project_name),
+                       color_theme=upload_config["color_theme"]),
+        "metrics": metrics,
+        "structural_check": structural_check,
+        "timestamp": datetime.datetime.now(),
+        "user_id": current_user.id,
+        "username": current_user.username,
+        "original_filename": filename,
+        "file_bytes": file_bytes,
+        "local_frame": local_frame,
+        "shape_descriptor": shape_descriptor,
+        **(session_extra or {})
+    }
+    
+    return {
+        "session_id": session_id,
+        "placed": placed,
+        "customs": custom,
+        "summary": summary,
+        "metrics": metrics,
+        "structural_check": structural_check,
+        "shape_descriptor": shape_descriptor
+    }
+
+
 @router.post("/preview-conversion")
 async def preview_file_conversion(
     file: UploadFile = File(...),
     offset_config: Optional[str] = Form(None),
+    preview_format: str = Form("both"),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Genera solo l'anteprima della conversione del file caricato senza fare il packing.
     Mostra la geometria convertita con le relative misure per validazione utente.
     NUOVO: Applica offset poligono se configurato e restituisce coordinate per visualizzazione.
+    preview_format: 'png', 'scene' (solo scena vettoriale) o 'both'.
     """
     # Import qui per evitare circular imports
     from main import parse_wall_file, generate_preview_image, SESSIONS
@@ -35,6 +229,11 @@ async def preview_file_conversion(
     import json
     
     try:
+        try:
+            preview_format = normalize_preview_format(preview_format, default="both")
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        
         # Log dell'attività dell'utente
         print(f"🔍 Preview conversione per file '{file.filename}' da utente: {current_user.username}")
         
@@ -70,6 +269,9 @@ async def preview_file_conversion(
         if not wall_exterior or wall_exterior.is_empty:
             raise HTTPException(status_code=400, detail="Nessuna geometria valida trovata nel file")
         
+        # 📍 Coordinate locali: evita perdita di precisione su disegni georeferenziati
+        wall_exterior, apertures, local_frame = normalize_to_local_origin(wall_exterior, apertures)
+        
         # 📐 NUOVO: Gestione offset poligono interno
         wall_original = wall_exterior  # Salva originale
         offset_applied_mm = 0
@@ -112,20 +314,23 @@ async def preview_file_conversion(
         area = wall_exterior.area
         perimeter = wall_exterior.length
         
-        # NUOVO: Classificazione geometrica avanzata
+        # Descrittore forma: calcolato una sola volta, salvato in sessione e riusato dal packer
+        shape_descriptor = None
         try:
-            from utils.geometry_parser import classify_polygon_geometry, format_geometry_label
-            geometry_type_code = classify_polygon_geometry(wall_exterior)
-            geometry_type = format_geometry_label(geometry_type_code)
-            print(f"🔍 Geometria classificata: {geometry_type_code} → {geometry_type}")
+            shape_descriptor = describe_wall(wall_exterior, apertures)
+            geometry_type = shape_descriptor.geometry_label
+            print(f"🔍 Geometria classificata: {shape_descriptor.geometry_type} → {geometry_type}")
         except Exception as e:
             print(f"⚠️ Errore classificazione geometria: {e}")
             # Fallback alla logica vecchia
             geometry_type = "Rettangolare"
         
         # Determina caratteristiche geometriche per validazioni successive
-        coords = list(wall_exterior.exterior.coords)
-        is_rectangle = len(coords) == 5 and coords[0] == coords[-1]
+        if shape_descriptor is not None:
+            is_rectangle = shape_descriptor.is_rectangle
+        else:
+            coords = list(wall_exterior.exterior.coords)
+            is_rectangle = len(coords) == 5 and coords[0] == coords[-1]
         is_complex = len(apertures) > 0 or not is_rectangle
         
         # ===== PREVIEW INIZIALE - SOLO CONTORNO PARETE =====
@@ -155,18 +360,28 @@ async def preview_file_conversion(
             enhanced_info["wall_original"] = wall_original  # Poligono originale per linea blu
             enhanced_info["offset_mm"] = offset_applied_mm
         
-        preview_base64 = generate_preview_image(
-            wall_exterior,  # Poligono con offset (verde)
-            placed,  # *** ARRAY VUOTO - NESSUN BLOCCO ***
-            custom,  # *** ARRAY VUOTO - NESSUN CUSTOM *** 
-            apertures,
-            {},  # color_theme vuoto
-            config,
-            enhanced_info=enhanced_info
-        )
+        scene_graph = build_preview_scene_graph(wall_exterior, placed, custom, apertures, config, enhanced_info)
+        
+        preview_base64 = None
+        if preview_format != "scene":
+            preview_base64 = generate_preview_image(
+                wall_exterior,  # Poligono con offset (verde)
+                placed,  # *** ARRAY VUOTO - NESSUN BLOCCO ***
+                custom,  # *** ARRAY VUOTO - NESSUN CUSTOM *** 
+                apertures,
+                {},  # color_theme vuoto
+                config,
+                enhanced_info=enhanced_info,
+                scene_graph=scene_graph
+            )
+            
+            if not preview_base64:
+                raise HTTPException(status_code=500, detail="Errore generazione preview")
         
-        if not preview_base64:
-            raise HTTPException(status_code=500, detail="Errore generazione preview")
+        # 🖌️ Scena vettoriale: il browser la ridisegna con il proprio tema
+        preview_scene = None
+        if preview_format != "png":
+            preview_scene = scene_to_vector(scene_graph)
         
         # Preparazione misure formattate
         measurements = {
@@ -260,13 +475,16 @@ async def preview_file_conversion(
             "username": current_user.username,
             "preview_only": True,  # Marca come sessione di preview - NESSUN PACKING ANCORA
             "offset_applied_mm": offset_applied_mm,  # Info offset per reference
-            "offset_error": offset_error
+            "offset_error": offset_error,
+            "local_frame": local_frame,  # 📍 Origine locale (invertita solo negli exporter)
+            "shape_descriptor": shape_descriptor
         }
         
         return {
             "status": "success",
             "preview_session_id": preview_session_id,  # NUOVO: ID per riutilizzo
             "preview_image": preview_base64,
+            "preview_scene": preview_scene,
             "measurements": measurements,
             "conversion_details": conversion_details,
             "validation_messages": validation_messages,
@@ -277,7 +495,8 @@ async def preview_file_conversion(
             "offset_applied_mm": offset_applied_mm,
             "offset_error": offset_error,
             "wall_polygon_coords": list(wall_exterior.exterior.coords) if wall_exterior else [],
-            "wall_polygon_original_coords": list(wall_original.exterior.coords) if wall_original else []
+            "wall_polygon_original_coords": list(wall_original.exterior.coords) if wall_original else [],
+            "shape_descriptor": shape_descriptor.to_dict() if shape_descriptor else None
         }
         
     except HTTPException:
@@ -417,6 +636,15 @@ async def enhanced_pack_from_preview(
         print(f"   📏 Block height: {block_schema['block_height']}")
         print(f"   ↔️ Row offset: {row_offset}")
         
+        # 🔥 NUOVO: Parse moraletti_config se fornito (usata da packing e verifica)
+        moraletti_dict = None
+        if moraletti_config:
+            try:
+                moraletti_dict = json.loads(moraletti_config)
+                print(f"📍 MORALETTI CONFIG ricevuto: {moraletti_dict}")
+            except json.JSONDecodeError:
+                print(f"⚠️ Errore parsing moraletti_config")
+        
         # OTTIMIZZAZIONE: Controlla se possiamo riutilizzare i risultati del preview
         preview_config = preview_data.get("preview_config", {})
         can_reuse_preview = (
@@ -435,18 +663,14 @@ async def enhanced_pack_from_preview(
             print("🔄 NUOVO PACKING: Parametri diversi dal preview, ricalcolo necessario")
             print(f"🔺🔺🔺 RICEVUTO vertical_spaces dal frontend: {vertical_spaces}")
             
-            # 🔥 NUOVO: Parse moraletti_config se fornito
-            moraletti_dict = None
-            if moraletti_config:
-                try:
-                    moraletti_dict = json.loads(moraletti_config)
-                    print(f"📍 MORALETTI CONFIG ricevuto: {moraletti_dict}")
-                except json.JSONDecodeError:
-                    print(f"⚠️ Errore parsing moraletti_config")
-            
             # 🔥 NUOVO: Log algorithm_type
             print(f"🧠 ALGORITHM TYPE ricevuto: {algorithm_type}")
             
+            # Descrittore dalla sessione preview (ricalcolato solo se cambia l'altezza riga)
+            shape_descriptor = get_shape_descriptor(
+                preview_data, wall_exterior, apertures, block_schema["block_height"]
+            )
+            
             # Perform packing SUI DATI GIÀ CONVERTITI
             placed, custom = pack_wall(
                 wall_exterior,
@@ -457,7 +681,8 @@ async def enhanced_pack_from_preview(
                 starting_direction=starting_direction,
                 vertical_config=vertical_config,
                 algorithm_type=algorithm_type,  # 🔥 NUOVO: Pass algorithm type
-                moraletti_config=moraletti_dict  # 🔥 NUOVO: Pass moraletti config
+                moraletti_config=moraletti_dict,  # 🔥 NUOVO: Pass moraletti config
+                shape_descriptor=shape_descriptor
             )
             summary = summarize_blocks(placed)
         
@@ -554,6 +779,25 @@ async def enhanced_pack_from_preview(
         except Exception as e:
             print(f"⚠️ Optimization pass failed: {e}")
         
+        # 🏗️ Verifica strutturale del layout finale (qualsiasi algoritmo)
+        result["structural_check"] = _structural_check(
+            result["blocks_standard"], result["blocks_custom"], wall_exterior, apertures,
+            widths_list, block_schema["block_height"], moraletti_dict
+        )
+        
+        # 🖌️ Grafo di scena del risultato: condiviso da preview, PDF e DXF
+        scene_graph = get_scene_graph(
+            None,
+            wall_exterior,
+            result["blocks_standard"],
+            result["blocks_custom"],
+            apertures,
+            result.get("config", {}).get("size_to_letter"),
+            wall_original=preview_data.get("wall_polygon_original"),
+            starting_point=_scene_starting_point(result)
+        )
+        result["preview_scene"] = scene_to_vector(scene_graph)
+        
         # Store final session
         SESSIONS[final_session_id] = {
             'data': result,
@@ -569,7 +813,10 @@ async def enhanced_pack_from_preview(
             'wall_polygon': wall_exterior,  # Geometria per packing (con offset se applicato)
             'wall_polygon_original': preview_data.get("wall_polygon_original"),  # 📐 NUOVO: Poligono originale per visualizzazione
             'offset_applied_mm': preview_data.get("offset_applied_mm", 0),  # 📐 NUOVO: Distanza offset
-            'apertures': apertures  # NUOVO: Salva anche aperture originali
+            'apertures': apertures,  # NUOVO: Salva anche aperture originali
+            'local_frame': preview_data.get("local_frame"),  # 📍 Origine locale dal preview
+            'shape_descriptor': preview_data.get("shape_descriptor"),
+            'scene_graph': scene_graph
         }
         
         # Cleanup preview session (opzionale)
@@ -610,92 +857,16 @@ async def upload_and_process(
     """
     Upload SVG/DWG e processamento completo con preview - PROTETTO DA AUTENTICAZIONE.
     """
-    # Import qui per evitare circular imports
-    from main import (
-        SESSIONS, PackingResult, parse_wall_file, pack_wall, opt_pass, 
-        summarize_blocks, calculate_metrics, get_block_schema_from_frontend,
-        get_default_block_schema, BLOCK_WIDTHS, BLOCK_HEIGHT, SIZE_TO_LETTER
-    )
-    
     try:
         # Log dell'attività dell'utente
         print(f"📁 File '{file.filename}' caricato da utente: {current_user.username}")
         
-        # Validazione file
-        file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else ''
-        supported_formats = ['svg', 'dwg', 'dxf']
-        
-        if file_ext not in supported_formats:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Formato file non supportato. Formati accettati: {', '.join(supported_formats).upper()}"
-            )
-        
-        if file.size and file.size > 10 * 1024 * 1024:  # 10MB limit
-            raise HTTPException(status_code=400, detail="File troppo grande (max 10MB)")
-        
-        # Lettura file
-        file_bytes = await file.read()
-        if not file_bytes:
-            raise HTTPException(status_code=400, detail="File vuoto")
-        
-        # Parse parametri blocchi (backward compatibility)
-        try:
-            widths = [int(w.strip()) for w in block_widths.split(',') if w.strip()]
-            if not widths:
-                widths = BLOCK_WIDTHS
-        except ValueError:
-            widths = BLOCK_WIDTHS
-        
-        # Parse dimensioni blocchi personalizzate
-        try:
-            block_config = json.loads(block_dimensions) if block_dimensions else {}
-            print(f"📦 [DEBUG] Block dimensions received: {block_config}")
-            
-            # Determina schema blocchi da usare (standard vs custom)
-            block_schema = get_block_schema_from_frontend(block_config)
-            
-            # Estrai dimensioni effettive da usare
-            final_widths = block_schema["block_widths"]
-            final_height = block_schema["block_height"]
-            final_size_to_letter = block_schema["size_to_letter"]
-            
-            print(f"🎯 Schema blocchi scelto: {block_schema['schema_type']}")
-            print(f"   📏 Dimensioni: {final_widths}×{final_height}")
-            print(f"   🔤 Mappatura: {final_size_to_letter}")
-            
-        except (ValueError, json.JSONDecodeError):
-            print("⚠️ Block dimensions parsing failed, using defaults")
-            block_schema = get_default_block_schema()
-            final_widths = BLOCK_WIDTHS
-            final_height = BLOCK_HEIGHT
-            final_size_to_letter = SIZE_TO_LETTER
-        
-        # Parse tema colori
-        try:
-            color_config = json.loads(color_theme) if color_theme else {}
-            print(f"🎨 [DEBUG] Color theme received: {color_config}")
-        except (ValueError, json.JSONDecodeError):
-            color_config = {}
-            print("⚠️ Color theme parsing failed, using defaults")
-        
-        # Parse vertical spaces configuration
-        vertical_config = None
-        if vertical_spaces:
-            try:
-                vertical_config = json.loads(vertical_spaces)
-                print(f"🔺 Vertical Spaces Config: {vertical_config}")
-            except json.JSONDecodeError:
-                print(f"⚠️ Errore parsing vertical_spaces, usando default")
-                vertical_config = {
-                    'enableGroundOffset': False,
-                    'groundOffsetValue': 0,
-                    'enableCeilingSpace': False,
-                    'ceilingSpaceValue': 0
-                }
+        file_bytes = await _read_upload(file)
+        upload_config = _parse_upload_config(block_dimensions, color_theme, vertical_spaces)
         
         # Parse file (SVG o DWG)
         wall, apertures = parse_wall_file(file_bytes, file.filename)
+        wall, apertures, local_frame = normalize_to_local_origin(wall, apertures)
         
         # 📐 APPLICA OFFSET INTERNO SE ABILITATO
         wall_original = wall  # Salva sempre poligono originale per visualizzazione
@@ -744,59 +915,25 @@ async def upload_and_process(
         else:
             print(f"📐 Nessuna configurazione offset ricevuta, uso poligono originale")
         
-        # Packing con dimensioni personalizzate (usa default left per questa route legacy)
-        placed, custom = pack_wall(
-            wall,  # Usa il poligono (con o senza offset applicato)
-            final_widths,
-            final_height,
+        # Packing e sessione (usa default left per questa route legacy)
+        packed = _pack_and_store_wall(
+            wall, apertures, local_frame, upload_config,
             row_offset=row_offset,
-            apertures=apertures if apertures else None,  # Aperture sempre invariate!
-            starting_direction='left',
-            vertical_config=vertical_config
+            project_name=project_name,
+            current_user=current_user,
+            filename=file.filename,
+            file_bytes=file_bytes,
+            wall_original=wall_original,
+            offset_applied_mm=offset_applied_mm,
+            offset_error=offset_error
         )
-        
-        # Ottimizzazione
-        placed, custom = opt_pass(placed, custom, final_widths)
-        
-        # Calcola metriche
-        summary = summarize_blocks(placed, final_size_to_letter)
-        metrics = calculate_metrics(placed, custom, wall.area)
-        
-        # Genera session ID
-        session_id = str(uuid.uuid4())
-        
-        # Salva in sessione (con info utente e file bytes per salvare dopo)
-        SESSIONS[session_id] = {
-            "wall_polygon": wall,  # Poligono usato per packing (con offset se applicato)
-            "wall_polygon_original": wall_original,  # 📐 NUOVO: Poligono originale per visualizzazione
-            "offset_applied_mm": offset_applied_mm,  # 📐 NUOVO: Distanza offset applicata
-            "offset_error": offset_error,  # 📐 NUOVO: Eventuale errore offset
-            "apertures": apertures,
-            "placed": placed,
-            "customs": custom,
-            "summary": summary,
-            "config": {
-                "block_widths": final_widths,
-                "block_height": final_height,  
-                "size_to_letter": final_size_to_letter,
-                "block_schema": block_schema,
-                "row_offset": row_offset,
-                "project_name": project_name,
-                "color_theme": color_config
-            },
-            "metrics": metrics,
-            "timestamp": datetime.datetime.now(),
-            "user_id": current_user.id,
-            "username": current_user.username,
-            "original_filename": file.filename,
-            "file_bytes": file_bytes
-        }
+        placed, custom = packed["placed"], packed["customs"]
         
         # Formatta response
         minx, miny, maxx, maxy = wall.bounds
         
         return {
-            "session_id": session_id,
+            "session_id": packed["session_id"],
             "status": "success",
             "wall_bounds": [minx, miny, maxx, maxy],
             "blocks_standard": [
@@ -829,16 +966,10 @@ async def upload_and_process(
                 }
                 for ap in (apertures or [])
             ],
-            "summary": summary,
-            "config": {
-                "block_widths": final_widths,
-                "block_height": final_height,
-                "size_to_letter": final_size_to_letter,
-                "block_schema": block_schema,
-                "row_offset": row_offset,
-                "project_name": project_name
-            },
-            "metrics": metrics,
+            "summary": packed["summary"],
+            "config": _response_config(upload_config, row_offset, project_name),
+            "metrics": packed["metrics"],
+            "structural_check": packed["structural_check"],
             "saved_file_path": None,
             # 📐 NUOVO: Dati offset per visualizzazione frontend
             "offset_applied_mm": offset_applied_mm,
@@ -847,21 +978,95 @@ async def upload_and_process(
             "wall_polygon_original_coords": list(wall_original.exterior.coords) if wall_original else []  # Poligono originale
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Errore upload: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/upload-walls")
+async def upload_multi_wall(
+    file: UploadFile = File(...),
+    row_offset: int = Form(826),
+    project_name: str = Form("Progetto Parete"),
+    color_theme: str = Form("{}"),
+    block_dimensions: str = Form("{}"),
+    vertical_spaces: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Upload di un disegno con più pareti: un solo parsing, packing di tutte le pareti.
+    Ogni parete ha la sua sessione; l'ordine segue il disegno (sinistra→destra, basso→alto).
+    """
+    try:
+        print(f"📁 File multi-parete '{file.filename}' caricato da utente: {current_user.username}")
+
+        file_bytes = await _read_upload(file)
+        upload_config = _parse_upload_config(block_dimensions, color_theme, vertical_spaces)
+
+        # Un solo parsing per tutte le pareti del disegno
+        parsed_walls = parse_wall_file_multi(file_bytes, file.filename)
+        group_id = str(uuid.uuid4())
+        walls_response = []
+
+        for wall_index, (wall, apertures) in enumerate(parsed_walls):
+            wall, apertures, local_frame = normalize_to_local_origin(wall, apertures)
+            packed = _pack_and_store_wall(
+                wall, apertures, local_frame, upload_config,
+                row_offset=row_offset,
+                project_name=f"{project_name} - Parete {wall_index + 1}",
+                current_user=current_user,
+                filename=file.filename,
+                file_bytes=file_bytes,
+                session_extra={"wall_group_id": group_id, "wall_index": wall_index}
+            )
+
+            walls_response.append({
+                "session_id": packed["session_id"],
+                "wall_index": wall_index,
+                "wall_bounds": list(local_frame.to_world(wall).bounds),
+                "wall_area": wall.area,
+                "apertures_count": len(apertures),
+                "geometry_type": packed["shape_descriptor"].geometry_label,
+                "summary": packed["summary"],
+                "metrics": packed["metrics"],
+                "structural_check": packed["structural_check"]
+            })
+
+        print(f"✅ Packing multi-parete completato: {len(walls_response)} pareti")
+
+        return {
+            "group_id": group_id,
+            "status": "success",
+            "walls_count": len(walls_response),
+            "walls": walls_response,
+            "config": _response_config(upload_config, row_offset, project_name)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Errore upload multi-parete: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/preview/{session_id}")
-async def get_preview_image(session_id: str, color_theme: Optional[str] = None):
+async def get_preview_image(session_id: str, color_theme: Optional[str] = None, format: str = "png"):
     """
     Genera immagine preview per sessione.
     Accetta opzionalmente color_theme come query parameter per aggiornare i colori.
+    format: 'png' (default), 'scene' (solo scena vettoriale, nessun render) o 'both'.
     """
     # Import qui per evitare circular imports
     from main import SESSIONS, generate_preview_image
     from shapely.geometry import Polygon
     
     try:
+        try:
+            preview_format = normalize_preview_format(format)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        
         if session_id not in SESSIONS:
             raise HTTPException(status_code=404, detail="Sessione non trovata")
         
@@ -935,7 +1140,7 @@ async def get_preview_image(session_id: str, color_theme: Optional[str] = None):
                 "production_parameters": data.get("production_parameters", {}),
                 "enhanced": True
             }
-            
+
             # 📐 NUOVO: Aggiungi wall_original se presente (per visualizzazione offset)
             if "wall_polygon_original" in session and session["wall_polygon_original"] is not None:
                 enhanced_info["wall_original"] = session["wall_polygon_original"]
@@ -977,22 +1182,39 @@ async def get_preview_image(session_id: str, color_theme: Optional[str] = None):
             config = {"size_to_letter": SIZE_TO_LETTER}
             print(f"🔧 Creato config con size_to_letter di default: {SIZE_TO_LETTER}")
         
-        # Genera preview
-        preview_base64 = generate_preview_image(
-            wall_polygon,
-            placed,
-            customs,
-            apertures,
-            color_theme_dict,
-            config,
-            enhanced_info=enhanced_info  # Pass enhanced data
+        # 🧩 Grafo di scena riutilizzato dalla sessione: un cambio tema non lo ricostruisce
+        scene_graph = build_preview_scene_graph(
+            wall_polygon, placed, customs, apertures, config, enhanced_info, session=session
         )
         
-        if not preview_base64:
-            raise HTTPException(status_code=500, detail="Errore generazione preview")
+        response = {}
+        
+        # 🖌️ Scena vettoriale: il browser ridisegna tema e zoom senza nuovi render
+        if preview_format != "png":
+            response["scene"] = scene_to_vector(scene_graph)
+        
+        if preview_format != "scene":
+            # Genera preview
+            preview_base64 = generate_preview_image(
+                wall_polygon,
+                placed,
+                customs,
+                apertures,
+                color_theme_dict,
+                config,
+                enhanced_info=enhanced_info,  # Pass enhanced data
+                scene_graph=scene_graph
+            )
+            
+            if not preview_base64:
+                raise HTTPException(status_code=500, detail="Errore generazione preview")
+            
+            response["image"] = preview_base64
         
-        return {"image": preview_base64}
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Errore preview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1142,6 +1364,9 @@ async def enhanced_upload_and_process(
         if not wall_exterior or wall_exterior.is_empty:
             raise HTTPException(status_code=400, detail="Nessuna geometria valida trovata nel file")
         
+        # 📍 Coordinate locali: evita perdita di precisione su disegni georeferenziati
+        wall_exterior, apertures, local_frame = normalize_to_local_origin(wall_exterior, apertures)
+        
         print(f"✅ Geometria parsed - Area parete: {wall_exterior.area/1000000:.2f} m²")
         print(f"📐 Aperture trovate: {len(apertures)}")
         
@@ -1164,6 +1389,8 @@ async def enhanced_upload_and_process(
         print(f"   📏 Block height: {block_schema['block_height']}")
         print(f"   ↔️ Row offset: {row_offset}")
         
+        shape_descriptor = describe_wall(wall_exterior, apertures, block_schema["block_height"])
+        
         # Perform standard packing with starting direction
         placed, custom = pack_wall(
             wall_exterior, 
@@ -1172,7 +1399,8 @@ async def enhanced_upload_and_process(
             row_offset=row_offset, 
             apertures=apertures,
             starting_direction=starting_direction,
-            vertical_config=vertical_config
+            vertical_config=vertical_config,
+            shape_descriptor=shape_descriptor
         )
         
         print(f"🎯 RISULTATI ENHANCED PACK:")
@@ -1266,6 +1494,12 @@ async def enhanced_upload_and_process(
         except Exception as e:
             print(f"⚠️ Optimization pass failed: {e}")
         
+        # 🏗️ Verifica strutturale del layout finale
+        result["structural_check"] = _structural_check(
+            result["blocks_standard"], result["blocks_custom"], wall_exterior, apertures,
+            widths_list, block_schema["block_height"]
+        )
+        
         # Store session
         SESSIONS[session_id] = {
             'data': result,
@@ -1278,7 +1512,9 @@ async def enhanced_upload_and_process(
             'file_bytes': file_content,  # IMPORTANTE: salva i bytes del file per il salvataggio progetto
             'original_filename': file.filename,
             'wall_polygon': wall_exterior,  # NUOVO: Salva geometria originale per preview identico
-            'apertures': apertures  # NUOVO: Salva anche aperture originali
+            'apertures': apertures,  # NUOVO: Salva anche aperture originali
+            'local_frame': local_frame,  # 📍 Origine locale (invertita solo negli exporter)
+            'shape_descriptor': shape_descriptor
         }
         
         print(f"💾 Enhanced session {session_id} salvata per utente {current_user.username}")
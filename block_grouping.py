@@ -9,12 +9,97 @@ Implementa:
 4. Supporto blocchi standard e custom con stesse dimensioni
 """
 
-from typing import List, Dict, Tuple, DefaultDict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, DefaultDict
 from collections import defaultdict
 from utils.config import SIZE_TO_LETTER, BLOCK_HEIGHT
+from utils.block_types import get_block_type_registry
 import string
 
 
+# Tolleranza (mm) per considerare "uguali" le dimensioni di due pezzi custom
+# o una larghezza standard e una voce della mappatura lettere
+CUSTOM_TOLERANCE_MM = 5
+MAPPING_TOLERANCE_MM = 5
+
+
+@dataclass(frozen=True)
+class CategoryInfo:
+    """Definizione di una categoria (lettera) assegnata a un gruppo di blocchi."""
+    letter: str
+    group_key: str
+    count: int
+    type: str        # 'standard' | 'custom'
+    priority: int
+
+
+@dataclass(frozen=True)
+class GroupingResult:
+    """
+    Risultato di un raggruppamento: etichette per indice e categorie in ordine
+    di assegnazione. Ogni chiamata produce strutture proprie, mai condivise.
+    """
+    std_labels: Dict[int, Dict]
+    custom_labels: Dict[int, Dict]
+    categories: Tuple[CategoryInfo, ...]
+
+    def summary(self) -> Dict[str, Dict]:
+        """Riassunto categorie per tabelle/export (vedi ``BlockGrouping.get_category_summary``)."""
+        summary = {}
+        for info in self.categories:
+            group_key = info.group_key
+            
+            # Estrai dimensioni dal group_key
+            if group_key.startswith('std_'):
+                dimensions_part = group_key.replace('std_', '')
+                block_type = 'standard'
+                description = f"Blocco Standard {info.letter}"
+            elif group_key.startswith('custom_'):
+                dimensions_part = group_key.replace('custom_', '')
+                block_type = 'custom'
+                description = f"Pezzo Custom {info.letter}"
+            else:
+                dimensions_part = "unknown"
+                block_type = 'unknown'
+                description = f"Blocco {info.letter}"
+            
+            summary[info.letter] = {
+                'count': info.count,
+                'type': block_type,
+                'dimensions': dimensions_part,
+                'description': description,
+                'priority': info.priority
+            }
+        
+        return summary
+
+
+def group_blocks(
+    placed: List[Dict],
+    customs: List[Dict],
+    custom_size_to_letter: Optional[Dict[int, str]] = None,
+    tolerance: int = CUSTOM_TOLERANCE_MM,
+) -> GroupingResult:
+    """
+    Raggruppa e categorizza blocchi standard e custom (funzione pura).
+
+    I gruppi seguono l'ordine di prima apparizione; le lettere vengono
+    assegnate per numerosità decrescente, a parità per ordine di apparizione.
+    """
+    # 1. Raggruppa blocchi per caratteristiche simili
+    standard_groups = _group_standard_blocks(placed)
+    custom_groups = _group_custom_blocks(customs, tolerance)
+    
+    # 2. Assegna categorie (lettere) a ogni gruppo
+    category_map, categories = _assign_categories(standard_groups, custom_groups, custom_size_to_letter)
+    
+    # 3. Crea etichette finali
+    std_labels = _create_standard_labels(placed, standard_groups, category_map)
+    custom_labels = _create_custom_labels(customs, custom_groups, category_map)
+    
+    return GroupingResult(std_labels, custom_labels, tuple(categories))
+
+
 class BlockGrouping:
     """Gestisce il raggruppamento e categorizzazione dei blocchi."""
     
@@ -23,11 +108,8 @@ class BlockGrouping:
         self.reset()
     
     def reset(self):
-        """Reset contatori e mappature."""
-        self.category_counters = defaultdict(int)
-        self.block_categories = {}  # block_id -> categoria
-        self.category_definitions = {}  # categoria -> info
-        self.next_category_letter = 'A'
+        """Dimentica l'ultimo raggruppamento calcolato da questa istanza."""
+        self.last_result: Optional[GroupingResult] = None
     
     def create_grouped_labels(self, placed: List[Dict], customs: List[Dict]) -> Tuple[Dict[int, Dict], Dict[int, Dict]]:
         """
@@ -42,284 +124,225 @@ class BlockGrouping:
                 'display': {...}      # Info per rendering
             }
         """
-        self.reset()
-        
-        # 1. Raggruppa blocchi per caratteristiche simili
-        standard_groups = self._group_standard_blocks(placed)
-        custom_groups = self._group_custom_blocks(customs)
-        
-        # 2. Assegna categorie (lettere) a ogni gruppo
-        category_map = self._assign_categories(standard_groups, custom_groups)
-        
-        # 3. Crea etichette finali
-        std_labels = self._create_standard_labels(placed, standard_groups, category_map)
-        custom_labels = self._create_custom_labels(customs, custom_groups, category_map)
-        
-        return std_labels, custom_labels
+        self.last_result = group_blocks(placed, customs, self.custom_size_to_letter)
+        return self.last_result.std_labels, self.last_result.custom_labels
     
-    def _group_standard_blocks(self, placed: List[Dict]) -> Dict[str, List[int]]:
-        """Raggruppa blocchi standard per tipo (dimensione)."""
-        groups = defaultdict(list)
+    def get_category_summary(self) -> Dict[str, Dict]:
+        """
+        Restituisce riassunto delle categorie dell'ultimo raggruppamento di questa istanza.
         
-        for i, block in enumerate(placed):
-            width = int(block['width'])
-            height = int(block['height'])
-            
-            # Crea chiave gruppo basata su dimensioni
-            group_key = f"std_{width}x{height}"
-            groups[group_key].append(i)
+        Returns:
+            Dict[categoria] = {
+                'count': numero_blocchi,
+                'type': 'standard'|'custom', 
+                'dimensions': 'larghezza×altezza',
+                'description': descrizione_umana
+            }
+        """
+        return self.last_result.summary() if self.last_result is not None else {}
+
+
+def _group_standard_blocks(placed: List[Dict]) -> Dict[str, List[int]]:
+    """Raggruppa blocchi standard per tipo (dimensione)."""
+    groups = defaultdict(list)
+    
+    for i, block in enumerate(placed):
+        width = int(block['width'])
+        height = int(block['height'])
         
-        print(f"📦 Gruppi standard trovati: {dict(groups)}")
-        return dict(groups)
+        # Crea chiave gruppo basata su dimensioni
+        group_key = f"std_{width}x{height}"
+        groups[group_key].append(i)
     
-    def _group_custom_blocks(self, customs: List[Dict]) -> Dict[str, List[int]]:
-        """Raggruppa blocchi custom per dimensioni simili."""
-        groups = defaultdict(list)
-        tolerance = 5  # mm di tolleranza per considerare dimensioni "uguali"
+    print(f"📦 Gruppi standard trovati: { {key: len(indices) for key, indices in groups.items()} }")
+    return dict(groups)
+
+
+def _group_custom_blocks(customs: List[Dict], tolerance: int = CUSTOM_TOLERANCE_MM) -> Dict[str, List[int]]:
+    """
+    Raggruppa blocchi custom per dimensioni simili.
+
+    Ogni gruppo è ancorato alle dimensioni (arrotondate) del primo pezzo e
+    registrato in un bucket di lato ``tolerance``: un pezzo entro tolleranza
+    può stare solo nel proprio bucket o in uno degli 8 adiacenti. Tra i gruppi
+    compatibili vince il più vecchio, come nella scansione lineare originale.
+    """
+    groups: Dict[str, List[int]] = {}
+    anchors: List[Tuple[int, int, str]] = []          # gruppo -> (w, h, chiave)
+    buckets: DefaultDict[Tuple[int, int], List[int]] = defaultdict(list)
+    size = max(int(tolerance), 1)
+    
+    for i, custom in enumerate(customs):
+        width = round(custom['width'])
+        height = round(custom['height'])
+        bucket_x, bucket_y = width // size, height // size
         
-        for i, custom in enumerate(customs):
-            width = round(custom['width'])
-            height = round(custom['height'])
-            
-            # Cerca gruppo esistente con dimensioni simili
-            found_group = None
-            for existing_key in groups.keys():
-                if existing_key.startswith("custom_"):
-                    # Estrai dimensioni esistenti
-                    try:
-                        parts = existing_key.replace("custom_", "").split("x")
-                        existing_w, existing_h = int(parts[0]), int(parts[1])
-                        
-                        # Controlla se rientra nella tolleranza
-                        if (abs(width - existing_w) <= tolerance and 
-                            abs(height - existing_h) <= tolerance):
-                            found_group = existing_key
-                            break
-                    except:
-                        continue
-            
-            if found_group:
-                groups[found_group].append(i)
-            else:
-                # Nuovo gruppo
-                group_key = f"custom_{width}x{height}"
-                groups[group_key].append(i)
+        # Cerca gruppo esistente con dimensioni simili nei bucket vicini
+        found_group = None
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for group in buckets.get((bucket_x + dx, bucket_y + dy), ()):
+                    existing_w, existing_h, _ = anchors[group]
+                    if (abs(width - existing_w) <= tolerance and
+                            abs(height - existing_h) <= tolerance and
+                            (found_group is None or group < found_group)):
+                        found_group = group
         
-        print(f"🔧 Gruppi custom trovati: {dict(groups)}")
-        return dict(groups)
+        if found_group is None:
+            # Nuovo gruppo
+            found_group = len(anchors)
+            group_key = f"custom_{width}x{height}"
+            anchors.append((width, height, group_key))
+            buckets[(bucket_x, bucket_y)].append(found_group)
+            groups[group_key] = []
+        
+        groups[anchors[found_group][2]].append(i)
     
-    def _assign_categories(self, std_groups: Dict, custom_groups: Dict) -> Dict[str, str]:
-        """
-        Assegna lettere categoria ai gruppi.
-        Se custom_size_to_letter è fornito, usa quel mapping per i blocchi standard.
-        Altrimenti usa A, B, C per standard e D+ per custom.
-        """
-        category_map = {}
+    print(f"🔧 Gruppi custom trovati: { {key: len(indices) for key, indices in groups.items()} }")
+    return groups
+
+
+def _by_size_then_appearance(groups: Dict[str, List[int]]) -> List[Tuple[str, List[int]]]:
+    """Gruppi per numerosità decrescente; a parità, per primo indice (ordine deterministico)."""
+    return sorted(groups.items(), key=lambda item: (-len(item[1]), item[1][0]))
+
+
+def _assign_categories(
+    std_groups: Dict[str, List[int]],
+    custom_groups: Dict[str, List[int]],
+    custom_size_to_letter: Optional[Dict[int, str]] = None,
+) -> Tuple[Dict[str, str], List[CategoryInfo]]:
+    """
+    Assegna lettere categoria ai gruppi.
+    Se custom_size_to_letter è fornito, usa quel mapping per i blocchi standard.
+    Altrimenti usa A, B, C per standard e D+ per custom.
+    """
+    category_map = {}
+    categories: List[CategoryInfo] = []
+    
+    if custom_size_to_letter:
+        print(f"🔧 Uso mapping personalizzato: {custom_size_to_letter}")
         
-        if self.custom_size_to_letter:
-            print(f"🔧 Uso mapping personalizzato: {self.custom_size_to_letter}")
+        # Con mapping personalizzato: assegna lettere in base alla larghezza del blocco
+        registry = get_block_type_registry(size_to_letter=custom_size_to_letter)
+        for group_key, indices in std_groups.items():
+            # Tipo internato dalla chiave gruppo (es. "std_1500x495" -> 1500)
+            block_type = registry[registry.resolve(group_key)]
+            width = block_type.width
             
-            # Con mapping personalizzato: assegna lettere in base alla larghezza del blocco
-            for group_key, indices in std_groups.items():
-                # Estrai larghezza dalla chiave gruppo (es. "std_1500x495" -> 1500)
-                try:
-                    width_str = group_key.replace("std_", "").split("x")[0]
-                    width = int(width_str)
-                    
-                    print(f"🔍 DEBUG: Cerco match per width={width} in mapping {self.custom_size_to_letter}")
-                    
-                    # Prova match esatto
-                    letter = self.custom_size_to_letter.get(width)
-                    
-                    # Se non trova match esatto, prova con tolleranza
-                    if not letter:
-                        print(f"⚠️  Nessun match esatto per width={width}, cerco con tolleranza...")
-                        tolerance = 5  # 5mm di tolleranza
-                        for map_width, map_letter in self.custom_size_to_letter.items():
-                            if abs(width - map_width) <= tolerance:
-                                letter = map_letter
-                                print(f"✅ Trovato match con tolleranza: {width} ≈ {map_width} → {letter}")
-                                break
-                    
-                    if not letter:
-                        print(f"❌ Nessun match trovato per width={width}, uso 'X'")
-                        letter = "X"
-                    else:
-                        print(f"✅ Match trovato: width={width} → letter={letter}")
-                    
-                    category_map[group_key] = letter
-                    
-                    # Salva definizione categoria
-                    self.category_definitions[letter] = {
-                        'group_key': group_key,
-                        'count': len(indices),
-                        'type': 'standard',
-                        'priority': len(indices) * 1000
-                    }
-                    
-                    print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, larghezza: {width})")
-                except (ValueError, IndexError) as e:
-                    print(f"⚠️ Errore parsing gruppo {group_key}: {e}")
-                    category_map[group_key] = "X"
-                    
-            # Custom blocks iniziano dalla lettera successiva a quella usata
-            used_letters = set(self.custom_size_to_letter.values())
-            custom_letter_start = len(used_letters)
-        else:
-            # Sistema originale: A, B, C per standard (ordinati per quantità)
-            std_sorted = sorted(std_groups.items(), key=lambda x: len(x[1]), reverse=True)
-            for i, (group_key, indices) in enumerate(std_sorted):
-                if i < 3:  # Solo A, B, C per standard
-                    letter = chr(ord('A') + i)
-                    category_map[group_key] = letter
-                    
-                    # Salva definizione categoria
-                    self.category_definitions[letter] = {
-                        'group_key': group_key,
-                        'count': len(indices),
-                        'type': 'standard',
-                        'priority': len(indices) * 1000
-                    }
-                    
-                    print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, tipo: standard)")
-            
-            custom_letter_start = 3  # D, E, F...
-        
-        # Assegna lettere ai gruppi custom (ordinati per quantità)
-        custom_sorted = sorted(custom_groups.items(), key=lambda x: len(x[1]), reverse=True)
-        
-        for i, (group_key, indices) in enumerate(custom_sorted):
-            letter_index = custom_letter_start + i
+            # Prova match esatto, poi con tolleranza
+            letter = block_type.letter
+            if not letter:
+                letter = registry.letter_for_width(width, MAPPING_TOLERANCE_MM)
+                if letter:
+                    print(f"✅ Trovato match con tolleranza: {width} → {letter}")
             
-            if letter_index < 26:
-                letter = string.ascii_uppercase[letter_index]
-            else:
-                # Dopo Z, usa AA, AB, AC...
-                letter = self._generate_extended_letter(letter_index - 26)
+            if not letter:
+                print(f"❌ Nessun match trovato per width={width}, uso 'X'")
+                letter = "X"
             
             category_map[group_key] = letter
-            
-            # Salva definizione categoria
-            self.category_definitions[letter] = {
-                'group_key': group_key,
-                'count': len(indices),
-                'type': 'custom',
-                'priority': len(indices) * 10
-            }
-            
-            print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, tipo: custom)")
+            categories.append(CategoryInfo(letter, group_key, len(indices), 'standard', len(indices) * 1000))
+            print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, larghezza: {width})")
+                
+        # Custom blocks iniziano dalla lettera successiva a quella usata
+        used_letters = set(custom_size_to_letter.values())
+        custom_letter_start = len(used_letters)
+    else:
+        # Sistema originale: A, B, C per standard (ordinati per quantità)
+        for i, (group_key, indices) in enumerate(_by_size_then_appearance(std_groups)):
+            if i < 3:  # Solo A, B, C per standard
+                letter = chr(ord('A') + i)
+                category_map[group_key] = letter
+                categories.append(CategoryInfo(letter, group_key, len(indices), 'standard', len(indices) * 1000))
+                print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, tipo: standard)")
         
-        return category_map
+        custom_letter_start = 3  # D, E, F...
     
-    def _generate_extended_letter(self, index: int) -> str:
-        """Genera lettere estese oltre Z: AA, AB, AC..."""
-        first = index // 26
-        second = index % 26
-        return string.ascii_uppercase[first] + string.ascii_uppercase[second]
-    
-    def _create_standard_labels(self, placed: List[Dict], groups: Dict, category_map: Dict) -> Dict[int, Dict]:
-        """Crea etichette per blocchi standard."""
-        labels = {}
+    # Assegna lettere ai gruppi custom (ordinati per quantità)
+    for i, (group_key, indices) in enumerate(_by_size_then_appearance(custom_groups)):
+        letter_index = custom_letter_start + i
         
-        for group_key, indices in groups.items():
-            category = category_map[group_key]
-            
-            # Numera progressivamente all'interno della categoria
-            for position, block_index in enumerate(indices):
-                number = position + 1
-                
-                labels[block_index] = {
-                    'category': category,
-                    'number': number,
-                    'full_label': f"{category}{number}",
-                    'group_key': group_key,
-                    'display': {
-                        'bottom_left': category,     # Lettera categoria
-                        'top_right': str(number),    # Numero progressivo
-                        'type': 'standard',
-                        'dimensions': f"{placed[block_index]['width']:.0f}×{placed[block_index]['height']:.0f}"
-                    }
-                }
+        if letter_index < 26:
+            letter = string.ascii_uppercase[letter_index]
+        else:
+            # Dopo Z, usa AA, AB, AC...
+            letter = _generate_extended_letter(letter_index - 26)
         
-        return labels
+        category_map[group_key] = letter
+        categories.append(CategoryInfo(letter, group_key, len(indices), 'custom', len(indices) * 10))
+        print(f"📋 Categoria {letter} → {group_key} ({len(indices)} blocchi, tipo: custom)")
     
-    def _create_custom_labels(self, customs: List[Dict], groups: Dict, category_map: Dict) -> Dict[int, Dict]:
-        """Crea etichette per blocchi custom."""
-        labels = {}
+    return category_map, categories
+
+
+def _generate_extended_letter(index: int) -> str:
+    """Genera lettere estese oltre Z: AA, AB, AC..."""
+    first = index // 26
+    second = index % 26
+    return string.ascii_uppercase[first] + string.ascii_uppercase[second]
+
+
+def _create_standard_labels(placed: List[Dict], groups: Dict, category_map: Dict) -> Dict[int, Dict]:
+    """Crea etichette per blocchi standard."""
+    labels = {}
+    
+    for group_key, indices in groups.items():
+        category = category_map[group_key]
         
-        for group_key, indices in groups.items():
-            category = category_map[group_key]
+        # Numera progressivamente all'interno della categoria
+        for position, block_index in enumerate(indices):
+            number = position + 1
             
-            # Numera progressivamente all'interno della categoria
-            for position, custom_index in enumerate(indices):
-                number = position + 1
-                custom = customs[custom_index]
-                
-                labels[custom_index] = {
-                    'category': category,
-                    'number': number,
-                    'full_label': f"{category}{number}",
-                    'group_key': group_key,
-                    'display': {
-                        'bottom_left': category,     # Lettera categoria
-                        'top_right': str(number),    # Numero progressivo
-                        'type': 'custom',
-                        'ctype': custom.get('ctype', 2),
-                        'dimensions': f"{custom['width']:.0f}×{custom['height']:.0f}"
-                    }
+            labels[block_index] = {
+                'category': category,
+                'number': number,
+                'full_label': f"{category}{number}",
+                'group_key': group_key,
+                'display': {
+                    'bottom_left': category,     # Lettera categoria
+                    'top_right': str(number),    # Numero progressivo
+                    'type': 'standard',
+                    'dimensions': f"{placed[block_index]['width']:.0f}×{placed[block_index]['height']:.0f}"
                 }
-        
-        return labels
-    
-    def get_category_summary(self) -> Dict[str, Dict]:
-        """
-        Restituisce riassunto delle categorie per tabelle/export.
-        
-        Returns:
-            Dict[categoria] = {
-                'count': numero_blocchi,
-                'type': 'standard'|'custom', 
-                'dimensions': 'larghezza×altezza',
-                'description': descrizione_umana
             }
-        """
-        summary = {}
+    
+    return labels
+
+
+def _create_custom_labels(customs: List[Dict], groups: Dict, category_map: Dict) -> Dict[int, Dict]:
+    """Crea etichette per blocchi custom."""
+    labels = {}
+    
+    for group_key, indices in groups.items():
+        category = category_map[group_key]
         
-        for category, info in self.category_definitions.items():
-            group_key = info['group_key']
+        # Numera progressivamente all'interno della categoria
+        for position, custom_index in enumerate(indices):
+            number = position + 1
+            custom = customs[custom_index]
             
-            # Estrai dimensioni dal group_key
-            if group_key.startswith('std_'):
-                dimensions_part = group_key.replace('std_', '')
-                block_type = 'standard'
-                description = f"Blocco Standard {category}"
-            elif group_key.startswith('custom_'):
-                dimensions_part = group_key.replace('custom_', '')
-                block_type = 'custom'
-                description = f"Pezzo Custom {category}"
-            else:
-                dimensions_part = "unknown"
-                block_type = 'unknown'
-                description = f"Blocco {category}"
-            
-            summary[category] = {
-                'count': info['count'],
-                'type': block_type,
-                'dimensions': dimensions_part,
-                'description': description,
-                'priority': info['priority']
+            labels[custom_index] = {
+                'category': category,
+                'number': number,
+                'full_label': f"{category}{number}",
+                'group_key': group_key,
+                'display': {
+                    'bottom_left': category,     # Lettera categoria
+                    'top_right': str(number),    # Numero progressivo
+                    'type': 'custom',
+                    'ctype': custom.get('ctype', 2),
+                    'dimensions': f"{custom['width']:.0f}×{custom['height']:.0f}"
+                }
             }
-        
-        return summary
+    
+    return labels
 
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Funzioni di compatibilità con il sistema esistente
 # ────────────────────────────────────────────────────────────────────────────────
 
-# Istanza globale per mantenere stato
-_block_grouping = BlockGrouping()
-
 def create_grouped_block_labels(placed: List[Dict], customs: List[Dict], custom_size_to_letter: Dict[int, str] = None) -> Tuple[Dict[int, Dict], Dict[int, Dict]]:
     """
     Funzione principale per creare etichette raggruppate.
@@ -331,16 +354,12 @@ def create_grouped_block_labels(placed: List[Dict], customs: List[Dict], custom_
     
     Sostituisce create_block_labels() con il nuovo sistema di raggruppamento.
     """
-    # Usa un'istanza dedicata se abbiamo mapping personalizzato
-    if custom_size_to_letter:
-        grouping_instance = BlockGrouping(custom_size_to_letter)
-        return grouping_instance.create_grouped_labels(placed, customs)
-    else:
-        return _block_grouping.create_grouped_labels(placed, customs)
+    result = group_blocks(placed, customs, custom_size_to_letter)
+    return result.std_labels, result.custom_labels
 
-def get_block_category_summary() -> Dict[str, Dict]:
+def get_block_category_summary(placed: List[Dict], customs: List[Dict], custom_size_to_letter: Dict[int, str] = None) -> Dict[str, Dict]:
     """Ottieni riassunto categorie per tabelle/export."""
-    return _block_grouping.get_category_summary()
+    return group_blocks(placed, customs, custom_size_to_letter).summary()
 
 def create_block_labels_legacy(placed: List[Dict], custom: List[Dict]) -> Tuple[Dict[int, str], Dict[int, str]]:
     """
@@ -408,11 +427,7 @@ if __name__ == "__main__":
 # Funzioni helper per compatibilità con main.py
 def group_blocks_by_category(placed: List[Dict], custom_size_to_letter: Dict[int, str] = None) -> Dict[str, List[Dict]]:
     """Raggruppa i blocchi per categoria (compatibilità main.py)."""
-    if custom_size_to_letter:
-        grouping = BlockGrouping(custom_size_to_letter)
-    else:
-        grouping = BlockGrouping()
-    std_labels, _ = grouping.create_grouped_labels(placed, [])
+    std_labels = group_blocks(placed, [], custom_size_to_letter).std_labels
     
     # Raggruppa per categoria
     categories = defaultdict(list)
@@ -426,8 +441,7 @@ def group_blocks_by_category(placed: List[Dict], custom_size_to_letter: Dict[int
 
 def group_custom_blocks_by_category(customs: List[Dict]) -> Dict[str, List[Dict]]:
     """Raggruppa i blocchi custom per categoria (compatibilità main.py)."""
-    grouping = BlockGrouping()
-    _, custom_labels = grouping.create_grouped_labels([], customs)
+    custom_labels = group_blocks([], customs).custom_labels
     
     # Raggruppa per categoria
     categories = defaultdict(list)
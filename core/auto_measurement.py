@@ -9,6 +9,18 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from core.sheet_nesting import NestingOptions, nest_pieces
+
+# Prezzi indicativi (da aggiornare con prezzi reali)
+MATERIAL_COST_PER_M3 = 400  # €/m³
+GUIDE_COST_PER_M = 15       # €/m
+LABOR_COST_FACTOR = 0.5     # manodopera: 50% dei materiali
+MISC_COST_FACTOR = 0.1      # viti, colla, etc.: 10% dei materiali
+
+# Punteggi dei rating per il punteggio complessivo
+STRUCTURAL_SCORES = {"Eccellente": 10, "Buono": 8, "Accettabile": 6, "Insufficiente": 3}
+COST_SCORES = {"Economico": 10, "Medio": 7, "Costoso": 4}
+
 class MeasurementUnit(Enum):
     """Unità di misura supportate."""
     MM = "mm"
@@ -218,75 +230,81 @@ class AutoMeasurementCalculator:
         }
     
     def calculate_cutting_optimization(self, required_pieces: List[Dict], 
-                                     material_sheet_size: Dict) -> Dict:
+                                     material_sheet_size: Dict,
+                                     kerf_mm: Optional[float] = None,
+                                     allow_rotation: bool = True,
+                                     time_budget_s: float = 0.5) -> Dict:
         """
         Ottimizza il taglio per minimizzare gli sprechi di materiale.
+
+        Nesting 2D a ghigliottina (core/sheet_nesting.py): ogni pezzo ha
+        coordinate reali sul foglio e il risultato include il piano di taglio.
+        I pezzi con ``grain`` (venatura) o ``rotatable: False`` non vengono ruotati.
+
+        Args:
+            required_pieces: Pezzi con width_mm/height_mm
+            material_sheet_size: Dimensioni foglio (width_mm, height_mm)
+            kerf_mm: Spessore lama; default la tolleranza di taglio standard
+            allow_rotation: Rotazione di 90° ammessa per i pezzi senza venatura
+            time_budget_s: Tempo massimo per provare euristiche alternative
         """
         
         sheet_width = material_sheet_size.get("width_mm", 2500)
         sheet_height = material_sheet_size.get("height_mm", 1250)
         sheet_area = sheet_width * sheet_height
         
-        # Ordina i pezzi per area decrescente (algoritmo First Fit Decreasing)
-        sorted_pieces = sorted(required_pieces, 
-                              key=lambda p: p.get("width_mm", 0) * p.get("height_mm", 0), 
-                              reverse=True)
+        options = NestingOptions(
+            sheet_width=sheet_width,
+            sheet_height=sheet_height,
+            kerf_mm=self.tolerance_mm if kerf_mm is None else kerf_mm,
+            allow_rotation=allow_rotation,
+            time_budget_s=time_budget_s
+        )
+        nesting = nest_pieces(
+            [(p.get("width_mm", 0), p.get("height_mm", 0), not p.get("grain") and p.get("rotatable", True))
+             for p in required_pieces],
+            options
+        )
         
-        # Simula il posizionamento
         sheets_used = []
-        current_sheet = {"width": sheet_width, "height": sheet_height, "pieces": [], "remaining_area": sheet_area}
-        
-        for piece in sorted_pieces:
-            piece_width = piece.get("width_mm", 0)
-            piece_height = piece.get("height_mm", 0)
-            piece_area = piece_width * piece_height
-            
-            # Controlla se il pezzo entra nel foglio corrente
-            if (piece_width <= current_sheet["width"] and 
-                piece_height <= current_sheet["height"] and
-                piece_area <= current_sheet["remaining_area"]):
-                
-                # Aggiungi il pezzo al foglio corrente
-                current_sheet["pieces"].append(piece)
-                current_sheet["remaining_area"] -= piece_area
-                
-                # Aggiorna dimensioni rimanenti (semplificato)
-                current_sheet["width"] -= piece_width
-                
-            else:
-                # Il pezzo non entra, inizia un nuovo foglio
-                if current_sheet["pieces"]:
-                    sheets_used.append(current_sheet)
-                
-                current_sheet = {
-                    "width": sheet_width - piece_width,
-                    "height": sheet_height,
-                    "pieces": [piece],
-                    "remaining_area": sheet_area - piece_area
-                }
-        
-        # Aggiungi l'ultimo foglio se ha pezzi
-        if current_sheet["pieces"]:
-            sheets_used.append(current_sheet)
+        cut_plan = []
+        for sheet in nesting.sheets:
+            used_area = sheet.used_area
+            sheets_used.append({
+                "sheet": sheet.index + 1,
+                "width": sheet.width,
+                "height": sheet.height,
+                "pieces": [dict(required_pieces[p.index], **p.to_dict()) for p in sheet.placements],
+                "used_area": used_area,
+                "remaining_area": sheet_area - used_area
+            })
+            cut_plan.extend(dict(cut.to_dict(), sheet=sheet.index + 1, step=step + 1)
+                            for step, cut in enumerate(sheet.cuts))
         
         # Calcola statistiche
-        total_used_area = sum(sum(p.get("width_mm", 0) * p.get("height_mm", 0) for p in sheet["pieces"]) 
-                             for sheet in sheets_used)
+        total_used_area = sum(sheet.used_area for sheet in nesting.sheets)
         total_sheet_area = len(sheets_used) * sheet_area
         efficiency = (total_used_area / total_sheet_area * 100) if total_sheet_area > 0 else 0
         
+        notes = [
+            f"Efficienza taglio: {efficiency:.1f}%",
+            f"Fogli necessari: {len(sheets_used)}",
+            f"Area totale utilizzata: {total_used_area/1000:.1f} dm²",
+            f"Spreco stimato: {(total_sheet_area - total_used_area)/1000:.1f} dm²",
+            f"Tagli: {len(cut_plan)} (lama {options.kerf_mm} mm, euristica {nesting.heuristic})"
+        ]
+        if nesting.unplaced:
+            notes.append(f"⚠️ {len(nesting.unplaced)} pezzi non entrano nel foglio {sheet_width}×{sheet_height}")
+        
         return {
             "sheets_needed": len(sheets_used),
             "sheets_layout": sheets_used,
+            "cut_plan": cut_plan,
+            "unplaced_pieces": [required_pieces[i] for i in nesting.unplaced],
             "efficiency_percent": round(efficiency, 1),
             "waste_area_mm2": total_sheet_area - total_used_area,
             "total_pieces": len(required_pieces),
-            "optimization_notes": [
-                f"Efficienza taglio: {efficiency:.1f}%",
-                f"Fogli necessari: {len(sheets_used)}",
-                f"Area totale utilizzata: {total_used_area/1000:.1f} dm²",
-                f"Spreco stimato: {(total_sheet_area - total_used_area)/1000:.1f} dm²"
-            ]
+            "optimization_notes": notes
         }
     
     def validate_measurement_combination(self, material: MaterialSpec, guide: GuideSpec,
@@ -362,19 +380,17 @@ class AutoMeasurementCalculator:
             "Verificare la misura prima dell'installazione"
         ]
     
-    def _estimate_project_cost(self, material_volume_m3: float, guide_length_m: float) -> Dict:
+    def _estimate_project_cost(self, material_volume_m3: float, guide_length_m: float,
+                               material_cost_per_m3: float = MATERIAL_COST_PER_M3,
+                               guide_cost_per_m: float = GUIDE_COST_PER_M) -> Dict:
         """Stima il costo del progetto."""
         
-        # Prezzi indicativi (da aggiornare con prezzi reali)
-        material_cost_per_m3 = 400  # €/m³
-        guide_cost_per_m = 15      # €/m
-        
         material_cost = material_volume_m3 * material_cost_per_m3
         guide_cost = guide_length_m * guide_cost_per_m
         
         # Costi aggiuntivi
-        labor_cost = (material_cost + guide_cost) * 0.5  # 50% dei materiali
-        misc_cost = (material_cost + guide_cost) * 0.1   # 10% per viti, colla, etc.
+        labor_cost = (material_cost + guide_cost) * LABOR_COST_FACTOR
+        misc_cost = (material_cost + guide_cost) * MISC_COST_FACTOR
         
         total_cost = material_cost + guide_cost + labor_cost + misc_cost
         
@@ -434,16 +450,17 @@ class AutoMeasurementCalculator:
         structural = self._calculate_structural_rating(material, guide, wall_dimensions)
         cost = self._calculate_cost_rating(material, guide)
         
-        structural_scores = {"Eccellente": 10, "Buono": 8, "Accettabile": 6, "Insufficiente": 3}
-        cost_scores = {"Economico": 10, "Medio": 7, "Costoso": 4}
-        
-        structural_score = structural_scores.get(structural, 5)
-        cost_score = cost_scores.get(cost, 5)
-        
-        # Media ponderata (strutturale 70%, costo 30%)
-        overall = (structural_score * 0.7) + (cost_score * 0.3)
-        
-        return round(overall, 1)
+        return overall_score_from_ratings(structural, cost)
+
+def overall_score_from_ratings(structural: str, cost: str) -> float:
+    """Media ponderata dei rating (strutturale 70%, costo 30%), da 1 a 10."""
+    
+    structural_score = STRUCTURAL_SCORES.get(structural, 5)
+    cost_score = COST_SCORES.get(cost, 5)
+    
+    overall = (structural_score * 0.7) + (cost_score * 0.3)
+    
+    return round(overall, 1)
 
 # Funzioni di utilità per l'integrazione con il sistema esistente
 def create_calculation_from_config(config: Dict) -> CalculationResult:
@@ -0,0 +1,333 @@
+"""
+Stima costi e materiali su griglia di opzioni del catalogo
+Confronta tutte le combinazioni materiale × spessore × guida su una o più
+pareti in un solo passaggio vettoriale (matrice combinazioni × pareti):
+stesse formule di AutoMeasurementCalculator per fabbisogno, costo, validazione
+e rating, poi classifica per validità, punteggio complessivo e costo totale.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.auto_measurement import (
+    GUIDE_COST_PER_M,
+    LABOR_COST_FACTOR,
+    MATERIAL_COST_PER_M3,
+    MISC_COST_FACTOR,
+    AutoMeasurementCalculator,
+    GuideSpec,
+    MaterialSpec,
+    overall_score_from_ratings,
+)
+
+__all__ = [
+    "MaterialOption",
+    "GuideOption",
+    "EstimateRow",
+    "EstimateTable",
+    "options_from_catalogue",
+    "wall_dimensions_from",
+    "estimate_project_grid",
+]
+
+# Rating in ordine dal migliore al peggiore (indice = posizione nella tupla)
+STRUCTURAL_RATINGS = ("Eccellente", "Buono", "Accettabile", "Insufficiente")
+COST_RATINGS = ("Economico", "Medio", "Costoso")
+
+DEFAULT_DENSITY_KG_M3 = 650.0
+DEFAULT_GUIDE_LOAD_KG = 40.0
+
+
+@dataclass(frozen=True)
+class MaterialOption:
+    """Materiale del catalogo con gli spessori da confrontare."""
+    name: str
+    thicknesses_mm: Tuple[int, ...]
+    density_kg_m3: float = DEFAULT_DENSITY_KG_M3
+    material_type: Optional[str] = None
+    cost_per_m3: float = MATERIAL_COST_PER_M3
+
+    def spec(self, thickness_mm: int) -> MaterialSpec:
+        return MaterialSpec(thickness_mm=thickness_mm, density_kg_m3=self.density_kg_m3)
+
+
+@dataclass(frozen=True)
+class GuideOption:
+    """Guida del catalogo; ``compatible_types`` vuoto = compatibile con tutti i materiali."""
+    name: str
+    spec: GuideSpec
+    price_per_meter: float = GUIDE_COST_PER_M
+    compatible_types: Tuple[str, ...] = ()
+
+    def accepts(self, material: MaterialOption) -> bool:
+        if not self.compatible_types:
+            return True
+        allowed = {t.lower() for t in self.compatible_types}
+        return material.name.lower() in allowed or (material.material_type or "").lower() in allowed
+
+
+@dataclass(frozen=True)
+class EstimateRow:
+    """Una combinazione materiale + spessore + guida valutata sull'intero progetto."""
+    rank: int
+    material: MaterialOption
+    thickness_mm: int
+    guide: GuideOption
+    closure_thickness_mm: int
+    compatible: bool
+    valid: bool
+    structural_rating: str           # il peggiore tra le pareti
+    cost_rating: str
+    overall_score: float             # il minimo tra le pareti
+    governing_wall: int              # parete che determina il punteggio
+    volume_m3: float
+    weight_kg: float
+    guide_length_m: float
+    material_cost: float
+    guide_cost: float
+    labor_cost: float
+    misc_cost: float
+    total_cost: float
+    wall_costs: Tuple[float, ...]
+    validation: Dict = field(default_factory=dict, compare=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "rank": self.rank,
+            "material": self.material.name,
+            "material_type": self.material.material_type,
+            "thickness_mm": self.thickness_mm,
+            "guide": self.guide.name,
+            "guide_width_mm": self.guide.spec.width_mm,
+            "closure_thickness_mm": self.closure_thickness_mm,
+            "compatible": self.compatible,
+            "valid": self.valid,
+            "structural_rating": self.structural_rating,
+            "cost_rating": self.cost_rating,
+            "overall_score": self.overall_score,
+            "governing_wall": self.governing_wall,
+            "requirements": {
+                "volume_m3": round(self.volume_m3, 4),
+                "weight_kg": round(self.weight_kg, 1),
+                "guide_length_m": round(self.guide_length_m, 2)
+            },
+            "cost_estimate": {
+                "material_cost": round(self.material_cost, 2),
+                "guide_cost": round(self.guide_cost, 2),
+                "labor_cost": round(self.labor_cost, 2),
+                "misc_cost": round(self.misc_cost, 2),
+                "total_cost": round(self.total_cost, 2),
+                "currency": "EUR"
+            },
+            "wall_costs": [round(c, 2) for c in self.wall_costs],
+            "validation": self.validation
+        }
+
+
+@dataclass(frozen=True)
+class EstimateTable:
+    """Tabella comparativa ordinata (migliore per prima)."""
+    rows: Tuple[EstimateRow, ...]
+    combinations: int
+    walls: Tuple[Dict, ...]
+    elapsed_ms: float
+
+    @property
+    def best(self) -> Optional[EstimateRow]:
+        return self.rows[0] if self.rows else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "combinations": self.combinations,
+            "walls": list(self.walls),
+            "rows": [row.to_dict() for row in self.rows],
+            "elapsed_ms": round(self.elapsed_ms, 2)
+        }
+
+
+def options_from_catalogue(materials: Sequence[Dict], guides: Sequence[Dict],
+                           thicknesses_mm: Optional[Sequence[int]] = None
+                           ) -> Tuple[List[MaterialOption], List[GuideOption]]:
+    """
+    Opzioni dai dizionari del catalogo (MaterialService / GuideService).
+    ``thicknesses_mm`` limita gli spessori a quelli indicati; i materiali
+    senza spessori rimasti vengono esclusi.
+    """
+    wanted = set(thicknesses_mm) if thicknesses_mm else None
+    material_options = []
+    for m in materials:
+        thicknesses = tuple(sorted(t for t in m.get("available_thicknesses", [])
+                                   if wanted is None or t in wanted))
+        if thicknesses:
+            material_options.append(MaterialOption(
+                name=m["name"],
+                thicknesses_mm=thicknesses,
+                density_kg_m3=m.get("density_kg_m3") or DEFAULT_DENSITY_KG_M3,
+                material_type=m.get("type")
+            ))
+
+    guide_options = [
+        GuideOption(
+            name=g["name"],
+            spec=GuideSpec(
+                width_mm=g["width_mm"],
+                depth_mm=g.get("depth_mm", 25),
+                max_load_kg=g.get("max_load_kg") or DEFAULT_GUIDE_LOAD_KG,
+                material_type=g.get("type", f"{g['width_mm']}mm")
+            ),
+            price_per_meter=g.get("price_per_meter") or GUIDE_COST_PER_M,
+            compatible_types=tuple(str(t) for t in g.get("material_compatibility") or ())
+        )
+        for g in guides
+    ]
+    return material_options, guide_options
+
+
+def wall_dimensions_from(wall: Dict) -> Dict:
+    """
+    Dimensioni di una parete da un dizionario ``width_mm``/``height_mm``
+    o da un risultato di packing (``wall_bounds``).
+    """
+    if "wall_bounds" in wall:
+        minx, miny, maxx, maxy = wall["wall_bounds"][:4]
+        dimensions = {"width_mm": maxx - minx, "height_mm": maxy - miny}
+    elif "width_mm" in wall and "height_mm" in wall:
+        dimensions = {"width_mm": wall["width_mm"], "height_mm": wall["height_mm"]}
+    else:
+        raise ValueError("Parete senza dimensioni: servono width_mm/height_mm o wall_bounds")
+
+    if dimensions["width_mm"] <= 0 or dimensions["height_mm"] <= 0:
+        raise ValueError(f"Dimensioni parete non valide: {dimensions}")
+    if "ceiling_height_mm" in wall:
+        dimensions["ceiling_height_mm"] = wall["ceiling_height_mm"]
+    return dimensions
+
+
+def estimate_project_grid(walls: Sequence[Dict], materials: Sequence[MaterialOption],
+                          guides: Sequence[GuideOption], limit: Optional[int] = None,
+                          calculator: Optional[AutoMeasurementCalculator] = None) -> EstimateTable:
+    """
+    Valuta ogni combinazione materiale × spessore × guida su tutte le pareti.
+
+    Per ogni coppia (combinazione, parete) calcola volume, peso, metri di guida
+    e costi come ``calculate_material_requirements`` (moretti inclusi, come nel
+    calcolo enhanced) e rating/punteggio come ``validate_measurement_combination``.
+    Sul progetto: quantità e costi sommati, rating strutturale e punteggio della
+    parete peggiore. Ordine: combinazioni valide e compatibili, punteggio
+    decrescente, costo crescente. Solo le prime ``limit`` righe riportano il
+    dettaglio della validazione (calcolato sulla parete determinante).
+    """
+    start = time.perf_counter()
+    calculator = calculator or AutoMeasurementCalculator()
+    walls = [wall_dimensions_from(w) for w in walls]
+    if not walls:
+        raise ValueError("Serve almeno una parete")
+
+    combos = [(material, thickness, guide)
+              for material in materials for thickness in material.thicknesses_mm for guide in guides]
+    if not combos:
+        return EstimateTable((), 0, tuple(walls), (time.perf_counter() - start) * 1000)
+
+    # Vettori per combinazione (C) e per parete (W)
+    t = np.array([c[1] for c in combos], dtype=float)
+    density = np.array([c[0].density_kg_m3 for c in combos], dtype=float)
+    cost_per_m3 = np.array([c[0].cost_per_m3 for c in combos], dtype=float)
+    guide_width = np.array([c[2].spec.width_mm for c in combos], dtype=float)
+    guide_load = np.array([c[2].spec.max_load_kg for c in combos], dtype=float)
+    guide_price = np.array([c[2].price_per_meter for c in combos], dtype=float)
+    compatible = np.array([c[2].accepts(c[0]) for c in combos], dtype=bool)
+
+    width = np.array([w["width_mm"] for w in walls], dtype=float)
+    height = np.array([w["height_mm"] for w in walls], dtype=float)
+    moretti_height = np.array([_moretti_height(calculator, w) for w in walls], dtype=float)
+
+    # Fabbisogno (C × W): stesse espressioni di calculate_material_requirements
+    area_m2 = (width * height) / 1_000_000
+    material_volume = (area_m2[None, :] * t[:, None]) / 1000
+    moretti_volume = (((width * moretti_height) / 1_000_000)[None, :] * t[:, None]) / 1000
+    volume = material_volume + moretti_volume
+    weight = material_volume * density[:, None] + moretti_volume * density[:, None]
+    guide_length = np.broadcast_to(((width + height) * 2 / 1000 * 1.1)[None, :], volume.shape)
+
+    # Costi (C × W): come _estimate_project_cost
+    material_cost = volume * cost_per_m3[:, None]
+    guide_cost = guide_length * guide_price[:, None]
+    labor_cost = (material_cost + guide_cost) * LABOR_COST_FACTOR
+    misc_cost = (material_cost + guide_cost) * MISC_COST_FACTOR
+    total_cost = material_cost + guide_cost + labor_cost + misc_cost
+
+    # Validazione e rating: come validate_measurement_combination
+    valid = ~(guide_width / t > 5) & compatible
+    structural_total = ((np.minimum(t / 25, 1.0) + np.minimum(guide_load / 50, 1.0))[:, None]
+                        - np.maximum(0, (height - 2500) / 1000)[None, :]) / 2
+    structural_idx = 3 - ((structural_total >= 0.4).astype(int) + (structural_total >= 0.6)
+                          + (structural_total >= 0.8))
+    cost_total = t * 0.1 + guide_width * 0.05
+    cost_idx = (cost_total > 5).astype(int) + (cost_total > 10)
+    score_table = np.array([[overall_score_from_ratings(s, c) for c in COST_RATINGS]
+                            for s in STRUCTURAL_RATINGS])
+    score = score_table[structural_idx, cost_idx[:, None]]
+
+    # Progetto: somme sulle pareti, parete peggiore per rating e punteggio
+    governing = np.argmin(score, axis=1)
+    project_score = score[np.arange(len(combos)), governing]
+    project_cost = total_cost.sum(axis=1)
+    order = np.lexsort((project_cost, -project_score, ~valid))
+
+    rows = []
+    sums = {name: values.sum(axis=1) for name, values in (
+        ("volume", volume), ("weight", weight), ("guide_length", guide_length),
+        ("material_cost", material_cost), ("guide_cost", guide_cost),
+        ("labor_cost", labor_cost), ("misc_cost", misc_cost))}
+    for rank, i in enumerate(order[:limit] if limit is not None else order, start=1):
+        material, thickness, guide = combos[i]
+        wall = walls[governing[i]]
+        rows.append(EstimateRow(
+            rank=rank,
+            material=material,
+            thickness_mm=thickness,
+            guide=guide,
+            closure_thickness_mm=thickness * 2 + guide.spec.width_mm,
+            compatible=bool(compatible[i]),
+            valid=bool(valid[i]),
+            structural_rating=STRUCTURAL_RATINGS[structural_idx[i].max()],
+            cost_rating=COST_RATINGS[cost_idx[i]],
+            overall_score=float(project_score[i]),
+            governing_wall=int(governing[i]),
+            volume_m3=float(sums["volume"][i]),
+            weight_kg=float(sums["weight"][i]),
+            guide_length_m=float(sums["guide_length"][i]),
+            material_cost=float(sums["material_cost"][i]),
+            guide_cost=float(sums["guide_cost"][i]),
+            labor_cost=float(sums["labor_cost"][i]),
+            misc_cost=float(sums["misc_cost"][i]),
+            total_cost=float(project_cost[i]),
+            wall_costs=tuple(float(c) for c in total_cost[i]),
+            validation=_row_validation(calculator, material.spec(thickness), guide, wall, compatible[i])
+        ))
+
+    return EstimateTable(tuple(rows), len(combos), tuple(walls), (time.perf_counter() - start) * 1000)
+
+
+def _moretti_height(calculator: AutoMeasurementCalculator, wall: Dict) -> float:
+    """Altezza moretti della parete (0 se non servono), come nel calcolo enhanced."""
+    complete_rows = int(wall["height_mm"] / calculator.standard_block_height_mm)
+    moretti = calculator.calculate_moretti_dimensions(
+        wall.get("ceiling_height_mm", calculator.standard_ceiling_height_mm), 0, complete_rows
+    )
+    return moretti["height_mm"] if moretti["needed"] else 0
+
+
+def _row_validation(calculator: AutoMeasurementCalculator, material: MaterialSpec, guide: GuideOption,
+                    wall: Dict, compatible: bool) -> Dict:
+    """Dettaglio testuale della validazione sulla parete determinante."""
+    result = calculator.validate_measurement_combination(material, guide.spec, wall)
+    validation = {key: result[key] for key in ("issues", "warnings", "recommendations")}
+    if not compatible:
+        validation["issues"] = validation["issues"] + [
+            f"Guida {guide.name} compatibile solo con: {', '.join(guide.compatible_types)}"
+        ]
+    return validation
@@ -7,10 +7,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from typing import Dict, List, Tuple, Optional, Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Tuple, Optional, Any
 from shapely.geometry import Polygon
 import json
 import logging
+import pickle
+import threading
 
 # Import sistema calcolo misure
 from core.auto_measurement import (
@@ -34,22 +38,131 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Combinazioni configurazione × dimensioni parete memorizzate (LRU)
+ENHANCED_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Statistiche della cache dei parametri enhanced"""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def to_dict(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": self.size,
+            "max_size": self.max_size,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+
+class EnhancedParametersCache:
+    """
+    Cache LRU thread-safe dei parametri enhanced, condivisa tra le richieste.
+    Chiave: configurazione normalizzata + dimensioni parete. I valori sono
+    conservati come snapshot serializzato: ogni chiamante riceve una copia
+    indipendente (più economica di deepcopy e del ricalcolo).
+    """
+    
+    def __init__(self, max_size: int = ENHANCED_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict]) -> Dict:
+        """Restituisce il valore memorizzato per ``key`` o lo calcola e lo memorizza"""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if snapshot is not None:
+            return pickle.loads(snapshot)
+        
+        # Calcolo fuori dal lock: richieste concorrenti sulla stessa chiave producono lo stesso valore
+        value = compute()
+        snapshot = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+    
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self.max_size)
+
+
+def _normalise_config(value: Any) -> Hashable:
+    """
+    Forma canonica e hashable di una configurazione (chiavi ordinate).
+    I valori restano distinti per tipo (14 e 14.0 finiscono nei testi delle formule).
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalise_config(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise_config(v) for v in value)
+    if isinstance(value, Hashable):
+        return (type(value).__name__, value)
+    return repr(value)
+
+
+# Cache condivisa da tutti i calcolatori del processo
+_shared_cache = EnhancedParametersCache()
+
+
+def get_enhanced_cache_stats() -> Dict:
+    """Statistiche della cache condivisa dei parametri enhanced"""
+    return _shared_cache.stats().to_dict()
+
+
+def clear_enhanced_cache() -> None:
+    """Svuota la cache condivisa (es. dopo modifiche ai parametri materiali)"""
+    _shared_cache.clear()
+
+
 class EnhancedPackingCalculator:
     """
     Estende il sistema di packing esistente con calcolo automatico delle misure.
     Integra le specifiche del documento italiano con gli algoritmi di ottimizzazione.
     """
     
-    def __init__(self, material_service: Optional[Any] = None):
+    def __init__(self, material_service: Optional[Any] = None,
+                 cache: Optional[EnhancedParametersCache] = None):
         self.measurement_calculator = AutoMeasurementCalculator()
         self.material_service = material_service or (MaterialParameterService() if MaterialParameterService else None)
         
-        # Cache per evitare ricalcoli
-        self._calculation_cache = {}
+        # Cache per evitare ricalcoli (condivisa tra richieste se non specificata)
+        self.cache = cache if cache is not None else _shared_cache
         
     def calculate_enhanced_packing_parameters(self, project_config: Dict, wall_polygon: Polygon) -> Dict:
         """
         Calcola parametri di packing potenziati con misure automatiche.
+        Il risultato dipende solo da configurazione e dimensioni della parete
+        ed è memorizzato nella cache del calcolatore.
         
         Args:
             project_config: Configurazione progetto con parametri materiali
@@ -67,6 +180,19 @@ class EnhancedPackingCalculator:
             "area_m2": wall_polygon.area / 1_000_000
         }
         
+        key = (
+            _normalise_config(project_config),
+            wall_dimensions["width_mm"],
+            wall_dimensions["height_mm"],
+            wall_dimensions["area_m2"]
+        )
+        return self.cache.get_or_compute(
+            key, lambda: self._compute_enhanced_parameters(project_config, wall_dimensions)
+        )
+    
+    def _compute_enhanced_parameters(self, project_config: Dict, wall_dimensions: Dict) -> Dict:
+        """Calcolo completo dei parametri enhanced (eseguito solo in caso di cache miss)."""
+        
         # Ottieni parametri materiali (da database o config)
         material_params = self._get_material_parameters(project_config)
         
@@ -220,11 +346,6 @@ class EnhancedPackingCalculator:
     def _get_material_parameters(self, config: Dict) -> Dict:
         """Ottiene parametri materiali da database o configurazione."""
         
-        cache_key = f"{config.get('material_id', 'default')}_{config.get('guide_id', 'default')}"
-        
-        if cache_key in self._calculation_cache:
-            return self._calculation_cache[cache_key]
-        
         # Prova a ottenere da database
         if self.material_service:
             try:
@@ -251,8 +372,6 @@ class EnhancedPackingCalculator:
                             ).to_dict(),
                             "source": "database"
                         }
-                        
-                        self._calculation_cache[cache_key] = result
                         return result
             except Exception as e:
                 logger.warning(f"Errore accesso database materiali: {e}")
@@ -273,8 +392,6 @@ class EnhancedPackingCalculator:
             ).to_dict(),
             "source": "config"
         }
-        
-        self._calculation_cache[cache_key] = result
         return result
     
     def _get_material_objects_from_dict(self, material_params: Dict) -> tuple[MaterialSpec, GuideSpec]:
@@ -374,37 +491,35 @@ class EnhancedPackingCalculator:
     
     def _enhance_blocks_with_measurements(self, standard_blocks: List[Dict], custom_blocks: List[Dict],
                                         enhanced_params: Dict) -> Dict:
-        """Potenzia blocchi con misure automatiche."""
+        """
+        Misure dei blocchi come tabella laterale per tipo (standard) o gruppo
+        dimensionale (custom): i blocchi non vengono copiati, i consumatori
+        risolvono le misure di un blocco con ``resolve_block_measurements``.
+        """
         
         closure_thickness = enhanced_params["closure_calculation"]["closure_thickness_mm"]
         
-        enhanced_standard = []
-        for block in standard_blocks:
-            enhanced_block = block.copy()
-            enhanced_block["thickness_mm"] = closure_thickness
-            enhanced_block["volume_m3"] = (
-                block.get("width", 0) * 
-                block.get("height", 0) * 
-                closure_thickness
-            ) / 1_000_000_000
-            enhanced_standard.append(enhanced_block)
-        
-        enhanced_custom = []
-        for block in custom_blocks:
-            enhanced_block = block.copy()  
-            enhanced_block["thickness_mm"] = closure_thickness
-            enhanced_block["volume_m3"] = (
-                block.get("width", 0) * 
-                block.get("height", 0) * 
-                closure_thickness
-            ) / 1_000_000_000
-            enhanced_custom.append(enhanced_block)
+        groups: Dict[str, Dict] = {}
+        for blocks in (standard_blocks, custom_blocks):
+            for block in blocks:
+                key = measurement_key(block)
+                group = groups.get(key)
+                if group is None:
+                    width, height = block.get("width", 0), block.get("height", 0)
+                    group = groups[key] = {
+                        "width": width,
+                        "height": height,
+                        "count": 0,
+                        "volume_m3": width * height * closure_thickness / 1_000_000_000
+                    }
+                group["count"] += 1
         
         return {
-            "standard": enhanced_standard,
-            "custom": enhanced_custom,
-            "total_volume_m3": sum(b["volume_m3"] for b in enhanced_standard + enhanced_custom),
-            "closure_thickness_mm": closure_thickness
+            "closure_thickness_mm": closure_thickness,
+            "groups": groups,
+            "standard_count": len(standard_blocks),
+            "custom_count": len(custom_blocks),
+            "total_volume_m3": sum(g["volume_m3"] * g["count"] for g in groups.values())
         }
     
     def _generate_enhanced_cutting_list(self, enhanced_params: Dict) -> Dict:
@@ -483,6 +598,30 @@ class EnhancedPackingCalculator:
         # Fallback
         return Polygon([(0, 0), (1000, 0), (1000, 1000), (0, 1000)])
 
+# Tabella misure blocchi (blocks_with_measurements)
+def measurement_key(block: Dict) -> str:
+    """Chiave della tabella misure: tipo per gli standard (std_WxH), dimensioni per gli altri."""
+    width, height = block.get("width", 0), block.get("height", 0)
+    block_type = block.get("type") or "custom"
+    if block_type.startswith("std_"):
+        return block_type
+    return f"{block_type}_{width:g}x{height:g}"
+
+
+def resolve_block_measurements(table: Dict, block: Dict) -> Dict:
+    """
+    Misure (spessore e volume) di un blocco dalla tabella ``blocks_with_measurements``.
+    Blocchi non presenti in tabella vengono calcolati dalle loro dimensioni.
+    """
+    thickness = table.get("closure_thickness_mm", 0)
+    group = table.get("groups", {}).get(measurement_key(block))
+    if group is not None:
+        volume = group["volume_m3"]
+    else:
+        volume = block.get("width", 0) * block.get("height", 0) * thickness / 1_000_000_000
+    return {"thickness_mm": thickness, "volume_m3": volume}
+
+
 # Funzioni di integrazione con sistema esistente
 def enhance_packing_with_automatic_measurements(packing_result: Dict, project_config: Dict) -> Dict:
     """
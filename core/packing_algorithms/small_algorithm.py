@@ -26,7 +26,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.moraletti_alignment import (
     DynamicMoralettiConfiguration,
     MoralettiCoverageValidator,
+    RowJoints,
+    RowMoraletti,
     StaggeringCalculator,
+    StaggerPrefix,
     validate_row_coverage,
     calculate_moraletti_positions_list
 )
@@ -110,35 +113,45 @@ class SmallAlgorithmPacker:
         if enable_debug:
             logger.info(f"   Trovate {len(all_combinations)} combinazioni possibili")
         
-        # 2. Valuta ogni combinazione
-        scored_combinations = []
+        # 2. Valuta ogni combinazione tenendo la migliore (a parità di score
+        #    vince la prima generata); le combinazioni che non possono superarla
+        #    vengono scartate durante il calcolo dello sfalsamento
+        best = None
+        
+        # Moraletti e giunti della riga sotto calcolati una volta per tutte le combinazioni
+        moraletti_below = self.validator.prepare_row(row_below) if row_below else None
+        joints_below = self.stagger_calc.prepare_row(row_below) if row_below else None
         
         for combination in all_combinations:
             # Crea blocchi con posizioni X
             blocks = self._create_blocks_with_positions(combination, 0, y)
             
             # Valuta questa combinazione
-            score_data = self._evaluate_combination(blocks, row_below, enable_debug)
+            score_data = self._evaluate_combination(
+                blocks, row_below, enable_debug, moraletti_below, joints_below,
+                min_score=best['score'] if best else None
+            )
             
-            if score_data['coverage']['is_complete']:
+            if score_data is None:
+                continue
+            
+            if score_data['coverage']['is_complete'] and (best is None or score_data['total_score'] > best['score']):
                 # Solo combinazioni con copertura 100%
-                scored_combinations.append({
+                best = {
                     'blocks': blocks,
                     'score': score_data['total_score'],
                     'coverage': score_data['coverage'],
                     'stagger': score_data['stagger'],
                     'stats': score_data['stats']
-                })
+                }
         
-        if not scored_combinations:
+        if best is None:
             logger.warning(f"⚠️ Nessuna combinazione con copertura 100%! Uso fallback.")
             return self._create_fallback_solution(segment_width, y, row_below)
         
-        # 3. Ordina per score (migliore prima)
-        scored_combinations.sort(key=lambda x: x['score'], reverse=True)
-        
-        # 4. Seleziona la migliore
-        best = scored_combinations[0]
+        # 3. Dettaglio copertura solo per la combinazione scelta
+        if moraletti_below is not None:
+            best['coverage'] = self.validator.validate_complete_coverage(moraletti_below, best['blocks'])
         
         if enable_debug:
             logger.info(f"✅ Migliore combinazione:")
@@ -284,7 +297,10 @@ class SmallAlgorithmPacker:
     
     def _evaluate_combination(self, blocks: List[Dict], 
                              row_below: Optional[List[Dict]], 
-                             enable_debug: bool = False) -> Dict:
+                             enable_debug: bool = False,
+                             moraletti_below: Optional[RowMoraletti] = None,
+                             joints_below: Optional[RowJoints] = None,
+                             min_score: Optional[float] = None) -> Optional[Dict]:
         """
         Valuta una combinazione di blocchi
         
@@ -294,33 +310,11 @@ class SmallAlgorithmPacker:
         3. Numero custom blocks
         4. Numero pezzi totali
         
-        Returns score complessivo
+        Returns score complessivo (copertura senza dettaglio per moraletto),
+        oppure None se con ``min_score`` la combinazione non può superarlo
         """
         
-        # 1. Validazione copertura moraletti
-        if row_below:
-            coverage = self.validator.validate_complete_coverage(row_below, blocks)
-        else:
-            # Prima riga - nessun moraletto da coprire
-            coverage = {
-                'is_complete': True,
-                'coverage_percent': 100.0,
-                'uncovered_count': 0,
-                'total_moraletti': 0
-            }
-        
-        # 2. Calcolo sfalsamento
-        if row_below:
-            stagger = self.stagger_calc.calculate_stagger_score(blocks, row_below)
-        else:
-            # Prima riga - sfalsamento N/A
-            stagger = {
-                'score': 1.0,
-                'stagger_percent': 100.0,
-                'is_good': True
-            }
-        
-        # 3. Statistiche
+        # 1. Statistiche e parte di score che non dipende dalla riga sotto
         custom_count = sum(1 for b in blocks if not b.get('is_standard', True))
         total_blocks = len(blocks)
         
@@ -330,27 +324,65 @@ class SmallAlgorithmPacker:
             'total_blocks': total_blocks
         }
         
-        # 4. Score totale (0-100)
         # PRIORITÀ:
         # - Copertura 100%: OBBLIGATORIA (se non 100% score = 0)
         # - Sfalsamento: peso 40%
         # - Meno custom: peso 30%
         # - Meno pezzi: peso 30%
         
+        # Score custom (0-30): meno custom = meglio
+        max_possible_custom = total_blocks
+        custom_score = (1 - (custom_count / max_possible_custom)) * 30 if max_possible_custom > 0 else 30
+        
+        # Score numero pezzi (0-30): meno pezzi = meglio
+        # Assumiamo max 10 pezzi come riferimento
+        pieces_score = (1 - min(total_blocks / 10, 1.0)) * 30
+        
+        # 2. Calcolo sfalsamento, giunto per giunto con limite superiore per il pruning
+        if row_below:
+            joints = joints_below or self.stagger_calc.prepare_row(row_below)
+            borders = self.stagger_calc.get_borders(blocks)
+            prefix = StaggerPrefix(joints)
+            for border in sorted(borders):
+                prefix.push(border)
+                if (min_score is not None and
+                        prefix.upper_bound(len(borders)) * 40 + custom_score + pieces_score <= min_score):
+                    return None
+            if borders:
+                stagger = self.stagger_calc.stagger_result(prefix.aligned, len(borders))
+            else:
+                stagger = self.stagger_calc.calculate_stagger_score(blocks, joints)
+        else:
+            # Prima riga - sfalsamento N/A
+            stagger = {
+                'score': 1.0,
+                'stagger_percent': 100.0,
+                'is_good': True
+            }
+            if min_score is not None and stagger['score'] * 40 + custom_score + pieces_score <= min_score:
+                return None
+        
+        # 3. Validazione copertura moraletti
+        if row_below:
+            coverage = self.validator.validate_complete_coverage(
+                moraletti_below or row_below, blocks, detailed=False
+            )
+        else:
+            # Prima riga - nessun moraletto da coprire
+            coverage = {
+                'is_complete': True,
+                'coverage_percent': 100.0,
+                'uncovered_count': 0,
+                'total_moraletti': 0
+            }
+        
+        # 4. Score totale (0-100)
         if not coverage['is_complete']:
             total_score = 0.0  # BOCCIATA!
         else:
             # Score sfalsamento (0-40)
             stagger_score = stagger['score'] * 40
             
-            # Score custom (0-30): meno custom = meglio
-            max_possible_custom = total_blocks
-            custom_score = (1 - (custom_count / max_possible_custom)) * 30 if max_possible_custom > 0 else 30
-            
-            # Score numero pezzi (0-30): meno pezzi = meglio
-            # Assumiamo max 10 pezzi come riferimento
-            pieces_score = (1 - min(total_blocks / 10, 1.0)) * 30
-            
             total_score = stagger_score + custom_score + pieces_score
         
         return {
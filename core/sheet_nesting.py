@@ -0,0 +1,223 @@
+"""
+Nesting 2D a ghigliottina per il taglio dei pezzi da lastra
+Posiziona i pezzi su fogli (default 2500×1250) con coordinate reali,
+rotazione opzionale, spessore lama (kerf) e vincolo di venatura.
+
+Ogni pezzo viene messo nello spazio libero che lo contiene con il minor
+avanzo d'area, cercando su TUTTI i fogli già aperti; lo spazio restante
+viene diviso con due tagli passanti, quindi il layout è sempre eseguibile
+con una sezionatrice e la sequenza dei tagli è il piano di taglio.
+Più euristiche (ordinamento pezzi × regola di divisione) vengono provate
+entro un budget di tempo e si tiene la migliore.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "NestingOptions",
+    "PlacedPiece",
+    "Cut",
+    "NestedSheet",
+    "NestingResult",
+    "nest_pieces",
+]
+
+# (x, y, larghezza, altezza) di uno spazio libero del foglio
+FreeRect = Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class NestingOptions:
+    """Parametri del foglio e del taglio."""
+    sheet_width: float = 2500
+    sheet_height: float = 1250
+    kerf_mm: float = 2.0              # materiale asportato da ogni taglio
+    allow_rotation: bool = True       # rotazione di 90° ammessa per i pezzi senza venatura
+    time_budget_s: float = 0.5        # tempo massimo per provare euristiche alternative
+
+
+@dataclass
+class PlacedPiece:
+    """Pezzo posizionato su un foglio (origine in basso a sinistra)."""
+    index: int                        # indice nella lista pezzi in ingresso
+    x: float
+    y: float
+    width: float                      # dimensioni sul foglio (dopo l'eventuale rotazione)
+    height: float
+    rotated: bool
+
+    def to_dict(self) -> Dict:
+        return {
+            "x": self.x,
+            "y": self.y,
+            "placed_width_mm": self.width,
+            "placed_height_mm": self.height,
+            "rotated": self.rotated
+        }
+
+
+@dataclass
+class Cut:
+    """Taglio passante dentro un rettangolo del foglio."""
+    axis: str                         # 'x' = taglio verticale in x=position, 'y' = orizzontale in y=position
+    position: float
+    start: float                      # estremi del taglio lungo l'altro asse
+    end: float
+
+    def to_dict(self) -> Dict:
+        return {"axis": self.axis, "position": self.position, "start": self.start, "end": self.end}
+
+
+@dataclass
+class NestedSheet:
+    """Foglio con pezzi, tagli in ordine di esecuzione e spazi liberi residui."""
+    index: int
+    width: float
+    height: float
+    placements: List[PlacedPiece] = field(default_factory=list)
+    cuts: List[Cut] = field(default_factory=list)
+    free: List[FreeRect] = field(default_factory=list)
+
+    @property
+    def used_area(self) -> float:
+        return sum(p.width * p.height for p in self.placements)
+
+
+@dataclass(frozen=True)
+class NestingResult:
+    """Risultato del nesting: fogli, pezzi non posizionabili e euristica vincente."""
+    sheets: Tuple[NestedSheet, ...]
+    unplaced: Tuple[int, ...]
+    heuristic: str
+    heuristics_tried: int
+    elapsed_s: float
+
+
+# Ordinamenti dei pezzi (chiave decrescente) e regole di divisione dello spazio libero
+_SORT_KEYS: Dict[str, Callable[[Tuple[float, float]], Tuple[float, float]]] = {
+    "area": lambda wh: (wh[0] * wh[1], max(wh)),
+    "lato_max": lambda wh: (max(wh), wh[0] * wh[1]),
+    "altezza": lambda wh: (wh[1], wh[0]),
+    "larghezza": lambda wh: (wh[0], wh[1]),
+}
+_SPLIT_RULES = ("asse_corto", "asse_lungo")
+
+
+def nest_pieces(pieces: Sequence[Tuple[float, float, bool]], options: NestingOptions) -> NestingResult:
+    """
+    Esegue il nesting di pezzi ``(larghezza, altezza, ruotabile)``.
+
+    La prima euristica viene sempre completata; le altre solo finché resta
+    budget. Vince il risultato con meno fogli e, a parità, con l'ultimo foglio
+    più vuoto (sfrido più grande e riutilizzabile).
+    """
+    started = time.perf_counter()
+    valid = [i for i, (w, h, _) in enumerate(pieces) if w > 0 and h > 0]
+    unplaced = [i for i, (w, h, _) in enumerate(pieces) if not (w > 0 and h > 0)]
+
+    # Pezzi che non entrano nel foglio in nessun orientamento ammesso
+    fitting = []
+    for i in valid:
+        if _orientations(pieces[i], options, options.sheet_width, options.sheet_height):
+            fitting.append(i)
+        else:
+            unplaced.append(i)
+
+    best: Optional[Tuple[Tuple[float, float], List[NestedSheet], str]] = None
+    tried = 0
+    for sort_name, sort_key in _SORT_KEYS.items():
+        for split_rule in _SPLIT_RULES:
+            if tried and time.perf_counter() - started > options.time_budget_s:
+                break
+            order = sorted(fitting, key=lambda i: sort_key(pieces[i][:2]), reverse=True)
+            sheets = _guillotine_pass(pieces, order, options, split_rule)
+            tried += 1
+            score = (len(sheets), sheets[-1].used_area if sheets else 0.0)
+            if best is None or score < best[0]:
+                best = (score, sheets, f"{sort_name}/{split_rule}")
+
+    sheets = best[1] if best else []
+    return NestingResult(
+        sheets=tuple(sheets),
+        unplaced=tuple(sorted(unplaced)),
+        heuristic=best[2] if best else "",
+        heuristics_tried=tried,
+        elapsed_s=time.perf_counter() - started,
+    )
+
+
+def _orientations(piece: Tuple[float, float, bool], options: NestingOptions,
+                  free_w: float, free_h: float) -> List[Tuple[float, float, bool]]:
+    """Orientamenti (w, h, ruotato) del pezzo che entrano in uno spazio free_w×free_h."""
+    w, h, rotatable = piece
+    result = []
+    if w <= free_w and h <= free_h:
+        result.append((w, h, False))
+    if rotatable and options.allow_rotation and w != h and h <= free_w and w <= free_h:
+        result.append((h, w, True))
+    return result
+
+
+def _guillotine_pass(pieces: Sequence[Tuple[float, float, bool]], order: Sequence[int],
+                     options: NestingOptions, split_rule: str) -> List[NestedSheet]:
+    """Un passaggio best-area-fit su tutti i fogli aperti con divisione a ghigliottina."""
+    sheets: List[NestedSheet] = []
+
+    for index in order:
+        choice = None   # (avanzo, foglio, posizione spazio libero, w, h, ruotato)
+        for sheet in sheets:
+            for slot, (_, _, free_w, free_h) in enumerate(sheet.free):
+                for w, h, rotated in _orientations(pieces[index], options, free_w, free_h):
+                    leftover = free_w * free_h - w * h
+                    if choice is None or leftover < choice[0]:
+                        choice = (leftover, sheet, slot, w, h, rotated)
+
+        if choice is None:
+            # Nessuno spazio sui fogli aperti: nuovo foglio
+            sheet = NestedSheet(len(sheets), options.sheet_width, options.sheet_height,
+                                free=[(0.0, 0.0, float(options.sheet_width), float(options.sheet_height))])
+            sheets.append(sheet)
+            w, h, rotated = _orientations(pieces[index], options, sheet.width, sheet.height)[0]
+            choice = (0.0, sheet, 0, w, h, rotated)
+
+        _, sheet, slot, w, h, rotated = choice
+        _place(sheet, slot, index, w, h, rotated, options.kerf_mm, split_rule)
+
+    return sheets
+
+
+def _place(sheet: NestedSheet, slot: int, index: int, w: float, h: float,
+           rotated: bool, kerf: float, split_rule: str) -> None:
+    """Posiziona il pezzo nell'angolo dello spazio libero e divide l'avanzo con due tagli."""
+    fx, fy, fw, fh = sheet.free.pop(slot)
+    sheet.placements.append(PlacedPiece(index, fx, fy, w, h, rotated))
+
+    # Strisce a destra e sopra il pezzo, al netto della lama (un avanzo più
+    # sottile del kerf va in sfrido, ma il taglio di rifilo resta)
+    right_w = fw - w - kerf
+    top_h = fh - h - kerf
+    # Primo taglio lungo l'asse che lascia l'avanzo più corto (o più lungo)
+    horizontal_first = (fw - w <= fh - h) if split_rule == "asse_corto" else (fw - w > fh - h)
+
+    if horizontal_first:
+        # Taglio orizzontale su tutta la larghezza, poi verticale sulla sola fascia del pezzo
+        if fh > h:
+            sheet.cuts.append(Cut("y", fy + h, fx, fx + fw))
+        if top_h > 0:
+            sheet.free.append((fx, fy + h + kerf, fw, top_h))
+        if fw > w:
+            sheet.cuts.append(Cut("x", fx + w, fy, fy + h))
+        if right_w > 0:
+            sheet.free.append((fx + w + kerf, fy, right_w, h))
+    else:
+        # Taglio verticale su tutta l'altezza, poi orizzontale sulla sola colonna del pezzo
+        if fw > w:
+            sheet.cuts.append(Cut("x", fx + w, fy, fy + fh))
+        if right_w > 0:
+            sheet.free.append((fx + w + kerf, fy, right_w, fh))
+        if fh > h:
+            sheet.cuts.append(Cut("y", fy + h, fx, fx + w))
+        if top_h > 0:
+            sheet.free.append((fx, fy + h + kerf, w, top_h))
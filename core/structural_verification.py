@@ -0,0 +1,341 @@
+"""
+Verifica strutturale della parete finita
+========================================
+
+Controlla appoggio dei moraletti e sfalsamento dei giunti su TUTTE le righe
+del risultato finale di qualsiasi algoritmo (bidirezionale o small), cioè
+dopo merge dei custom e taglio alla geometria della parete.
+
+Ogni blocco (standard o custom, anche tagliato) è ridotto al suo intervallo x
+con quota di base e di sommità. Un moraletto sulla sommità di un blocco deve
+cadere dentro un blocco che parte da quella quota; un giunto è allineato se
+dista meno di ``STAGGER_TOLERANCE_MM`` da un giunto tra i blocchi sotto.
+Le quote sono indicizzate e combinate con la x in un'unica chiave ordinata,
+così una sola ricerca numpy risponde per tutta la parete.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
+
+from utils.config import BLOCK_HEIGHT, BLOCK_WIDTHS
+from utils.moraletti_alignment import (
+    STAGGER_TOLERANCE_MM,
+    DynamicMoralettiConfiguration,
+    StaggeringCalculator,
+)
+
+__all__ = [
+    "LEVEL_TOLERANCE_MM",
+    "MORALETTO_SCOPERTO",
+    "GIUNTO_ALLINEATO",
+    "StructuralViolation",
+    "RowStructure",
+    "StructuralReport",
+    "moraletti_backend_config",
+    "verify_wall_structure",
+]
+
+# Quote entro questa distanza sono la stessa quota (sommità sotto = base sopra)
+LEVEL_TOLERANCE_MM = 1.0
+
+# Tipi di violazione
+MORALETTO_SCOPERTO = "moraletto_scoperto"   # errore: moraletto senza blocco sopra
+GIUNTO_ALLINEATO = "giunto_allineato"       # avviso: giunto sopra un giunto
+
+
+@dataclass(frozen=True)
+class StructuralViolation:
+    """Singolo problema strutturale, riferito alla riga che dovrebbe risolverlo."""
+
+    row: int                  # indice riga (0 = base parete)
+    y: float                  # quota di base della riga
+    kind: str                 # MORALETTO_SCOPERTO o GIUNTO_ALLINEATO
+    x: float                  # centro del moraletto o posizione del giunto
+    block: str                # blocco che porta il moraletto / forma il giunto ("standard #3")
+
+    @property
+    def severity(self) -> str:
+        return "errore" if self.kind == MORALETTO_SCOPERTO else "avviso"
+
+    def to_dict(self) -> Dict:
+        return {
+            "row": self.row,
+            "y": self.y,
+            "kind": self.kind,
+            "severity": self.severity,
+            "x": round(self.x, 1),
+            "block": self.block,
+        }
+
+
+@dataclass(frozen=True)
+class RowStructure:
+    """Esito per riga: moraletti da coprire alla base e giunti rispetto alla riga sotto."""
+
+    row: int
+    y: float
+    blocks: int
+    moraletti: int            # moraletti sotto la riga che devono essere coperti
+    uncovered: int
+    exempt: int               # moraletti sotto aperture o fuori parete (non richiesti)
+    joints: int
+    aligned_joints: int
+
+    @property
+    def stagger(self) -> Dict:
+        return StaggeringCalculator.stagger_result(self.aligned_joints, self.joints)
+
+    def to_dict(self) -> Dict:
+        return {
+            "row": self.row,
+            "y": self.y,
+            "blocks": self.blocks,
+            "moraletti": self.moraletti,
+            "uncovered": self.uncovered,
+            "exempt": self.exempt,
+            "joints": self.joints,
+            "aligned_joints": self.aligned_joints,
+            "stagger_percent": round(self.stagger["stagger_percent"], 1),
+        }
+
+
+@dataclass(frozen=True)
+class StructuralReport:
+    """Report della parete: righe in ordine di quota e violazioni in ordine (riga, x)."""
+
+    rows: Tuple[RowStructure, ...]
+    violations: Tuple[StructuralViolation, ...]
+    elapsed_ms: float
+
+    @property
+    def uncovered_moraletti(self) -> int:
+        return sum(row.uncovered for row in self.rows)
+
+    @property
+    def aligned_joints(self) -> int:
+        return sum(row.aligned_joints for row in self.rows)
+
+    @property
+    def is_sound(self) -> bool:
+        """Nessun moraletto scoperto (i giunti allineati sono solo avvisi)"""
+        return self.uncovered_moraletti == 0
+
+    def violations_for_row(self, row: int) -> List[StructuralViolation]:
+        return [v for v in self.violations if v.row == row]
+
+    def to_dict(self) -> Dict:
+        return {
+            "is_sound": self.is_sound,
+            "rows_checked": len(self.rows),
+            "total_moraletti": sum(row.moraletti for row in self.rows),
+            "uncovered_moraletti": self.uncovered_moraletti,
+            "exempt_moraletti": sum(row.exempt for row in self.rows),
+            "total_joints": sum(row.joints for row in self.rows),
+            "aligned_joints": self.aligned_joints,
+            "rows": [row.to_dict() for row in self.rows],
+            "violations": [v.to_dict() for v in self.violations],
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+def moraletti_backend_config(frontend_config: Optional[Dict], block_widths: Sequence[int],
+                             block_height: int) -> Dict:
+    """
+    Mappatura configurazione moraletti Frontend → Backend.
+
+    Frontend invia: {spacing_mm, max_moraletti_*, thickness_mm, height_mm, height_from_ground_mm};
+    i blocchi (Grande/Medio/Piccolo = le tre larghezze maggiori, in ordine
+    decrescente qualunque sia l'ordine ricevuto) e i default dinamici vengono
+    dalla configurazione del packing. Packer e verifica usano questa mappatura,
+    quindi vedono la stessa configurazione.
+
+    Raises:
+        ValueError: meno di 3 larghezze blocco
+    """
+    block_widths = sorted(block_widths, reverse=True)
+    if len(block_widths) < 3:
+        raise ValueError(f"Servono 3 larghezze blocco (Grande/Medio/Piccolo), ricevute: {block_widths}")
+    frontend_config = frontend_config or {}
+    return {
+        # Dimensioni blocchi (prese da block_widths/block_height)
+        'block_large_width': block_widths[0],
+        'block_medium_width': block_widths[1],
+        'block_small_width': block_widths[2],
+        'block_large_height': block_height,
+        'block_medium_height': block_height,
+        'block_small_height': block_height,
+
+        # Configurazione moraletti dal frontend (default: spacing = blocco più piccolo)
+        'moraletti_spacing': frontend_config.get('spacing_mm', block_widths[2]),
+        'moraletti_count_large': frontend_config.get('max_moraletti_large', 3),
+        'moraletti_count_medium': frontend_config.get('max_moraletti_medium', 2),
+        'moraletti_count_small': frontend_config.get('max_moraletti_small', 1),
+
+        # Dimensioni moraletti dal frontend (default: 58mm, altezza blocco, piedini 95mm)
+        'moraletti_thickness': frontend_config.get('thickness_mm', 58),
+        'moraletti_height': frontend_config.get('height_mm', block_height),
+        'moraletti_height_from_ground': frontend_config.get('height_from_ground_mm', 95)
+    }
+
+
+def verify_wall_structure(placed: List[Dict],
+                          customs: List[Dict],
+                          wall: Optional[Polygon] = None,
+                          apertures: Optional[Sequence[Polygon]] = None,
+                          moraletti_config: Optional[Dict | DynamicMoralettiConfiguration] = None,
+                          block_widths: Optional[Sequence[int]] = None,
+                          block_height: int = BLOCK_HEIGHT) -> StructuralReport:
+    """
+    Verifica appoggio moraletti e sfalsamento di una parete già impaccata.
+
+    ``moraletti_config`` può essere la configurazione del frontend (mappata con
+    ``moraletti_backend_config`` sui ``block_widths``) o già costruita.
+    Un moraletto non va coperto se sopra c'è un'apertura, se è fuori dalla
+    parete o se nessun blocco parte dalla sua quota (sommità parete).
+
+    Raises:
+        ValueError: configurazione moraletti non valida per i blocchi indicati
+    """
+    started = time.perf_counter()
+    if isinstance(moraletti_config, DynamicMoralettiConfiguration):
+        config = moraletti_config
+    else:
+        config = DynamicMoralettiConfiguration(
+            moraletti_backend_config(moraletti_config, block_widths or BLOCK_WIDTHS, block_height)
+        )
+
+    blocks = [("standard", i, b) for i, b in enumerate(placed)] + \
+             [("custom", i, b) for i, b in enumerate(customs)]
+    if not blocks:
+        return StructuralReport((), (), (time.perf_counter() - started) * 1000)
+
+    x0 = np.array([float(b["x"]) for _, _, b in blocks])
+    x1 = x0 + np.array([float(b["width"]) for _, _, b in blocks])
+    y0 = np.array([float(b["y"]) for _, _, b in blocks])
+    y1 = y0 + np.array([float(b["height"]) for _, _, b in blocks])
+
+    # Quote di base e sommità indicizzate (stessa quota entro LEVEL_TOLERANCE_MM)
+    levels, bottom, top = _index_levels(y0, y1)
+
+    # Chiave unica (quota, x): x traslata per quota in fasce che non si toccano
+    origin = x0.min()
+    band = 2.0 * (x1.max() - origin) + 4.0 * (config.thickness + STAGGER_TOLERANCE_MM) + 1.0
+
+    def key(level_index, x):
+        return level_index * band + (x - origin)
+
+    # Blocchi ordinati per (quota di base, x): inizi e massimo progressivo delle fini
+    by_bottom = np.lexsort((x0, bottom))
+    starts = key(bottom[by_bottom], x0[by_bottom])
+    reach = np.maximum.accumulate(key(bottom[by_bottom], x1[by_bottom]))
+
+    # --- Moraletti: tutti i centri della parete in un solo array ---
+    unique_widths, width_index = np.unique(x1 - x0, return_inverse=True)
+    counts = np.array([config.layouts.count(w) for w in unique_widths])[width_index]
+    owner = np.repeat(np.arange(len(blocks)), counts)
+    rank = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    centers = x0[owner] + ((x1 - x0)[owner] - rank * config.spacing)
+    moraletto_level = top[owner]
+
+    # Coperto se un blocco che parte dalla quota lo contiene (± mezzo spessore)
+    tolerance = config.thickness / 2
+    probe = key(moraletto_level, centers)
+    last_start = np.searchsorted(starts, probe + tolerance, side="right") - 1
+    covered = (last_start >= 0) & (reach[np.maximum(last_start, 0)] >= probe - tolerance)
+
+    # Non richiesti: quota su cui non parte nessun blocco, aperture, fuori parete
+    required = np.isin(moraletto_level, bottom)
+    buildable = _buildable_area(wall, apertures)
+    if buildable is not None:
+        required &= shapely.intersects_xy(buildable, centers, levels[moraletto_level] + LEVEL_TOLERANCE_MM)
+    uncovered = required & ~covered
+
+    # --- Giunti: bordo destro seguito da un blocco adiacente sulla stessa quota ---
+    joints_above, joint_owner = _joints(by_bottom, bottom, x0, x1)
+    joints_below, below_owner = _joints(np.lexsort((x0, top)), top, x0, x1)
+    aligned = _near_any(key(bottom[joint_owner], joints_above),
+                        np.sort(key(top[below_owner], joints_below)), STAGGER_TOLERANCE_MM)
+
+    # --- Report per riga (quota di base) ---
+    row_of_level = {level: row for row, level in enumerate(np.unique(bottom))}
+    rows = []
+    for level, row in row_of_level.items():
+        at_level = moraletto_level == level
+        joint_mask = bottom[joint_owner] == level
+        rows.append(RowStructure(
+            row=row,
+            y=float(levels[level]),
+            blocks=int(np.count_nonzero(bottom == level)),
+            moraletti=int(np.count_nonzero(required & at_level)),
+            uncovered=int(np.count_nonzero(uncovered & at_level)),
+            exempt=int(np.count_nonzero(~required & at_level)),
+            joints=int(np.count_nonzero(joint_mask)),
+            aligned_joints=int(np.count_nonzero(aligned & joint_mask)),
+        ))
+
+    violations = [
+        StructuralViolation(row_of_level[moraletto_level[i]], float(levels[moraletto_level[i]]),
+                            MORALETTO_SCOPERTO, float(centers[i]), _label(blocks[owner[i]]))
+        for i in np.flatnonzero(uncovered)
+    ] + [
+        StructuralViolation(row_of_level[bottom[joint_owner[i]]], float(levels[bottom[joint_owner[i]]]),
+                            GIUNTO_ALLINEATO, float(joints_above[i]), _label(blocks[joint_owner[i]]))
+        for i in np.flatnonzero(aligned)
+    ]
+    violations.sort(key=lambda v: (v.row, v.x, v.kind))
+
+    return StructuralReport(tuple(rows), tuple(violations), (time.perf_counter() - started) * 1000)
+
+
+def _index_levels(y0: np.ndarray, y1: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Quote distinte (fuse entro la tolleranza) e indice di quota di base/sommità per blocco."""
+    values = np.sort(np.concatenate([y0, y1]))
+    first = np.concatenate([[True], np.diff(values) > LEVEL_TOLERANCE_MM])
+    levels = values[first]
+    # Ogni quota punta al primo valore del suo gruppo
+    bottom = np.searchsorted(levels, y0 + LEVEL_TOLERANCE_MM, side="right") - 1
+    top = np.searchsorted(levels, y1 + LEVEL_TOLERANCE_MM, side="right") - 1
+    return levels, bottom, top
+
+
+def _buildable_area(wall: Optional[Polygon], apertures: Optional[Sequence[Polygon]]):
+    """Parete meno aperture, preparata per i test punto-in-area (None se manca la parete)."""
+    if wall is None:
+        return None
+    area = wall.difference(unary_union(list(apertures))) if apertures else wall
+    shapely.prepare(area)
+    return area
+
+
+def _joints(order: np.ndarray, level: np.ndarray, x0: np.ndarray,
+            x1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Giunti di blocchi ordinati per (quota, x): bordo destro di un blocco seguito
+    da uno sulla stessa quota che inizia lì. Restituisce posizioni e blocco a sinistra.
+    """
+    left, right = order[:-1], order[1:]
+    joined = (level[left] == level[right]) & (np.abs(x0[right] - x1[left]) <= LEVEL_TOLERANCE_MM)
+    return x1[left[joined]], left[joined]
+
+
+def _near_any(values: np.ndarray, sorted_keys: np.ndarray, tolerance: float) -> np.ndarray:
+    """Per ogni valore: esiste una chiave a distanza < tolerance?"""
+    if sorted_keys.size == 0:
+        return np.zeros(values.shape, dtype=bool)
+    index = np.searchsorted(sorted_keys, values)
+    right = sorted_keys[np.minimum(index, sorted_keys.size - 1)]
+    left = sorted_keys[np.maximum(index - 1, 0)]
+    return np.minimum(np.abs(right - values), np.abs(values - left)) < tolerance
+
+
+def _label(block: Tuple[str, int, Dict]) -> str:
+    kind, index, _ = block
+    return f"{kind} #{index}"
@@ -15,6 +15,7 @@ from shapely.geometry import Polygon, box, shape, mapping
 from shapely.ops import unary_union
 
 from utils.geometry_utils import snap, sanitize_polygon, ensure_multipolygon, polygon_holes
+from utils.shape_descriptor import ShapeDescriptor, describe_wall
 from utils.config import (
     AREA_EPS,
     BLOCK_HEIGHT,
@@ -603,7 +604,8 @@ def pack_wall(polygon: Polygon,
               starting_direction: str = 'left',
               vertical_config: Optional[Dict] = None,
               algorithm_type: str = 'bidirectional',
-              moraletti_config: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict]]:
+              moraletti_config: Optional[Dict] = None,
+              shape_descriptor: Optional[ShapeDescriptor] = None) -> Tuple[List[Dict], List[Dict]]:
     """
     PACKER PRINCIPALE CON ALGORITMO DIREZIONALE UNIFORME + SPAZI VERTICALI + SMALL ALGORITHM
     
@@ -628,6 +630,9 @@ def pack_wall(polygon: Polygon,
             'moraletti_count_small': int,
             ...
         }
+        shape_descriptor: Descrittore forma della parete (tipicamente dalla sessione);
+                          se manca o non corrisponde viene ricalcolato. Abilita il
+                          percorso rapido per pareti rettangolari senza aperture.
     """
     
     # Default vertical config se non specificato
@@ -729,39 +734,11 @@ def pack_wall(polygon: Polygon,
             try:
                 from utils.moraletti_alignment import DynamicMoralettiConfiguration
                 from core.packing_algorithms.small_algorithm import pack_wall_with_small_algorithm
+                from core.structural_verification import moraletti_backend_config
+                from utils.block_types import SMALL_ALGORITHM_TYPES, get_block_type_registry
                 
-                # MAPPATURA: Frontend → Backend
-                # Frontend invia: {spacing_mm, max_moraletti_large, max_moraletti_medium, max_moraletti_small}
-                # Backend si aspetta: {block_*_width/height, moraletti_spacing, moraletti_count_*, moraletti_thickness/height/height_from_ground}
-                
-                frontend_config = moraletti_config
-                
-                # Default dinamici
-                default_spacing = block_widths[2]  # Blocco più piccolo
-                default_thickness = 58  # Standard
-                default_height = block_height  # Altezza blocco
-                default_height_from_ground = 95  # Piedini standard
-                
-                backend_config = {
-                    # Dimensioni blocchi (prese da block_widths/block_height)
-                    'block_large_width': block_widths[0],
-                    'block_medium_width': block_widths[1],
-                    'block_small_width': block_widths[2],
-                    'block_large_height': block_height,
-                    'block_medium_height': block_height,
-                    'block_small_height': block_height,
-                    
-                    # Configurazione moraletti dal frontend (con default dinamici)
-                    'moraletti_spacing': frontend_config.get('spacing_mm', default_spacing),
-                    'moraletti_count_large': frontend_config.get('max_moraletti_large', 3),
-                    'moraletti_count_medium': frontend_config.get('max_moraletti_medium', 2),
-                    'moraletti_count_small': frontend_config.get('max_moraletti_small', 1),
-                    
-                    # Dimensioni moraletti dal frontend (con default)
-                    'moraletti_thickness': frontend_config.get('thickness_mm', default_thickness),
-                    'moraletti_height': frontend_config.get('height_mm', default_height),
-                    'moraletti_height_from_ground': frontend_config.get('height_from_ground_mm', default_height_from_ground)
-                }
+                # MAPPATURA: Frontend → Backend (condivisa con la verifica strutturale)
+                backend_config = moraletti_backend_config(moraletti_config, block_widths, block_height)
                 
                 print(f"   📦 Configurazione moraletti:")
                 print(f"      Blocchi: {backend_config['block_large_width']}mm / {backend_config['block_medium_width']}mm / {backend_config['block_small_width']}mm")
@@ -827,22 +804,16 @@ def pack_wall(polygon: Polygon,
                 
                 # � CONVERSIONE TIPI: Converti 'large'/'medium'/'small' → 'std_1239x495' format
                 print(f"\n🔄 Conversione tipi blocchi Small Algorithm → formato standard...")
+                # Stesso ordine Grande/Medio/Piccolo della configurazione moraletti
+                small_widths = [backend_config[f'block_{size}_width'] for size in SMALL_ALGORITHM_TYPES]
+                block_types = get_block_type_registry(small_widths, block_height, moraletti_config=backend_config)
                 for block in placed_all:
-                    if 'type' in block and block['type'] in ['large', 'medium', 'small']:
-                        # Mappa tipo Small Algorithm a formato standard
-                        if block['type'] == 'large':
-                            width = block_widths[0]  # 1239
-                        elif block['type'] == 'medium':
-                            width = block_widths[1]  # 826
-                        elif block['type'] == 'small':
-                            width = block_widths[2]  # 413
-                        else:
-                            width = block.get('width', block_widths[0])
-                        
-                        height = block.get('height', block_height)
-                        block['type'] = f"std_{int(width)}x{int(height)}"
-                        block['width'] = width  # Assicura consistenza
-                        block['height'] = height
+                    if block.get('type') in SMALL_ALGORITHM_TYPES:
+                        # Tipo dal registro condiviso (large → larghezza maggiore, ...)
+                        block_type = block_types[block_types.resolve_block(block)]
+                        block['type'] = block_type.name
+                        block['width'] = block_type.width  # Assicura consistenza
+                        block['height'] = block.get('height', block_height)
                 
                 print(f"   ✅ Tipi convertiti: large/medium/small → std_XXXxYYY")
                 
@@ -893,6 +864,10 @@ def pack_wall(polygon: Polygon,
     print(f"   Direzione: TUTTE le righe partono da {'SINISTRA' if starting_direction == 'left' else 'DESTRA'}")
     print(f"   Debug: {'ATTIVO' if enable_debug else 'DISATTIVO'}")
     
+    if shape_descriptor is None or not shape_descriptor.matches(polygon, apertures, block_height):
+        shape_descriptor = describe_wall(polygon, apertures, block_height)
+    print(f"   Forma: {shape_descriptor.geometry_type} (rettilinea={shape_descriptor.is_rectilinear})")
+
     polygon = sanitize_polygon(polygon)
 
     # Aperture dal poligono + eventuali passate a parte
@@ -936,6 +911,11 @@ def pack_wall(polygon: Polygon,
     else:
         print(f"   ✅ Nessuna apertura valida trovata")
 
+    # ⚡ PERCORSO RAPIDO: parete rettangolare piena → ogni striscia è già il componente
+    fast_rectangle = shape_descriptor.is_plain_rectangle and keepout is None
+    if fast_rectangle:
+        print(f"   ⚡ Parete rettangolare senza aperture: intersezioni geometriche saltate")
+
     minx, miny, maxx, maxy = polygon.bounds
     
     # ========== GESTIONE SPAZI VERTICALI ==========
@@ -981,11 +961,13 @@ def pack_wall(polygon: Polygon,
         
         stripe_top = y + block_height
         stripe = box(minx, y, maxx, stripe_top)
-        inter = polygon.intersection(stripe)
-        if keepout:
-            inter = inter.difference(keepout)
-
-        comps = ensure_multipolygon(inter)
+        if fast_rectangle:
+            comps = [stripe]
+        else:
+            inter = polygon.intersection(stripe)
+            if keepout:
+                inter = inter.difference(keepout)
+            comps = ensure_multipolygon(inter)
         print(f"   📊 Componenti trovate: {len(comps)}")
 
         for i, comp in enumerate(comps):
@@ -1038,11 +1020,13 @@ def pack_wall(polygon: Polygon,
         
         stripe_top = y + adaptive_height
         stripe = box(minx, y, maxx, stripe_top)
-        inter = polygon.intersection(stripe)
-        if keepout:
-            inter = inter.difference(keepout)
-
-        comps = ensure_multipolygon(inter)
+        if fast_rectangle:
+            comps = [stripe]
+        else:
+            inter = polygon.intersection(stripe)
+            if keepout:
+                inter = inter.difference(keepout)
+            comps = ensure_multipolygon(inter)
 
         for comp in comps:
             if comp.is_empty or comp.area < AREA_EPS:
@@ -1107,6 +1091,10 @@ def pack_wall(polygon: Polygon,
     print(f"   Dopo il merge: {len(placed_all)} standard, {len(validated_customs)} custom")
     print(f"   ✅ Merge completato: {efficiency*100:.1f}% efficienza mantenuta\n")
     
+    if fast_rectangle and _blocks_within_bounds(placed_all + validated_customs, polygon.bounds):
+        # Parete rettangolare e blocchi tutti interni: il taglio non cambierebbe nulla
+        return placed_all, validated_customs
+
     # 🔪 POST-PROCESSING 2: Taglia TUTTI i blocchi per adattarli alla geometria della parete
     print(f"🔪 POST-PROCESSING: Taglio blocchi per adattamento geometria...")
     print(f"   Prima del taglio: {len(placed_all)} standard, {len(validated_customs)} custom")
@@ -1125,6 +1113,19 @@ def pack_wall(polygon: Polygon,
     return placed_all, validated_customs
 
 
+def _blocks_within_bounds(blocks: List[Dict], bounds: Tuple[float, float, float, float], tol: float = COORD_EPS) -> bool:
+    """True se tutti i blocchi (x, y, width, height) stanno nel rettangolo ``bounds``."""
+    minx, miny, maxx, maxy = bounds
+    for block in blocks:
+        x = block.get('x', 0)
+        y = block.get('y', 0)
+        if (x < minx - tol or y < miny - tol
+                or x + block.get('width', 0) > maxx + tol
+                or y + block.get('height', 0) > maxy + tol):
+            return False
+    return True
+
+
 def merge_customs_row_aware(customs: List[Dict], tol: float = 5, row_height: int = 495) -> List[Dict]:
     """
     Coalesco customs solo all'interno della stessa fascia orizzontale.
@@ -0,0 +1,124 @@
+"""
+Cache del catalogo materiali
+Letture read-through di materiali, guide e template, invalidate dal contatore
+di versione del catalogo salvato nel DB (coerente tra più processi worker).
+"""
+
+import functools
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from database.material_models import CatalogueVersion
+from utils.config import CATALOGUE_CACHE_TTL_S
+
+# Unica riga del contatore versione
+CATALOGUE_VERSION_ID = 1
+
+
+def read_catalogue_version(db) -> int:
+    """Versione corrente del catalogo (0 se non è mai stato modificato)."""
+    row = db.get(CatalogueVersion, CATALOGUE_VERSION_ID)
+    return row.version if row else 0
+
+
+def bump_catalogue_version(db) -> None:
+    """
+    Incrementa la versione del catalogo nella transazione corrente.
+    Da chiamare prima del commit di ogni scrittura su materiali, guide o template.
+    """
+    row = db.get(CatalogueVersion, CATALOGUE_VERSION_ID)
+    if row is None:
+        db.add(CatalogueVersion(id=CATALOGUE_VERSION_ID, version=1))
+    else:
+        # UPDATE ... SET version = version + 1: atomico anche con più processi
+        row.version = CatalogueVersion.version + 1
+
+
+class CatalogueCache:
+    """
+    Cache read-through del catalogo.
+
+    Le voci valgono per una versione del catalogo: la versione nel DB viene
+    riletta al massimo ogni ``ttl_s`` secondi (una query leggera) e, se è
+    cambiata, la cache si svuota. Le scritture di questo processo invalidano
+    subito con ``invalidate``; quelle di altri processi entro ``ttl_s``.
+    I valori sono snapshot serializzati: ogni lettura riceve una copia.
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None, ttl_s: float = CATALOGUE_CACHE_TTL_S):
+        self._session_factory = session_factory
+        self.ttl_s = ttl_s
+        self._entries: Dict[Hashable, bytes] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _session(self):
+        if self._session_factory is None:
+            from database.config import get_db_session
+            return get_db_session()
+        return self._session_factory()
+
+    def _sync_version(self) -> int:
+        """Rilegge la versione dal DB se il controllo precedente è scaduto (lock già acquisito)."""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.ttl_s:
+            with self._session() as db:
+                version = read_catalogue_version(db)
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+        return self._version
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Valore in cache per ``key`` o caricato con ``loader`` e memorizzato."""
+        with self._lock:
+            version = self._sync_version()
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if snapshot is not None:
+            return pickle.loads(snapshot)
+
+        value = loader()
+        snapshot = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            # Non memorizzare se nel frattempo il catalogo è cambiato
+            if self._version == version:
+                self._entries[key] = snapshot
+        return value
+
+    def invalidate(self) -> None:
+        """Svuota la cache e forza la rilettura della versione alla prossima lettura."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def read_through(self, func: Callable) -> Callable:
+        """Decoratore: letture del catalogo servite dalla cache (chiave = funzione + argomenti)."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            return self.get(key, lambda: func(*args, **kwargs))
+        return wrapper
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl_s": self.ttl_s
+            }
+
+
+# Cache condivisa dai servizi del catalogo
+catalogue_cache = CatalogueCache()
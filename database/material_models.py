@@ -212,3 +212,17 @@ class ProjectTemplate(Base):
     
     def __repr__(self):
         return f"<ProjectTemplate(name='{self.name}', category='{self.category}')>"
+
+class CatalogueVersion(Base):
+    """
+    Contatore versione del catalogo (materiali, guide, template): una sola riga,
+    incrementata da ogni scrittura. Condiviso tra i processi tramite il DB.
+    """
+    __tablename__ = 'catalogue_version'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<CatalogueVersion(version={self.version})>"
@@ -13,11 +13,13 @@ from database.material_models import (
     MaterialType, GuideType, WallPosition
 )
 from database.config import get_db_session
+from database.catalogue_cache import bump_catalogue_version, catalogue_cache
 
 class MaterialService:
     """Servizio per la gestione dei materiali."""
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_all_materials() -> List[Dict]:
         """Restituisce tutti i materiali attivi."""
         with get_db_session() as db:
@@ -25,6 +27,7 @@ class MaterialService:
             return [MaterialService._material_to_dict(m) for m in materials]
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_material_by_id(material_id: int) -> Optional[Dict]:
         """Restituisce un materiale per ID."""
         with get_db_session() as db:
@@ -35,6 +38,7 @@ class MaterialService:
             return MaterialService._material_to_dict(material) if material else None
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_materials_by_type(material_type: MaterialType) -> List[Dict]:
         """Restituisce materiali per tipo."""
         with get_db_session() as db:
@@ -57,8 +61,10 @@ class MaterialService:
                 **kwargs
             )
             db.add(material)
+            bump_catalogue_version(db)
             db.commit()
             db.refresh(material)
+            catalogue_cache.invalidate()
             return MaterialService._material_to_dict(material)
     
     @staticmethod
@@ -90,6 +96,7 @@ class GuideService:
     """Servizio per la gestione delle guide."""
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_all_guides() -> List[Dict]:
         """Restituisce tutte le guide attive."""
         with get_db_session() as db:
@@ -97,6 +104,7 @@ class GuideService:
             return [GuideService._guide_to_dict(g) for g in guides]
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_guide_by_id(guide_id: int) -> Optional[Dict]:
         """Restituisce una guida per ID."""
         with get_db_session() as db:
@@ -107,6 +115,7 @@ class GuideService:
             return GuideService._guide_to_dict(guide) if guide else None
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_guides_by_type(guide_type: GuideType) -> List[Dict]:
         """Restituisce guide per tipo."""
         with get_db_session() as db:
@@ -130,8 +139,10 @@ class GuideService:
                 **kwargs
             )
             db.add(guide)
+            bump_catalogue_version(db)
             db.commit()
             db.refresh(guide)
+            catalogue_cache.invalidate()
             return GuideService._guide_to_dict(guide)
     
     @staticmethod
@@ -450,6 +461,7 @@ class MaterialTemplateService:
     """Servizio per la gestione dei template di progetto."""
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_all_templates() -> List[Dict]:
         """Restituisce tutti i template pubblici."""
         with get_db_session() as db:
@@ -460,6 +472,7 @@ class MaterialTemplateService:
             return [MaterialTemplateService._template_to_dict(t) for t in templates]
     
     @staticmethod
+    @catalogue_cache.read_through
     def get_user_templates(user_id: int) -> List[Dict]:
         """Restituisce i template di un utente specifico."""
         with get_db_session() as db:
@@ -503,6 +516,7 @@ class MaterialTemplateService:
                 }
             ]
             
+            created = 0
             for template_data in templates:
                 existing = db.query(ProjectTemplate).filter(
                     ProjectTemplate.name == template_data["name"]
@@ -515,8 +529,14 @@ class MaterialTemplateService:
                         created_by_user_id=None  # Template di sistema
                     )
                     db.add(template)
+                    created += 1
             
+            if created:
+                bump_catalogue_version(db)
             db.commit()
+        
+        if created:
+            catalogue_cache.invalidate()
     
     @staticmethod
     def _template_to_dict(template: ProjectTemplate) -> Dict:
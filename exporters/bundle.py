@@ -0,0 +1,182 @@
+"""Export multi-formato in un unico archivio.
+
+Tutti i formati richiesti vengono prodotti dallo stesso risultato preparato
+(``ExportInput``: dati del packing più grafo di scena con le etichette già
+risolte) e impacchettati in uno ZIP. Gli exporter girano in thread separati:
+condividono il grafo in memoria senza doverlo serializzare verso processi
+worker, e la scrittura dei file di un formato si sovrappone al calcolo degli
+altri.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from shapely.geometry import Polygon
+
+from exporters.dxf_exporter import export_to_dxf
+from exporters.json_exporter import export_to_json
+from exporters.pdf_exporter import export_to_pdf_professional_multipage
+from utils.coordinate_frame import LocalFrame
+from utils.file_manager import get_organized_output_path
+from utils.scene_graph import SceneGraph
+
+__all__ = [
+    "ExportInput",
+    "EXPORT_FORMATS",
+    "DEFAULT_BUNDLE_FORMATS",
+    "export_filename",
+    "export_format",
+    "export_bundle",
+    "parse_bundle_formats",
+]
+
+# formato -> (prefisso nome file, estensione, media type)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "json": ("distinta", ".json", "application/json"),
+    "json-compact": ("distinta_compatta", ".json", "application/json"),
+    "pdf": ("distinta_base", ".pdf", "application/pdf"),
+    "dxf": ("schema", ".dxf", "application/dxf"),
+    "dxf-step5": ("step5_visual", ".dxf", "application/dxf"),
+}
+DEFAULT_BUNDLE_FORMATS = ("json", "pdf", "dxf")
+
+BUNDLE_WORKERS = min(len(DEFAULT_BUNDLE_FORMATS), os.cpu_count() or 1)
+
+
+@dataclass(frozen=True)
+class ExportInput:
+    """Risultato di packing pronto per l'export, condiviso da tutti i formati."""
+    summary: Dict[str, int]
+    customs: List[Dict]
+    placed: List[Dict]
+    wall_polygon: Polygon
+    apertures: List[Polygon]
+    config: Dict
+    params: Dict
+    project_name: str = "Progetto Parete"
+    local_frame: Optional[LocalFrame] = None
+    scene_graph: Optional[SceneGraph] = None
+    enhanced_info: Optional[Dict] = None   # solo per dxf-step5
+
+
+def export_filename(fmt: str, tag: str, timestamp: str) -> str:
+    """Nome file di un formato, es. ``distinta_base_1a2b3c4d_20250101_120000.pdf``."""
+    prefix, ext, _ = EXPORT_FORMATS[fmt]
+    return f"{prefix}_{tag}_{timestamp}{ext}"
+
+
+def parse_bundle_formats(formats: Optional[str]) -> Tuple[str, ...]:
+    """Formati da una lista separata da virgole (vuota → predefiniti), senza duplicati."""
+    if not formats:
+        return DEFAULT_BUNDLE_FORMATS
+    requested = [f.strip().lower() for f in formats.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Formati non supportati: {', '.join(unknown)} (ammessi: {', '.join(EXPORT_FORMATS)})")
+    if not requested:
+        raise ValueError("Nessun formato richiesto")
+    return tuple(dict.fromkeys(requested))
+
+
+def export_format(export: ExportInput, fmt: str, filename: str) -> str:
+    """Esegue l'exporter di un formato e restituisce il percorso del file prodotto."""
+    if fmt in ("json", "json-compact"):
+        return export_to_json(
+            export.summary,
+            export.customs,
+            export.placed,
+            out_path=filename,
+            params=export.params,
+            block_config=export.config,
+            local_frame=export.local_frame,
+            mode="compact" if fmt == "json-compact" else "pretty",
+            scene_graph=export.scene_graph,
+        )
+    if fmt == "pdf":
+        return export_to_pdf_professional_multipage(
+            summary=export.summary,
+            customs=export.customs,
+            placed=export.placed,
+            wall_polygon=export.wall_polygon,
+            apertures=export.apertures,
+            project_name=export.project_name,
+            out_path=filename,
+            params=export.params,
+            block_config=export.config,
+            author="WallBuild TAKTAK®",
+            revision="Auto",
+            local_frame=export.local_frame,
+            scene_graph=export.scene_graph,
+        )
+    if fmt in ("dxf", "dxf-step5"):
+        return export_to_dxf(
+            export.summary,
+            export.customs,
+            export.placed,
+            export.wall_polygon,
+            export.apertures,
+            project_name=export.project_name,
+            out_path=filename,
+            params=export.params,
+            color_theme=export.config.get("color_theme", {}),
+            block_config=export.config,
+            mode="step5" if fmt == "dxf-step5" else "technical",
+            enhanced_info=export.enhanced_info if fmt == "dxf-step5" else None,
+            local_frame=export.local_frame,
+            scene_graph=export.scene_graph,
+        )
+    raise ValueError(f"Formato non supportato: {fmt}")
+
+
+def export_bundle(
+    export: ExportInput,
+    formats: Sequence[str] = DEFAULT_BUNDLE_FORMATS,
+    tag: str = "progetto",
+    timestamp: Optional[str] = None,
+    parallel: Optional[bool] = None,
+) -> str:
+    """
+    Produce tutti i formati richiesti e li impacchetta in un archivio ZIP.
+
+    Args:
+        export: Risultato preparato (grafo ed etichette calcolati una volta)
+        formats: Formati da includere (chiavi di ``EXPORT_FORMATS``)
+        tag: Identificativo nei nomi file (es. prefisso della sessione)
+        parallel: None = automatico (thread se più formati e più CPU)
+
+    Returns:
+        Percorso dell'archivio in ``output/bundles``.
+    """
+    formats = tuple(dict.fromkeys(formats))
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"Formati non supportati: {', '.join(unknown) or 'nessuno'}")
+
+    timestamp = timestamp or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filenames = [export_filename(fmt, tag, timestamp) for fmt in formats]
+    workers = min(BUNDLE_WORKERS, len(formats))
+    if parallel is None:
+        parallel = workers > 1
+
+    if parallel:
+        print(f"⚡ [BUNDLE] {len(formats)} formati su {workers} thread")
+        with ThreadPoolExecutor(max_workers=max(workers, 2)) as pool:
+            futures = [pool.submit(export_format, export, fmt, name)
+                       for fmt, name in zip(formats, filenames)]
+            paths = [future.result() for future in futures]
+    else:
+        paths = [export_format(export, fmt, name) for fmt, name in zip(formats, filenames)]
+
+    archive_path = get_organized_output_path(f"export_{tag}_{timestamp}.zip", "bundles")
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, name in zip(paths, filenames):
+            archive.write(path, arcname=name)
+
+    print(f"📦 Bundle export: {', '.join(formats)} → {archive_path}")
+    return archive_path
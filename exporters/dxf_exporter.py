@@ -9,9 +9,11 @@ Le utilities dei blocchi sono state spostate in utils/block_utils.py
 from __future__ import annotations
 
 import datetime
-from typing import Dict, List, Optional
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from shapely.geometry import Polygon, shape
+from shapely.geometry import Polygon
 
 try:
     import ezdxf
@@ -24,8 +26,9 @@ except ImportError:  # pragma: no cover
     TextEntityAlignment = None  # type: ignore
     EZDXF_AVAILABLE = False
 
-from exporters.labels import create_block_labels, create_detailed_block_labels
+from utils.coordinate_frame import LocalFrame
 from utils.file_manager import get_organized_output_path
+from utils.scene_graph import SceneBlock, SceneCustom, SceneGraph, build_scene_graph
 
 # Importa dai nuovi moduli per le funzioni di raggruppamento
 try:
@@ -58,7 +61,9 @@ def export_to_dxf(summary: Dict[str, int],
                   color_theme: Optional[Dict] = None,
                   block_config: Optional[Dict] = None,
                   mode: str = "technical",
-                  enhanced_info: Optional[Dict] = None) -> str:
+                  enhanced_info: Optional[Dict] = None,
+                  local_frame: Optional[LocalFrame] = None,
+                  scene_graph: Optional[SceneGraph] = None) -> str:
     """
     Genera DXF con layout specifico in base al mode:
     - mode='technical': Layout tecnico tradizionale (SOPRA assemblato + SOTTO schema taglio)
@@ -67,6 +72,9 @@ def export_to_dxf(summary: Dict[str, int],
     Args:
         mode: 'technical' (default) or 'step5' per diversi layout
         enhanced_info: Dati enhanced per mode='step5' con configurazione completa
+        local_frame: Origine locale della sessione; nel layout tecnico il foglio
+            viene riportato nelle coordinate del disegno originale
+        scene_graph: Grafo di scena della sessione (etichette e geometrie già risolte)
     """
     # Controlla mode e delega alla funzione specifica
     if mode == "step5":
@@ -80,7 +88,8 @@ def export_to_dxf(summary: Dict[str, int],
             out_path=out_path,
             enhanced_info=enhanced_info,
             color_theme=color_theme,
-            block_config=block_config
+            block_config=block_config,
+            scene_graph=scene_graph
         )
     
     # Mode 'technical' (default) - mantiene comportamento originale
@@ -104,11 +113,12 @@ def export_to_dxf(summary: Dict[str, int],
         wall_height = maxy - miny
         
         # ===== LAYOUT SEMPLIFICATO: SOPRA + SOTTO =====
-        layout = DXFLayoutManager(wall_width, wall_height)
+        origin = (local_frame.origin_x, local_frame.origin_y) if local_frame else (0.0, 0.0)
+        layout = DXFLayoutManager(wall_width, wall_height, origin=origin)
         
         # 1. LAYOUT PRINCIPALE assemblato (zona superiore)
         main_zone = layout.add_zone("main", wall_width, wall_height)
-        _draw_main_layout(msp, wall_polygon, placed, customs, apertures, main_zone, block_config)
+        _draw_main_layout(msp, wall_polygon, placed, customs, apertures, main_zone, block_config, scene_graph)
         
         # 2. SCHEMA TAGLIO raggruppato (zona inferiore con separazione)
         cutting_width = wall_width  # Stessa larghezza del main
@@ -138,11 +148,12 @@ def export_to_dxf(summary: Dict[str, int],
 class DXFLayoutManager:
     """Gestisce il layout DXF evitando sovrapposizioni."""
     
-    def __init__(self, base_width: float, base_height: float):
+    def __init__(self, base_width: float, base_height: float, origin=(0.0, 0.0)):
         self.zones = {}
         self.base_width = base_width
         self.base_height = base_height
-        self.total_bounds = [0, 0, 0, 0]  # minx, miny, maxx, maxy
+        self.origin = origin  # Origine del foglio (coordinate mondo del disegno)
+        self.total_bounds = [origin[0], origin[1], origin[0], origin[1]]  # minx, miny, maxx, maxy
         
     def add_zone(self, name: str, width: float, height: float, 
                  anchor: str = "topleft", ref_zone: str = None, margin: float = 500) -> Dict:
@@ -159,7 +170,7 @@ class DXFLayoutManager:
         
         if anchor == "topleft" or ref_zone is None:
             # Prima zona o posizione assoluta
-            x, y = 0, 0
+            x, y = self.origin
             
         elif anchor == "right_of" and ref_zone in self.zones:
             ref = self.zones[ref_zone]
@@ -178,12 +189,12 @@ class DXFLayoutManager:
             
         elif anchor == "bottom":
             # In fondo rispetto a tutte le zone esistenti
-            x = 0
+            x = self.origin[0]
             y = min(zone['y'] - zone['height'] for zone in self.zones.values()) - margin - height
             
         else:
             # Fallback
-            x, y = 0, 0
+            x, y = self.origin
             
         zone = {
             'name': name,
@@ -296,24 +307,26 @@ def _draw_compact_cartridge(msp, project_name: str, summary: Dict[str, int],
 
 
 def _draw_main_layout(msp, wall_polygon: Polygon, placed: List[Dict], customs: List[Dict], 
-                     apertures: Optional[List[Polygon]], zone: Dict, block_config: Optional[Dict] = None):
+                     apertures: Optional[List[Polygon]], zone: Dict, block_config: Optional[Dict] = None,
+                     scene_graph: Optional[SceneGraph] = None):
     """Disegna il layout principale della parete."""
     offset_x = zone['x']
     offset_y = zone['y']
+    graph = _layout_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
     
     # Contorno parete
-    _draw_wall_outline(msp, wall_polygon, offset_x, offset_y)
+    _draw_wall_outline(msp, graph.wall, offset_x, offset_y)
     
     # Aperture
-    if apertures:
-        _draw_apertures(msp, apertures, offset_x, offset_y)
+    if graph.apertures:
+        _draw_apertures(msp, list(graph.apertures), offset_x, offset_y)
     
     # Blocchi
-    _draw_standard_blocks(msp, placed, offset_x, offset_y, block_config)
-    _draw_custom_blocks(msp, customs, offset_x, offset_y)
+    _draw_standard_blocks(msp, graph.blocks, offset_x, offset_y)
+    _draw_custom_blocks(msp, graph.customs, offset_x, offset_y)
     
     # Quote principali
-    _add_main_dimensions(msp, wall_polygon, offset_x, offset_y)
+    _add_main_dimensions(msp, graph.wall, offset_x, offset_y)
     
     # Titolo sezione - ALTISSIMO per evitare qualsiasi sovrapposizione
     msp.add_text("LAYOUT PARETE PRINCIPALE", height=300, dxfattribs={
@@ -323,6 +336,16 @@ def _draw_main_layout(msp, wall_polygon: Polygon, placed: List[Dict], customs: L
                     align=TextEntityAlignment.MIDDLE_CENTER)
 
 
+def _layout_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph=None) -> SceneGraph:
+    """Grafo di scena del layout: quello della sessione se fornito, altrimenti costruito qui."""
+    if scene_graph is not None:
+        return scene_graph
+    size_to_letter = block_config.get('size_to_letter') if block_config else None
+    if size_to_letter:
+        print(f"🎨 [DEBUG] DXF using custom size_to_letter: {size_to_letter}")
+    return build_scene_graph(wall_polygon, placed, customs, apertures, size_to_letter)
+
+
 def _draw_cutting_schema_fixed(msp, customs: List[Dict], zone: Dict):
     """Disegna schema di taglio con TUTTI i blocchi (standard + custom) raggruppati per categoria."""
     offset_x = zone['x']
@@ -507,146 +530,161 @@ def _draw_apertures(msp, apertures: List[Polygon], offset_x: float, offset_y: fl
         }).set_placement((center_x, center_y), align=TextEntityAlignment.MIDDLE_CENTER)
 
 
-def _draw_standard_blocks(msp, placed: List[Dict], offset_x: float, offset_y: float, block_config: Optional[Dict] = None):
-    """Disegna blocchi standard con etichette raggruppate."""
-    # Usa il sistema di etichettatura avanzato con mapping personalizzato
-    if block_config and block_config.get('size_to_letter'):
-        print(f"🎨 [DEBUG] DXF using custom size_to_letter: {block_config.get('size_to_letter')}")
-        detailed_labels, _ = create_detailed_block_labels(placed, [], block_config.get('size_to_letter'))
-    else:
-        print(f"🎨 [DEBUG] DXF using default system")
-        detailed_labels, _ = create_detailed_block_labels(placed, [])
-    
-    for i, block in enumerate(placed):
-        x1 = block['x'] + offset_x
-        y1 = block['y'] + offset_y
-        x2 = x1 + block['width']
-        y2 = y1 + block['height']
-        
-        # Rettangolo blocco
-        msp.add_lwpolyline([
-            (x1, y1), (x2, y1), (x2, y2), (x1, y2), (x1, y1)
-        ], dxfattribs={"layer": "BLOCCHI_STD"})
-        
-        # Sistema di etichettatura NUOVO: categoria BL + numero TR
-        if i in detailed_labels:
-            label_info = detailed_labels[i]
-            
-            # Posizioni specifiche
-            category_x = x1 + 50  # Basso sinistra X
-            category_y = y1 + 50  # Basso sinistra Y
-            number_x = x2 - 50    # Alto destra X  
-            number_y = y2 - 50    # Alto destra Y
-            
-            # Lettera categoria (basso sinistra) - più grande
-            category = label_info['display']['bottom_left']
-            msp.add_text(category, height=150, dxfattribs={
-                "layer": "TESTI",
-                "style": "Standard",
-                "color": 1  # Rosso per categoria
-            }).set_placement((category_x, category_y), align=TextEntityAlignment.BOTTOM_LEFT)
-            
-            # Numero progressivo (alto destra) - più piccolo
-            number = label_info['display']['top_right']
-            msp.add_text(number, height=100, dxfattribs={
-                "layer": "TESTI", 
-                "style": "Standard",
-                "color": 2  # Giallo per numero
-            }).set_placement((number_x, number_y), align=TextEntityAlignment.TOP_RIGHT)
-            
+# ────────────────────────────────────────────────────────────────────────────────
+# Definizioni BLOCK condivise: un BLOCK per dimensione e categoria standard e
+# uno per geometria custom; ogni pezzo è un INSERT con il solo numero come attributo
+# ────────────────────────────────────────────────────────────────────────────────
+
+STD_BLOCK_PREFIX = "STD_"
+CUSTOM_BLOCK_PREFIX = "CU_"
+# Decimali (mm) con cui le coordinate custom entrano nell'hash della geometria
+CUSTOM_HASH_DECIMALS = 1
+
+
+@dataclass(frozen=True)
+class _BlockText:
+    """Testo di un BLOCK, posizionato rispetto al rettangolo del pezzo.
+
+    I testi ``shared`` sono uguali per tutte le istanze e restano nella
+    definizione; gli altri diventano ATTDEF valorizzati da ogni INSERT.
+    """
+    tag: str
+    anchor: str          # "bl" basso-sinistra, "tr" alto-destra, "c" centro
+    margin: float
+    height: float
+    color: Optional[int]
+    align: str           # nome TextEntityAlignment
+    shared: bool = False
+
+    def location(self, width: float, height: float) -> Tuple[float, float]:
+        if self.anchor == "bl":
+            return self.margin, self.margin
+        if self.anchor == "tr":
+            return width - self.margin, height - self.margin
+        return width / 2, height / 2
+
+    def dxfattribs(self) -> Dict:
+        attribs = {"layer": "TESTI", "style": "Standard", "height": self.height}
+        if self.color is not None:
+            attribs["color"] = self.color
+        return attribs
+
+
+# Categoria BL + numero TR, etichetta centrata legacy se manca la categoria
+STD_BLOCK_TEXTS = (
+    _BlockText("CATEGORIA", "bl", 50, 150, 1, "BOTTOM_LEFT", shared=True),   # Rosso
+    _BlockText("NUMERO", "tr", 50, 100, 2, "TOP_RIGHT"),                      # Giallo
+    _BlockText("ETICHETTA", "c", 0, 120, None, "MIDDLE_CENTER"),
+)
+
+CUSTOM_BLOCK_TEXTS = (
+    _BlockText("CATEGORIA", "bl", 40, 120, 3, "BOTTOM_LEFT", shared=True),   # Verde
+    _BlockText("NUMERO", "tr", 40, 80, 4, "TOP_RIGHT"),                       # Cyan
+    _BlockText("TAGLIO", "c", 0, 60, 8, "MIDDLE_CENTER", shared=True),        # Grigio
+    _BlockText("ETICHETTA", "c", 0, 90, None, "MIDDLE_CENTER"),
+)
+
+
+def _dim_tag(value: float) -> str:
+    """Dimensione nel nome del BLOCK (niente punti nei nomi DXF)."""
+    return f"{round(value, 1):g}".replace(".", "_")
+
+
+def _custom_geometry_key(custom: SceneCustom) -> str:
+    """Hash della geometria custom relativa al suo angolo: pezzi uguali, stesso BLOCK."""
+    digest = hashlib.sha1(f"{_dim_tag(custom.width)}x{_dim_tag(custom.height)}|{custom.ctype}".encode())
+    for poly in custom.polygons:
+        coords = tuple(
+            (round(x - custom.x, CUSTOM_HASH_DECIMALS) + 0.0, round(y - custom.y, CUSTOM_HASH_DECIMALS) + 0.0)
+            for x, y in poly.exterior.coords
+        )
+        digest.update(repr(coords).encode())
+    return digest.hexdigest()[:12]
+
+
+def _block_definition(doc, name: str, width: float, height: float, outlines: Sequence[Sequence],
+                      texts: Sequence[_BlockText], shared: Dict[str, str]) -> str:
+    """Crea il BLOCK al primo uso: contorni, testi condivisi e ATTDEF per pezzo."""
+    if name in doc.blocks:
+        return name
+    definition = doc.blocks.new(name=name)
+    for coords in outlines:
+        definition.add_lwpolyline(coords, close=True)
+    for spec in texts:
+        align = TextEntityAlignment[spec.align]
+        location = spec.location(width, height)
+        if not spec.shared:
+            definition.add_attdef(spec.tag, dxfattribs=spec.dxfattribs()).set_placement(location, align=align)
+        elif shared.get(spec.tag):
+            definition.add_text(shared[spec.tag], dxfattribs=spec.dxfattribs()).set_placement(location, align=align)
+    return name
+
+
+def _insert_block(msp, name: str, x: float, y: float, width: float, height: float,
+                  layer: str, texts: Sequence[_BlockText], values: Dict[str, str]):
+    """INSERT del BLOCK con i soli attributi valorizzati."""
+    ref = msp.add_blockref(name, (x, y), dxfattribs={"layer": layer})
+    for spec in texts:
+        text = values.get(spec.tag)
+        if spec.shared or not text:
+            continue
+        lx, ly = spec.location(width, height)
+        attrib = ref.add_attrib(spec.tag, text, dxfattribs=spec.dxfattribs())
+        attrib.set_placement((x + lx, y + ly), align=TextEntityAlignment[spec.align])
+    return ref
+
+
+def _draw_standard_blocks(msp, blocks: Sequence[SceneBlock], offset_x: float, offset_y: float):
+    """Disegna blocchi standard come INSERT di BLOCK per dimensione e categoria."""
+    doc = msp.doc
+    for block in blocks:
+        name = f"{STD_BLOCK_PREFIX}{_dim_tag(block.width)}x{_dim_tag(block.height)}"
+        label = block.label
+        # Sistema di etichettatura NUOVO: categoria BL (nel BLOCK) + numero TR (attributo)
+        if label is not None and label.has_corners:
+            name = f"{name}_{label.category}"
+            shared = {"CATEGORIA": label.category}
+            values = {"NUMERO": label.number}
         else:
-            # Fallback: etichetta centrata con mapping personalizzato se disponibile
-            center_x = x1 + block['width'] / 2
-            center_y = y1 + block['height'] / 2
-            
-            if block_config and block_config.get('size_to_letter'):
-                std_labels_detailed, _ = create_detailed_block_labels(placed, [], block_config.get('size_to_letter'))
-                std_labels = {i: label['full_label'] for i, label in std_labels_detailed.items()}
-            else:
-                std_labels, _ = create_block_labels(placed, [])
-            label = std_labels.get(i, f"STD{i+1}")
-            
-            msp.add_text(label, height=120, dxfattribs={
-                "layer": "TESTI",
-                "style": "Standard"
-            }).set_placement((center_x, center_y), align=TextEntityAlignment.MIDDLE_CENTER)
+            # Fallback: etichetta centrata legacy
+            shared = {}
+            values = {"ETICHETTA": label.text if label is not None else f"STD{block.index + 1}"}
+        
+        w, h = block.width, block.height
+        _block_definition(doc, name, w, h, [[(0, 0), (w, 0), (w, h), (0, h), (0, 0)]],
+                          STD_BLOCK_TEXTS, shared)
+        _insert_block(msp, name, block.x + offset_x, block.y + offset_y, w, h,
+                      "BLOCCHI_STD", STD_BLOCK_TEXTS, values)
 
 
-def _draw_custom_blocks(msp, customs: List[Dict], offset_x: float, offset_y: float):
-    """Disegna blocchi custom con etichette raggruppate e info taglio."""
-    # Usa il nuovo sistema di etichettatura dettagliata
-    _, detailed_labels = create_detailed_block_labels([], customs)
-    
-    for i, custom in enumerate(customs):
-        # Disegna geometria custom
+def _draw_custom_blocks(msp, customs: Sequence[SceneCustom], offset_x: float, offset_y: float):
+    """Disegna blocchi custom come INSERT di BLOCK condivisi per geometria, con info taglio."""
+    doc = msp.doc
+    for custom in customs:
         try:
-            poly = shape(custom['geometry'])
-            coords = [(x + offset_x, y + offset_y) for x, y in poly.exterior.coords]
-            msp.add_lwpolyline(coords, close=True, dxfattribs={"layer": "BLOCCHI_CUSTOM"})
+            name = f"{CUSTOM_BLOCK_PREFIX}{_custom_geometry_key(custom)}"
+            cut_info = f"{custom.width:.0f}x{custom.height:.0f}\nCU{custom.ctype}"
             
-            # Calcola bounds per posizionamento etichette
-            x1 = custom['x'] + offset_x
-            y1 = custom['y'] + offset_y
-            x2 = x1 + custom['width']
-            y2 = y1 + custom['height']
-            
-            # Sistema di etichettatura NUOVO: categoria BL + numero TR
-            if i in detailed_labels:
-                label_info = detailed_labels[i]
-                
-                # Posizioni specifiche
-                category_x = x1 + 40  # Basso sinistra X (margine più piccolo per custom)
-                category_y = y1 + 40  # Basso sinistra Y
-                number_x = x2 - 40    # Alto destra X  
-                number_y = y2 - 40    # Alto destra Y
-                
-                # Lettera categoria (basso sinistra) - più grande
-                category = label_info['display']['bottom_left']
-                msp.add_text(category, height=120, dxfattribs={
-                    "layer": "TESTI",
-                    "style": "Standard",
-                    "color": 3  # Verde per categoria custom
-                }).set_placement((category_x, category_y), align=TextEntityAlignment.BOTTOM_LEFT)
-                
-                # Numero progressivo (alto destra) - più piccolo
-                number = label_info['display']['top_right']
-                msp.add_text(number, height=80, dxfattribs={
-                    "layer": "TESTI", 
-                    "style": "Standard",
-                    "color": 4  # Cyan per numero custom
-                }).set_placement((number_x, number_y), align=TextEntityAlignment.TOP_RIGHT)
-                
-                # Info taglio al centro (opzionale, più piccola)
-                center_x = custom['x'] + custom['width'] / 2 + offset_x
-                center_y = custom['y'] + custom['height'] / 2 + offset_y
-                
-                ctype = custom.get('ctype', 2)
-                dimensions_text = f"{custom['width']:.0f}x{custom['height']:.0f}\nCU{ctype}"
-                
-                msp.add_text(dimensions_text, height=60, dxfattribs={
-                    "layer": "TESTI",
-                    "style": "Standard",
-                    "color": 8  # Grigio per info aggiuntive
-                }).set_placement((center_x, center_y), align=TextEntityAlignment.MIDDLE_CENTER)
-                
+            label = custom.label
+            # Sistema di etichettatura NUOVO: categoria BL + info taglio al centro (nel BLOCK), numero TR
+            if label is not None and label.has_corners:
+                name = f"{name}_{label.category}"
+                shared = {"CATEGORIA": label.category, "TAGLIO": cut_info}
+                values = {"NUMERO": label.number}
             else:
                 # Fallback: etichetta centrata legacy
-                center_x = custom['x'] + custom['width'] / 2 + offset_x
-                center_y = custom['y'] + custom['height'] / 2 + offset_y
-                
-                _, custom_labels = create_block_labels([], customs)
-                label = custom_labels.get(i, f"CU{i+1}")
-                
-                ctype = custom.get('ctype', 2)
-                full_label = f"{label}\n{custom['width']:.0f}x{custom['height']:.0f}\nCU{ctype}"
-                
-                msp.add_text(full_label, height=90, dxfattribs={
-                    "layer": "TESTI",
-                    "style": "Standard"
-                }).set_placement((center_x, center_y), align=TextEntityAlignment.MIDDLE_CENTER)
+                text = label.text if label is not None else f"CU{custom.index + 1}"
+                shared = {}
+                values = {"ETICHETTA": f"{text}\n{cut_info}"}
+            
+            outlines = [[(x - custom.x, y - custom.y) for x, y in poly.exterior.coords]
+                        for poly in custom.polygons]
+            _block_definition(doc, name, custom.width, custom.height, outlines, CUSTOM_BLOCK_TEXTS, shared)
+            _insert_block(msp, name, custom.x + offset_x, custom.y + offset_y, custom.width, custom.height,
+                          "BLOCCHI_CUSTOM", CUSTOM_BLOCK_TEXTS, values)
             
         except Exception as e:
-            print(f"❌ Errore disegno custom {i}: {e}")
+            print(f"❌ Errore disegno custom {custom.index}: {e}")
 
 
 def _add_main_dimensions(msp, wall_polygon: Polygon, offset_x: float, offset_y: float):
@@ -688,7 +726,8 @@ def export_step5_visualization_dxf(
     out_path: str = "step5_visualization.dxf",
     enhanced_info: Optional[Dict] = None,
     color_theme: Optional[Dict] = None,
-    block_config: Optional[Dict] = None
+    block_config: Optional[Dict] = None,
+    scene_graph: Optional[SceneGraph] = None
 ) -> str:
     """
     Genera DXF con layout Step 5 identico all'interfaccia web:
@@ -707,6 +746,7 @@ def export_step5_visualization_dxf(
         enhanced_info: Dati enhanced con configurazione completa
         color_theme: Tema colori personalizzato
         block_config: Configurazione blocchi personalizzata
+        scene_graph: Grafo di scena della sessione (etichette e geometrie già risolte)
         
     Returns:
         Percorso file DXF generato
@@ -746,7 +786,7 @@ def export_step5_visualization_dxf(
         _draw_step5_preview_section(
             msp, wall_polygon, placed, customs, apertures,
             PREVIEW_X, PREVIEW_Y, PREVIEW_W, PREVIEW_H,
-            enhanced_info, color_theme, block_config
+            enhanced_info, color_theme, block_config, scene_graph
         )
         
         # 2. SEZIONE TABELLE DATI (Standard + Custom)
@@ -808,7 +848,8 @@ def _setup_step5_layers(doc):
 
 
 def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
-                               x, y, width, height, enhanced_info, color_theme, block_config):
+                               x, y, width, height, enhanced_info, color_theme, block_config,
+                               scene_graph: Optional[SceneGraph] = None):
     """Disegna sezione preview con ricostruzione vettoriale identica all'interfaccia."""
     
     # Header con titolo IDENTICO all'interfaccia web
@@ -830,8 +871,10 @@ def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
         dxfattribs={"layer": "STEP5_PREVIEW_BORDER"}
     )
     
+    graph = _layout_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+    
     # Calcola scaling per fit preview area
-    wall_bounds = wall_polygon.bounds
+    wall_bounds = graph.bounds
     wall_w = wall_bounds[2] - wall_bounds[0]
     wall_h = wall_bounds[3] - wall_bounds[1]
     
@@ -851,25 +894,19 @@ def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
     
     # 1. Disegna contorno parete (blu) IDENTICO all'interfaccia web
     wall_coords = [(px * scale + offset_x, py * scale + offset_y) 
-                   for px, py in wall_polygon.exterior.coords]
+                   for px, py in graph.wall.exterior.coords]
     msp.add_lwpolyline(
         wall_coords,
         close=True,
         dxfattribs={"layer": "STEP5_PREVIEW_WALL", "lineweight": 60, "color": 5}  # Blu spesso come interfaccia
     )
     
-    # OTTIENI ETICHETTE CORRETTE usando il sistema esistente (IDENTICO alla preview web)
-    if block_config and block_config.get('size_to_letter'):
-        std_detailed_labels, custom_detailed_labels = create_detailed_block_labels(placed, customs, block_config.get('size_to_letter'))
-    else:
-        std_detailed_labels, custom_detailed_labels = create_detailed_block_labels(placed, customs)
-    
     # 2. Disegna blocchi standard (grigi) con etichette IDENTICHE alla preview web
-    for i, block in enumerate(placed):
-        bx = block['x'] * scale + offset_x
-        by = block['y'] * scale + offset_y
-        bw = block['width'] * scale
-        bh = block['height'] * scale
+    for block in graph.blocks:
+        bx = block.x * scale + offset_x
+        by = block.y * scale + offset_y
+        bw = block.width * scale
+        bh = block.height * scale
         
         # Rectangle grigio IDENTICO all'interfaccia web
         msp.add_lwpolyline(
@@ -878,16 +915,8 @@ def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
             dxfattribs={"layer": "STEP5_PREVIEW_BLOCKS", "lineweight": 25}
         )
         
-        # USA ETICHETTE DAL SISTEMA ESISTENTE (identiche alla preview web)
-        if i in std_detailed_labels:
-            label_info = std_detailed_labels[i]
-            # Usa ENTRAMBE: lettera categoria (bottom_left) + numero (top_right)
-            category = label_info['display']['bottom_left']  # Lettera: A, B, C
-            number = label_info['display']['top_right']      # Numero: 1, 2, 3...
-            label = f"{category}{number}"  # Combina: A1, A2, B1, B2...
-        else:
-            # Fallback se etichetta non trovata
-            label = f"S{i+1}"
+        # Etichetta dal grafo di scena (identica alla preview web): A1, A2, B1...
+        label = block.label.text if block.label is not None else f"S{block.index + 1}"
         
         # Posizione alto-destra del blocco
         label_x = bx + bw - 3  # Leggermente dentro dal bordo destro
@@ -901,53 +930,45 @@ def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
         ).set_placement((label_x, label_y), align=TextEntityAlignment.TOP_RIGHT)
     
     # 3. Disegna pezzi custom (viola tratteggiato) con etichette IDENTICHE alla preview web
-    for i, custom in enumerate(customs):
+    for custom in graph.customs:
         try:
-            geom = shape(custom['geometry'])
-            custom_coords = [(px * scale + offset_x, py * scale + offset_y) 
-                           for px, py in geom.exterior.coords]
-            
-            # Polyline viola con spessore IDENTICO all'interfaccia
-            msp.add_lwpolyline(
-                custom_coords,
-                close=True,
-                dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM", "lineweight": 30, "color": 6}
-            )
-            
-            # Hatch pattern viola con LINEE OBLIQUE RADE
-            try:
-                hatch = msp.add_hatch(color=6, dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM"})
-                hatch.paths.add_polyline_path(custom_coords, is_closed=True)
-                # Pattern LINE con angolo obliquo e scala grande per linee rade
-                hatch.set_pattern_fill("LINE", scale=5.0, angle=45)  # Linee oblique rade
-            except:
+            for poly in custom.polygons:
+                custom_coords = [(px * scale + offset_x, py * scale + offset_y) 
+                               for px, py in poly.exterior.coords]
+                
+                # Polyline viola con spessore IDENTICO all'interfaccia
+                msp.add_lwpolyline(
+                    custom_coords,
+                    close=True,
+                    dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM", "lineweight": 30, "color": 6}
+                )
+                
+                # Hatch pattern viola con LINEE OBLIQUE RADE
                 try:
-                    # Fallback: prova ANSI31 con scala molto grande per linee rade
                     hatch = msp.add_hatch(color=6, dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM"})
                     hatch.paths.add_polyline_path(custom_coords, is_closed=True)
-                    hatch.set_pattern_fill("ANSI31", scale=3.0, angle=45)  # Linee oblique più rade
+                    # Pattern LINE con angolo obliquo e scala grande per linee rade
+                    hatch.set_pattern_fill("LINE", scale=5.0, angle=45)  # Linee oblique rade
                 except:
-                    # Ultimo fallback: riempimento solido viola chiaro
-                    solid_hatch = msp.add_hatch(color=126, dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM"})  # Viola chiaro
-                    solid_hatch.paths.add_polyline_path(custom_coords, is_closed=True)
-                    solid_hatch.set_solid_fill()
+                    try:
+                        # Fallback: prova ANSI31 con scala molto grande per linee rade
+                        hatch = msp.add_hatch(color=6, dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM"})
+                        hatch.paths.add_polyline_path(custom_coords, is_closed=True)
+                        hatch.set_pattern_fill("ANSI31", scale=3.0, angle=45)  # Linee oblique più rade
+                    except:
+                        # Ultimo fallback: riempimento solido viola chiaro
+                        solid_hatch = msp.add_hatch(color=126, dxfattribs={"layer": "STEP5_PREVIEW_CUSTOM"})  # Viola chiaro
+                        solid_hatch.paths.add_polyline_path(custom_coords, is_closed=True)
+                        solid_hatch.set_solid_fill()
             
-            # USA ETICHETTE DAL SISTEMA ESISTENTE (identiche alla preview web)
-            if i in custom_detailed_labels:
-                label_info = custom_detailed_labels[i]
-                # Usa ENTRAMBE: lettera categoria (bottom_left) + numero (top_right)
-                category = label_info['display']['bottom_left']  # Lettera: D, E, F
-                number = label_info['display']['top_right']      # Numero: 1, 2, 3...
-                label = f"{category}{number}"  # Combina: D1, D2, E1, E2...
-            else:
-                # Fallback se etichetta non trovata
-                label = f"D{i+1}"
+            # Etichetta dal grafo di scena (identica alla preview web): D1, D2, E1...
+            label = custom.label.text if custom.label is not None else f"D{custom.index + 1}"
             
             # Posizioni per etichetta custom
-            custom_x = custom['x'] * scale + offset_x
-            custom_y = custom['y'] * scale + offset_y
-            custom_w = custom['width'] * scale
-            custom_h = custom['height'] * scale
+            custom_x = custom.x * scale + offset_x
+            custom_y = custom.y * scale + offset_y
+            custom_w = custom.width * scale
+            custom_h = custom.height * scale
             
             # Posizione alto-destra del blocco custom
             label_x = custom_x + custom_w - 3  # Leggermente dentro dal bordo destro
@@ -961,7 +982,7 @@ def _draw_step5_preview_section(msp, wall_polygon, placed, customs, apertures,
             ).set_placement((label_x, label_y), align=TextEntityAlignment.TOP_RIGHT)
             
         except Exception as e:
-            print(f"Errore drawing custom {i}: {e}")
+            print(f"Errore drawing custom {custom.index}: {e}")
     
     # 4. Marker "INIZIO" (rosso in basso)
     start_marker_x = x + 20
@@ -988,46 +1009,21 @@ def _draw_step5_tables_section(msp, summary, customs, placed,
 
 def _create_html_compatible_type_map(block_config):
     """Crea type mapping identico all'HTML usando block_config.size_to_letter."""
-    type_map = {}
+    from utils.block_types import get_block_type_registry
     
     if block_config and 'size_to_letter' in block_config:
         # Usa configurazione del backend (identico all'HTML)
-        size_to_letter = block_config['size_to_letter']
-        block_height = block_config.get('block_height', 495)  # Default height
-        
-        print(f"[DEBUG] Using block_config.size_to_letter: {size_to_letter}")
-        
-        for width_str, letter in size_to_letter.items():
-            width = int(width_str)
-            std_type = f"std_{width}x{block_height}"
-            
-            type_map[std_type] = {
-                'name': f'Categoria {letter}',
-                'size': f'{width} x {block_height}',
-                'category': letter,
-                'width': width,
-                'height': block_height
-            }
+        print(f"[DEBUG] Using block_config.size_to_letter: {block_config['size_to_letter']}")
+        registry = get_block_type_registry(
+            size_to_letter=block_config['size_to_letter'],
+            block_height=block_config.get('block_height', 495)
+        )
     else:
-        # Fallback con mapping default
+        # Fallback con mapping default (1239/826/413 → A/B/C)
         print("[DEBUG] Using fallback default mapping")
-        default_mapping = {
-            1239: 'A',
-            826: 'B', 
-            413: 'C'
-        }
-        default_height = 495
-        
-        for width, letter in default_mapping.items():
-            std_type = f"std_{width}x{default_height}"
-            type_map[std_type] = {
-                'name': f'Categoria {letter}',
-                'size': f'{width} x {default_height}',
-                'category': letter,
-                'width': width,
-                'height': default_height
-            }
+        registry = get_block_type_registry()
     
+    type_map = registry.type_map()
     print(f"[DEBUG] Created type_map: {type_map}")
     return type_map
 
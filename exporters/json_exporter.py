@@ -1,12 +1,34 @@
-"""Exporter per il formato JSON."""
+"""Exporter per il formato JSON.
+
+Il documento viene scritto in streaming: le sezioni per pezzo ("custom" e
+"standard") sono codificate un elemento alla volta direttamente dal risultato
+del packing, senza costruire il documento annidato in memoria. Due modalità
+producono lo stesso contenuto:
+
+- ``pretty``: indentato con chiavi ordinate, per l'archivio di progetto
+- ``compact``: senza spazi, per l'integrazione ERP
+"""
 
 import json
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
 
 from exporters.labels import create_block_labels, create_detailed_block_labels
+from utils.coordinate_frame import LocalFrame
 from utils.file_manager import get_organized_output_path
+from utils.scene_graph import SceneGraph
+
+__all__ = ["export_to_json", "JSON_MODES", "JSON_SCHEMA_VERSION", "ORJSON_AVAILABLE"]
 
-__all__ = ["export_to_json"]
+# Versione del formato: va aumentata a ogni modifica della struttura del documento
+JSON_SCHEMA_VERSION = "1.0"
+JSON_MODES = ("pretty", "compact")
 
 
 def export_to_json(
@@ -16,36 +38,43 @@ def export_to_json(
     out_path: str = "distinta_wall.json",
     params: Optional[Dict] = None,
     block_config: Optional[Dict] = None,
+    local_frame: Optional[LocalFrame] = None,
+    mode: str = "pretty",
+    scene_graph: Optional[SceneGraph] = None,
 ) -> str:
-    """Serializza dati di parete nel formato JSON organizzato."""
-    organized_path = get_organized_output_path(out_path, "json")
+    """Serializza dati di parete nel formato JSON organizzato.
 
-    if block_config and block_config.get("size_to_letter"):
-        size_to_letter = block_config.get("size_to_letter")
-        print(f"[DEBUG] Export JSON using custom size_to_letter: {size_to_letter}")
-        std_labels_detailed, custom_labels_detailed = create_detailed_block_labels(placed, customs, size_to_letter)
-        std_labels = {i: label["full_label"] for i, label in std_labels_detailed.items()}
-        custom_labels = {i: label["full_label"] for i, label in custom_labels_detailed.items()}
-    else:
-        print("[DEBUG] Export JSON using default labeling system")
-        std_labels, custom_labels = create_block_labels(placed, customs)
+    Se ``local_frame`` è indicato, le coordinate vengono riportate nel sistema
+    del disegno originale (georeferenziato). Con ``scene_graph`` le etichette
+    sono quelle già risolte per preview e PDF, senza ricalcolo.
+    """
+    if mode not in JSON_MODES:
+        raise ValueError(f"Modalità JSON non supportata: {mode} (ammesse: {', '.join(JSON_MODES)})")
+
+    organized_path = get_organized_output_path(out_path, "json")
+    std_labels, custom_labels = _json_labels(placed, customs, block_config, scene_graph)
+    frame = local_frame if local_frame is not None and not local_frame.is_identity else None
 
-    data = {
-        "schema_version": "1.0",
-        "units": "mm",
-        "params": params or {},
-        "standard": {
-            std_labels[i]: {
+    def standard_items() -> Iterable[Tuple[str, Dict]]:
+        # Stessa semantica del dict originale: a parità di etichetta vince l'ultimo blocco
+        by_label = {std_labels[i]: i for i in range(len(placed))}
+        for label in sorted(by_label):
+            p = placed[by_label[label]]
+            if frame is not None:
+                p = frame.block_to_world(p)
+            yield label, {
                 "type": p["type"],
                 "width": int(p["width"]),
                 "height": int(p["height"]),
                 "x": int(round(p["x"])),
                 "y": int(round(p["y"])),
             }
-            for i, p in enumerate(placed)
-        },
-        "custom": [
-            {
+
+    def custom_items() -> Iterable[Dict]:
+        for i, c in enumerate(customs):
+            if frame is not None:
+                c = frame.block_to_world(c)
+            yield {
                 "label": custom_labels[i],
                 "ctype": c.get("ctype", 2),
                 "width": int(round(c["width"])),
@@ -54,15 +83,121 @@ def export_to_json(
                 "y": int(round(c["y"])),
                 "geometry": c["geometry"],
             }
-            for i, c in enumerate(customs)
-        ],
-        "totals": {
-            "standard_counts": summary,
-            "custom_count": len(customs),
-        },
-    }
 
-    with open(organized_path, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, sort_keys=True)
+    with open(organized_path, "wb") as handle:
+        writer = _JsonStreamWriter(handle, pretty=(mode == "pretty"))
+        # Membri in ordine alfabetico (documento con chiavi ordinate)
+        writer.array("custom", custom_items())
+        writer.value("params", params or {})
+        writer.value("schema_version", JSON_SCHEMA_VERSION)
+        writer.mapping("standard", standard_items())
+        writer.value("totals", {"standard_counts": summary, "custom_count": len(customs)})
+        writer.value("units", "mm")
+        writer.close()
 
     return organized_path
+
+
+def _json_labels(
+    placed: List[Dict],
+    customs: List[Dict],
+    block_config: Optional[Dict],
+    scene_graph: Optional[SceneGraph],
+) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """Etichette dei pezzi: dal grafo di scena se corrisponde al risultato, altrimenti calcolate."""
+    if scene_graph is not None and _graph_matches_result(scene_graph, placed, customs):
+        std_labels = {b.index: b.label.text if b.label else f"STD{b.index + 1}" for b in scene_graph.blocks}
+        custom_labels = {c.index: c.label.text if c.label else f"CU{c.index + 1}" for c in scene_graph.customs}
+        return std_labels, custom_labels
+
+    if block_config and block_config.get("size_to_letter"):
+        size_to_letter = block_config.get("size_to_letter")
+        print(f"[DEBUG] Export JSON using custom size_to_letter: {size_to_letter}")
+        std_labels_detailed, custom_labels_detailed = create_detailed_block_labels(placed, customs, size_to_letter)
+        std_labels = {i: label["full_label"] for i, label in std_labels_detailed.items()}
+        custom_labels = {i: label["full_label"] for i, label in custom_labels_detailed.items()}
+    else:
+        print("[DEBUG] Export JSON using default labeling system")
+        std_labels, custom_labels = create_block_labels(placed, customs)
+    return std_labels, custom_labels
+
+
+def _graph_matches_result(scene_graph: SceneGraph, placed: List[Dict], customs: List[Dict]) -> bool:
+    """True se blocchi e custom del grafo sono, indice per indice, quelli del risultato."""
+    if len(scene_graph.blocks) != len(placed) or len(scene_graph.customs) != len(customs):
+        return False
+
+    def same(node, piece: Dict) -> bool:
+        return (node.x, node.y, node.width, node.height) == (
+            float(piece["x"]), float(piece["y"]), float(piece["width"]), float(piece["height"])
+        )
+
+    return (all(same(node, placed[node.index]) for node in scene_graph.blocks)
+            and all(same(node, customs[node.index]) for node in scene_graph.customs))
+
+
+def _encoder(pretty: bool) -> Callable[[object], bytes]:
+    """Codifica un valore in JSON UTF-8 (orjson se installato)."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return lambda value: orjson.dumps(value, option=option)
+    if pretty:
+        return lambda value: json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return lambda value: json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+class _JsonStreamWriter:
+    """Scrive l'oggetto radice un membro alla volta; array e mapping per elemento.
+
+    In modalità pretty ogni valore codificato viene reindentato alla sua
+    profondità, così il file è identico a ``json.dump(indent=2, sort_keys=True)``.
+    """
+
+    def __init__(self, handle, pretty: bool):
+        self._handle = handle
+        self._encode = _encoder(pretty)
+        self._pretty = pretty
+        self._members = 0
+        handle.write(b"{")
+
+    def _encoded(self, value, depth: int) -> bytes:
+        data = self._encode(value)
+        if self._pretty and depth:
+            data = data.replace(b"\n", b"\n" + b"  " * depth)
+        return data
+
+    def _newline(self, depth: int) -> bytes:
+        return b"\n" + b"  " * depth if self._pretty else b""
+
+    def _key(self, key: str) -> None:
+        separator = b"," if self._members else b""
+        colon = b": " if self._pretty else b":"
+        self._handle.write(separator + self._newline(1) + self._encoded(key, 0) + colon)
+        self._members += 1
+
+    def value(self, key: str, value) -> None:
+        self._key(key)
+        self._handle.write(self._encoded(value, 1))
+
+    def array(self, key: str, items: Iterable) -> None:
+        self._key(key)
+        self._sequence(b"[", b"]", (self._encoded(item, 2) for item in items))
+
+    def mapping(self, key: str, items: Iterable[Tuple[str, object]]) -> None:
+        self._key(key)
+        colon = b": " if self._pretty else b":"
+        self._sequence(b"{", b"}", (self._encoded(k, 0) + colon + self._encoded(v, 2) for k, v in items))
+
+    def _sequence(self, open_: bytes, close: bytes, chunks: Iterable[bytes]) -> None:
+        write = self._handle.write
+        write(open_)
+        count = 0
+        for chunk in chunks:
+            write((b"," if count else b"") + self._newline(2) + chunk)
+            count += 1
+        write((self._newline(1) if count else b"") + close)
+
+    def close(self) -> None:
+        self._handle.write((self._newline(0) if self._members else b"") + b"}")
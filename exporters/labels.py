@@ -1,7 +1,15 @@
-"""Labeling helpers condivisi tra gli exporter."""
+"""Labeling helpers condivisi tra gli exporter.
 
+Le etichette di un risultato di packing si calcolano una volta con
+``get_block_labels`` e vengono memorizzate in sessione
+(``session["block_labels"]``): grafo di scena, tabelle PDF ed export JSON
+ricevono lo stesso ``BlockLabels``.
+"""
+
+import hashlib
 from collections import defaultdict
-from typing import DefaultDict, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import DefaultDict, Dict, List, Optional, Sequence, Tuple
 
 from utils.config import SIZE_TO_LETTER
 
@@ -16,11 +24,81 @@ except ImportError:  # pragma: no cover
 
 
 __all__ = [
+    "BlockLabels",
+    "block_labels_key",
     "create_block_labels",
     "create_detailed_block_labels",
+    "get_block_labels",
 ]
 
 
+@dataclass(frozen=True)
+class BlockLabels:
+    """Etichette dettagliate (categoria + numero) di un risultato di packing."""
+
+    key: str
+    standard: Dict[int, Dict]
+    custom: Dict[int, Dict]
+
+    def full_labels(self) -> Tuple[Dict[int, str], Dict[int, str]]:
+        """Etichette complete (A1, D2...) per indice, come ``create_block_labels``."""
+        return (
+            {i: label["full_label"] for i, label in self.standard.items()},
+            {i: label["full_label"] for i, label in self.custom.items()},
+        )
+
+    def standard_by_category(self, placed: Sequence[Dict]) -> Dict[str, List[Dict]]:
+        """Blocchi standard raggruppati per categoria, nell'ordine di posa."""
+        return _by_category(placed, self.standard)
+
+    def custom_by_category(self, customs: Sequence[Dict]) -> Dict[str, List[Dict]]:
+        """Pezzi custom raggruppati per categoria, nell'ordine di posa."""
+        return _by_category(customs, self.custom)
+
+
+def block_labels_key(
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    size_to_letter: Optional[Dict] = None,
+) -> str:
+    """Impronta di ciò da cui dipendono le etichette: dimensioni, ordine, ctype e mappatura."""
+    digest = hashlib.sha1()
+    digest.update(repr([(b["width"], b["height"]) for b in placed]).encode())
+    digest.update(repr([(c["width"], c["height"], c.get("ctype", 2)) for c in customs]).encode())
+    digest.update(repr(sorted((str(k), v) for k, v in (size_to_letter or {}).items())).encode())
+    return digest.hexdigest()
+
+
+def get_block_labels(
+    session: Optional[Dict],
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    size_to_letter: Optional[Dict] = None,
+) -> BlockLabels:
+    """
+    Restituisce le etichette salvate in sessione, ricalcolandole solo se
+    blocchi o mappatura lettere sono cambiati.
+    """
+    key = block_labels_key(placed, customs, size_to_letter)
+    cached = session.get("block_labels") if session is not None else None
+    if isinstance(cached, BlockLabels) and cached.key == key:
+        return cached
+
+    standard, custom = create_detailed_block_labels(list(placed), list(customs), size_to_letter or None)
+    labels = BlockLabels(key=key, standard=standard, custom=custom)
+    if session is not None:
+        session["block_labels"] = labels
+    return labels
+
+
+def _by_category(blocks: Sequence[Dict], labels: Dict[int, Dict]) -> Dict[str, List[Dict]]:
+    categories: DefaultDict[str, List[Dict]] = defaultdict(list)
+    for i, block in enumerate(blocks):
+        if i in labels:
+            categories[labels[i]["category"]].append(block)
+    return dict(categories)
+
+
 def create_block_labels(placed: List[Dict], custom: List[Dict]) -> Tuple[Dict[int, str], Dict[int, str]]:
     """Restituisce etichette legacy (stringhe) per blocchi standard e custom."""
     if _grouping_legacy is not None:
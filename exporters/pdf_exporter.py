@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import datetime
-import io
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-from shapely.geometry import Polygon, shape
+from shapely.geometry import Polygon
 
-from exporters.labels import create_detailed_block_labels
+from utils.coordinate_frame import LocalFrame
 from utils.file_manager import get_organized_output_path
+from exporters.labels import BlockLabels
+from utils.scene_graph import SceneGraph, build_scene_graph
 from block_grouping import (
     create_grouped_block_labels,
     group_blocks_by_category,
@@ -24,7 +25,6 @@ try:  # ReportLab
     from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
     from reportlab.lib.units import mm
     from reportlab.platypus import (
-        Image,
         PageBreak,
         Paragraph,
         SimpleDocTemplate,
@@ -35,31 +35,67 @@ try:  # ReportLab
         Frame,
         KeepTogether,
     )
+    from reportlab.platypus.flowables import Flowable
     from reportlab.pdfgen import canvas
 
     REPORTLAB_AVAILABLE = True
 except ImportError:  # pragma: no cover
     REPORTLAB_AVAILABLE = False
 
-try:  # Matplotlib for schema rendering
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as patches
-
-    MATPLOTLIB_AVAILABLE = True
-except Exception:  # pragma: no cover
-    plt = None  # type: ignore
-    patches = None  # type: ignore
-    MATPLOTLIB_AVAILABLE = False
+from exporters.pdf_vector import (
+    SCHEMA_COMPACT,
+    SCHEMA_FULLPAGE,
+    SCHEMA_PROFESSIONAL,
+    pie_chart_drawing,
+    wall_schema_drawing,
+)
 
 
 __all__ = ["export_to_pdf", "export_to_pdf_professional", "export_to_pdf_professional_multipage", "REPORTLAB_AVAILABLE"]
 
+
+def _schema_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph=None) -> SceneGraph:
+    """Grafo di scena dello schema: quello della sessione se fornito, altrimenti costruito qui."""
+    if scene_graph is not None:
+        return scene_graph
+    size_to_letter = block_config.get("size_to_letter") if block_config else None
+    return build_scene_graph(wall_polygon, placed, customs, apertures, size_to_letter)
+
+
+def _report_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph=None) -> Optional[SceneGraph]:
+    """Grafo del report (schema + etichette delle tabelle); None se la geometria non è disegnabile."""
+    try:
+        return _schema_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+    except Exception as exc:
+        print(f"⚠️ [PDF] Grafo di scena non disponibile, tabelle con etichettatura propria: {exc}")
+        return None
+
+
+def _standard_groups(placed, block_config, labels: Optional[BlockLabels] = None) -> Dict[str, List[Dict]]:
+    """Blocchi standard per categoria: dalle etichette condivise se disponibili."""
+    if labels is not None:
+        return labels.standard_by_category(placed)
+    if block_config and block_config.get("size_to_letter"):
+        return group_blocks_by_category(placed, block_config.get("size_to_letter"))
+    return group_blocks_by_category(placed)
+
+
+def _custom_groups(customs, labels: Optional[BlockLabels] = None) -> Dict[str, List[Dict]]:
+    """Pezzi custom per categoria: dalle etichette condivise se disponibili."""
+    if labels is not None:
+        return labels.custom_by_category(customs)
+    return group_custom_blocks_by_category(customs)
+
+
 # Colori Corporate TAKTAK®
 BRAND_BLUE = HexColor("#1B3B6F") if REPORTLAB_AVAILABLE else None
 BRAND_GRAY = HexColor("#E5E5E5") if REPORTLAB_AVAILABLE else None
 BRAND_GREEN = HexColor("#C6F3C0") if REPORTLAB_AVAILABLE else None
 BRAND_ACCENT = HexColor("#FF6B35") if REPORTLAB_AVAILABLE else None
 
+# Spicchi grafico torta: standard, custom
+PIE_COLORS = ("#4A90E2", "#50C878")
+
 
 def export_to_pdf(
     summary: Dict[str, int],
@@ -71,6 +107,7 @@ def export_to_pdf(
     out_path: str = "report_parete.pdf",
     params: Optional[Dict] = None,
     block_config: Optional[Dict] = None,
+    scene_graph: Optional[SceneGraph] = None,
 ) -> str:
     """Genera un report PDF completo con schema parete e tabelle."""
     if not REPORTLAB_AVAILABLE:
@@ -89,24 +126,27 @@ def export_to_pdf(
 
     styles = getSampleStyleSheet()
     story: List = []
+    # Schema e tabelle con le stesse etichette (una sola etichettatura per report)
+    scene_graph = _report_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+    labels = scene_graph.labels if scene_graph is not None else None
 
     # Header e schema
     story.extend(_build_pdf_header(project_name, summary, customs, styles))
     story.append(Spacer(1, 10 * mm))
 
-    schema_image = _generate_wall_schema_image(wall_polygon, placed, customs, apertures, block_config)
+    schema_image = _generate_wall_schema_image(wall_polygon, placed, customs, apertures, block_config, scene_graph)
     if schema_image:
         story.append(schema_image)
         story.append(Spacer(1, 10 * mm))
 
     # Tabelle standard/custom
     if summary:
-        story.append(_build_standard_blocks_table(summary, placed, styles, block_config))
+        story.append(_build_standard_blocks_table(summary, placed, styles, block_config, labels))
         story.append(Spacer(1, 8 * mm))
 
     if customs:
         story.append(PageBreak())
-        story.append(_build_custom_blocks_table(customs, styles))
+        story.append(_build_custom_blocks_table(customs, styles, labels))
         story.append(Spacer(1, 8 * mm))
 
     if params:
@@ -188,168 +228,26 @@ def _generate_wall_schema_image(
     customs: List[Dict],
     apertures: Optional[List[Polygon]] = None,
     block_config: Optional[Dict] = None,
+    scene_graph: Optional[SceneGraph] = None,
 ):
-    if not MATPLOTLIB_AVAILABLE:
-        return None
-
+    """Schema costruttivo vettoriale (reportlab) per il report base."""
     try:
-        fig, ax = plt.subplots(figsize=(180 / 25.4, 120 / 25.4), dpi=200)
-        ax.set_aspect("equal")
-
-        minx, miny, maxx, maxy = wall_polygon.bounds
-        margin = max((maxx - minx), (maxy - miny)) * 0.05
-        ax.set_xlim(minx - margin, maxx + margin)
-        ax.set_ylim(miny - margin, maxy + margin)
-
-        x, y = wall_polygon.exterior.xy
-        ax.plot(x, y, color="blue", linewidth=2, label="Contorno parete")
-
-        if block_config and block_config.get("size_to_letter"):
-            detailed_std, detailed_custom = create_detailed_block_labels(
-                placed,
-                customs,
-                block_config.get("size_to_letter"),
-            )
-        else:
-            detailed_std, detailed_custom = create_detailed_block_labels(placed, customs)
-
-        for i, blk in enumerate(placed):
-            rect = patches.Rectangle(
-                (blk["x"], blk["y"]),
-                blk["width"],
-                blk["height"],
-                facecolor="lightgray",
-                edgecolor="black",
-                linewidth=0.5,
-            )
-            ax.add_patch(rect)
-
-            label_info = detailed_std.get(i)
-            if not label_info:
-                continue
-
-            margin_px = 3
-            category = label_info["display"]["bottom_left"]
-            number = label_info["display"]["top_right"]
-
-            fontsize_letter = min(10, max(6, blk["width"] / 150))
-            ax.text(
-                blk["x"] + margin_px,
-                blk["y"] + margin_px,
-                category,
-                ha="left",
-                va="bottom",
-                fontsize=fontsize_letter,
-                fontweight="bold",
-                color="black",
-                bbox=dict(boxstyle="round,pad=0.1", facecolor="white", alpha=0.9),
-            )
-
-            fontsize_number = min(8, max(5, blk["width"] / 200))
-            ax.text(
-                blk["x"] + blk["width"] - margin_px,
-                blk["y"] + blk["height"] - margin_px,
-                str(number),
-                ha="right",
-                va="top",
-                fontsize=fontsize_number,
-                fontweight="bold",
-                color="red",
-                bbox=dict(boxstyle="round,pad=0.1", facecolor="white", alpha=0.9),
-            )
-
-        for i, cust in enumerate(customs):
-            try:
-                poly = shape(cust["geometry"])
-            except Exception:
-                continue
-
-            patch = patches.Polygon(
-                list(poly.exterior.coords),
-                facecolor="lightgreen",
-                edgecolor="green",
-                linewidth=0.8,
-                hatch="//",
-                alpha=0.7,
-            )
-            ax.add_patch(patch)
-
-            label_info = detailed_custom.get(i)
-            if not label_info:
-                continue
-
-            margin_px = 3
-            category = label_info["display"]["bottom_left"]
-            number = label_info["display"]["top_right"]
-
-            fontsize_letter = min(8, max(5, cust["width"] / 150))
-            ax.text(
-                cust["x"] + margin_px,
-                cust["y"] + margin_px,
-                category,
-                ha="left",
-                va="bottom",
-                fontsize=fontsize_letter,
-                fontweight="bold",
-                color="darkgreen",
-                bbox=dict(boxstyle="round,pad=0.1", facecolor="white", alpha=0.9),
-            )
-
-            fontsize_number = min(6, max(4, cust["width"] / 200))
-            ax.text(
-                cust["x"] + cust["width"] - margin_px,
-                cust["y"] + cust["height"] - margin_px,
-                str(number),
-                ha="right",
-                va="top",
-                fontsize=fontsize_number,
-                fontweight="bold",
-                color="red",
-                bbox=dict(boxstyle="round,pad=0.1", facecolor="white", alpha=0.9),
-            )
-
-        if apertures:
-            for ap in apertures:
-                x, y = ap.exterior.xy
-                ax.plot(x, y, color="red", linestyle="--", linewidth=2)
-                ax.fill(x, y, color="red", alpha=0.15)
-
-        ax.set_title("Schema Costruttivo Parete", fontsize=12, fontweight="bold", pad=10)
-        ax.legend(loc="upper right", fontsize=8)
-        ax.grid(True, alpha=0.3)
-        ax.set_xlabel("mm", fontsize=8)
-        ax.set_ylabel("mm", fontsize=8)
-
-        img_buffer = io.BytesIO()
-        fig.savefig(
-            img_buffer,
-            format="png",
-            dpi=200,
-            bbox_inches="tight",
-            facecolor="white",
-            edgecolor="none",
-        )
-        img_buffer.seek(0)
-        plt.close(fig)
-
-        return Image(img_buffer, width=170 * mm, height=110 * mm)
+        graph = _schema_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+        return wall_schema_drawing(graph, 170, 110, SCHEMA_COMPACT)
     except Exception as exc:  # pragma: no cover - solo logging
         print(f"[WARN] Errore generazione schema PDF: {exc}")
         return None
 
-
 def _build_standard_blocks_table(
     summary: Dict[str, int],
     placed: List[Dict],
     styles,
     block_config: Optional[Dict] = None,
+    labels: Optional[BlockLabels] = None,
 ) -> Table:
     data = [["CATEGORIA", "QUANTITA'", "DIMENSIONI (mm)", "AREA TOT (m^2)"]]
 
-    if block_config and block_config.get("size_to_letter"):
-        grouped_blocks = group_blocks_by_category(placed, block_config.get("size_to_letter"))
-    else:
-        grouped_blocks = group_blocks_by_category(placed)
+    grouped_blocks = _standard_groups(placed, block_config, labels)
 
     total_area = 0.0
     total_count = 0
@@ -397,10 +295,10 @@ def _build_standard_blocks_table(
     return table
 
 
-def _build_custom_blocks_table(customs: List[Dict], styles) -> Table:
+def _build_custom_blocks_table(customs: List[Dict], styles, labels: Optional[BlockLabels] = None) -> Table:
     data = [["CATEGORIA CUSTOM", "QUANTITA'", "DIMENSIONI (mm)", "AREA TOT (m^2)"]]
 
-    grouped_customs = group_custom_blocks_by_category(customs)
+    grouped_customs = _custom_groups(customs, labels)
 
     total_area = 0.0
     total_count = 0
@@ -503,6 +401,7 @@ def export_to_pdf_professional(
     block_config: Optional[Dict] = None,
     author: str = "N. Bovo",
     revision: str = "Rev 1.0",
+    scene_graph: Optional[SceneGraph] = None,
 ) -> str:
     """
     Genera DISTINTA BASE PROFESSIONALE in formato A4 ORIZZONTALE (297×210 mm).
@@ -525,6 +424,7 @@ def export_to_pdf_professional(
         block_config: Configurazione blocchi
         author: Nome autore/redattore
         revision: Versione documento
+        scene_graph: Grafo di scena della sessione (etichette e geometrie già risolte)
         
     Returns:
         Path del PDF generato
@@ -550,6 +450,9 @@ def export_to_pdf_professional(
     # Story elements
     story: List = []
     styles = getSampleStyleSheet()
+    # Schema e tabelle con le stesse etichette (una sola etichettatura per report)
+    scene_graph = _report_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+    labels = scene_graph.labels if scene_graph is not None else None
     
     # === HEADER PROFESSIONALE ===
     story.extend(_build_professional_header(
@@ -574,7 +477,8 @@ def export_to_pdf_professional(
         apertures, 
         block_config,
         width_mm=130,
-        height_mm=140
+        height_mm=140,
+        scene_graph=scene_graph
     )
     
     # COLONNA DESTRA: Riepilogo + Grafico + Tabelle
@@ -592,11 +496,13 @@ def export_to_pdf_professional(
     
     # Tabelle blocchi raggruppati
     if summary:
-        right_column_elements.append(_build_compact_standard_table(summary, placed, styles, block_config))
+        right_column_elements.append(
+            _build_compact_standard_table(summary, placed, styles, block_config, labels)
+        )
         right_column_elements.append(Spacer(1, 2 * mm))
     
     if customs:
-        right_column_elements.append(_build_compact_custom_table(customs, styles))
+        right_column_elements.append(_build_compact_custom_table(customs, styles, labels))
         right_column_elements.append(Spacer(1, 2 * mm))
     
     # Parametri tecnici compatti
@@ -724,139 +630,16 @@ def _generate_professional_wall_schema(
     block_config: Optional[Dict],
     width_mm: int = 130,
     height_mm: int = 140,
+    scene_graph: Optional[SceneGraph] = None,
 ):
-    """Genera schema costruttivo parete ad alta qualità per layout professionale."""
-    if not MATPLOTLIB_AVAILABLE:
-        return None
-    
+    """Genera schema costruttivo parete vettoriale per layout professionale."""
     try:
-        # DPI alto per stampa professionale
-        fig, ax = plt.subplots(figsize=(width_mm / 25.4, height_mm / 25.4), dpi=300)
-        ax.set_aspect("equal")
-        
-        minx, miny, maxx, maxy = wall_polygon.bounds
-        margin = max((maxx - minx), (maxy - miny)) * 0.03
-        ax.set_xlim(minx - margin, maxx + margin)
-        ax.set_ylim(miny - margin, maxy + margin)
-        
-        # Contorno parete (blu TAKTAK®)
-        x, y = wall_polygon.exterior.xy
-        ax.plot(x, y, color='#1B3B6F', linewidth=2.5, label="Parete")
-        
-        # Etichette blocchi
-        if block_config and block_config.get("size_to_letter"):
-            detailed_std, detailed_custom = create_detailed_block_labels(
-                placed, customs, block_config.get("size_to_letter")
-            )
-        else:
-            detailed_std, detailed_custom = create_detailed_block_labels(placed, customs)
-        
-        # Blocchi standard (grigio)
-        for i, blk in enumerate(placed):
-            rect = patches.Rectangle(
-                (blk["x"], blk["y"]),
-                blk["width"],
-                blk["height"],
-                facecolor="#E5E5E5",
-                edgecolor="black",
-                linewidth=0.4,
-            )
-            ax.add_patch(rect)
-            
-            # Etichetta numerazione operatori
-            label_info = detailed_std.get(i)
-            if label_info:
-                category = label_info["display"]["bottom_left"]
-                number = label_info["display"]["top_right"]
-                full_label = f"{category}{number}"
-                
-                # Posizione alto-destra per operatori cantiere
-                fontsize = min(7, max(4, blk["width"] / 200))
-                ax.text(
-                    blk["x"] + blk["width"] - 5,
-                    blk["y"] + blk["height"] - 5,
-                    full_label,
-                    ha="right",
-                    va="top",
-                    fontsize=fontsize,
-                    fontweight="bold",
-                    color="red",
-                    bbox=dict(boxstyle="round,pad=0.2", facecolor="white", alpha=0.95, edgecolor="red", linewidth=0.5),
-                )
-        
-        # Pezzi custom (verde con hatch)
-        for i, cust in enumerate(customs):
-            try:
-                poly = shape(cust["geometry"])
-                patch = patches.Polygon(
-                    list(poly.exterior.coords),
-                    facecolor="#90EE90",
-                    edgecolor="#228B22",
-                    linewidth=0.6,
-                    hatch="//",
-                    alpha=0.6,
-                )
-                ax.add_patch(patch)
-                
-                # Etichetta custom
-                label_info = detailed_custom.get(i)
-                if label_info:
-                    category = label_info["display"]["bottom_left"]
-                    number = label_info["display"]["top_right"]
-                    full_label = f"{category}{number}"
-                    
-                    fontsize = min(6, max(4, cust["width"] / 200))
-                    ax.text(
-                        cust["x"] + cust["width"] - 5,
-                        cust["y"] + cust["height"] - 5,
-                        full_label,
-                        ha="right",
-                        va="top",
-                        fontsize=fontsize,
-                        fontweight="bold",
-                        color="#228B22",
-                        bbox=dict(boxstyle="round,pad=0.2", facecolor="white", alpha=0.95, edgecolor="#228B22", linewidth=0.5),
-                    )
-            except Exception:
-                continue
-        
-        # Aperture (rosso tratteggiato)
-        if apertures:
-            for ap in apertures:
-                x, y = ap.exterior.xy
-                ax.plot(x, y, color="red", linestyle="--", linewidth=1.5)
-                ax.fill(x, y, color="red", alpha=0.1)
-        
-        # Titolo e assi
-        ax.set_title("Schema Costruttivo Parete - Vista Frontale", fontsize=10, fontweight="bold", pad=8, color='#1B3B6F')
-        ax.grid(True, alpha=0.2, linestyle=":", linewidth=0.5)
-        ax.set_xlabel("mm", fontsize=7)
-        ax.set_ylabel("mm", fontsize=7)
-        ax.tick_params(labelsize=6)
-        
-        # Legenda compatta
-        ax.legend(loc="upper right", fontsize=6, framealpha=0.9)
-        
-        # Salva in buffer
-        img_buffer = io.BytesIO()
-        fig.savefig(
-            img_buffer,
-            format="png",
-            dpi=300,
-            bbox_inches="tight",
-            facecolor="white",
-            edgecolor="none",
-        )
-        img_buffer.seek(0)
-        plt.close(fig)
-        
-        return Image(img_buffer, width=width_mm * mm, height=height_mm * mm)
-        
+        graph = _schema_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+        return wall_schema_drawing(graph, width_mm, height_mm, SCHEMA_PROFESSIONAL)
     except Exception as exc:
         print(f"⚠️ [WARN] Errore schema professionale: {exc}")
         return None
 
-
 def _build_compact_summary(summary: Dict[str, int], customs: List[Dict], wall_polygon: Polygon, styles) -> Table:
     """Tabella riepilogo compatta per layout professionale."""
     total_standard = sum(summary.values())
@@ -896,47 +679,23 @@ def _build_compact_summary(summary: Dict[str, int], customs: List[Dict], wall_po
 
 def _generate_efficiency_pie_chart(summary: Dict[str, int], customs: List[Dict]):
     """Genera grafico torta Standard vs Custom."""
-    if not MATPLOTLIB_AVAILABLE:
-        return None
-    
     try:
         total_standard = sum(summary.values())
         total_custom = len(customs)
-        
-        if total_standard + total_custom == 0:
-            return None
-        
-        fig, ax = plt.subplots(figsize=(50 / 25.4, 50 / 25.4), dpi=200)
-        
-        sizes = [total_standard, total_custom]
-        labels = [f'Standard\n{total_standard}', f'Custom\n{total_custom}']
-        colors_pie = ['#4A90E2', '#50C878']
-        explode = (0.05, 0)
-        
-        ax.pie(
-            sizes,
-            explode=explode,
-            labels=labels,
-            autopct='%1.0f%%',
-            colors=colors_pie,
-            startangle=90,
-            textprops={'fontsize': 8, 'fontweight': 'bold'}
+        return pie_chart_drawing(
+            [total_standard, total_custom],
+            [f"Standard\n{total_standard}", f"Custom\n{total_custom}"],
+            PIE_COLORS,
+            size_mm=50,
+            title="Standard vs Custom",
+            title_size=9,
+            label_size=8,
+            explode=(0.05, 0),
         )
-        
-        ax.set_title("Standard vs Custom", fontsize=9, fontweight="bold", pad=5)
-        
-        img_buffer = io.BytesIO()
-        fig.savefig(img_buffer, format="png", dpi=200, bbox_inches="tight", facecolor="white")
-        img_buffer.seek(0)
-        plt.close(fig)
-        
-        return Image(img_buffer, width=50 * mm, height=50 * mm)
-        
     except Exception as exc:
         print(f"⚠️ [WARN] Errore grafico torta: {exc}")
         return None
 
-
 def _build_compact_standard_table(summary: Dict[str, int], placed: List[Dict], styles, block_config: Optional[Dict]) -> Table:
     """Tabella blocchi standard compatta."""
     data = [["BLOCCHI STANDARD", "Q.tà", "Dimensioni"]]
@@ -1085,9 +844,11 @@ def export_to_pdf_professional_multipage(
     block_config: Optional[Dict] = None,
     author: str = "N. Bovo",
     revision: str = "Rev 1.0",
+    local_frame: Optional[LocalFrame] = None,
+    scene_graph: Optional[SceneGraph] = None,
 ) -> str:
     """
-    Genera DISTINTA BASE PROFESSIONALE MULTIPAGINA (4 pagine A4 orizzontali).
+    Genera DISTINTA BASE PROFESSIONALE MULTIPAGINA (A4 orizzontale, pagine calcolate dal contenuto).
     
     PAGINA 1: Sintesi e Riepilogo Tecnico
     - Header con logo TAKTAK®
@@ -1100,13 +861,10 @@ def export_to_pdf_professional_multipage(
     - Legenda blocchi sotto lo schema
     - Titolo e assi millimetrici
     
-    PAGINA 3: Blocchi Standard Dettagliati
-    - Tabella completa con: Categoria, Nome, Q.tà, Dimensioni, Numerazione (A1, A2...)
-    - Aree totali per categoria
-    
-    PAGINA 4: Blocchi Custom Dettagliati
-    - Tabella completa con: Categoria, Nome, Q.tà, Dimensioni, Numerazione (D1, D2...), Note
-    - Aree totali e riepilogo finale
+    PAGINA 3+: Distinta Completa (continua sulle pagine necessarie)
+    - Blocchi standard: Categoria, Nome, Q.tà, Dimensioni, Numerazione (A1, A2...)
+    - Blocchi custom: Categoria, Nome, Q.tà, Dimensioni, Numerazione (D1, D2...), Note
+    - Riepilogo finale
     
     Args:
         summary: Riassunto blocchi standard
@@ -1120,6 +878,8 @@ def export_to_pdf_professional_multipage(
         block_config: Configurazione blocchi
         author: Nome autore/redattore
         revision: Versione documento
+        local_frame: Origine locale della sessione (assi dello schema in coordinate disegno)
+        scene_graph: Grafo di scena della sessione (etichette e geometrie già risolte)
         
     Returns:
         Path del PDF generato
@@ -1141,6 +901,9 @@ def export_to_pdf_professional_multipage(
     
     story: List = []
     styles = getSampleStyleSheet()
+    # Schema e tabelle con le stesse etichette (una sola etichettatura per report)
+    scene_graph = _report_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+    labels = scene_graph.labels if scene_graph is not None else None
     
     # Calcola dimensioni parete per header
     minx, miny, maxx, maxy = wall_polygon.bounds
@@ -1151,6 +914,7 @@ def export_to_pdf_professional_multipage(
     # PAGINA 1: SINTESI E RIEPILOGO TECNICO (invariata)
     # ========================================================================
     
+    story.append(_ReportSection("Sintesi e Riepilogo Tecnico"))
     story.extend(_build_page1_header(
         project_name, wall_width_m, wall_height_m, author, revision, styles
     ))
@@ -1160,16 +924,35 @@ def export_to_pdf_professional_multipage(
     left_col_p1 = []
     right_col_p1 = []
     
+    # Parti indipendenti delle pagine, unite nell'ordine della distinta
+    (
+        summary_table,
+        pie_chart,
+        technical_params,
+        schema_fullpage,
+        standard_table,
+        custom_table,
+        final_summary,
+    ) = _build_parts_sequential([
+        (_build_full_summary_table, (summary, customs, wall_polygon, styles)),
+        (_generate_efficiency_pie_chart_large, (summary, customs)),
+        (_build_full_technical_params, (params, block_config, styles)),
+        (_generate_wall_schema_fullpage, (wall_polygon, placed, customs, apertures, block_config,
+                                          260, 120, local_frame, scene_graph)),
+        (_build_compact_standard_table, (summary, placed, styles, block_config, labels)),
+        (_build_compact_custom_table, (customs, styles, labels)),
+        (_build_final_summary_compact, (summary, customs, wall_polygon, styles)),
+    ])
+
     # Colonna sinistra: Riepilogo + Grafico torta
-    left_col_p1.append(_build_full_summary_table(summary, customs, wall_polygon, styles))
+    left_col_p1.append(summary_table)
     left_col_p1.append(Spacer(1, 5 * mm))
     
-    pie_chart = _generate_efficiency_pie_chart_large(summary, customs)
     if pie_chart:
         left_col_p1.append(pie_chart)
     
     # Colonna destra: Parametri tecnici dettagliati
-    right_col_p1.append(_build_full_technical_params(params, block_config, styles))
+    right_col_p1.append(technical_params)
     
     # Combina colonne
     page1_table = Table(
@@ -1191,24 +974,15 @@ def export_to_pdf_professional_multipage(
     # ========================================================================
     
     # Costruiamo gli elementi della pagina 2 in una lista separata
-    page2_elements = []
+    page2_elements = [_ReportSection("Schema Costruttivo Full-Page con Numerazione")]
     page2_elements.extend(_build_page2_header_fullpage(project_name, wall_width_m, wall_height_m, styles))
     page2_elements.append(Spacer(1, 2 * mm))  # Ridotto da 3mm a 2mm
     
-    # Schema MOLTO GRANDE full-page - MASSIMA DIMENSIONE POSSIBILE
-    print(f"🎨 [DEBUG] Generazione schema pagina 2: matplotlib={'DISPONIBILE' if MATPLOTLIB_AVAILABLE else 'NON DISPONIBILE'}")
-    print(f"🎨 [DEBUG] Parametri: wall_polygon={wall_polygon is not None}, placed={len(placed) if placed else 0}, customs={len(customs) if customs else 0}")
-    
-    schema_fullpage = _generate_wall_schema_fullpage(
-        wall_polygon, placed, customs, apertures, block_config,
-        width_mm=260,  # MASSIMA larghezza per A4 landscape
-        height_mm=120   # RIDOTTO da 135 a 120 per sicurezza
-    )
-    
+    # Schema MOLTO GRANDE full-page (260x120 mm, costruito con le altre parti)
     print(f"🎨 [DEBUG] Schema generato: {schema_fullpage is not None}")
     
     if schema_fullpage:
-        # Immagine centrata senza troppo spazio
+        # Schema centrato senza troppo spazio
         page2_elements.append(schema_fullpage)
         page2_elements.append(Spacer(1, 2 * mm))  # Ridotto da 3mm a 2mm
         
@@ -1221,7 +995,7 @@ def export_to_pdf_professional_multipage(
         page2_elements.append(Spacer(1, 30 * mm))
         page2_elements.append(Paragraph("<b>⚠️ Schema costruttivo non disponibile</b>", error_style))
         page2_elements.append(Spacer(1, 5 * mm))
-        page2_elements.append(Paragraph("Matplotlib non disponibile o errore nella generazione dell'immagine", error_style))
+        page2_elements.append(Paragraph("Errore nella generazione dello schema vettoriale", error_style))
     
     # Aggiungiamo TUTTO in un KeepTogether per forzare header + schema sulla stessa pagina
     # MA NON funziona per immagini grandi, quindi aggiungiamo direttamente alla story
@@ -1234,38 +1008,25 @@ def export_to_pdf_professional_multipage(
     # PAGINA 3: BLOCCHI STANDARD + CUSTOM + RIEPILOGO FINALE (TUTTO IN UNA PAGINA)
     # ========================================================================
     
+    story.append(_ReportSection("Distinta Completa - Blocchi Standard e Custom"))
     story.extend(_build_page3_combined_header(project_name, styles))
     story.append(Spacer(1, 3 * mm))  # Ridotto da 5mm a 3mm
     
     # BLOCCHI STANDARD con numerazione (tabella compatta)
-    story.append(_build_compact_standard_table(summary, placed, styles, block_config))
+    story.append(standard_table)
     story.append(Spacer(1, 3 * mm))  # Ridotto da 4mm a 3mm
     
-    # BLOCCHI CUSTOM con numerazione (tabella compatta)
-    story.append(_build_compact_custom_table(customs, styles))
+    # BLOCCHI CUSTOM con numerazione (tabella compatta, può continuare su più pagine)
+    story.append(custom_table)
     story.append(Spacer(1, 3 * mm))  # Ridotto da 4mm a 3mm
     
     # RIEPILOGO FINALE (barra visiva compatta)
-    story.append(_build_final_summary_compact(summary, customs, wall_polygon, styles))
+    story.append(final_summary)
     
-    # Build con footer dinamico - total_pages viene calcolato DOPO il build
-    # ma dobbiamo stimarlo: con il contenuto attuale sono 4 pagine
-    total_pages = 4  # Aggiornato da 3 a 4 perché pagina 3 si estende su 2 pagine
-    
-    # Classe counter per tracciare le pagine correttamente
-    class PageCounter:
-        def __init__(self):
-            self.count = 0
-    
-    page_counter = PageCounter()
-    
-    def on_page(canvas, doc):
-        page_counter.count += 1
-        _draw_multipage_footer(
-            canvas, doc, project_name, out_path, page_counter.count, total_pages
-        )
-    
-    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    # Footer disegnati a fine build, quando il numero totale di pagine è noto
+    canvasmaker = _numbered_canvas(project_name, out_path)
+    doc.build(story, canvasmaker=canvasmaker)
+    total_pages = canvasmaker.total_pages
     
     print(f"✅ [PDF] Distinta Base Multipagina ({total_pages} pagine) generata: {organized_path}")
     return organized_path
@@ -1362,47 +1123,26 @@ def _build_full_summary_table(summary: Dict[str, int], customs: List[Dict], wall
 
 def _generate_efficiency_pie_chart_large(summary: Dict[str, int], customs: List[Dict]):
     """Grafico torta più grande per pagina 1."""
-    if not MATPLOTLIB_AVAILABLE:
-        return None
-    
     try:
         total_standard = sum(summary.values())
         total_custom = len(customs)
-        
-        if total_standard + total_custom == 0:
-            return None
-        
-        fig, ax = plt.subplots(figsize=(80 / 25.4, 80 / 25.4), dpi=200)
-        
-        sizes = [total_standard, total_custom]
-        labels = [f'Standard\n{total_standard} pz', f'Custom\n{total_custom} pz']
-        colors_pie = ['#4A90E2', '#50C878']
-        explode = (0.05, 0)
-        
-        wedges, texts, autotexts = ax.pie(
-            sizes, explode=explode, labels=labels, autopct='%1.1f%%',
-            colors=colors_pie, startangle=90,
-            textprops={'fontsize': 10, 'fontweight': 'bold'}
+        return pie_chart_drawing(
+            [total_standard, total_custom],
+            [f"Standard\n{total_standard} pz", f"Custom\n{total_custom} pz"],
+            PIE_COLORS,
+            size_mm=80,
+            title="Standard vs Custom",
+            title_size=12,
+            label_size=10,
+            pct_decimals=1,
+            pct_color="#FFFFFF",
+            pct_size=11,
+            explode=(0.05, 0),
         )
-        
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(11)
-        
-        ax.set_title("Standard vs Custom", fontsize=12, fontweight="bold", pad=10)
-        
-        img_buffer = io.BytesIO()
-        fig.savefig(img_buffer, format="png", dpi=200, bbox_inches="tight", facecolor="white")
-        img_buffer.seek(0)
-        plt.close(fig)
-        
-        return Image(img_buffer, width=80 * mm, height=80 * mm)
-        
     except Exception as exc:
         print(f"⚠️ [WARN] Errore grafico torta: {exc}")
         return None
 
-
 def _build_full_technical_params(params: Optional[Dict], block_config: Optional[Dict], styles) -> Table:
     """Tabella parametri tecnici completa per pagina 1."""
     data = [["PARAMETRI TECNICI", "VALORE"]]
@@ -1570,146 +1310,22 @@ def _build_page2_header_fullpage(project_name: str, wall_w: float, wall_h: float
     return elements
 
 
-def _generate_wall_schema_fullpage(wall_polygon, placed, customs, apertures, block_config, width_mm=260, height_mm=155):
-    """Schema parete FULL-PAGE massima larghezza per pagina 2."""
-    if not MATPLOTLIB_AVAILABLE:
-        print("❌ Matplotlib non disponibile - schema non può essere generato")
-        return None
-    
+def _generate_wall_schema_fullpage(wall_polygon, placed, customs, apertures, block_config, width_mm=260, height_mm=155,
+                                   local_frame: Optional[LocalFrame] = None,
+                                   scene_graph: Optional[SceneGraph] = None):
+    """
+    Schema costruttivo FULL-PAGE vettoriale: numerazione operatori come testo
+    selezionabile, nitido a qualsiasi zoom.
+    """
     try:
-        # DPI altissimo per stampa professionale
-        fig, ax = plt.subplots(figsize=(width_mm / 25.4, height_mm / 25.4), dpi=300)
-        ax.set_aspect("equal")
-        
-        minx, miny, maxx, maxy = wall_polygon.bounds
-        margin = max((maxx - minx), (maxy - miny)) * 0.02
-        ax.set_xlim(minx - margin, maxx + margin)
-        ax.set_ylim(miny - margin, maxy + margin)
-        
-        # Contorno parete (blu TAKTAK®)
-        x, y = wall_polygon.exterior.xy
-        ax.plot(x, y, color='#1B3B6F', linewidth=3, label="Contorno Parete", zorder=10)
-        
-        # Etichette blocchi
-        if block_config and block_config.get("size_to_letter"):
-            detailed_std, detailed_custom = create_detailed_block_labels(
-                placed, customs, block_config.get("size_to_letter")
-            )
-        else:
-            detailed_std, detailed_custom = create_detailed_block_labels(placed, customs)
-        
-        # Blocchi standard (grigio)
-        for i, blk in enumerate(placed):
-            rect = patches.Rectangle(
-                (blk["x"], blk["y"]),
-                blk["width"],
-                blk["height"],
-                facecolor="#E5E5E5",
-                edgecolor="black",
-                linewidth=0.5,
-                zorder=5
-            )
-            ax.add_patch(rect)
-            
-            # Etichetta numerazione GRANDE per operatori
-            label_info = detailed_std.get(i)
-            if label_info:
-                category = label_info["display"]["bottom_left"]
-                number = label_info["display"]["top_right"]
-                full_label = f"{category}{number}"
-                
-                # Posizione alto-destra
-                fontsize = min(9, max(5, blk["width"] / 180))
-                ax.text(
-                    blk["x"] + blk["width"] - 8,
-                    blk["y"] + blk["height"] - 8,
-                    full_label,
-                    ha="right",
-                    va="top",
-                    fontsize=fontsize,
-                    fontweight="bold",
-                    color="red",
-                    bbox=dict(boxstyle="round,pad=0.25", facecolor="white", alpha=0.98, edgecolor="red", linewidth=0.8),
-                    zorder=15
-                )
-        
-        # Pezzi custom (verde con hatch)
-        for i, cust in enumerate(customs):
-            try:
-                poly = shape(cust["geometry"])
-                patch = patches.Polygon(
-                    list(poly.exterior.coords),
-                    facecolor="#90EE90",
-                    edgecolor="#228B22",
-                    linewidth=0.8,
-                    hatch="///",
-                    alpha=0.65,
-                    zorder=5
-                )
-                ax.add_patch(patch)
-                
-                # Etichetta custom GRANDE
-                label_info = detailed_custom.get(i)
-                if label_info:
-                    category = label_info["display"]["bottom_left"]
-                    number = label_info["display"]["top_right"]
-                    full_label = f"{category}{number}"
-                    
-                    fontsize = min(8, max(5, cust["width"] / 180))
-                    ax.text(
-                        cust["x"] + cust["width"] - 8,
-                        cust["y"] + cust["height"] - 8,
-                        full_label,
-                        ha="right",
-                        va="top",
-                        fontsize=fontsize,
-                        fontweight="bold",
-                        color="#228B22",
-                        bbox=dict(boxstyle="round,pad=0.25", facecolor="white", alpha=0.98, edgecolor="#228B22", linewidth=0.8),
-                        zorder=15
-                    )
-            except Exception:
-                continue
-        
-        # Aperture (rosso tratteggiato)
-        if apertures:
-            for ap in apertures:
-                x, y = ap.exterior.xy
-                ax.plot(x, y, color="red", linestyle="--", linewidth=2, label="Aperture", zorder=8)
-                ax.fill(x, y, color="red", alpha=0.12, zorder=3)
-        
-        # Titolo e assi
-        ax.set_title("Schema Costruttivo con Numerazione Operatori", fontsize=12, fontweight="bold", pad=12, color='#1B3B6F')
-        ax.grid(True, alpha=0.25, linestyle=":", linewidth=0.5, zorder=1)
-        ax.set_xlabel("Larghezza (mm)", fontsize=9, fontweight="bold")
-        ax.set_ylabel("Altezza (mm)", fontsize=9, fontweight="bold")
-        ax.tick_params(labelsize=7)
-        
-        # Legenda
-        handles, labels = ax.get_legend_handles_labels()
-        by_label = dict(zip(labels, handles))
-        ax.legend(by_label.values(), by_label.keys(), loc="upper right", fontsize=7, framealpha=0.95)
-        
-        # Salva in buffer
-        img_buffer = io.BytesIO()
-        fig.savefig(
-            img_buffer,
-            format="png",
-            dpi=300,
-            bbox_inches="tight",
-            facecolor="white",
-            edgecolor="none",
-        )
-        img_buffer.seek(0)
-        plt.close(fig)
-        
-        return Image(img_buffer, width=width_mm * mm, height=height_mm * mm)
-        
+        graph = _schema_graph(wall_polygon, placed, customs, apertures, block_config, scene_graph)
+        # Assi in coordinate del disegno originale (geometria disegnata in locale)
+        frame = local_frame if local_frame is not None and not local_frame.is_identity else None
+        return wall_schema_drawing(graph, width_mm, height_mm, SCHEMA_FULLPAGE, local_frame=frame)
     except Exception as exc:
         print(f"⚠️ Errore generazione schema: {exc}")
         return None
 
-
 def _build_full_legend_table(block_config, customs, placed, styles) -> Table:
     """Tabella legenda COMPLETA per pagina 2 sotto lo schema."""
     data = [["CATEGORIA", "DESCRIZIONE", "DIMENSIONI (mm)", "ESEMPIO NUMERAZIONE"]]
@@ -1790,12 +1406,9 @@ def _build_standard_table_with_numbering(summary, placed, styles, block_config)
     """Tabella COMPLETA blocchi standard con numerazione A1, A2, A3..."""
     data = [["CATEGORIA", "NOME BLOCCO", "Q.TÀ", "DIMENSIONI (mm)", "NUMERAZIONE"]]
     
-    # Ottieni etichette dettagliate
     if block_config and block_config.get("size_to_letter"):
-        detailed_std, _ = create_detailed_block_labels(placed, [], block_config.get("size_to_letter"))
         grouped = group_blocks_by_category(placed, block_config.get("size_to_letter"))
     else:
-        detailed_std, _ = create_detailed_block_labels(placed, [])
         grouped = group_blocks_by_category(placed)
     
     total_count = 0
@@ -1884,8 +1497,6 @@ def _build_custom_table_with_numbering(customs, styles) -> Table:
     """Tabella COMPLETA blocchi custom con numerazione D1, D2, D3..."""
     data = [["CATEGORIA", "NOME PEZZO", "Q.TÀ", "DIMENSIONI (mm)", "NUMERAZIONE", "NOTE"]]
     
-    # Ottieni etichette dettagliate
-    _, detailed_custom = create_detailed_block_labels([], customs)
     grouped = group_custom_blocks_by_category(customs)
     
     total_count = 0
@@ -1980,16 +1591,13 @@ def _build_page3_combined_header(project_name: str, styles) -> List:
     return elements
 
 
-def _build_compact_standard_table(summary, placed, styles, block_config) -> Table:
+def _build_compact_standard_table(summary, placed, styles, block_config, labels: Optional[BlockLabels] = None) -> Table:
     """Tabella COMPATTA blocchi standard con numerazione (per pagina 3)."""
     data = [["BLOCCHI STANDARD", "", "", "", ""]]
     data.append(["CATEGORIA", "DIMENSIONI", "Q.TÀ", "AREA m²", "NUMERAZIONE"])
     
     # Ottieni etichette dettagliate
-    if block_config and block_config.get("size_to_letter"):
-        grouped = group_blocks_by_category(placed, block_config.get("size_to_letter"))
-    else:
-        grouped = group_blocks_by_category(placed)
+    grouped = _standard_groups(placed, block_config, labels)
     
     total_count = 0
     total_area = 0.0
@@ -2057,7 +1665,7 @@ def _build_compact_standard_table(summary, placed, styles, block_config) -> Tabl
     return table
 
 
-def _build_compact_custom_table(customs, styles) -> Table:
+def _build_compact_custom_table(customs, styles, labels: Optional[BlockLabels] = None) -> Table:
     """Tabella COMPATTA blocchi custom con numerazione (per pagina 3)."""
     data = [["PEZZI CUSTOM", "", "", "", ""]]
     data.append(["CATEGORIA", "DIMENSIONI", "Q.TÀ", "AREA m²", "NUMERAZIONE"])
@@ -2065,7 +1673,7 @@ def _build_compact_custom_table(customs, styles) -> Table:
     if not customs:
         data.append(["—", "Nessun pezzo custom", "0", "0.00", "—"])
     else:
-        grouped = group_custom_blocks_by_category(customs)
+        grouped = _custom_groups(customs, labels)
         
         total_count = 0
         total_area = 0.0
@@ -2144,18 +1752,14 @@ def _build_final_summary_compact(summary, customs, wall_polygon, styles) -> Tabl
     from shapely.geometry import box
     wall_area = wall_polygon.area / 1_000_000  # m²
     
-    # Area blocchi standard
+    # Area blocchi standard (dimensioni dal registro tipi)
+    from utils.block_types import get_block_type_registry
+    registry = get_block_type_registry()
     std_area = 0.0
     for key, count in summary.items():
-        if 'x' in key.lower():
-            parts = key.lower().split('x')
-            if len(parts) >= 2:
-                try:
-                    w = float(parts[0].replace('std_', '').replace('_', ''))
-                    h = float(parts[1])
-                    std_area += (w * h * count) / 1_000_000
-                except:
-                    pass
+        type_id = registry.resolve(key)
+        if type_id is not None:
+            std_area += registry[type_id].area_m2 * count
     
     # Area custom
     custom_area = 0.0
@@ -2418,8 +2022,9 @@ def _build_final_summary_bar(summary, customs, styles) -> Table:
     return table
 
 
-def _draw_multipage_footer(canvas_obj, doc, project_name: str, filename: str, page_num: int, total_pages: int):
-    """Footer con paginazione multipagina (1/4, 2/4, 3/4, 4/4)."""
+def _draw_multipage_footer(canvas_obj, doc, project_name: str, filename: str, page_num: int, total_pages: int,
+                           page_title: str = "Distinta Base"):
+    """Footer con paginazione multipagina (Pag. X/N) e titolo della sezione."""
     canvas_obj.saveState()
     
     page_width, page_height = landscape(A4)
@@ -2433,15 +2038,6 @@ def _draw_multipage_footer(canvas_obj, doc, project_name: str, filename: str, pa
     canvas_obj.setFont('Helvetica', 7)
     canvas_obj.setFillColor(colors.grey)
     
-    # Titolo pagina specifico per 4 pagine
-    page_titles = {
-        1: "Sintesi e Riepilogo Tecnico",
-        2: "Schema Costruttivo Full-Page con Numerazione",
-        3: "Distinta Completa - Blocchi Standard e Custom (1/2)",
-        4: "Distinta Completa - Blocchi Standard e Custom (2/2)"
-    }
-    page_title = page_titles.get(page_num, "Distinta Base")
-    
     # Sinistra: progetto e titolo pagina
     footer_left = f"Distinta Base – {project_name} | {page_title}"
     canvas_obj.drawString(15 * mm, 11 * mm, footer_left)
@@ -2458,3 +2054,65 @@ def _draw_multipage_footer(canvas_obj, doc, project_name: str, filename: str, pa
     canvas_obj.restoreState()
 
 
+# ============================================================================
+# ASSEMBLAGGIO MULTIPAGINA: PARTI DELLE PAGINE E PAGINAZIONE DAL CONTENUTO
+# ============================================================================
+
+
+def _build_parts_sequential(tasks: Sequence[Tuple[Callable, tuple]]) -> List:
+    """Costruisce le parti indipendenti delle pagine, restituite nell'ordine dei task."""
+    return [fn(*args) for fn, args in tasks]
+
+
+if REPORTLAB_AVAILABLE:
+
+    class _ReportSection(Flowable):
+        """Segnaposto invisibile: da questa pagina inizia una sezione della distinta."""
+
+        def __init__(self, title: str):
+            super().__init__()
+            self.title = title
+
+        def wrap(self, avail_width, avail_height):
+            return 0, 0
+
+        def draw(self):
+            self.canv.report_section = self.title
+
+
+def _numbered_canvas(project_name: str, filename: str):
+    """Canvas che rimanda i footer a fine documento per scrivere "Pag. X/N" esatto.
+
+    Le pagine vengono trattenute in showPage e disegnate in save(), quando il
+    totale è noto; pagine consecutive della stessa sezione ricevono "(k/n)".
+    Dopo il build il totale è disponibile come attributo ``total_pages``.
+    """
+
+    class _NumberedCanvas(canvas.Canvas):
+        total_pages = 0
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.report_section = "Distinta Base"
+            self._page_states: List[Dict] = []
+
+        def showPage(self):
+            self._page_states.append(dict(self.__dict__))
+            self._startPage()
+
+        def save(self):
+            sections = [state["report_section"] for state in self._page_states]
+            total = len(self._page_states)
+            type(self).total_pages = total
+            for page_num, state in enumerate(self._page_states, 1):
+                self.__dict__.update(state)
+                section = sections[page_num - 1]
+                title = section
+                count = sections.count(section)
+                if count > 1:
+                    title = f"{section} ({sections[:page_num].count(section)}/{count})"
+                _draw_multipage_footer(self, None, project_name, filename, page_num, total, title)
+                super().showPage()
+            super().save()
+
+    return _NumberedCanvas
@@ -0,0 +1,404 @@
+"""
+Grafica vettoriale nativa per i report PDF.
+
+Schema costruttivo, grafici a torta e legende vengono disegnati come
+``reportlab.graphics`` Drawing (flowable) invece di PNG matplotlib: il PDF
+resta nitido a qualsiasi zoom, le etichette sono testo selezionabile e non
+serve rasterizzare a 300 dpi.
+
+Lo schema legge solo primitive del grafo di scena (``utils.scene_graph``):
+etichette e geometrie non vengono ricalcolate qui.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import LineString, MultiLineString, Polygon
+
+from utils.coordinate_frame import LocalFrame
+from utils.raster_preview import nice_ticks
+from utils.scene_graph import BlockLabel, SceneGraph
+
+try:
+    from reportlab.graphics.shapes import Drawing, Group, Line, PolyLine, Polygon as RLPolygon, Rect, String, Wedge
+    from reportlab.lib.colors import Color, HexColor, white
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    REPORTLAB_GRAPHICS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    REPORTLAB_GRAPHICS_AVAILABLE = False
+
+
+# Spazi riservati attorno all'area di disegno (punti)
+AXIS_LEFT = 34
+AXIS_BOTTOM = 24
+PLOT_PAD = 6
+
+# Distanza tra le linee del tratteggio dei pezzi custom (punti)
+HATCH_SPACING = 4.0
+
+
+@dataclass(frozen=True)
+class LabelSpec:
+    """Testo etichetta: punti max/min, divisore sulla larghezza blocco (mm) e colore."""
+
+    max_pt: float
+    min_pt: float
+    width_divisor: float
+    color: str
+
+    def size(self, width: float) -> float:
+        return min(self.max_pt, max(self.min_pt, width / self.width_divisor))
+
+
+@dataclass(frozen=True)
+class SchemaStyle:
+    """Aspetto di una variante dello schema costruttivo."""
+
+    title: str
+    title_size: float = 12
+    title_color: str = "#000000"
+    wall_color: str = "#0000FF"
+    wall_width: float = 2
+    wall_legend: str = "Contorno parete"
+    block_fill: str = "#D3D3D3"
+    block_stroke: str = "#000000"
+    block_width: float = 0.5
+    custom_fill: str = "#90EE90"
+    custom_stroke: str = "#008000"
+    custom_width: float = 0.8
+    custom_alpha: float = 0.7
+    aperture_color: str = "#FF0000"
+    aperture_width: float = 2
+    aperture_alpha: float = 0.15
+    aperture_legend: Optional[str] = None
+    # "corners": categoria basso-sinistra + numero alto-destra; "full": A1 in alto a destra
+    label_mode: str = "corners"
+    label_inset: float = 3  # mm mondo
+    std_label: LabelSpec = LabelSpec(8, 5, 200, "#FF0000")
+    std_category: LabelSpec = LabelSpec(10, 6, 150, "#000000")
+    custom_label: LabelSpec = LabelSpec(6, 4, 200, "#FF0000")
+    custom_category: LabelSpec = LabelSpec(8, 5, 150, "#006400")
+    label_border: bool = False
+    grid_alpha: float = 0.3
+    tick_size: float = 6
+    x_label: str = "mm"
+    y_label: str = "mm"
+    axis_label_size: float = 8
+    legend_size: float = 8
+    margin_ratio: float = 0.05
+
+
+# Varianti usate dai report (stessi colori/dimensioni dei vecchi schemi raster)
+SCHEMA_COMPACT = SchemaStyle(title="Schema Costruttivo Parete")
+SCHEMA_PROFESSIONAL = SchemaStyle(
+    title="Schema Costruttivo Parete - Vista Frontale",
+    title_size=10, title_color="#1B3B6F",
+    wall_color="#1B3B6F", wall_width=2.5, wall_legend="Parete",
+    block_fill="#E5E5E5", block_width=0.4,
+    custom_stroke="#228B22", custom_width=0.6, custom_alpha=0.6,
+    aperture_width=1.5, aperture_alpha=0.1,
+    label_mode="full", label_inset=5,
+    std_label=LabelSpec(7, 4, 200, "#FF0000"),
+    custom_label=LabelSpec(6, 4, 200, "#228B22"),
+    label_border=True, grid_alpha=0.2, axis_label_size=7, legend_size=6,
+    margin_ratio=0.03,
+)
+SCHEMA_FULLPAGE = SchemaStyle(
+    title="Schema Costruttivo con Numerazione Operatori",
+    title_size=12, title_color="#1B3B6F",
+    wall_color="#1B3B6F", wall_width=3, wall_legend="Contorno Parete",
+    block_fill="#E5E5E5", block_width=0.5,
+    custom_stroke="#228B22", custom_width=0.8, custom_alpha=0.65,
+    aperture_legend="Aperture",
+    label_mode="full", label_inset=8,
+    std_label=LabelSpec(9, 5, 180, "#FF0000"),
+    custom_label=LabelSpec(8, 5, 180, "#228B22"),
+    label_border=True, grid_alpha=0.25, tick_size=7,
+    x_label="Larghezza (mm)", y_label="Altezza (mm)", axis_label_size=9, legend_size=7,
+    margin_ratio=0.02,
+)
+
+
+@dataclass
+class _Frame:
+    """Trasformazione mondo (mm) → punti del Drawing con scala uniforme."""
+
+    x0: float
+    y0: float
+    scale: float
+    ox: float
+    oy: float
+    plot: Tuple[float, float, float, float] = field(default=(0, 0, 0, 0))
+
+    def xy(self, coords) -> np.ndarray:
+        pts = np.asarray(coords, dtype=float)
+        return np.column_stack(((pts[:, 0] - self.x0) * self.scale + self.ox,
+                                (pts[:, 1] - self.y0) * self.scale + self.oy))
+
+    def x(self, value: float) -> float:
+        return (value - self.x0) * self.scale + self.ox
+
+    def y(self, value: float) -> float:
+        return (value - self.y0) * self.scale + self.oy
+
+
+def wall_schema_drawing(
+    graph: SceneGraph,
+    width_mm: float,
+    height_mm: float,
+    style: SchemaStyle = SCHEMA_COMPACT,
+    local_frame: Optional[LocalFrame] = None,
+) -> "Drawing":
+    """Schema costruttivo della parete come Drawing vettoriale reportlab."""
+    width, height = width_mm * mm, height_mm * mm
+    drawing = Drawing(width, height)
+    drawing.hAlign = "CENTER"
+
+    title_h = style.title_size + 8
+    plot_x0, plot_y0 = AXIS_LEFT, AXIS_BOTTOM
+    plot_w = width - AXIS_LEFT - PLOT_PAD
+    plot_h = height - AXIS_BOTTOM - title_h
+
+    minx, miny, maxx, maxy = graph.bounds
+    margin = max(maxx - minx, maxy - miny) * style.margin_ratio
+    x0, y0, x1, y1 = minx - margin, miny - margin, maxx + margin, maxy + margin
+    scale = min(plot_w / max(x1 - x0, 1e-9), plot_h / max(y1 - y0, 1e-9))
+    # Aspetto "equal": area dati centrata nel riquadro disponibile
+    used_w, used_h = (x1 - x0) * scale, (y1 - y0) * scale
+    ox = plot_x0 + (plot_w - used_w) / 2
+    oy = plot_y0 + (plot_h - used_h) / 2
+    frame = _Frame(x0, y0, scale, ox, oy, plot=(ox, oy, ox + used_w, oy + used_h))
+
+    drawing.add(String(width / 2, height - style.title_size - 2, style.title,
+                       fontName="Helvetica-Bold", fontSize=style.title_size,
+                       fillColor=HexColor(style.title_color), textAnchor="middle"))
+
+    _draw_axes(drawing, frame, (x0, y0, x1, y1), style, local_frame)
+
+    for block in graph.blocks:
+        bx, by = frame.x(block.x), frame.y(block.y)
+        drawing.add(Rect(bx, by, block.width * scale, block.height * scale,
+                         fillColor=HexColor(style.block_fill), strokeColor=HexColor(style.block_stroke),
+                         strokeWidth=style.block_width))
+
+    for custom in graph.customs:
+        for poly in custom.polygons:
+            drawing.add(_polygon(frame, poly, fill=_alpha(style.custom_fill, style.custom_alpha),
+                                 stroke=HexColor(style.custom_stroke), width=style.custom_width))
+            drawing.add(_hatch(frame, poly, _alpha(style.custom_stroke, style.custom_alpha)))
+
+    for aperture in graph.apertures:
+        drawing.add(_polygon(frame, aperture, fill=_alpha(style.aperture_color, style.aperture_alpha),
+                             stroke=None, width=0))
+        drawing.add(_polyline(frame, aperture.exterior.coords, HexColor(style.aperture_color),
+                              style.aperture_width, dashed=True))
+
+    drawing.add(_polyline(frame, graph.wall.exterior.coords, HexColor(style.wall_color), style.wall_width))
+
+    for block in graph.blocks:
+        _draw_label(drawing, frame, block.x, block.y, block.width, block.height, block.label,
+                    style.std_label, style.std_category, style)
+    for custom in graph.customs:
+        _draw_label(drawing, frame, custom.x, custom.y, custom.width, custom.height, custom.label,
+                    style.custom_label, style.custom_category, style)
+
+    entries = [(style.wall_legend, style.wall_color, False)]
+    if style.aperture_legend and graph.apertures:
+        entries.append((style.aperture_legend, style.aperture_color, True))
+    drawing.add(legend_group(entries, frame.plot[2] - 4, frame.plot[3] - 4, style.legend_size))
+    return drawing
+
+
+def pie_chart_drawing(
+    values: Sequence[float],
+    labels: Sequence[str],
+    colors: Sequence[str],
+    size_mm: float,
+    title: str,
+    title_size: float = 9,
+    label_size: float = 8,
+    pct_decimals: int = 0,
+    pct_color: str = "#000000",
+    pct_size: Optional[float] = None,
+    explode: Sequence[float] = (),
+) -> Optional["Drawing"]:
+    """Grafico a torta vettoriale (spicchi antiorari da ore 12, come matplotlib startangle=90)."""
+    total = float(sum(values))
+    if total <= 0:
+        return None
+
+    size = size_mm * mm
+    drawing = Drawing(size, size)
+    drawing.hAlign = "CENTER"
+    title_h = title_size + 6
+    drawing.add(String(size / 2, size - title_size - 1, title, fontName="Helvetica-Bold",
+                       fontSize=title_size, textAnchor="middle"))
+
+    # Spazio per le etichette esterne (due righe)
+    radius = max(4.0, (min(size, size - title_h) - 4 * label_size) / 2 - 4)
+    cx, cy = size / 2, (size - title_h) / 2
+
+    angle = 90.0
+    for i, value in enumerate(values):
+        if value <= 0:
+            continue
+        sweep = 360.0 * value / total
+        mid = math.radians(angle + sweep / 2)
+        shift = (explode[i] if i < len(explode) else 0) * radius
+        wx, wy = cx + shift * math.cos(mid), cy + shift * math.sin(mid)
+        drawing.add(Wedge(wx, wy, radius, angle, angle + sweep, fillColor=HexColor(colors[i]),
+                          strokeColor=white, strokeWidth=0.5))
+
+        pct = f"{100.0 * value / total:.{pct_decimals}f}%"
+        drawing.add(String(wx + 0.6 * radius * math.cos(mid), wy + 0.6 * radius * math.sin(mid) - 3, pct,
+                           fontName="Helvetica-Bold", fontSize=pct_size or label_size,
+                           fillColor=HexColor(pct_color), textAnchor="middle"))
+
+        lines = labels[i].split("\n")
+        lx = wx + (radius + 6) * math.cos(mid)
+        ly = wy + (radius + 6) * math.sin(mid)
+        anchor = "start" if math.cos(mid) > 0.2 else "end" if math.cos(mid) < -0.2 else "middle"
+        top = ly + (len(lines) - 1) * label_size / 2
+        for j, line in enumerate(lines):
+            drawing.add(String(lx, top - j * (label_size + 1) - label_size / 3, line,
+                               fontName="Helvetica-Bold", fontSize=label_size, textAnchor=anchor))
+        angle += sweep
+    return drawing
+
+
+def legend_group(entries: Sequence[Tuple[str, str, bool]], right: float, top: float, font_size: float) -> "Group":
+    """Legenda (testo, colore, tratteggiata) ancorata in alto a destra con sfondo bianco."""
+    group = Group()
+    swatch = font_size * 2.2
+    row_h = font_size + 4
+    text_w = max(stringWidth(text, "Helvetica", font_size) for text, _, _ in entries)
+    box_w = swatch + 6 + text_w + 8
+    box_h = row_h * len(entries) + 4
+    left = right - box_w
+    group.add(Rect(left, top - box_h, box_w, box_h, fillColor=_alpha("#FFFFFF", 0.9),
+                   strokeColor=HexColor("#CCCCCC"), strokeWidth=0.5))
+    for i, (text, color, dashed) in enumerate(entries):
+        y = top - 2 - row_h * (i + 0.5)
+        line = Line(left + 4, y, left + 4 + swatch, y, strokeColor=HexColor(color), strokeWidth=1.5)
+        if dashed:
+            line.strokeDashArray = [3, 2]
+        group.add(line)
+        group.add(String(left + 4 + swatch + 4, y - font_size / 3, text, fontName="Helvetica", fontSize=font_size))
+    return group
+
+
+def _draw_axes(drawing, frame: _Frame, view, style: SchemaStyle, local_frame: Optional[LocalFrame]) -> None:
+    x0, y0, x1, y1 = view
+    px0, py0, px1, py1 = frame.plot
+    offset_x = local_frame.origin_x if local_frame is not None else 0.0
+    offset_y = local_frame.origin_y if local_frame is not None else 0.0
+    grid = _alpha("#808080", style.grid_alpha)
+    axis = HexColor("#000000")
+
+    for tx in nice_ticks(x0, x1):
+        px = frame.x(tx)
+        drawing.add(Line(px, py0, px, py1, strokeColor=grid, strokeWidth=0.4, strokeDashArray=[1, 2]))
+        drawing.add(Line(px, py0, px, py0 - 3, strokeColor=axis, strokeWidth=0.5))
+        drawing.add(String(px, py0 - 4 - style.tick_size, _tick(tx + offset_x), fontName="Helvetica",
+                           fontSize=style.tick_size, textAnchor="middle"))
+    for ty in nice_ticks(y0, y1):
+        py = frame.y(ty)
+        drawing.add(Line(px0, py, px1, py, strokeColor=grid, strokeWidth=0.4, strokeDashArray=[1, 2]))
+        drawing.add(Line(px0, py, px0 - 3, py, strokeColor=axis, strokeWidth=0.5))
+        drawing.add(String(px0 - 5, py - style.tick_size / 3, _tick(ty + offset_y), fontName="Helvetica",
+                           fontSize=style.tick_size, textAnchor="end"))
+
+    drawing.add(Rect(px0, py0, px1 - px0, py1 - py0, fillColor=None, strokeColor=axis, strokeWidth=0.6))
+    drawing.add(String((px0 + px1) / 2, 2, style.x_label, fontName="Helvetica-Bold",
+                       fontSize=style.axis_label_size, textAnchor="middle"))
+    y_label = String(0, 0, style.y_label, fontName="Helvetica-Bold", fontSize=style.axis_label_size,
+                     textAnchor="middle")
+    rotated = Group(y_label)
+    rotated.transform = (0, 1, -1, 0, style.axis_label_size, (py0 + py1) / 2)
+    drawing.add(rotated)
+
+
+def _draw_label(drawing, frame: _Frame, x: float, y: float, w: float, h: float,
+                label: Optional[BlockLabel], number_spec: LabelSpec, category_spec: LabelSpec,
+                style: SchemaStyle) -> None:
+    if label is None or not label.has_corners:
+        return
+    inset = style.label_inset
+    if style.label_mode == "full":
+        _text_box(drawing, frame.x(x + w - inset), frame.y(y + h - inset), label.text,
+                  number_spec.size(w), number_spec.color, "end", "top", style.label_border)
+        return
+    _text_box(drawing, frame.x(x + inset), frame.y(y + inset), label.category,
+              category_spec.size(w), category_spec.color, "start", "bottom", False)
+    _text_box(drawing, frame.x(x + w - inset), frame.y(y + h - inset), label.number,
+              number_spec.size(w), number_spec.color, "end", "top", False)
+
+
+def _text_box(drawing, x: float, y: float, text: str, size: float, color: str,
+              anchor: str, valign: str, border: bool) -> None:
+    """Testo selezionabile su riquadro bianco (come il bbox delle etichette raster)."""
+    text_w = stringWidth(text, "Helvetica-Bold", size)
+    pad = size * 0.2
+    left = x - text_w if anchor == "end" else x
+    baseline = y - size * 0.8 if valign == "top" else y + size * 0.2
+    drawing.add(Rect(left - pad, baseline - size * 0.2 - pad, text_w + 2 * pad, size + 2 * pad,
+                     rx=pad, ry=pad, fillColor=_alpha("#FFFFFF", 0.9),
+                     strokeColor=HexColor(color) if border else None, strokeWidth=0.5 if border else 0))
+    drawing.add(String(left, baseline, text, fontName="Helvetica-Bold", fontSize=size,
+                       fillColor=HexColor(color)))
+
+
+def _polygon(frame: _Frame, poly: Polygon, fill, stroke, width: float):
+    points = frame.xy(poly.exterior.coords[:-1]).ravel().tolist()
+    return RLPolygon(points, fillColor=fill, strokeColor=stroke, strokeWidth=width)
+
+
+def _polyline(frame: _Frame, coords, color, width: float, dashed: bool = False):
+    line = PolyLine(frame.xy(list(coords)).ravel().tolist(), strokeColor=color, strokeWidth=width)
+    if dashed:
+        line.strokeDashArray = [4, 2]
+    return line
+
+
+def _hatch(frame: _Frame, poly: Polygon, color) -> "Group":
+    """Tratteggio a 45° ritagliato sul poligono (segmenti vettoriali, niente pattern raster)."""
+    group = Group()
+    minx, miny, maxx, maxy = poly.bounds
+    step = HATCH_SPACING / frame.scale
+    span = (maxx - minx) + (maxy - miny)
+    lines = [LineString([(minx + offset - (maxy - miny), miny), (minx + offset, maxy)])
+             for offset in np.arange(step, span + step, step)]
+    clipped = MultiLineString(lines).intersection(poly) if lines else None
+    for part in getattr(clipped, "geoms", [clipped] if clipped is not None else []):
+        if isinstance(part, LineString) and not part.is_empty:
+            (ax, ay), (bx, by) = frame.xy(part.coords)[[0, -1]]
+            group.add(Line(ax, ay, bx, by, strokeColor=color, strokeWidth=0.3))
+    return group
+
+
+def _alpha(hex_color: str, alpha: float):
+    base = HexColor(hex_color)
+    return Color(base.red, base.green, base.blue, alpha=alpha)
+
+
+def _tick(value: float) -> str:
+    return f"{value:.0f}"
+
+
+__all__ = [
+    "REPORTLAB_GRAPHICS_AVAILABLE",
+    "SCHEMA_COMPACT",
+    "SCHEMA_FULLPAGE",
+    "SCHEMA_PROFESSIONAL",
+    "LabelSpec",
+    "SchemaStyle",
+    "legend_group",
+    "pie_chart_drawing",
+    "wall_schema_drawing",
+]
@@ -2,15 +2,22 @@
 Public parsing API exposed by the parsers package.
 """
 
-from .dwg import analyze_dwg_header, parse_dwg_wall, try_oda_conversion
+from .base import MultiParseResult
+from .dwg import analyze_dwg_header, parse_dwg_wall, parse_dwg_walls, try_oda_conversion
 from .fallbacks import intelligent_fallback
-from .svg import parse_svg_wall
-from .universal import parse_wall_file
+from .multi_wall import split_walls
+from .svg import parse_svg_wall, parse_svg_walls
+from .universal import parse_wall_file, parse_wall_file_multi
 
 __all__ = [
+    "MultiParseResult",
     "parse_wall_file",
+    "parse_wall_file_multi",
     "parse_dwg_wall",
+    "parse_dwg_walls",
     "parse_svg_wall",
+    "parse_svg_walls",
+    "split_walls",
     "analyze_dwg_header",
     "try_oda_conversion",
     "intelligent_fallback",
@@ -10,4 +10,7 @@ from shapely.geometry import Polygon
 
 ParseResult = Tuple[Polygon, List[Polygon]]
 
-__all__ = ["ParseResult"]
+# Una ParseResult per ogni parete del disegno, in ordine di lettura
+MultiParseResult = List[ParseResult]
+
+__all__ = ["MultiParseResult", "ParseResult"]
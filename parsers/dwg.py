@@ -7,14 +7,15 @@ from __future__ import annotations
 import math
 import os
 import tempfile
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from shapely.geometry import MultiPolygon, Polygon, box
 from shapely.ops import unary_union
 
 from utils.config import AREA_EPS
 from utils.geometry_utils import sanitize_polygon
-from .base import ParseResult
+from .base import MultiParseResult, ParseResult
+from .multi_wall import coords_to_polygons, split_walls
 
 try:
     import ezdxf  # type: ignore
@@ -52,6 +53,33 @@ def parse_dwg_wall(
     print(" Usando fallback parser...")
     return _fallback_parse_dwg(dwg_bytes)
 
+def parse_dwg_walls(
+    dwg_bytes: bytes,
+    layer_wall: str = "MURO",
+    layer_holes: str = "BUCHI",
+) -> MultiParseResult:
+    """Parse a DWG/DXF returning every disjoint wall with its own apertures."""
+    readers = []
+    if dxfgrabber_available:
+        readers.append(("dxfgrabber", _read_layers_with_dxfgrabber))
+    if ezdxf_available:
+        readers.append(("ezdxf", _read_layers_with_ezdxf))
+
+    for name, reader in readers:
+        try:
+            wall_geometries, hole_geometries = reader(dwg_bytes, layer_wall, layer_holes)
+            walls = split_walls(coords_to_polygons(wall_geometries), coords_to_polygons(hole_geometries))
+            print(
+                f" DWG parsed con {name}: {len(walls)} pareti, "
+                f"{sum(len(aps) for _, aps in walls)} aperture"
+            )
+            return walls
+        except Exception as exc:  # pragma: no cover
+            print(f" {name} fallito: {exc}")
+
+    print(" Usando fallback parser...")
+    return [_fallback_parse_dwg(dwg_bytes)]
+
 def analyze_dwg_header(file_bytes: bytes) -> Dict[str, Optional[object]]:
     """Inspect the DWG header to determine format compatibility."""
     header = file_bytes[:20] if len(file_bytes) >= 20 else file_bytes
@@ -109,8 +137,13 @@ def try_oda_conversion(
     filename: str,
     layer_wall: str,
     layer_holes: str,
-) -> ParseResult:
-    """Attempt conversion through ODA File Converter and re-parse."""
+    parse: Optional[Callable[[bytes, str, str], ParseResult | MultiParseResult]] = None,
+) -> ParseResult | MultiParseResult:
+    """Attempt conversion through ODA File Converter and re-parse.
+
+    ``parse`` receives the converted DXF bytes and the layer names
+    (default :func:`parse_dwg_wall`; :func:`parse_dwg_walls` for multi-wall).
+    """
     try:
         import oda_converter  # type: ignore
     except ImportError as exc:  # pragma: no cover
@@ -121,7 +154,7 @@ def try_oda_conversion(
 
     print(" Tentativo conversione con ODA File Converter...")
     dxf_bytes = oda_converter.convert_dwg_to_dxf(file_bytes)
-    return parse_dwg_wall(dxf_bytes, layer_wall, layer_holes)
+    return (parse or parse_dwg_wall)(dxf_bytes, layer_wall, layer_holes)
 
 def _parse_dwg_with_dxfgrabber(
     dwg_bytes: bytes,
@@ -129,6 +162,24 @@ def _parse_dwg_with_dxfgrabber(
     layer_holes: str,
 ) -> ParseResult:
     """Parse DWG data using dxfgrabber for improved compatibility."""
+    wall_geometries, hole_geometries = _read_layers_with_dxfgrabber(dwg_bytes, layer_wall, layer_holes)
+
+    wall_polygon = _dwg_geometries_to_polygon(wall_geometries, is_wall=True)
+    aperture_polygons = _dwg_geometries_to_apertures(hole_geometries)
+
+    print(
+        f" DWG parsed con dxfgrabber: parete {wall_polygon.area:.1f} mm^2, "
+        f"{len(aperture_polygons)} aperture"
+    )
+    return wall_polygon, aperture_polygons
+
+
+def _read_layers_with_dxfgrabber(
+    dwg_bytes: bytes,
+    layer_wall: str,
+    layer_holes: str,
+) -> Tuple[List[List[Tuple[float, float]]], List[List[Tuple[float, float]]]]:
+    """Read raw wall/hole coordinate lists using dxfgrabber."""
     with tempfile.NamedTemporaryFile(suffix=".dwg", delete=False) as tmp_file:
         tmp_file.write(dwg_bytes)
         tmp_path = tmp_file.name
@@ -146,14 +197,7 @@ def _parse_dwg_with_dxfgrabber(
         if not wall_geometries:
             raise ValueError(f"Nessuna geometria valida trovata per layer '{layer_wall}'")
 
-        wall_polygon = _dwg_geometries_to_polygon(wall_geometries, is_wall=True)
-        aperture_polygons = _dwg_geometries_to_apertures(hole_geometries)
-
-        print(
-            f" DWG parsed con dxfgrabber: parete {wall_polygon.area:.1f} mm^2, "
-            f"{len(aperture_polygons)} aperture"
-        )
-        return wall_polygon, aperture_polygons
+        return wall_geometries, hole_geometries
 
     finally:
         try:
@@ -252,6 +296,24 @@ def _parse_dwg_with_ezdxf(
     layer_holes: str,
 ) -> ParseResult:
     """Parse DWG data using ezdxf."""
+    wall_geometries, hole_geometries = _read_layers_with_ezdxf(dwg_bytes, layer_wall, layer_holes)
+
+    wall_polygon = _dwg_geometries_to_polygon(wall_geometries, is_wall=True)
+    aperture_polygons = _dwg_geometries_to_apertures(hole_geometries)
+
+    print(
+        f" DWG parsed con ezdxf: parete {wall_polygon.area:.1f} mm^2, "
+        f"{len(aperture_polygons)} aperture"
+    )
+    return wall_polygon, aperture_polygons
+
+
+def _read_layers_with_ezdxf(
+    dwg_bytes: bytes,
+    layer_wall: str,
+    layer_holes: str,
+) -> Tuple[List[List[Tuple[float, float]]], List[List[Tuple[float, float]]]]:
+    """Read raw wall/hole coordinate lists using ezdxf."""
     with tempfile.NamedTemporaryFile(suffix=".dwg", delete=False) as tmp_file:
         tmp_file.write(dwg_bytes)
         tmp_path = tmp_file.name
@@ -267,14 +329,7 @@ def _parse_dwg_with_ezdxf(
         if not wall_geometries:
             raise ValueError(f"Nessuna geometria valida trovata per layer '{layer_wall}'")
 
-        wall_polygon = _dwg_geometries_to_polygon(wall_geometries, is_wall=True)
-        aperture_polygons = _dwg_geometries_to_apertures(hole_geometries)
-
-        print(
-            f" DWG parsed con ezdxf: parete {wall_polygon.area:.1f} mm^2, "
-            f"{len(aperture_polygons)} aperture"
-        )
-        return wall_polygon, aperture_polygons
+        return wall_geometries, hole_geometries
 
     finally:
         try:
@@ -527,6 +582,7 @@ def _fallback_parse_dwg(dwg_bytes: bytes) -> ParseResult:
 
 __all__ = [
     "parse_dwg_wall",
+    "parse_dwg_walls",
     "analyze_dwg_header",
     "try_oda_conversion",
 ]
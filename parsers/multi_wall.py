@@ -0,0 +1,142 @@
+"""
+Multi-wall extraction: every disjoint wall outline of a drawing.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from shapely.geometry import MultiPolygon, Polygon
+from shapely.ops import unary_union
+from shapely.strtree import STRtree
+
+from utils.config import AREA_EPS
+from utils.geometry_utils import sanitize_polygon
+from .base import MultiParseResult
+
+Coords = List[Tuple[float, float]]
+
+
+def coords_to_polygons(geometries: Sequence[Coords]) -> List[Polygon]:
+    """Close, repair and keep the valid polygons of a list of coordinate lists."""
+    polygons: List[Polygon] = []
+
+    for coords in geometries:
+        if len(coords) < 3:
+            continue
+        try:
+            ring = list(coords)
+            if ring[0] != ring[-1]:
+                ring.append(ring[0])
+
+            poly = Polygon(ring)
+            if not poly.is_valid:
+                poly = poly.buffer(0)
+
+            for part in _polygon_parts(poly):
+                if part.area > AREA_EPS:
+                    polygons.append(part)
+        except Exception as exc:
+            print(f" Geometria scartata: {exc}")
+
+    return polygons
+
+
+def split_walls(
+    wall_polygons: Sequence[Polygon],
+    aperture_polygons: Sequence[Polygon],
+    nested_as_apertures: bool = False,
+    min_wall_area: float = AREA_EPS,
+) -> MultiParseResult:
+    """
+    Group wall outlines into disjoint walls and assign each aperture to its wall.
+
+    Overlapping or touching outlines are merged into a single wall. Outlines
+    nested inside a larger one are dropped, or treated as apertures when
+    ``nested_as_apertures`` is set (drawings without dedicated layers).
+    Walls are ordered left to right, then bottom to top.
+    """
+    if not wall_polygons:
+        raise ValueError("Nessuna geometria valida trovata")
+
+    outer, nested = _split_nested(wall_polygons)
+
+    merged = unary_union(outer)
+    walls = [sanitize_polygon(part) for part in _polygon_parts(merged) if part.area > min_wall_area]
+    if not walls:
+        raise ValueError("Nessuna parete valida trovata")
+    walls.sort(key=lambda poly: (round(poly.bounds[0], 3), round(poly.bounds[1], 3)))
+
+    candidates = list(aperture_polygons)
+    if nested_as_apertures:
+        candidates.extend(nested)
+    # Nei disegni senza layer le aperture contengono anche i contorni delle pareti
+    candidates = [ap for ap in candidates if not any(_same_outline(ap, wall) for wall in walls)]
+
+    grouped = assign_apertures(walls, candidates)
+    return list(zip(walls, grouped))
+
+
+def assign_apertures(walls: Sequence[Polygon], apertures: Sequence[Polygon]) -> List[List[Polygon]]:
+    """
+    Assign apertures to the wall they overlap most, using an STRtree index.
+
+    Apertures that touch no wall are discarded.
+    """
+    grouped: List[List[Polygon]] = [[] for _ in walls]
+    if not walls or not apertures:
+        return grouped
+
+    tree = STRtree(list(walls))
+    discarded = 0
+
+    for aperture in apertures:
+        hits = tree.query(aperture, predicate="intersects")
+        if len(hits) == 0:
+            discarded += 1
+            continue
+
+        if len(hits) == 1:
+            best = int(hits[0])
+        else:
+            best = int(max(hits, key=lambda idx: walls[int(idx)].intersection(aperture).area))
+        grouped[best].append(aperture)
+
+    if discarded:
+        print(f" {discarded} aperture fuori da ogni parete scartate")
+    return grouped
+
+
+def _split_nested(polygons: Sequence[Polygon]) -> Tuple[List[Polygon], List[Polygon]]:
+    """Separate top-level outlines from outlines contained in a larger one."""
+    ordered = sorted(polygons, key=lambda poly: poly.area, reverse=True)
+    tree = STRtree(ordered)
+
+    outer: List[Polygon] = []
+    nested: List[Polygon] = []
+    for idx, poly in enumerate(ordered):
+        containers = [int(i) for i in tree.query(poly, predicate="within") if int(i) < idx]
+        if containers:
+            nested.append(poly)
+        else:
+            outer.append(poly)
+    return outer, nested
+
+
+def _same_outline(a: Polygon, b: Polygon, tolerance: float = 1e-6) -> bool:
+    if abs(a.area - b.area) > max(a.area, b.area) * tolerance:
+        return False
+    return a.symmetric_difference(b).area <= max(a.area, b.area) * tolerance
+
+
+def _polygon_parts(geometry) -> List[Polygon]:
+    if isinstance(geometry, Polygon):
+        return [geometry] if not geometry.is_empty else []
+    if isinstance(geometry, MultiPolygon):
+        return [part for part in geometry.geoms if not part.is_empty]
+    if hasattr(geometry, "geoms"):
+        return [part for part in geometry.geoms if isinstance(part, Polygon) and not part.is_empty]
+    return []
+
+
+__all__ = ["assign_apertures", "coords_to_polygons", "split_walls"]
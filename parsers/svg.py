@@ -4,23 +4,37 @@ SVG parsing utilities extracted from the legacy monolith.
 
 from __future__ import annotations
 
+import io
 import math
 import re
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 
 from shapely.geometry import MultiPolygon, Polygon
 from shapely.ops import unary_union
 
 from utils.config import AREA_EPS
 from utils.geometry_utils import sanitize_polygon
-from .base import ParseResult
+from .base import MultiParseResult, ParseResult
+from .multi_wall import coords_to_polygons, split_walls
 
 try:
     import svgpathtools  # type: ignore
 except Exception:  # pragma: no cover
     svgpathtools = None  # type: ignore
 
+SVG_NS = "http://www.w3.org/2000/svg"
+INKSCAPE_LABEL = "{http://www.inkscape.org/namespaces/inkscape}label"
+
+# Ordine di estrazione storico (path, polygon, polyline, rect, circle)
+SHAPE_TAGS = ("path", "polygon", "polyline", "rect", "circle")
+
+# Matrice affine SVG (a, b, c, d, e, f): x' = a*x + c*y + e, y' = b*x + d*y + f
+Affine = Tuple[float, float, float, float, float, float]
+IDENTITY: Affine = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+Coords = List[Tuple[float, float]]
+
 
 def parse_svg_wall(
     svg_bytes: bytes,
@@ -29,14 +43,7 @@ def parse_svg_wall(
 ) -> ParseResult:
     """Parse an SVG extracting wall and apertures from dedicated layers."""
     try:
-        svg_content = svg_bytes.decode("utf-8")
-        root = ET.fromstring(svg_content)
-
-        ns = {"svg": "http://www.w3.org/2000/svg"}
-        scale_factor = _extract_scale_factor(root, ns)
-
-        wall_geometries = _extract_geometries_by_layer(root, ns, layer_wall, scale_factor)
-        hole_geometries = _extract_geometries_by_layer(root, ns, layer_holes, scale_factor)
+        wall_geometries, hole_geometries, _ = stream_svg_layers(svg_bytes, layer_wall, layer_holes)
 
         wall_polygon = _geometries_to_polygon(wall_geometries, is_wall=True)
         aperture_polygons = _geometries_to_apertures(hole_geometries)
@@ -49,6 +56,222 @@ def parse_svg_wall(
         return _fallback_parse_svg(svg_bytes)
 
 
+def parse_svg_walls(
+    svg_bytes: bytes,
+    layer_wall: str = "MURO",
+    layer_holes: str = "BUCHI",
+) -> MultiParseResult:
+    """Parse an SVG returning every disjoint wall with its own apertures."""
+    try:
+        wall_geometries, hole_geometries, generic = stream_svg_layers(svg_bytes, layer_wall, layer_holes)
+
+        wall_polygons = coords_to_polygons(wall_geometries)
+        if not wall_polygons:
+            wall_polygons = [_geometries_to_polygon(wall_geometries, is_wall=True)]
+
+        if generic:
+            # Le aperture sono i contorni annidati dentro una parete
+            walls = split_walls(wall_polygons, [], nested_as_apertures=True)
+        else:
+            walls = split_walls(wall_polygons, coords_to_polygons(hole_geometries))
+
+        print(f" SVG parsed: {len(walls)} pareti, {sum(len(aps) for _, aps in walls)} aperture")
+        return walls
+
+    except Exception as exc:
+        print(f" Errore parsing multi-parete SVG: {exc}")
+        return [parse_svg_wall(svg_bytes, layer_wall, layer_holes)]
+
+
+def stream_svg_layers(
+    source: Union[bytes, str, BinaryIO],
+    layer_wall: str = "MURO",
+    layer_holes: str = "BUCHI",
+) -> Tuple[List[Coords], List[Coords], bool]:
+    """
+    Extract wall and hole geometries in a single iterparse pass.
+
+    Transforms and the document scale are applied while streaming; every
+    element is cleared and detached as soon as it closes, so peak memory is
+    bounded by tree depth plus the extracted coordinates. When a layer is
+    missing, every geometry of the document is used (legacy behaviour).
+
+    Returns ``(wall_geometries, hole_geometries, generic)``: ``generic`` is
+    True when neither layer was found and both lists come from the fallback.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    ns = {"svg": SVG_NS}
+    wall_key = layer_wall.lower()
+    hole_key = layer_holes.lower()
+
+    wall_buckets: Dict[str, List[Coords]] = {tag: [] for tag in SHAPE_TAGS}
+    hole_buckets: Dict[str, List[Coords]] = {tag: [] for tag in SHAPE_TAGS}
+    generic_buckets: Optional[Dict[str, List[Coords]]] = {tag: [] for tag in SHAPE_TAGS}
+
+    scale = 1.0
+    # Stack parallelo agli elementi aperti: (elemento, in_muro, in_buchi, ctm)
+    stack: List[Tuple[ET.Element, bool, bool, Affine]] = []
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if not stack:
+                scale = _extract_scale_factor(elem, ns)
+                stack.append((elem, False, False, IDENTITY))
+                continue
+
+            _, in_wall, in_holes, ctm = stack[-1]
+            local = elem.get("transform")
+            if local:
+                ctm = _compose_affine(ctm, _parse_transform(local))
+
+            if elem.tag == f"{{{SVG_NS}}}g":
+                group_id = elem.get("id", "")
+                if not in_wall and _layer_matches(elem, wall_key):
+                    print(f" Trovato layer '{layer_wall}' nel gruppo: {group_id}")
+                    in_wall = True
+                if not in_holes and _layer_matches(elem, hole_key):
+                    print(f" Trovato layer '{layer_holes}' nel gruppo: {group_id}")
+                    in_holes = True
+
+            stack.append((elem, in_wall, in_holes, ctm))
+            continue
+
+        _, in_wall, in_holes, ctm = stack.pop()
+        tag = elem.tag
+        if tag.startswith(f"{{{SVG_NS}}}"):
+            tag = tag[len(SVG_NS) + 2:]
+            if tag in SHAPE_TAGS and (in_wall or in_holes or generic_buckets is not None):
+                coords = _extract_element_geometry(elem, tag, scale, ctm)
+                if coords is not None:
+                    if in_wall:
+                        wall_buckets[tag].append(coords)
+                    if in_holes:
+                        hole_buckets[tag].append(list(coords))
+                    if generic_buckets is not None:
+                        generic_buckets[tag].append(list(coords))
+                        if _has_geometries(wall_buckets) and _has_geometries(hole_buckets):
+                            generic_buckets = None  # entrambi i layer popolati: niente fallback
+
+        elem.clear()
+        if stack:
+            parent = stack[-1][0]
+            if len(parent) and parent[-1] is elem:
+                del parent[-1]
+
+    wall_geometries = _flatten_buckets(wall_buckets)
+    hole_geometries = _flatten_buckets(hole_buckets)
+    generic = not wall_geometries and not hole_geometries
+
+    if not wall_geometries:
+        print(f" Layer '{layer_wall}' non trovato, cercando geometrie generiche...")
+        wall_geometries = _flatten_buckets(generic_buckets or {})
+    if not hole_geometries:
+        print(f" Layer '{layer_holes}' non trovato, cercando geometrie generiche...")
+        hole_geometries = [list(coords) for coords in _flatten_buckets(generic_buckets or {})]
+
+    return wall_geometries, hole_geometries, generic
+
+
+def _layer_matches(group: ET.Element, layer_key: str) -> bool:
+    """Return True when a <g> element represents the requested layer."""
+    group_id = group.get('id', '').lower()
+    group_label = group.get(INKSCAPE_LABEL, '').lower()
+    group_class = group.get('class', '').lower()
+
+    return (
+        layer_key in group_id
+        or layer_key in group_label
+        or layer_key in group_class
+        or f"layer_{layer_key}" == group_id
+        or f"layer-{layer_key}" in group_class
+    )
+
+
+def _has_geometries(buckets: Dict[str, List[Coords]]) -> bool:
+    return any(buckets.values())
+
+
+def _flatten_buckets(buckets: Dict[str, List[Coords]]) -> List[Coords]:
+    """Concatenate per-tag buckets in the historical extraction order."""
+    geometries: List[Coords] = []
+    for tag in SHAPE_TAGS:
+        geometries.extend(buckets.get(tag, []))
+    return geometries
+
+
+def _extract_element_geometry(
+    elem: ET.Element,
+    tag: str,
+    scale: float,
+    ctm: Affine = IDENTITY,
+) -> Optional[Coords]:
+    """Extract one shape element applying its transform matrix and the scale."""
+    if ctm == IDENTITY:
+        return _extract_shape_coords(elem, tag, scale)
+
+    coords = _extract_shape_coords(elem, tag, 1.0)
+    if coords is None:
+        return None
+    a, b, c, d, e, f = ctm
+    return [
+        ((a * x + c * y + e) * scale, (b * x + d * y + f) * scale)
+        for x, y in coords
+    ]
+
+
+def _compose_affine(outer: Affine, inner: Affine) -> Affine:
+    """Return the matrix product outer x inner."""
+    a1, b1, c1, d1, e1, f1 = outer
+    a2, b2, c2, d2, e2, f2 = inner
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def _parse_transform(transform: str) -> Affine:
+    """Parse an SVG transform attribute into a single affine matrix."""
+    result = IDENTITY
+
+    for name, args in re.findall(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)', transform):
+        values = [float(v) for v in re.findall(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', args)]
+
+        if name == 'matrix' and len(values) == 6:
+            local = tuple(values)
+        elif name == 'translate' and values:
+            local = (1.0, 0.0, 0.0, 1.0, values[0], values[1] if len(values) > 1 else 0.0)
+        elif name == 'scale' and values:
+            sy = values[1] if len(values) > 1 else values[0]
+            local = (values[0], 0.0, 0.0, sy, 0.0, 0.0)
+        elif name == 'rotate' and values:
+            angle = math.radians(values[0])
+            cos_a, sin_a = math.cos(angle), math.sin(angle)
+            local = (cos_a, sin_a, -sin_a, cos_a, 0.0, 0.0)
+            if len(values) >= 3:
+                cx, cy = values[1], values[2]
+                local = _compose_affine(
+                    _compose_affine((1.0, 0.0, 0.0, 1.0, cx, cy), local),
+                    (1.0, 0.0, 0.0, 1.0, -cx, -cy),
+                )
+        elif name == 'skewX' and values:
+            local = (1.0, 0.0, math.tan(math.radians(values[0])), 1.0, 0.0, 0.0)
+        elif name == 'skewY' and values:
+            local = (1.0, math.tan(math.radians(values[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            print(f" Transform ignorata: {name}({args})")
+            continue
+
+        result = _compose_affine(result, local)  # type: ignore[arg-type]
+
+    return result
+
+
 def _extract_scale_factor(root: ET.Element, ns: Dict[str, str]) -> float:
     """Determine drawing scale from viewBox or explicit units."""
     try:
@@ -73,108 +296,83 @@ def _extract_scale_factor(root: ET.Element, ns: Dict[str, str]) -> float:
     return 1.0
 
 
-def _extract_geometries_by_layer(
-    root: ET.Element,
+def _extract_paths_from_group(
+    group: ET.Element,
     ns: Dict[str, str],
-    layer_name: str,
     scale: float,
 ) -> List[List[Tuple[float, float]]]:
-    """Collect geometries from an SVG layer or from top-level elements."""
+    """Extract path, polygon, polyline, rect, circle elements."""
     geometries: List[List[Tuple[float, float]]] = []
 
-    for group in root.findall('.//svg:g', ns):
-        group_id = group.get('id', '')
-        group_label = group.get('{http://www.inkscape.org/namespaces/inkscape}label', '')
-        group_class = group.get('class', '')
-
-        layer_match = (
-            layer_name.lower() in group_id.lower()
-            or layer_name.lower() in group_label.lower()
-            or layer_name.lower() in group_class.lower()
-            or f"layer_{layer_name.lower()}" == group_id.lower()
-            or f"layer-{layer_name.lower()}" in group_class.lower()
-        )
-
-        if layer_match:
-            print(f" Trovato layer '{layer_name}' nel gruppo: {group_id}")
-            geometries.extend(_extract_paths_from_group(group, ns, scale))
-
-    if not geometries:
-        print(f" Layer '{layer_name}' non trovato, cercando geometrie generiche...")
-        geometries.extend(_extract_paths_from_group(root, ns, scale))
+    for tag in SHAPE_TAGS:
+        for elem in group.findall(f'.//svg:{tag}', ns):
+            coords = _extract_shape_coords(elem, tag, scale)
+            if coords is not None:
+                geometries.append(coords)
 
     return geometries
 
 
-def _extract_paths_from_group(
-    group: ET.Element,
-    ns: Dict[str, str],
+def _extract_shape_coords(
+    elem: ET.Element,
+    tag: str,
     scale: float,
-) -> List[List[Tuple[float, float]]]:
-    """Extract path, polygon, polyline, rect, circle elements."""
-    geometries: List[List[Tuple[float, float]]] = []
-
-    for path in group.findall('.//svg:path', ns):
-        data = path.get('d')
+) -> Optional[List[Tuple[float, float]]]:
+    """Convert a single path/polygon/polyline/rect/circle element to coordinates."""
+    if tag == 'path':
+        data = elem.get('d')
         if data:
             try:
                 coords = _parse_svg_path(data, scale)
                 if coords and len(coords) >= 3:
-                    geometries.append(coords)
+                    return coords
             except Exception as exc:
                 print(f" Errore parsing path: {exc}")
+        return None
 
-    for polygon in group.findall('.//svg:polygon', ns):
-        points = polygon.get('points')
+    if tag in ('polygon', 'polyline'):
+        points = elem.get('points')
         if points:
             try:
                 coords = _parse_svg_polygon_points(points, scale)
-                if coords and len(coords) >= 3:
-                    geometries.append(coords)
+                if tag == 'polygon' and coords and len(coords) >= 3:
                     print(f" Polygon trovato: {len(coords)} punti")
-            except Exception as exc:
-                print(f" Errore parsing polygon: {exc}")
-
-    for polyline in group.findall('.//svg:polyline', ns):
-        points = polyline.get('points')
-        if points:
-            try:
-                coords = _parse_svg_polygon_points(points, scale)
-                if coords and len(coords) >= 2:
-                    geometries.append(coords)
+                    return coords
+                if tag == 'polyline' and coords and len(coords) >= 2:
                     print(f" Polyline trovata: {len(coords)} punti")
+                    return coords
             except Exception as exc:
-                print(f" Errore parsing polyline: {exc}")
+                print(f" Errore parsing {tag}: {exc}")
+        return None
 
-    for rect in group.findall('.//svg:rect', ns):
+    if tag == 'rect':
         try:
-            x = float(rect.get('x', 0)) * scale
-            y = float(rect.get('y', 0)) * scale
-            width = float(rect.get('width', 0)) * scale
-            height = float(rect.get('height', 0)) * scale
+            x = float(elem.get('x', 0)) * scale
+            y = float(elem.get('y', 0)) * scale
+            width = float(elem.get('width', 0)) * scale
+            height = float(elem.get('height', 0)) * scale
 
-            coords = [(x, y), (x + width, y), (x + width, y + height), (x, y + height), (x, y)]
-            geometries.append(coords)
+            return [(x, y), (x + width, y), (x + width, y + height), (x, y + height), (x, y)]
         except Exception as exc:
             print(f" Errore parsing rect: {exc}")
+        return None
 
-    for circle in group.findall('.//svg:circle', ns):
+    if tag == 'circle':
         try:
-            cx = float(circle.get('cx', 0)) * scale
-            cy = float(circle.get('cy', 0)) * scale
-            radius = float(circle.get('r', 0)) * scale
+            cx = float(elem.get('cx', 0)) * scale
+            cy = float(elem.get('cy', 0)) * scale
+            radius = float(elem.get('r', 0)) * scale
 
             coords: List[Tuple[float, float]] = []
             for i in range(17):
                 angle = 2 * math.pi * i / 16
-                x = cx + radius * math.cos(angle)
-                y = cy + radius * math.sin(angle)
-                coords.append((x, y))
-            geometries.append(coords)
+                coords.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+            return coords
         except Exception as exc:
             print(f" Errore parsing circle: {exc}")
+        return None
 
-    return geometries
+    return None
 
 
 def _parse_svg_path(path_data: str, scale: float) -> List[Tuple[float, float]]:
@@ -389,4 +587,4 @@ def _fallback_parse_svg(svg_bytes: bytes) -> ParseResult:
         return wall, []
 
 
-__all__ = ["parse_svg_wall"]
+__all__ = ["parse_svg_wall", "parse_svg_walls", "stream_svg_layers"]
@@ -4,10 +4,15 @@ Universal file parsing entrypoints.
 
 from __future__ import annotations
 
-from .base import ParseResult
-from .dwg import analyze_dwg_header, parse_dwg_wall, try_oda_conversion
+from .base import MultiParseResult, ParseResult
+from .dwg import (
+    analyze_dwg_header,
+    parse_dwg_wall,
+    parse_dwg_walls,
+    try_oda_conversion,
+)
 from .fallbacks import intelligent_fallback
-from .svg import parse_svg_wall
+from .svg import parse_svg_wall, parse_svg_walls
 
 
 def parse_wall_file(
@@ -65,4 +70,37 @@ def parse_wall_file(
     raise ValueError(f"Formato file non supportato: {filename}. Supportati: SVG, DWG, DXF")
 
 
-__all__ = ["parse_wall_file"]
+def parse_wall_file_multi(
+    file_bytes: bytes,
+    filename: str,
+    layer_wall: str = "MURO",
+    layer_holes: str = "BUCHI",
+) -> MultiParseResult:
+    """
+    Parse SVG, DWG or DXF content returning every wall of the drawing.
+
+    Each entry is a (wall polygon, apertures) pair; walls are ordered left to
+    right, then bottom to top, so they can be packed in a single job.
+    """
+    file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
+
+    if file_ext == 'svg':
+        print(f" Parsing multi-parete SVG: {filename}")
+        return parse_svg_walls(file_bytes, layer_wall, layer_holes)
+
+    if file_ext in ['dwg', 'dxf']:
+        print(f" Parsing multi-parete DWG/DXF: {filename}")
+        try:
+            return try_oda_conversion(file_bytes, filename, layer_wall, layer_holes, parse=parse_dwg_walls)
+        except Exception as exc:
+            print(f" ODA fallito: {exc}, tentativo parser diretto...")
+            try:
+                return parse_dwg_walls(file_bytes, layer_wall, layer_holes)
+            except Exception as exc2:
+                print(f" Parser diretto fallito: {exc2}")
+
+    # Formati non riconosciuti o fallback: una sola parete
+    return [parse_wall_file(file_bytes, filename, layer_wall, layer_holes)]
+
+
+__all__ = ["parse_wall_file", "parse_wall_file_multi"]
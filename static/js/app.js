@@ -714,6 +714,9 @@ class WallPackingApp {
             // Store result
             this.currentSessionId = result.session_id;
             this.currentData = result;
+            if (result.preview_scene) {
+                this.sceneCache = { sessionId: result.session_id, scene: result.preview_scene };
+            }
             
             // Update UI (no smart-loading hide needed)
             this.hideLoading();
@@ -1140,17 +1143,32 @@ class WallPackingApp {
         try {
             // Ottieni il tema colori corrente
             const colorTheme = getCurrentColorTheme();
+            
+            // 🖌️ Scena vettoriale già disponibile: ridisegna in locale senza render sul server
+            const cachedScene = this.getSessionScene(this.currentSessionId);
+            if (previewImage && cachedScene) {
+                previewImage.src = renderVectorSceneToDataUrl(cachedScene, colorTheme);
+                previewImage.style.display = 'block';
+                if (previewLoading) previewLoading.style.display = 'none';
+                return;
+            }
+            
             const colorThemeParam = encodeURIComponent(JSON.stringify(colorTheme));
+            const format = typeof renderVectorSceneToDataUrl === 'function' ? 'scene' : 'png';
             
-            const response = await fetch(`/api/preview/${this.currentSessionId}?color_theme=${colorThemeParam}`);
+            const response = await fetch(`/api/preview/${this.currentSessionId}?color_theme=${colorThemeParam}&format=${format}`);
             if (!response.ok) {
                 throw new Error('Errore generazione preview');
             }
             
             const data = await response.json();
             
-            if (previewImage && data.image) {
-                previewImage.src = data.image;
+            if (data.scene) {
+                this.sceneCache = { sessionId: this.currentSessionId, scene: data.scene };
+            }
+            
+            if (previewImage && (data.image || data.scene)) {
+                previewImage.src = data.image || renderVectorSceneToDataUrl(data.scene, colorTheme);
                 previewImage.style.display = 'block';
             }
             
@@ -1163,6 +1181,23 @@ class WallPackingApp {
         }
     }
     
+    getSessionScene(sessionId) {
+        if (typeof renderVectorSceneToDataUrl !== 'function') return null;
+        if (this.sceneCache && this.sceneCache.sessionId === sessionId) {
+            return this.sceneCache.scene;
+        }
+        return null;
+    }
+    
+    // Immagine del preview di conversione: PNG dal server o scena vettoriale disegnata in locale
+    previewImageSource(previewData) {
+        if (!previewData) return null;
+        if (previewData.preview_scene && typeof renderVectorSceneToDataUrl === 'function') {
+            return renderVectorSceneToDataUrl(previewData.preview_scene, getCurrentColorTheme());
+        }
+        return previewData.preview_image;
+    }
+    
     async downloadResult(format) {
         console.log(`🔽 Download ${format.toUpperCase()} richiesto`);
         
@@ -3287,7 +3322,7 @@ class WallPackingApp {
         }
         
         // Controlla che tutti i componenti dei dati siano presenti E che l'UI li mostri
-        const hasPreviewImage = !!previewData.preview_image;
+        const hasPreviewImage = !!(previewData.preview_image || previewData.preview_scene);
         const hasMeasurements = !!previewData.measurements;
         const hasConversionDetails = !!previewData.conversion_details;
         const hasSessionId = !!previewData.preview_session_id;
@@ -3434,7 +3469,7 @@ class WallPackingApp {
         
         // �️ Mostra sempre canvas preview (che contiene già entrambi i poligoni se c'è offset)
         console.log('✅ Usando canvas preview (matplotlib con offset integrato)');
-        this.renderPreviewImage(previewData.preview_image);
+        this.renderPreviewImage(this.previewImageSource(previewData));
         
         // Nascondi wallPreview SVG (non più necessario, tutto è in matplotlib)
         const wallPreviewDiv = document.getElementById('wallPreview');
@@ -3682,7 +3717,7 @@ class WallPackingApp {
         
         // Re-render image at new scale if we have the data
         if (this.currentPreviewData) {
-            this.renderPreviewImage(this.currentPreviewData.preview_image);
+            this.renderPreviewImage(this.previewImageSource(this.currentPreviewData));
         }
     }
     
@@ -3708,7 +3743,7 @@ class WallPackingApp {
         
         // Re-render
         if (this.currentPreviewData) {
-            this.renderPreviewImage(this.currentPreviewData.preview_image);
+            this.renderPreviewImage(this.previewImageSource(this.currentPreviewData));
         }
     }
 }
@@ -5556,9 +5591,11 @@ async function showStep5FromSavedData(project) {
         const previewImage = document.getElementById('previewImage');
         const previewLoading = document.getElementById('previewLoading');
         
-        if (previewImage && project.preview_image) {
+        if (previewImage && (project.preview_image || project.preview_scene)) {
             console.log('🖼️ Caricamento preview salvata...');
-            previewImage.src = project.preview_image;
+            previewImage.src = project.preview_scene && typeof renderVectorSceneToDataUrl === 'function'
+                ? renderVectorSceneToDataUrl(project.preview_scene, getCurrentColorTheme())
+                : project.preview_image;
             previewImage.style.display = 'block';
             if (previewLoading) previewLoading.style.display = 'none';
             console.log('✅ Preview caricata');
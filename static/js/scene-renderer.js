@@ -0,0 +1,307 @@
+// ================================================================
+// VECTOR SCENE RENDERER
+// ================================================================
+// Disegna la scena vettoriale restituita dalle API (preview_scene / scene)
+// su un canvas: cambi di tema e zoom non richiedono nuovi render sul server.
+// Formato documentato in utils/vector_scene.py.
+
+const SCENE_DEFAULT_THEME = {
+    wallOutlineColor: '#1E40AF',
+    wallLineWidth: 2,
+    blockAColor: '#E5E7EB',
+    blockABorder: '#374151',
+    blockBColor: '#DBEAFE',
+    blockBBorder: '#1E40AF',
+    blockCColor: '#FEF3C7',
+    blockCBorder: '#D97706',
+    customPieceColor: '#F3E8FF',
+    customPieceBorder: '#7C3AED',
+    doorWindowColor: '#FEE2E2',
+    doorWindowBorder: '#DC2626'
+};
+
+// Stesse proporzioni del preview PNG (utils/raster_preview.py)
+const SCENE_LAYOUT = { title: 28, axisLeft: 52, axisBottom: 24, pad: 10, pxPerPt: 100 / 72 };
+const SCENE_BLOCK_STRIDE = 6;  // x, y, w, h, label_id, kind
+
+/**
+ * Disegna una scena vettoriale su un canvas.
+ * @param {HTMLCanvasElement} canvas - Canvas di destinazione (dimensioni già impostate)
+ * @param {Object} scene - Scena vettoriale dalle API
+ * @param {Object} theme - Tema colori (stesse chiavi di getCurrentColorTheme)
+ * @param {Object} options - { title, titleColor, marginRatio, showDimensions, showAxes }
+ */
+function drawVectorScene(canvas, scene, theme = {}, options = {}) {
+    if (!canvas || !scene) return;
+
+    const colors = { ...SCENE_DEFAULT_THEME, ...(theme || {}) };
+    const opts = {
+        title: 'Preview Costruzione Parete',
+        titleColor: '#1f2937',
+        marginRatio: 0.01,
+        showDimensions: true,
+        showAxes: true,
+        ...options
+    };
+
+    const ctx = canvas.getContext('2d');
+    const width = canvas.width;
+    const height = canvas.height;
+
+    // Area di disegno e trasformazione mm -> pixel (asse y verso l'alto)
+    const [minx, miny, maxx, maxy] = scene.bounds;
+    const margin = Math.max(maxx - minx, maxy - miny) * opts.marginRatio;
+    const view = [minx - margin, miny - margin, maxx + margin, maxy + margin];
+    const left = opts.showAxes ? SCENE_LAYOUT.axisLeft : SCENE_LAYOUT.pad;
+    const top = opts.title ? SCENE_LAYOUT.title : SCENE_LAYOUT.pad;
+    const bottom = opts.showAxes ? SCENE_LAYOUT.axisBottom : SCENE_LAYOUT.pad;
+    const plotW = width - left - SCENE_LAYOUT.pad;
+    const plotH = height - top - bottom;
+    const scale = Math.min(plotW / (view[2] - view[0]), plotH / (view[3] - view[1]));
+    const offX = left + (plotW - (view[2] - view[0]) * scale) / 2;
+    const offY = top + (plotH + (view[3] - view[1]) * scale) / 2;
+    const px = (x) => offX + (x - view[0]) * scale;
+    const py = (y) => offY - (y - view[1]) * scale;
+
+    ctx.save();
+    ctx.clearRect(0, 0, width, height);
+    ctx.fillStyle = '#ffffff';
+    ctx.fillRect(0, 0, width, height);
+
+    const ringPath = (ring) => {
+        ctx.moveTo(px(ring[0]), py(ring[1]));
+        for (let i = 2; i < ring.length; i += 2) {
+            ctx.lineTo(px(ring[i]), py(ring[i + 1]));
+        }
+        ctx.closePath();
+    };
+    const fillRings = (rings, fill, stroke, lineWidth, alpha = 1, dash = null) => {
+        if (!rings || !rings.length) return;
+        ctx.beginPath();
+        rings.forEach(ringPath);
+        ctx.globalAlpha = alpha;
+        if (fill) {
+            ctx.fillStyle = fill;
+            ctx.fill('evenodd');
+        }
+        if (stroke && lineWidth > 0) {
+            ctx.setLineDash(dash || []);
+            ctx.strokeStyle = stroke;
+            ctx.lineWidth = lineWidth;
+            ctx.stroke();
+            ctx.setLineDash([]);
+        }
+        ctx.globalAlpha = 1;
+    };
+
+    // Griglia
+    const xTicks = sceneNiceTicks(view[0], view[2]);
+    const yTicks = sceneNiceTicks(view[1], view[3]);
+    ctx.strokeStyle = 'rgba(0, 0, 0, 0.08)';
+    ctx.lineWidth = 1;
+    ctx.beginPath();
+    xTicks.forEach(t => { ctx.moveTo(px(t), py(view[1])); ctx.lineTo(px(t), py(view[3])); });
+    yTicks.forEach(t => { ctx.moveTo(px(view[0]), py(t)); ctx.lineTo(px(view[2]), py(t)); });
+    ctx.stroke();
+
+    // Parete con offset (area verde) sotto i blocchi
+    if (scene.wall_original) {
+        fillRings(scene.wall, 'rgba(34, 197, 94, 0.15)', '#22C55E', 3);
+    }
+
+    // Blocchi standard raggruppati per tipo: un path per colore
+    const kindColors = [
+        [colors.blockAColor, colors.blockABorder],
+        [colors.blockBColor, colors.blockBBorder],
+        [colors.blockCColor, colors.blockCBorder]
+    ];
+    const blocks = scene.blocks || [];
+    kindColors.forEach(([fill, border], kind) => {
+        ctx.beginPath();
+        for (let i = 0; i < blocks.length; i += SCENE_BLOCK_STRIDE) {
+            // Tipo sconosciuto (-1): colori del blocco A come nel preview PNG
+            const blockKind = blocks[i + 5] < 0 ? 0 : blocks[i + 5];
+            if (blockKind !== kind) continue;
+            ctx.rect(px(blocks[i]), py(blocks[i + 1] + blocks[i + 3]),
+                     blocks[i + 2] * scale, blocks[i + 3] * scale);
+        }
+        ctx.fillStyle = fill;
+        ctx.fill();
+        ctx.strokeStyle = border;
+        ctx.lineWidth = 0.7;
+        ctx.stroke();
+    });
+
+    // Pezzi custom
+    const customs = scene.customs || [];
+    fillRings(customs.flatMap(c => c.rings), colors.customPieceColor, colors.customPieceBorder, 1.1, 0.8);
+
+    // Aperture (riempimento leggero)
+    fillRings(scene.apertures, colors.doorWindowColor, null, 0, 0.15);
+
+    // Contorni
+    if (scene.wall_original) {
+        fillRings(scene.wall_original.slice(0, 1), null, '#3B82F6', 5 * SCENE_LAYOUT.pxPerPt, 0.8, [12, 6]);
+    } else {
+        fillRings(scene.wall, null, colors.wallOutlineColor, (colors.wallLineWidth || 2) * SCENE_LAYOUT.pxPerPt);
+    }
+    (scene.apertures || []).forEach(ring => {
+        fillRings([ring], null, colors.doorWindowBorder, 2 * SCENE_LAYOUT.pxPerPt, 1, [8, 4]);
+    });
+
+    // Etichette: categoria in basso a sinistra, numero in alto a destra
+    const labels = scene.labels || [];
+    const drawLabel = (x, y, w, h, labelId, catStyle, numStyle) => {
+        const label = labels[labelId];
+        if (!label) return;
+        const catPt = Math.min(catStyle[0], Math.max(catStyle[1], w / catStyle[2]));
+        const numPt = Math.min(numStyle[0], Math.max(numStyle[1], w / numStyle[2]));
+        ctx.font = `bold ${catPt * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+        ctx.fillStyle = catStyle[3];
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'alphabetic';
+        ctx.fillText(label[0], px(x + w * 0.1), py(y + h * 0.2));
+        ctx.font = `${numPt * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+        ctx.fillStyle = numStyle[3];
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'top';
+        ctx.fillText(label[1], px(x + w * 0.9), py(y + h * 0.8));
+    };
+    for (let i = 0; i < blocks.length; i += SCENE_BLOCK_STRIDE) {
+        drawLabel(blocks[i], blocks[i + 1], blocks[i + 2], blocks[i + 3], blocks[i + 4],
+                  [12, 6, 150, '#dc2626'], [10, 4, 200, '#2563eb']);
+    }
+    customs.forEach(custom => {
+        const ring = custom.rings[0];
+        const xs = ring.filter((_, i) => i % 2 === 0);
+        const ys = ring.filter((_, i) => i % 2 === 1);
+        const x = Math.min(...xs);
+        const y = Math.min(...ys);
+        drawLabel(x, y, Math.max(...xs) - x, Math.max(...ys) - y, custom.label,
+                  [10, 5, 120, '#16a34a'], [8, 4, 150, '#065f46']);
+    });
+
+    // Quote
+    if (opts.showDimensions) {
+        drawSceneDimensions(ctx, scene.dimensions || [], px, py);
+    }
+
+    // Freccia INIZIO
+    if (scene.start) {
+        drawSceneArrow(ctx, px(scene.start.tail[0]), py(scene.start.tail[1]),
+                       px(scene.start.tip[0]), py(scene.start.tip[1]));
+    }
+
+    // Titolo e assi
+    if (opts.title) {
+        ctx.font = `bold ${12 * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+        ctx.fillStyle = opts.titleColor;
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        ctx.fillText(opts.title, width / 2, SCENE_LAYOUT.title / 2);
+    }
+    if (opts.showAxes) {
+        ctx.font = `${8 * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+        ctx.fillStyle = '#374151';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'top';
+        xTicks.forEach(t => ctx.fillText(sceneFormatTick(t), px(t), py(view[1]) + 4));
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'middle';
+        yTicks.forEach(t => ctx.fillText(sceneFormatTick(t), px(view[0]) - 4, py(t)));
+    }
+
+    ctx.restore();
+    canvas.dataset.imageLoaded = 'true';
+}
+
+/**
+ * Disegna la scena su un canvas temporaneo e restituisce il data URI PNG.
+ * Utile dove l'interfaccia usa ancora <img> o il flusso renderPreviewImage.
+ */
+function renderVectorSceneToDataUrl(scene, theme = {}, width = 800, height = 600, options = {}) {
+    const canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    drawVectorScene(canvas, scene, theme, options);
+    return canvas.toDataURL('image/png');
+}
+
+function drawSceneDimensions(ctx, dimensions, px, py) {
+    const offset = 14;
+    ctx.save();
+    ctx.strokeStyle = '#6b7280';
+    ctx.fillStyle = '#374151';
+    ctx.lineWidth = 1;
+    ctx.font = `${7 * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+    dimensions.forEach(dim => {
+        let ax = px(dim.a[0]), ay = py(dim.a[1]), bx = px(dim.b[0]), by = py(dim.b[1]);
+        const horizontal = dim.side === 'bottom' || dim.side === 'top';
+        const shift = dim.side === 'bottom' || dim.side === 'left' ? offset : -offset;
+        if (horizontal) { ay += shift; by += shift; } else { ax -= shift; bx -= shift; }
+        ctx.beginPath();
+        ctx.moveTo(ax, ay);
+        ctx.lineTo(bx, by);
+        ctx.stroke();
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        const text = `${dim.value}`;
+        const tx = (ax + bx) / 2, ty = (ay + by) / 2;
+        const tw = ctx.measureText(text).width + 4;
+        ctx.save();
+        ctx.translate(tx, ty);
+        if (!horizontal) ctx.rotate(-Math.PI / 2);
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(-tw / 2, -6, tw, 12);
+        ctx.fillStyle = '#374151';
+        ctx.fillText(text, 0, 0);
+        ctx.restore();
+    });
+    ctx.restore();
+}
+
+function drawSceneArrow(ctx, x1, y1, x2, y2) {
+    const color = '#dc2626';
+    const angle = Math.atan2(y2 - y1, x2 - x1);
+    const head = 12;
+    ctx.save();
+    ctx.strokeStyle = color;
+    ctx.fillStyle = color;
+    ctx.lineWidth = 3;
+    ctx.beginPath();
+    ctx.moveTo(x1, y1);
+    ctx.lineTo(x2, y2);
+    ctx.stroke();
+    ctx.beginPath();
+    ctx.moveTo(x2, y2);
+    ctx.lineTo(x2 - head * Math.cos(angle - 0.4), y2 - head * Math.sin(angle - 0.4));
+    ctx.lineTo(x2 - head * Math.cos(angle + 0.4), y2 - head * Math.sin(angle + 0.4));
+    ctx.closePath();
+    ctx.fill();
+    ctx.font = `bold ${10 * SCENE_LAYOUT.pxPerPt}px DejaVu Sans, Arial, sans-serif`;
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'bottom';
+    ctx.fillText('INIZIO', x1, y1 - 4);
+    ctx.restore();
+}
+
+// Tick "rotondi" sugli assi (stesso algoritmo di nice_ticks in Python)
+function sceneNiceTicks(lo, hi, maxTicks = 8) {
+    const span = hi - lo;
+    if (span <= 0) return [lo];
+    const raw = span / Math.max(1, maxTicks - 1);
+    const magnitude = Math.pow(10, Math.floor(Math.log10(raw)));
+    const step = [1, 2, 2.5, 5, 10].map(m => m * magnitude).find(s => s >= raw) || 10 * magnitude;
+    const ticks = [];
+    for (let t = Math.ceil(lo / step) * step; t <= hi + 1e-9; t += step) {
+        ticks.push(Math.round(t * 1e6) / 1e6);
+    }
+    return ticks;
+}
+
+function sceneFormatTick(value) {
+    return Math.abs(value - Math.round(value)) < 1e-9 ? `${Math.round(value)}` : `${value}`;
+}
+
+window.drawVectorScene = drawVectorScene;
+window.renderVectorSceneToDataUrl = renderVectorSceneToDataUrl;
@@ -38,8 +38,8 @@ placed = [
 
 # Blocchi custom posizionati (esempio)
 customs = [
-    {"width": 650, "height": 495, "x": 0, "y": 1485},    # D con 2 moraletti
-    {"width": 650, "height": 495, "x": 650, "y": 1485},  # D con 2 moraletti
+    {"width": 650, "height": 495, "x": 0, "y": 1485},    # D con 1 moraletto (custom tra Piccolo e Medio)
+    {"width": 650, "height": 495, "x": 650, "y": 1485},  # D con 1 moraletto
     {"width": 380, "height": 495, "x": 1300, "y": 1485}, # E con 1 moraletto
 ]
 
@@ -72,6 +72,6 @@ print("     - A (1239mm): 2 blocchi × 3 mor = 6 moraletti")
 print("     - B (826mm): 3 blocchi × 2 mor = 6 moraletti")
 print("     - C (413mm): 2 blocchi × 1 mor = 2 moraletti")
 print("   Custom:")
-print("     - D (650mm): 2 blocchi × 2 mor = 4 moraletti")
+print("     - D (650mm): 2 blocchi × 1 mor = 2 moraletti")
 print("     - E (380mm): 1 blocco × 1 mor = 1 moraletto")
-print("   TOTALE: 6 + 6 + 2 + 4 + 1 = 19 moraletti")
+print("   TOTALE: 6 + 6 + 2 + 2 + 1 = 17 moraletti")
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Parser Corpus Harness
+Esegue tutte le strategie di parsing (universal, DWG, SVG) su una cartella di
+disegni, misura area parete, numero aperture, validità e latenza per strategia,
+e confronta il risultato con i riepiloghi golden salvati.
+
+Include un generatore di disegni sintetici di stress (molte entità, spline
+pesanti, linee esplose) per intercettare i crolli di performance dei parser
+prima che arrivino in produzione.
+
+Uso:
+    python tests/parser_corpus.py run                 # confronto con golden
+    python tests/parser_corpus.py run --update        # rigenera golden
+    python tests/parser_corpus.py generate OUT_DIR    # crea corpus di stress
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Aggiungi la directory del progetto al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from parsers import dwg as dwg_parser  # noqa: E402
+from parsers import svg as svg_parser  # noqa: E402
+from parsers.fallbacks import intelligent_fallback  # noqa: E402
+from parsers.universal import parse_wall_file  # noqa: E402
+
+DEFAULT_CORPUS_DIRS = [project_root / "tests", project_root / "test"]
+DEFAULT_GOLDEN_PATH = project_root / "tests" / "golden" / "parser_corpus.json"
+CORPUS_EXTENSIONS = {".svg", ".dwg", ".dxf"}
+
+AREA_REL_TOLERANCE = 1e-6        # tolleranza relativa area parete rispetto al golden
+LATENCY_REGRESSION_FACTOR = 3.0  # latenza oltre N volte il golden = regressione
+LATENCY_MIN_MS = 250.0           # sotto questa soglia le variazioni sono rumore
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Strategie
+# ────────────────────────────────────────────────────────────────────────────────
+
+def _oda(data: bytes, filename: str):
+    return dwg_parser.try_oda_conversion(data, filename, "MURO", "BUCHI")
+
+
+def _intelligent_fallback(data: bytes, filename: str):
+    return intelligent_fallback(data, filename, dwg_parser.analyze_dwg_header(data))
+
+
+# nome → (estensioni supportate, funzione(bytes, filename) -> ParseResult)
+STRATEGIES: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+    "universal": ((".svg", ".dwg", ".dxf"), lambda data, name: parse_wall_file(data, name)),
+    "svg_stream": ((".svg",), lambda data, name: svg_parser.parse_svg_wall(data)),
+    "svg_fallback": ((".svg",), lambda data, name: svg_parser._fallback_parse_svg(data)),
+    "dwg_oda": ((".dwg", ".dxf"), _oda),
+    "dwg_dxfgrabber": ((".dwg", ".dxf"), lambda data, name: dwg_parser._parse_dwg_with_dxfgrabber(data, "MURO", "BUCHI")),
+    "dwg_ezdxf": ((".dwg", ".dxf"), lambda data, name: dwg_parser._parse_dwg_with_ezdxf(data, "MURO", "BUCHI")),
+    "dwg_fallback": ((".dwg", ".dxf"), lambda data, name: dwg_parser._fallback_parse_dwg(data)),
+    "intelligent_fallback": ((".dwg", ".dxf"), _intelligent_fallback),
+}
+
+
+def _oda_available() -> bool:
+    try:
+        import oda_converter  # type: ignore
+        with contextlib.redirect_stdout(io.StringIO()):
+            return bool(oda_converter.is_oda_available())
+    except Exception:
+        return False
+
+
+# Strategie che dipendono da tool esterni: "skipped" se non installati
+ENVIRONMENT_CHECKS: Dict[str, Callable[[], bool]] = {"dwg_oda": _oda_available}
+
+
+def run_strategy(name: str, data: bytes, filename: str) -> Dict:
+    """Esegue una strategia catturando l'output dei parser e misurandone la latenza."""
+    _, func = STRATEGIES[name]
+    check = ENVIRONMENT_CHECKS.get(name)
+    if check is not None and not check():
+        return {"status": "skipped", "latency_ms": 0.0}
+
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall, apertures = func(data, filename)
+        status = "ok"
+        error = None
+    except Exception as exc:
+        wall, apertures = None, []
+        status = "error"
+        error = f"{type(exc).__name__}: {exc}"
+    latency_ms = (time.perf_counter() - start) * 1000.0
+
+    record: Dict = {"status": status, "latency_ms": round(latency_ms, 2)}
+    if status == "ok":
+        record.update({
+            "wall_area": round(wall.area, 3),
+            "wall_bounds": [round(v, 3) for v in wall.bounds],
+            "aperture_count": len(apertures),
+            "valid": bool(wall.is_valid and not wall.is_empty and all(ap.is_valid for ap in apertures)),
+        })
+    else:
+        record["error"] = error
+    return record
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Corpus
+# ────────────────────────────────────────────────────────────────────────────────
+
+def iter_corpus_files(corpus_dirs: Iterable[Path]) -> List[Path]:
+    files: List[Path] = []
+    for directory in corpus_dirs:
+        directory = Path(directory)
+        if directory.is_dir():
+            files.extend(p for p in directory.iterdir() if p.suffix.lower() in CORPUS_EXTENSIONS)
+    return sorted(files)
+
+
+def _corpus_key(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(project_root).as_posix()
+    except ValueError:
+        return path.name
+
+
+def run_corpus(
+    corpus_dirs: Optional[Iterable[Path]] = None,
+    strategies: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, Dict]]:
+    """Esegue ogni strategia applicabile su ogni file: {file: {strategia: record}}."""
+    selected = list(strategies or STRATEGIES.keys())
+    report: Dict[str, Dict[str, Dict]] = {}
+
+    for path in iter_corpus_files(corpus_dirs or DEFAULT_CORPUS_DIRS):
+        data = path.read_bytes()
+        ext = path.suffix.lower()
+        report[_corpus_key(path)] = {
+            name: run_strategy(name, data, path.name)
+            for name in selected
+            if ext in STRATEGIES[name][0]
+        }
+
+    return report
+
+
+def compare_with_golden(report: Dict, golden: Dict) -> Tuple[List[str], List[str]]:
+    """
+    Confronta un report con i golden.
+
+    Returns:
+        (differenze, regressioni_latenza): le differenze di risultato sono errori,
+        le regressioni di latenza sono avvisi (dipendono dalla macchina).
+    """
+    differences: List[str] = []
+    latency: List[str] = []
+
+    for filename, expected_strategies in golden.items():
+        actual_strategies = report.get(filename)
+        if actual_strategies is None:
+            differences.append(f"{filename}: file mancante nel corpus")
+            continue
+
+        for strategy, expected in expected_strategies.items():
+            actual = actual_strategies.get(strategy)
+            where = f"{filename} [{strategy}]"
+            if actual is None:
+                differences.append(f"{where}: strategia non eseguita")
+                continue
+            if "skipped" in (actual["status"], expected["status"]):
+                continue
+            if actual["status"] != expected["status"]:
+                differences.append(f"{where}: status {expected['status']} → {actual['status']}")
+                continue
+            if expected["status"] == "ok":
+                for key in ("aperture_count", "valid"):
+                    if actual[key] != expected[key]:
+                        differences.append(f"{where}: {key} {expected[key]} → {actual[key]}")
+                expected_area = expected["wall_area"]
+                if abs(actual["wall_area"] - expected_area) > AREA_REL_TOLERANCE * max(1.0, abs(expected_area)):
+                    differences.append(f"{where}: wall_area {expected_area} → {actual['wall_area']}")
+
+            baseline = expected.get("latency_ms", 0.0)
+            if (actual["latency_ms"] > LATENCY_MIN_MS
+                    and actual["latency_ms"] > baseline * LATENCY_REGRESSION_FACTOR):
+                latency.append(f"{where}: latenza {baseline:.1f}ms → {actual['latency_ms']:.1f}ms")
+
+    for filename in report:
+        if filename not in golden:
+            differences.append(f"{filename}: nuovo file senza golden (usa --update)")
+
+    return differences, latency
+
+
+def load_golden(path: Path = DEFAULT_GOLDEN_PATH) -> Dict:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_golden(report: Dict, path: Path = DEFAULT_GOLDEN_PATH) -> None:
+    """Salva i golden senza i messaggi d'errore (contengono percorsi temporanei)."""
+    path = Path(path)
+    report = {
+        filename: {
+            name: {key: value for key, value in record.items() if key != "error"}
+            for name, record in strategies.items()
+        }
+        for filename, strategies in report.items()
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Generatore disegni sintetici di stress
+# ────────────────────────────────────────────────────────────────────────────────
+
+def _hole_grid(width: float, height: float, count: int) -> List[Tuple[float, float, float, float]]:
+    """Griglia di piccole aperture rettangolari (x, y, w, h) dentro la parete."""
+    cols = max(1, int(math.ceil(math.sqrt(count * width / height))))
+    rows = max(1, int(math.ceil(count / cols)))
+    cell_w, cell_h = width / cols, height / rows
+    holes = []
+    for i in range(count):
+        r, c = divmod(i, cols)
+        holes.append((c * cell_w + cell_w * 0.25, r * cell_h + cell_h * 0.25, cell_w * 0.5, cell_h * 0.5))
+    return holes
+
+
+def _wavy_top(width: float, height: float, segments: int) -> List[Tuple[float, float, float, float, float, float]]:
+    """Segmenti di Bézier cubiche per un bordo superiore ondulato (cx1, cy1, cx2, cy2, x, y)."""
+    step = width / segments
+    curves = []
+    for i in range(segments):
+        x0 = width - i * step
+        x1 = x0 - step
+        amp = 80.0 if i % 2 == 0 else -80.0
+        curves.append((x0 - step / 3, height + amp, x0 - 2 * step / 3, height - amp, x1, height))
+    return curves
+
+
+def generate_stress_svg(kind: str, size: int, width: float = 12000.0, height: float = 3000.0) -> bytes:
+    """
+    SVG di stress con layer MURO/BUCHI.
+
+    kind:
+        'entities' → ``size`` aperture rettangolari
+        'splines'  → bordo superiore con ``size`` Bézier cubiche
+        'exploded' → contorno parete esploso in ``size`` segmenti separati
+    """
+    wall_parts: List[str] = []
+    hole_parts: List[str] = []
+
+    if kind == "entities":
+        wall_parts.append(f'<rect x="0" y="0" width="{width}" height="{height}"/>')
+        hole_parts.extend(
+            f'<rect x="{x:.2f}" y="{y:.2f}" width="{w:.2f}" height="{h:.2f}"/>'
+            for x, y, w, h in _hole_grid(width, height, size)
+        )
+    elif kind == "splines":
+        d = [f"M0,0 L{width},0 L{width},{height}"]
+        d.extend(f"C{a:.2f},{b:.2f} {c:.2f},{e:.2f} {x:.2f},{y:.2f}" for a, b, c, e, x, y in _wavy_top(width, height, size))
+        d.append("Z")
+        wall_parts.append(f'<path d="{" ".join(d)}"/>')
+    elif kind == "exploded":
+        per_side = max(1, size // 4)
+        corners = [(0.0, 0.0), (width, 0.0), (width, height), (0.0, height), (0.0, 0.0)]
+        for (x0, y0), (x1, y1) in zip(corners, corners[1:]):
+            for i in range(per_side):
+                ax_, ay_ = x0 + (x1 - x0) * i / per_side, y0 + (y1 - y0) * i / per_side
+                bx_, by_ = x0 + (x1 - x0) * (i + 1) / per_side, y0 + (y1 - y0) * (i + 1) / per_side
+                wall_parts.append(f'<path d="M{ax_:.3f} {ay_:.3f}L{bx_:.3f} {by_:.3f}"/>')
+    else:
+        raise ValueError(f"Tipo di stress sconosciuto: {kind}")
+
+    return (
+        '<?xml version="1.0"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+        f'  <g id="layer_MURO">{"".join(wall_parts)}</g>\n'
+        f'  <g id="layer_BUCHI">{"".join(hole_parts)}</g>\n'
+        '</svg>\n'
+    ).encode("utf-8")
+
+
+def generate_stress_dxf(kind: str, size: int, width: float = 12000.0, height: float = 3000.0) -> bytes:
+    """DXF di stress (stessi ``kind`` di :func:`generate_stress_svg`); richiede ezdxf."""
+    if not dwg_parser.ezdxf_available:
+        raise RuntimeError("ezdxf non disponibile per generare DXF di stress")
+
+    ezdxf = dwg_parser.ezdxf
+    doc = ezdxf.new("R2010")
+    msp = doc.modelspace()
+    doc.layers.add("MURO")
+    doc.layers.add("BUCHI")
+
+    if kind == "entities":
+        msp.add_lwpolyline([(0, 0), (width, 0), (width, height), (0, height)], close=True, dxfattribs={"layer": "MURO"})
+        for x, y, w, h in _hole_grid(width, height, size):
+            msp.add_lwpolyline([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], close=True, dxfattribs={"layer": "BUCHI"})
+    elif kind == "splines":
+        fit_points = [(width * i / size, height + (80.0 if i % 2 else -80.0)) for i in range(size + 1)]
+        msp.add_spline(fit_points + [(width, 0), (0, 0), fit_points[0]], dxfattribs={"layer": "MURO"})
+    elif kind == "exploded":
+        per_side = max(1, size // 4)
+        corners = [(0.0, 0.0), (width, 0.0), (width, height), (0.0, height), (0.0, 0.0)]
+        for (x0, y0), (x1, y1) in zip(corners, corners[1:]):
+            for i in range(per_side):
+                start = (x0 + (x1 - x0) * i / per_side, y0 + (y1 - y0) * i / per_side)
+                end = (x0 + (x1 - x0) * (i + 1) / per_side, y0 + (y1 - y0) * (i + 1) / per_side)
+                msp.add_line(start, end, dxfattribs={"layer": "MURO"})
+    else:
+        raise ValueError(f"Tipo di stress sconosciuto: {kind}")
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    try:
+        doc.saveas(tmp_path)
+        return Path(tmp_path).read_bytes()
+    finally:
+        os.unlink(tmp_path)
+
+
+STRESS_KINDS = ("entities", "splines", "exploded")
+
+
+def write_stress_corpus(out_dir: Path, sizes: Iterable[int] = (100, 1000), formats: Iterable[str] = ("svg", "dxf")) -> List[Path]:
+    """Scrive un corpus di stress: stress_<kind>_<size>.<fmt> per ogni combinazione."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for fmt in formats:
+        generator = generate_stress_svg if fmt == "svg" else generate_stress_dxf
+        for kind in STRESS_KINDS:
+            for size in sizes:
+                path = out_dir / f"stress_{kind}_{size}.{fmt}"
+                path.write_bytes(generator(kind, size))
+                written.append(path)
+    return written
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# CLI
+# ────────────────────────────────────────────────────────────────────────────────
+
+def _print_report(report: Dict) -> None:
+    for filename, strategies in report.items():
+        print(f"\n📁 {filename}")
+        for name, record in strategies.items():
+            if record["status"] == "skipped":
+                print(f"   ⏭️  {name:<22} non disponibile in questo ambiente")
+            elif record["status"] == "ok":
+                print(f"   ✅ {name:<22} area={record['wall_area']:>16,.1f}  aperture={record['aperture_count']:<4} "
+                      f"valid={record['valid']!s:<5} {record['latency_ms']:>9.1f}ms")
+            else:
+                print(f"   ❌ {name:<22} {record['error'][:60]:<60} {record['latency_ms']:>9.1f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parser corpus regression and latency harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="Esegue il corpus e confronta con i golden")
+    run_cmd.add_argument("--corpus", action="append", type=Path, help="Cartella corpus (ripetibile)")
+    run_cmd.add_argument("--golden", type=Path, default=DEFAULT_GOLDEN_PATH)
+    run_cmd.add_argument("--strategy", action="append", choices=sorted(STRATEGIES), help="Limita le strategie")
+    run_cmd.add_argument("--update", action="store_true", help="Riscrive i golden con il risultato corrente")
+    run_cmd.add_argument("--strict-latency", action="store_true", help="Le regressioni di latenza fanno fallire")
+
+    gen_cmd = sub.add_parser("generate", help="Genera un corpus sintetico di stress")
+    gen_cmd.add_argument("out_dir", type=Path)
+    gen_cmd.add_argument("--sizes", default="100,1000", help="Numero di entità, separati da virgola")
+    gen_cmd.add_argument("--formats", default="svg,dxf")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+        for path in write_stress_corpus(args.out_dir, sizes, formats):
+            print(f"📝 {path} ({path.stat().st_size:,} bytes)")
+        return 0
+
+    report = run_corpus(args.corpus, args.strategy)
+    _print_report(report)
+
+    if args.update:
+        save_golden(report, args.golden)
+        print(f"\n💾 Golden aggiornati: {args.golden}")
+        return 0
+
+    differences, latency = compare_with_golden(report, load_golden(args.golden))
+    for line in latency:
+        print(f"⏱️  {line}")
+    for line in differences:
+        print(f"❌ {line}")
+
+    failed = bool(differences) or (args.strict_latency and bool(latency))
+    print(f"\n{'❌ REGRESSIONI RILEVATE' if failed else '✅ Corpus conforme ai golden'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test raggruppamento blocchi a bucket
+====================================
+
+Testa:
+1. Gruppi custom uguali alla scansione lineare, anche ai bordi di tolleranza
+2. Ordine delle categorie deterministico (quantità, poi prima apparizione)
+3. Nessuno stato globale: chiamate concorrenti con risultati indipendenti
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from block_grouping import (
+    CUSTOM_TOLERANCE_MM,
+    _group_custom_blocks,
+    create_grouped_block_labels,
+    get_block_category_summary,
+    group_blocks,
+)
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _linear_groups(customs, tolerance=CUSTOM_TOLERANCE_MM):
+    """Riferimento: confronto con ogni gruppo esistente, vince il primo."""
+    groups, anchors = {}, []
+    for i, custom in enumerate(customs):
+        width, height = round(custom["width"]), round(custom["height"])
+        for w, h, key in anchors:
+            if abs(width - w) <= tolerance and abs(height - h) <= tolerance:
+                groups[key].append(i)
+                break
+        else:
+            key = f"custom_{width}x{height}"
+            anchors.append((width, height, key))
+            groups[key] = [i]
+    return groups
+
+
+def _customs(rng, n):
+    widths = [300, 304.6, 305, 310, 295.4, 290]
+    heights = [495, 490, 500, 200]
+    return [{"width": rng.choice(widths + [rng.uniform(50, 900)]),
+             "height": rng.choice(heights + [rng.uniform(100, 495)]), "ctype": 2}
+            for _ in range(n)]
+
+
+def test_buckets_match_linear_scan():
+    """Stessi gruppi e stesso ordine della scansione lineare su dati casuali"""
+    rng = random.Random(7)
+    for _ in range(200):
+        customs = _customs(rng, rng.randint(0, 80))
+        assert _group_custom_blocks(customs) == _linear_groups(customs)
+
+    # Catena 300 → 305 → 310: il terzo pezzo non si aggancia al secondo
+    chain = [{"width": w, "height": 495} for w in (300, 305, 310, 304.6)]
+    assert _group_custom_blocks(chain) == {"custom_300x495": [0, 1, 3], "custom_310x495": [2]}
+
+
+def test_deterministic_category_order():
+    """A parità di quantità la lettera va al gruppo apparso per primo"""
+    customs = [{"width": 500, "height": 200}, {"width": 300, "height": 495},
+               {"width": 300, "height": 495}, {"width": 500, "height": 200},
+               {"width": 120, "height": 495}]
+    result = group_blocks([], customs, SIZE_TO_LETTER)
+
+    assert [(c.letter, c.group_key, c.count) for c in result.categories] == [
+        ("D", "custom_500x200", 2), ("E", "custom_300x495", 2), ("F", "custom_120x495", 1)]
+    assert result.summary()["D"]["dimensions"] == "500x200"
+    assert [result.custom_labels[i]["full_label"] for i in range(5)] == ["D1", "E1", "E2", "D2", "F1"]
+
+
+def test_no_shared_state_between_calls():
+    """Chiamate concorrenti su dati diversi non si influenzano"""
+    rng = random.Random(3)
+    jobs = []
+    for n in range(1, 13):
+        placed = [{"width": rng.choice([1239, 826, 413]), "height": 495} for _ in range(n)]
+        jobs.append((placed, _customs(rng, n * 3)))
+
+    expected = [create_grouped_block_labels(p, c, SIZE_TO_LETTER) for p, c in jobs]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda job: create_grouped_block_labels(*job, SIZE_TO_LETTER), jobs))
+    assert results == expected
+
+    # Il riassunto dipende solo dagli argomenti, non dall'ultima chiamata
+    placed, customs = jobs[0]
+    first = get_block_category_summary(placed, customs, SIZE_TO_LETTER)
+    get_block_category_summary(*jobs[-1], SIZE_TO_LETTER)
+    assert get_block_category_summary(placed, customs, SIZE_TO_LETTER) == first
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test etichette condivise per risultato di packing
+=================================================
+
+Testa:
+1. Etichette calcolate una volta per sessione e mappatura lettere
+2. Tabelle PDF con le stesse categorie dello schema, senza ricalcolo
+"""
+
+import sys
+sys.path.append('.')
+
+from shapely.geometry import box
+
+import exporters.labels as labels
+from exporters.labels import BlockLabels, get_block_labels
+from utils.scene_graph import build_scene_graph
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _sample():
+    placed = [{"type": "std_1239x495", "x": x, "y": 0, "width": 1239, "height": 495} for x in (0, 1239)]
+    placed.append({"type": "std_826x495", "x": 2478, "y": 0, "width": 826, "height": 495})
+    customs = [{"type": "custom", "ctype": 2, "x": 3304, "y": y, "width": 300, "height": 495,
+                "geometry": box(3304, y, 3604, y + 495).__geo_interface__} for y in (0, 495)]
+    return placed, customs
+
+
+def test_labels_cached_per_result(monkeypatch):
+    """Stessi blocchi e mappatura → stesso oggetto; dimensioni o mappatura diverse → ricalcolo"""
+    placed, customs = _sample()
+    calls = []
+    original = labels.create_detailed_block_labels
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr("exporters.labels.create_detailed_block_labels", counting)
+
+    session = {}
+    first = get_block_labels(session, placed, customs, SIZE_TO_LETTER)
+    moved = [dict(b, x=b["x"] + 100) for b in placed]
+    assert get_block_labels(session, moved, customs, SIZE_TO_LETTER) is first
+    assert session["block_labels"] is first and len(calls) == 1
+
+    get_block_labels(session, placed, customs, {1239: "X", 826: "B", 413: "C"})
+    get_block_labels(session, placed, customs[:1], {1239: "X", 826: "B", 413: "C"})
+    assert len(calls) == 3
+
+    assert isinstance(first, BlockLabels)
+    std_full, custom_full = first.full_labels()
+    assert std_full == {0: "A1", 1: "A2", 2: "B1"}
+    assert set(first.standard_by_category(placed)) == {"A", "B"}
+    assert [len(v) for v in first.custom_by_category(customs).values()] == [2]
+
+
+def test_pdf_tables_use_scene_graph_labels(monkeypatch):
+    """Categorie custom delle tabelle uguali a quelle dello schema (mappatura a 4 lettere)"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from exporters.pdf_exporter import _build_compact_custom_table
+
+    placed, customs = _sample()
+    mapping = {1239: "A", 826: "B", 413: "C", 620: "E"}
+    graph = build_scene_graph(box(0, 0, 3604, 990), placed, customs, [], mapping)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("etichette ricalcolate")
+
+    monkeypatch.setattr("exporters.pdf_exporter.group_custom_blocks_by_category", fail)
+    table = _build_compact_custom_table(customs, getSampleStyleSheet(), graph.labels)
+
+    schema_categories = {custom.label.category for custom in graph.customs}
+    table_categories = {row[0].replace("Cat. ", "") for row in table._cellvalues[2:-1]}
+    assert table_categories == schema_categories == {"E"}
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
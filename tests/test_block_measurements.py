@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test tabella misure blocchi (enhanced packing)
+==============================================
+
+Testa:
+1. Volumi risolti dalla tabella uguali al calcolo per blocco
+2. Blocchi in ingresso non copiati né modificati
+3. Una voce per tipo standard / gruppo custom
+"""
+
+import sys
+sys.path.append('.')
+
+import contextlib
+import io
+import random
+
+import pytest
+
+from core.enhanced_packing import (
+    enhance_packing_with_automatic_measurements,
+    measurement_key,
+    resolve_block_measurements,
+)
+
+CONFIG = {"material_thickness_mm": 14, "guide_width_mm": 75}
+
+
+def _blocks(seed):
+    rng = random.Random(seed)
+    placed = [{"type": f"std_{w}x495", "width": w, "height": 495, "x": rng.uniform(0, 5000), "y": 0}
+              for w in rng.choices([1239, 826, 413], k=300)]
+    customs = [{"type": "custom", "width": round(rng.uniform(50, 1200), 1), "height": rng.choice([495, 300]),
+                "x": 0, "y": 0, "geometry": {}} for _ in range(40)]
+    return placed, customs + customs[:10]
+
+
+def test_side_table_resolves_block_volumes():
+    """Volume e spessore di ogni blocco come nel vecchio arricchimento per copia"""
+    placed, customs = _blocks(1)
+    packing = {"wall_bounds": [0, 0, 5000, 2475], "blocks_standard": placed, "blocks_custom": customs}
+    before = [dict(b) for b in placed + customs]
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = enhance_packing_with_automatic_measurements(packing, CONFIG)
+
+    table = result["blocks_with_measurements"]
+    assert table["closure_thickness_mm"] == 103
+    for block in placed + customs:
+        measures = resolve_block_measurements(table, block)
+        assert measures["thickness_mm"] == 103
+        assert measures["volume_m3"] == block["width"] * block["height"] * 103 / 1_000_000_000
+
+    expected_total = sum(b["width"] * b["height"] * 103 / 1_000_000_000 for b in placed + customs)
+    assert table["total_volume_m3"] == pytest.approx(expected_total)
+    assert result["blocks_standard"] is placed and result["blocks_custom"] is customs
+    assert [dict(b) for b in placed + customs] == before
+
+
+def test_one_entry_per_type_or_custom_group():
+    """Standard raggruppati per tipo, custom per dimensioni, conteggi completi"""
+    placed, customs = _blocks(2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = enhance_packing_with_automatic_measurements(
+            {"wall_bounds": [0, 0, 5000, 2475], "blocks_standard": placed, "blocks_custom": customs}, CONFIG
+        )["blocks_with_measurements"]
+
+    keys = {measurement_key(b) for b in placed + customs}
+    assert set(table["groups"]) == keys
+    assert {k for k in keys if k.startswith("std_")} <= {"std_1239x495", "std_826x495", "std_413x495"}
+    assert sum(g["count"] for g in table["groups"].values()) == len(placed) + len(customs)
+    assert (table["standard_count"], table["custom_count"]) == (len(placed), len(customs))
+
+    unknown = {"type": "custom", "width": 10, "height": 10}
+    assert resolve_block_measurements(table, unknown)["volume_m3"] == 10 * 10 * 103 / 1_000_000_000
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
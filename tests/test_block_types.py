@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test registro tipi blocco
+=========================
+
+Testa:
+1. Id compatti internati una volta per configurazione (dimensioni, lettera, moraletti)
+2. Riassunto, mappa tipi DXF e schema custom dallo stesso registro
+3. Tipi dello Small Algorithm risolti dal registro in pack_wall
+"""
+
+import sys
+sys.path.append('.')
+
+import contextlib
+import io
+
+from shapely.geometry import box
+
+from core.structural_verification import moraletti_backend_config
+from utils.block_types import BlockTypeRegistry, get_block_type_registry
+from utils.block_utils import summarize_blocks
+
+FRONTEND = {'spacing_mm': 420, 'max_moraletti_large': 3, 'max_moraletti_medium': 2, 'max_moraletti_small': 1}
+
+
+def test_types_are_interned_once():
+    """Stesso nome o dimensioni → stesso id; registro condiviso per configurazione"""
+    moraletti = moraletti_backend_config(FRONTEND, [1239, 826, 413], 495)
+    shared = get_block_type_registry([1239, 826, 413], 495, moraletti_config=moraletti)
+    assert get_block_type_registry([1239, 826, 413], 495.0, moraletti_config=dict(moraletti)) is shared
+    assert get_block_type_registry([1239, 826, 413], 495) is not shared
+
+    registry = BlockTypeRegistry([1239, 826, 413], 495, moraletti_config=moraletti)
+
+    assert [t.name for t in registry.standard_types()] == ["std_1239x495", "std_826x495", "std_413x495"]
+    large = registry[registry.resolve("std_1239x495")]
+    assert (large.id, large.width, large.height, large.letter) == (0, 1239, 495, "A")
+    assert large.moraletti.count == 3 and registry[2].moraletti.count == 1
+
+    assert registry.resolve("std_826x495") == registry.intern(826.0, 495) == 1
+    assert registry.resolve("custom") is None and registry.resolve("std_12x") is None
+    assert registry.resolve_block({"type": "medium", "height": 495}) == 1
+    short = registry[registry.resolve("std_413x300")]
+    assert (short.id, short.letter) == (3, "C") and len(registry) == 4
+    assert registry.letter_for_width(1236) is None and registry.letter_for_width(1236, 5) == "A"
+
+
+def test_summary_type_map_and_schema_share_registry():
+    """Stessi nomi e lettere in riassunto, tabella DXF e schema personalizzato"""
+    from exporters.dxf_exporter import _create_html_compatible_type_map
+    from utils.config import create_custom_block_schema
+
+    placed = [{"type": t} for t in ("std_1239x495", "custom", "std_826x495", "std_1239x495")]
+    assert summarize_blocks(placed) == {"std_1239x495": 2, "custom": 1, "std_826x495": 1}
+    with contextlib.redirect_stdout(io.StringIO()):
+        mapped = summarize_blocks(placed, {"1500": "A", "900": "B", "400": "C"})
+        type_map = _create_html_compatible_type_map({"size_to_letter": {"1500": "A", "900": "B"},
+                                                     "block_height": 495})
+        default_map = _create_html_compatible_type_map(None)
+    assert mapped == {"std_1500x495": 2, "custom": 1, "std_900x495": 1}
+    assert type_map["std_1500x495"] == {'name': 'Categoria A', 'size': '1500 x 495', 'category': 'A',
+                                        'width': 1500, 'height': 495}
+    assert [v["category"] for v in default_map.values()] == ["A", "B", "C"]
+
+    schema = create_custom_block_schema([500, 1500, 900], 400)
+    assert schema["size_to_letter"] == {1500: "A", 900: "B", 500: "C"}
+    registry = BlockTypeRegistry(schema["block_widths"], schema["block_height"], schema["size_to_letter"])
+    assert [t.name for t in registry.standard_types()] == ["std_1500x400", "std_900x400", "std_500x400"]
+
+
+def test_small_algorithm_types_resolved_by_registry():
+    """pack_wall small: tutti i tipi standard risolvibili, con layout moraletti"""
+    from core.wall_builder import pack_wall
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        placed, _ = pack_wall(box(0, 0, 5000, 1485), [1239, 826, 413], 495,
+                              algorithm_type="small", moraletti_config=FRONTEND)
+    registry = get_block_type_registry([1239, 826, 413], 495,
+                                       moraletti_config=moraletti_backend_config(FRONTEND, [1239, 826, 413], 495))
+    for block in placed:
+        block_type = registry[registry.resolve(block["type"])]
+        assert block_type.name == block["type"] and block_type.width == block["width"]
+    assert {registry[registry.resolve(b["type"])].letter for b in placed} <= {"A", "B", "C"}
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test cache del catalogo materiali
+=================================
+
+Testa:
+1. Letture ripetute servite dalla cache, copie indipendenti
+2. Scritture (materiali, guide, template) che invalidano tramite la versione nel DB
+3. Coerenza tra processi: altra cache sullo stesso DB entro il ttl
+"""
+
+import sys
+sys.path.append('.')
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database.material_services as services
+from database.catalogue_cache import CatalogueCache, bump_catalogue_version, read_catalogue_version
+from database.material_models import Base, GuideType, Material, MaterialType
+
+
+@pytest.fixture
+def catalogue(monkeypatch):
+    """DB SQLite in memoria con contatore delle query SELECT sul catalogo."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "catalogue_version" not in statement:
+            queries.append(statement)
+
+    @contextmanager
+    def session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    cache = CatalogueCache(session, ttl_s=60)
+    for name in ("get_all_materials", "get_material_by_id", "get_all_guides", "get_all_templates"):
+        owner = services.GuideService if "guide" in name else (
+            services.MaterialTemplateService if "template" in name else services.MaterialService)
+        original = getattr(owner, name).__wrapped__
+        monkeypatch.setattr(owner, name, staticmethod(cache.read_through(original)))
+    monkeypatch.setattr(services, "get_db_session", session)
+    monkeypatch.setattr(services, "catalogue_cache", cache)
+    return cache, session, queries
+
+
+def test_reads_are_served_from_cache(catalogue):
+    """Seconda lettura senza query; modificare il risultato non tocca la cache"""
+    cache, _, queries = catalogue
+    created = services.MaterialService.create_material("MDF", MaterialType.MDF, [12, 18], 750.0)
+
+    first = services.MaterialService.get_all_materials()
+    executed = len(queries)
+    first[0]["name"] = "modificato"
+    second = services.MaterialService.get_all_materials()
+
+    assert len(queries) == executed
+    assert second[0]["name"] == "MDF"
+    assert services.MaterialService.get_material_by_id(created["id"])["available_thicknesses"] == [12, 18]
+    assert cache.stats()["hits"] == 1
+
+
+def test_writes_invalidate_through_version(catalogue):
+    """create_material/create_guide/template incrementano la versione e svuotano la cache"""
+    cache, session, _ = catalogue
+    assert services.GuideService.get_all_guides() == []
+    services.GuideService.create_guide("Guida 75", GuideType.GUIDE_75MM, 75, 25, 40.0)
+    assert [g["name"] for g in services.GuideService.get_all_guides()] == ["Guida 75"]
+
+    services.MaterialTemplateService.create_default_templates()
+    assert len(services.MaterialTemplateService.get_all_templates()) == 3
+    services.MaterialTemplateService.create_default_templates()  # già presenti: nessuna scrittura
+
+    with session() as db:
+        assert read_catalogue_version(db) == 2
+    assert cache.stats()["version"] == 2
+
+
+def test_other_process_writes_seen_after_ttl(catalogue):
+    """Scrittura da un altro processo: visibile alla scadenza del ttl, non prima"""
+    cache, session, _ = catalogue
+    services.MaterialService.create_material("OSB", MaterialType.OSB, [12], 600.0)
+    assert len(services.MaterialService.get_all_materials()) == 1
+
+    # Un altro worker scrive sullo stesso DB: questa cache non viene avvisata
+    with session() as db:
+        db.add(Material(name="Truciolato", type=MaterialType.TRUCIOLATO, available_thicknesses="[18]"))
+        bump_catalogue_version(db)
+        db.commit()
+
+    assert len(services.MaterialService.get_all_materials()) == 1
+    cache.ttl_s = 0
+    assert len(services.MaterialService.get_all_materials()) == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
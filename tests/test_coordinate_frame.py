@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test normalizzazione coordinate in origine locale
+=================================================
+
+Testa:
+1. Traslazione dei disegni georeferenziati (MARINA_ROTTINI_A1,2)
+2. Nessuna modifica per disegni già locali
+3. Ripristino coordinate disegno nell'export JSON
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+from pathlib import Path
+
+from shapely.geometry import Polygon, box
+
+from exporters.json_exporter import export_to_json
+from parsers.svg import parse_svg_wall
+from utils.coordinate_frame import IDENTITY_FRAME, LocalFrame, frame_from_session, normalize_to_local_origin
+
+TEST_DIR = Path(__file__).parent
+
+
+def test_georeferenced_drawing_is_normalized():
+    """Il disegno MARINA_ROTTINI viene riportato vicino all'origine"""
+    wall, apertures = parse_svg_wall((TEST_DIR / "MARINA_ROTTINI_A1,2.svg").read_bytes())
+    local_wall, local_apertures, frame = normalize_to_local_origin(wall, apertures)
+
+    assert not frame.is_identity
+    assert local_wall.bounds[:2] == (0.0, 0.0)
+    assert abs(local_wall.area - wall.area) < 1e-3
+    assert len(local_apertures) == len(apertures)
+    assert frame.to_world(local_wall).equals_exact(wall, 1e-6)
+
+
+def test_local_drawing_untouched():
+    """Disegni con coordinate piccole non vengono traslati"""
+    wall = box(100, 50, 8100, 2750)
+    aperture = box(1000, 50, 2000, 2150)
+
+    local_wall, local_apertures, frame = normalize_to_local_origin(wall, [aperture])
+
+    assert frame is IDENTITY_FRAME
+    assert local_wall is wall
+    assert local_apertures[0] is aperture
+
+
+def test_json_export_restores_world_coordinates():
+    """L'export JSON applica la traslazione inversa a blocchi e geometrie custom"""
+    frame = LocalFrame(7607919.215, 10386616.677)
+    placed = [{"type": "std_1239x495", "width": 1239, "height": 495, "x": 0.0, "y": 0.0}]
+    custom_poly = Polygon([(1239, 0), (1500, 0), (1500, 495), (1239, 495)])
+    customs = [{
+        "type": "custom", "ctype": 1, "width": 261, "height": 495, "x": 1239.0, "y": 0.0,
+        "geometry": json.loads(json.dumps(custom_poly.__geo_interface__)),
+    }]
+
+    path = export_to_json({"std_1239x495": 1}, customs, placed, out_path="test_coordinate_frame.json",
+                          local_frame=frame)
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    Path(path).unlink()
+
+    std = next(iter(data["standard"].values()))
+    assert (std["x"], std["y"]) == (round(frame.origin_x), round(frame.origin_y))
+    first_vertex = data["custom"][0]["geometry"]["coordinates"][0][0]
+    assert abs(first_vertex[0] - (1239 + frame.origin_x)) < 1e-6
+    # I blocchi della sessione restano in coordinate locali
+    assert placed[0]["x"] == 0.0
+
+
+def test_frame_from_session_roundtrip():
+    """Il frame sopravvive alla serializzazione nei progetti salvati"""
+    frame = LocalFrame(10.5, -20.25)
+    assert frame_from_session({"local_frame": frame}) is frame
+    assert frame_from_session({"local_frame": frame.to_dict()}) == frame
+    assert frame_from_session({}) is IDENTITY_FRAME
+
+
+if __name__ == "__main__":
+    test_georeferenced_drawing_is_normalized()
+    test_local_drawing_untouched()
+    test_json_export_restores_world_coordinates()
+    test_frame_from_session_roundtrip()
+    print("✅ Tutti i test coordinate locali passati")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test stima costi su griglia materiale × spessore × guida
+========================================================
+
+Testa:
+1. Quantità, costi, validità e punteggi identici al calcolo scalare per parete
+2. Classifica: valide e compatibili prima, poi punteggio e costo
+3. Opzioni dal catalogo e pareti da risultati di packing
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+
+import pytest
+
+from core.auto_measurement import AutoMeasurementCalculator, GuideSpec
+from core.cost_estimator import (
+    GuideOption,
+    MaterialOption,
+    estimate_project_grid,
+    options_from_catalogue,
+    wall_dimensions_from,
+)
+
+CALC = AutoMeasurementCalculator()
+STRUCTURAL_ORDER = ["Eccellente", "Buono", "Accettabile", "Insufficiente"]
+
+
+def _grid(rng):
+    materials = [MaterialOption(f"M{i}", tuple(sorted(rng.sample([8, 10, 14, 18, 22, 25, 30], 3))),
+                                rng.uniform(400, 900), cost_per_m3=rng.choice([400, 550]))
+                 for i in range(3)]
+    guides = [GuideOption(f"G{w}", GuideSpec(w, 25, rng.uniform(20, 80), f"{w}mm"), rng.choice([15, 22.5]))
+              for w in (50, 75, 100)]
+    walls = [{"width_mm": rng.uniform(800, 9000), "height_mm": rng.uniform(1000, 4200)}
+             for _ in range(rng.randint(1, 4))]
+    return materials, guides, walls
+
+
+def test_grid_matches_scalar_calculation():
+    """Ogni riga = somma/minimo dei calcoli scalari parete per parete"""
+    rng = random.Random(49)
+    for _ in range(15):
+        materials, guides, walls = _grid(rng)
+        table = estimate_project_grid(walls, materials, guides)
+        assert table.combinations == len(table.rows) == sum(len(m.thicknesses_mm) for m in materials) * 3
+
+        for row in table.rows:
+            material = row.material.spec(row.thickness_mm)
+            guide = row.guide.spec
+            volume = weight = cost = 0.0
+            scores, ratings = [], []
+            for wall in walls:
+                moretti = CALC.calculate_moretti_dimensions(
+                    2700, row.closure_thickness_mm, int(wall["height_mm"] / 495))
+                req = CALC.calculate_material_requirements(wall, material, guide, moretti)
+                expected_cost = CALC._estimate_project_cost(
+                    req["totals"]["volume_m3"], req["guides"]["length_m"],
+                    row.material.cost_per_m3, row.guide.price_per_meter)
+                validation = CALC.validate_measurement_combination(material, guide, wall)
+                volume += req["totals"]["volume_m3"]
+                weight += req["totals"]["weight_kg"]
+                cost += expected_cost["total_cost"]
+                scores.append(validation["overall_score"])
+                ratings.append(validation["structural_rating"])
+                assert row.valid == validation["valid"]
+                assert row.cost_rating == validation["cost_rating"]
+
+            assert row.volume_m3 == pytest.approx(volume)
+            assert row.weight_kg == pytest.approx(weight)
+            assert row.total_cost == pytest.approx(cost, abs=0.01 * len(walls))
+            assert row.overall_score == min(scores) == scores[row.governing_wall]
+            assert row.structural_rating == max(ratings, key=STRUCTURAL_ORDER.index)
+
+
+def test_ranking_and_limit():
+    """Valide prima, punteggio decrescente, costo crescente; limite sulle righe"""
+    rng = random.Random(7)
+    materials, guides, walls = _grid(rng)
+    thin = MaterialOption("Sottile", (8,), material_type="altro")
+    only_mdf = GuideOption("Solo MDF", GuideSpec(40, 25, 60.0, "50mm"), compatible_types=("mdf",))
+    table = estimate_project_grid(walls, materials + [thin], guides + [only_mdf])
+
+    keys = [(not r.valid, -r.overall_score, r.total_cost) for r in table.rows]
+    assert keys == sorted(keys)
+    assert [r.rank for r in table.rows] == list(range(1, len(table.rows) + 1))
+    incompatible = [r for r in table.rows if not r.compatible]
+    assert incompatible and all(not r.valid for r in incompatible)
+    assert "Solo MDF" in incompatible[0].validation["issues"][-1]
+    assert any(r.valid for r in table.rows) and table.best.valid
+
+    top = estimate_project_grid(walls, materials + [thin], guides + [only_mdf], limit=3)
+    assert [r.to_dict() for r in top.rows] == [r.to_dict() for r in table.rows[:3]]
+    assert top.combinations == table.combinations
+
+
+def test_catalogue_options_and_wall_sources():
+    """Dizionari del catalogo, filtro spessori, pareti da wall_bounds"""
+    materials = [{"name": "Truciolato", "type": "truciolato", "available_thicknesses": [10, 14, 18],
+                  "density_kg_m3": None},
+                 {"name": "MDF", "type": "mdf", "available_thicknesses": [22], "density_kg_m3": 750.0}]
+    guides = [{"name": "Guida 75", "type": "75mm", "width_mm": 75, "depth_mm": 25, "max_load_kg": 40.0,
+               "material_compatibility": ["truciolato"], "price_per_meter": 18.0}]
+    material_options, guide_options = options_from_catalogue(materials, guides, thicknesses_mm=[14, 18])
+    assert [(m.name, m.thicknesses_mm, m.density_kg_m3) for m in material_options] == [
+        ("Truciolato", (14, 18), 650.0)]
+    assert guide_options[0].price_per_meter == 18.0 and guide_options[0].accepts(material_options[0])
+
+    wall = wall_dimensions_from({"wall_bounds": [100, 0, 5100, 2700], "blocks_standard": []})
+    assert wall == {"width_mm": 5000, "height_mm": 2700}
+    table = estimate_project_grid([wall], material_options, guide_options)
+    assert [r.closure_thickness_mm for r in table.rows if r.thickness_mm == 14] == [103]
+    assert table.to_dict()["rows"][0]["cost_estimate"]["currency"] == "EUR"
+
+    with pytest.raises(ValueError):
+        estimate_project_grid([{"width_mm": 0, "height_mm": 2700}], material_options, guide_options)
+    with pytest.raises(ValueError):
+        estimate_project_grid([], material_options, guide_options)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test DXF con definizioni BLOCK
+==============================
+
+Testa:
+1. Un BLOCK per tipo standard, un INSERT per blocco posato con numero come attributo
+2. Pezzi custom con la stessa geometria condividono la definizione
+"""
+
+import sys
+sys.path.append('.')
+
+import pytest
+from shapely.geometry import box
+
+from exporters.dxf_exporter import EZDXF_AVAILABLE, export_to_dxf
+
+pytestmark = pytest.mark.skipif(not EZDXF_AVAILABLE, reason="ezdxf non disponibile")
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _custom(x, y, w, h):
+    return {"type": "custom", "ctype": 2, "x": x, "y": y, "width": w, "height": h,
+            "geometry": box(x, y, x + w, y + h).__geo_interface__}
+
+
+def _export(tmp_path, monkeypatch):
+    import ezdxf
+
+    monkeypatch.chdir(tmp_path)
+    wall = box(0, 0, 6000, 990)
+    placed = [{"type": "std_1239x495", "x": x, "y": y, "width": 1239, "height": 495}
+              for y in (0, 495) for x in (0, 1239, 2478)]
+    placed.append({"type": "std_826x495", "x": 3717, "y": 0, "width": 826, "height": 495})
+    customs = [_custom(4543, 0, 300, 495), _custom(4543, 495, 300, 495), _custom(4843, 0, 157, 495)]
+    path = export_to_dxf({"std_1239x495": 6, "std_826x495": 1}, customs, placed, wall,
+                         out_path="blocchi.dxf", block_config={"size_to_letter": SIZE_TO_LETTER})
+    return ezdxf.readfile(path), placed, customs
+
+
+def test_standard_blocks_are_inserts(tmp_path, monkeypatch):
+    """Nessuna polilinea per blocco: INSERT di un BLOCK per dimensione"""
+    doc, placed, _ = _export(tmp_path, monkeypatch)
+    msp = doc.modelspace()
+
+    assert len(msp.query('LWPOLYLINE[layer=="BLOCCHI_STD"]')) == 0
+    inserts = msp.query('INSERT[layer=="BLOCCHI_STD"]')
+    assert len(inserts) == len(placed)
+    assert {ref.dxf.name for ref in inserts} == {"STD_1239x495_A", "STD_826x495_B"}
+
+    numbers = sorted(ref.get_attrib_text("NUMERO") for ref in inserts
+                     if ref.dxf.name == "STD_1239x495_A")
+    assert numbers == ["1", "2", "3", "4", "5", "6"]
+
+    definition = doc.blocks.get("STD_1239x495_A")
+    assert len(definition.query("LWPOLYLINE")) == 1
+    assert [text.dxf.text for text in definition.query("TEXT")] == ["A"]
+    assert [attdef.dxf.tag for attdef in definition.query("ATTDEF")] == ["NUMERO", "ETICHETTA"]
+
+
+def test_customs_share_definition_by_geometry(tmp_path, monkeypatch):
+    """Due custom 300x495 in punti diversi: un solo BLOCK, due INSERT"""
+    doc, _, customs = _export(tmp_path, monkeypatch)
+    inserts = doc.modelspace().query('INSERT[layer=="BLOCCHI_CUSTOM"]')
+
+    assert len(inserts) == len(customs)
+    names = [ref.dxf.name for ref in inserts]
+    assert names[0] == names[1] and names[2] != names[0]
+    assert all(name.startswith("CU_") for name in names)
+    assert (inserts[1].dxf.insert.x, inserts[1].dxf.insert.y) != (inserts[0].dxf.insert.x, inserts[0].dxf.insert.y)
+    assert inserts[0].get_attrib_text("NUMERO") != inserts[1].get_attrib_text("NUMERO")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
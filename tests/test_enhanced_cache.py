@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test cache dei parametri enhanced
+=================================
+
+Testa:
+1. Risultato memorizzato identico al calcolo diretto, copie indipendenti
+2. Chiave su configurazione normalizzata e dimensioni parete
+3. LRU limitata, statistiche e cache condivisa tra richieste
+"""
+
+import sys
+sys.path.append('.')
+
+import contextlib
+import io
+
+from shapely.geometry import box
+
+import core.enhanced_packing as enhanced
+from core.enhanced_packing import EnhancedPackingCalculator, EnhancedParametersCache
+
+CONFIG = {
+    "material_thickness_mm": 14,
+    "guide_width_mm": 75,
+    "guide_type": "75mm",
+    "is_attached_to_existing": True,
+    "fixed_walls": [{"position": "right"}],
+    "ceiling_height_mm": 2700
+}
+WALL = box(0, 0, 5000, 2700)
+
+
+def test_cached_result_matches_direct_computation():
+    """Hit uguale al calcolo completo; modificare una copia non tocca la cache"""
+    calculator = EnhancedPackingCalculator(cache=EnhancedParametersCache())
+    first = calculator.calculate_enhanced_packing_parameters(CONFIG, WALL)
+    first["mounting_strategy"]["special_considerations"].append("modificato")
+    first["closure_calculation"]["closure_thickness_mm"] = 0
+
+    second = calculator.calculate_enhanced_packing_parameters(dict(reversed(list(CONFIG.items()))), WALL)
+    direct = calculator._compute_enhanced_parameters(CONFIG, second["wall_dimensions"])
+    assert second == direct
+    assert second["closure_calculation"]["closure_thickness_mm"] == 103
+    assert calculator.cache.stats().hits == 1
+
+
+def test_key_distinguishes_config_and_wall():
+    """Valori diversi (anche 14 vs 14.0) o pareti diverse sono chiavi diverse"""
+    cache = EnhancedParametersCache()
+    calculator = EnhancedPackingCalculator(cache=cache)
+    thin = calculator.calculate_enhanced_packing_parameters(CONFIG, WALL)
+    as_float = calculator.calculate_enhanced_packing_parameters(dict(CONFIG, material_thickness_mm=14.0), WALL)
+    thick = calculator.calculate_enhanced_packing_parameters(dict(CONFIG, material_thickness_mm=18), WALL)
+    wide = calculator.calculate_enhanced_packing_parameters(CONFIG, box(0, 0, 6000, 2700))
+
+    assert cache.stats().misses == 4 and cache.stats().hits == 0
+    assert thin["closure_calculation"]["formula"] == "14 + 75 + 14 = 103"
+    assert as_float["closure_calculation"]["formula"] != thin["closure_calculation"]["formula"]
+    assert thick["closure_calculation"]["closure_thickness_mm"] == 111
+    assert wide["wall_dimensions"]["width_mm"] == 6000
+
+
+def test_lru_stats_and_shared_cache(monkeypatch):
+    """Oltre la capacità si scarta la meno usata; le richieste condividono la cache"""
+    cache = EnhancedParametersCache(max_size=2)
+    calculator = EnhancedPackingCalculator(cache=cache)
+    for width in (1000, 2000, 1000, 3000, 1000, 2000):
+        calculator.calculate_enhanced_packing_parameters(CONFIG, box(0, 0, width, 2700))
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 4, 2, 2)
+    assert stats.to_dict()["hit_rate"] == round(2 / 6, 4)
+
+    monkeypatch.setattr(enhanced, "_shared_cache", EnhancedParametersCache())
+    packing_result = {"wall_bounds": [0, 0, 5000, 2700], "blocks_standard": [], "blocks_custom": []}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(3):
+            enhanced.enhance_packing_with_automatic_measurements(packing_result, CONFIG)
+    assert enhanced.get_enhanced_cache_stats()["hits"] == 2
+    enhanced.clear_enhanced_cache()
+    assert enhanced.get_enhanced_cache_stats()["size"] == 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
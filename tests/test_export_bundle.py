@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test bundle di export multi-formato
+===================================
+
+Testa:
+1. Un archivio ZIP con tutti i formati richiesti, nomi coerenti
+2. Etichette calcolate una volta sola per tutti i formati
+3. Validazione della lista formati
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import zipfile
+
+import pytest
+from shapely.geometry import box
+
+import exporters.labels as labels
+from exporters.bundle import DEFAULT_BUNDLE_FORMATS, ExportInput, export_bundle, parse_bundle_formats
+from exporters.dxf_exporter import EZDXF_AVAILABLE
+from exporters.pdf_exporter import REPORTLAB_AVAILABLE
+from utils.scene_graph import build_scene_graph
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _export_input():
+    wall = box(0, 0, 3000, 990)
+    placed = [{"type": "std_1239x495", "x": x, "y": y, "width": 1239, "height": 495}
+              for y in (0, 495) for x in (0, 1239)]
+    customs = [{"type": "custom", "ctype": 2, "x": 2478, "y": y, "width": 522, "height": 495,
+                "geometry": box(2478, y, 3000, y + 495).__geo_interface__} for y in (0, 495)]
+    config = {"size_to_letter": SIZE_TO_LETTER, "project_name": "Bundle"}
+    graph = build_scene_graph(wall, placed, customs, [], SIZE_TO_LETTER)
+    return ExportInput(summary={"std_1239x495": 4}, customs=customs, placed=placed, wall_polygon=wall,
+                       apertures=[], config=config, params={}, project_name="Bundle", scene_graph=graph)
+
+
+@pytest.mark.skipif(not (EZDXF_AVAILABLE and REPORTLAB_AVAILABLE), reason="ezdxf/reportlab non disponibili")
+@pytest.mark.parametrize("parallel", [False, True])
+def test_bundle_contains_all_formats(tmp_path, monkeypatch, parallel):
+    """JSON, PDF e DXF nello stesso archivio, senza ricalcolare le etichette"""
+    monkeypatch.chdir(tmp_path)
+    export = _export_input()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("etichette ricalcolate")
+
+    monkeypatch.setattr(labels, "create_detailed_block_labels", fail)
+
+    path = export_bundle(export, ("json", "json-compact", "pdf", "dxf"), tag="abcd1234",
+                         timestamp="20250101_120000", parallel=parallel)
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        assert names == [
+            "distinta_abcd1234_20250101_120000.json",
+            "distinta_compatta_abcd1234_20250101_120000.json",
+            "distinta_base_abcd1234_20250101_120000.pdf",
+            "schema_abcd1234_20250101_120000.dxf",
+        ]
+        pretty = json.loads(archive.read(names[0]))
+        assert json.loads(archive.read(names[1])) == pretty
+        assert archive.read(names[2]).startswith(b"%PDF")
+        assert b"SECTION" in archive.read(names[3])
+
+    assert sorted(pretty["standard"]) == sorted(block.label.text for block in export.scene_graph.blocks)
+
+
+def test_format_list_validation():
+    """Lista vuota → predefiniti; duplicati rimossi; formati ignoti rifiutati"""
+    assert parse_bundle_formats(None) == DEFAULT_BUNDLE_FORMATS
+    assert parse_bundle_formats("PDF, json,pdf") == ("pdf", "json")
+    with pytest.raises(ValueError):
+        parse_bundle_formats("json,docx")
+    with pytest.raises(ValueError):
+        parse_bundle_formats(" , ")
+    with pytest.raises(ValueError):
+        export_bundle(_export_input(), ("svg",))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test export JSON in streaming
+=============================
+
+Testa:
+1. Modalità pretty identica a json.dump(indent=2, sort_keys=True)
+2. Modalità compact con lo stesso contenuto, senza spazi
+3. Etichette prese dal grafo di scena senza ricalcolo
+4. Grafo di un altro risultato ignorato (etichette ricalcolate)
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+
+import pytest
+from shapely.geometry import box
+
+from exporters.json_exporter import JSON_SCHEMA_VERSION, export_to_json
+from utils.scene_graph import build_scene_graph
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _sample():
+    placed = [{"type": "std_1239x495", "x": x, "y": y, "width": 1239, "height": 495}
+              for y in (0.0, 495.0) for x in (0.0, 1239.0)]
+    customs = [{"type": "custom", "ctype": 2, "x": 2478.0, "y": y, "width": 300.5, "height": 495,
+                "geometry": box(2478, y, 2778.5, y + 495).__geo_interface__}
+               for y in (0.0, 495.0)]
+    return {"std_1239x495": len(placed)}, customs, placed
+
+
+def test_pretty_and_compact_modes(tmp_path, monkeypatch):
+    """Stesso documento nelle due modalità, formattazione pretty invariata"""
+    monkeypatch.chdir(tmp_path)
+    summary, customs, placed = _sample()
+    config = {"size_to_letter": SIZE_TO_LETTER}
+
+    pretty = open(export_to_json(summary, customs, placed, out_path="pretty.json", params={"passo": 826},
+                                 block_config=config), encoding="utf-8").read()
+    compact = open(export_to_json(summary, customs, placed, out_path="compact.json", params={"passo": 826},
+                                  block_config=config, mode="compact"), encoding="utf-8").read()
+
+    data = json.loads(pretty)
+    assert pretty == json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
+    assert json.loads(compact) == data
+    assert "\n" not in compact and ": " not in compact
+
+    assert data["schema_version"] == JSON_SCHEMA_VERSION
+    assert sorted(data["standard"]) == ["A1", "A2", "A3", "A4"]
+    assert [c["label"] for c in data["custom"]] and len(data["custom"]) == 2
+    assert data["totals"] == {"standard_counts": summary, "custom_count": 2}
+
+    with pytest.raises(ValueError):
+        export_to_json(summary, customs, placed, out_path="x.json", mode="yaml")
+
+
+def test_empty_result(tmp_path, monkeypatch):
+    """Array e mapping vuoti restano JSON valido in entrambe le modalità"""
+    monkeypatch.chdir(tmp_path)
+    for mode in ("pretty", "compact"):
+        data = json.load(open(export_to_json({}, [], [], out_path=f"vuoto_{mode}.json", mode=mode)))
+        assert data["custom"] == [] and data["standard"] == {}
+
+
+def test_labels_from_scene_graph(tmp_path, monkeypatch):
+    """Con il grafo della sessione le etichette non vengono ricalcolate"""
+    monkeypatch.chdir(tmp_path)
+    summary, customs, placed = _sample()
+    graph = build_scene_graph(box(0, 0, 3000, 990), placed, customs, [], SIZE_TO_LETTER)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("etichette ricalcolate")
+
+    monkeypatch.setattr("exporters.json_exporter.create_detailed_block_labels", fail)
+    monkeypatch.setattr("exporters.json_exporter.create_block_labels", fail)
+
+    path = export_to_json(summary, customs, placed, out_path="grafo.json",
+                          block_config={"size_to_letter": SIZE_TO_LETTER}, scene_graph=graph)
+    data = json.load(open(path, encoding="utf-8"))
+    assert sorted(data["standard"]) == sorted(block.label.text for block in graph.blocks)
+    assert [c["label"] for c in data["custom"]] == [custom.label.text for custom in graph.customs]
+
+
+def test_stale_scene_graph_ignored(tmp_path, monkeypatch):
+    """Stessi blocchi standard ma custom diversi: il grafo non vale per questo risultato"""
+    monkeypatch.chdir(tmp_path)
+    summary, customs, placed = _sample()
+    config = {"size_to_letter": SIZE_TO_LETTER}
+    wall = box(0, 0, 3000, 990)
+    moved = [dict(customs[0], x=2500.0)] + customs[1:]
+
+    for graph, result_customs in (
+        (build_scene_graph(wall, placed, customs[:1], [], SIZE_TO_LETTER), customs),  # custom mancante
+        (build_scene_graph(wall, placed, customs, [], SIZE_TO_LETTER), moved),        # custom spostato
+    ):
+        path = export_to_json(summary, result_customs, placed, out_path="grafo.json",
+                              block_config=config, scene_graph=graph)
+        expected = export_to_json(summary, result_customs, placed, out_path="calcolato.json", block_config=config)
+        assert json.load(open(path, encoding="utf-8")) == json.load(open(expected, encoding="utf-8"))
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
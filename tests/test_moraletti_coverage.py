@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test validazione copertura moraletti a sweep ordinato
+=====================================================
+
+Testa:
+1. Esito e dettaglio identici al confronto moraletto × blocco
+2. Riga sotto preparata una volta e riusata per più candidati
+3. Modalità senza dettaglio: solo esito e conteggi
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+
+from utils.moraletti_alignment import (
+    DynamicMoralettiConfiguration,
+    MoralettiCoverageValidator,
+    RowMoraletti,
+)
+
+CONFIG = DynamicMoralettiConfiguration({
+    'block_large_width': 1239, 'block_large_height': 495,
+    'block_medium_width': 826, 'block_medium_height': 495,
+    'block_small_width': 413, 'block_small_height': 495,
+    'moraletti_thickness': 58, 'moraletti_height': 495,
+    'moraletti_height_from_ground': 95, 'moraletti_spacing': 420,
+    'moraletti_count_large': 3, 'moraletti_count_medium': 2, 'moraletti_count_small': 1,
+})
+
+
+def _row(rng, wall_width, gaps=False):
+    """Riga contigua di blocchi standard/custom, eventualmente con buchi."""
+    row, x = [], 0.0
+    while x < wall_width:
+        width = min(rng.choice([1239, 826, 413, rng.uniform(50, 1200)]), wall_width - x)
+        if width >= 1239:
+            width = 1238.0
+        row.append({'x': x, 'width': width, 'id': f"b{len(row)}"})
+        x += width + (rng.choice([0, 0, 40, 80]) if gaps else 0)
+    return row
+
+
+def _reference(row_below, row_above):
+    """Confronto di ogni moraletto con ogni blocco sopra (vince il primo che copre)."""
+    tolerance = CONFIG.thickness / 2
+    uncovered, coverage_map = [], {}
+    for block in row_below:
+        for moraletto in CONFIG.calculate_moraletti_for_block(block['width'], block['x'], block['id']).positions:
+            covering = next((b for b in row_above
+                             if b['x'] - tolerance <= moraletto.center_x <= b['x'] + b['width'] + tolerance), None)
+            if covering is None:
+                uncovered.append(moraletto)
+            else:
+                coverage_map[moraletto.center_x] = {'moraletto': moraletto, 'covered_by': covering}
+    return uncovered, coverage_map
+
+
+def test_sweep_matches_reference():
+    """Righe casuali, anche con buchi: stessi scoperti e stessa coverage_map"""
+    rng = random.Random(11)
+    validator = MoralettiCoverageValidator(CONFIG)
+    for _ in range(300):
+        wall = rng.uniform(500, 8000)
+        below, above = _row(rng, wall), _row(rng, wall, gaps=True)
+        uncovered, coverage_map = _reference(below, above)
+
+        result = validator.validate_complete_coverage(below, above)
+        assert result['uncovered_moraletti'] == uncovered
+        assert result['coverage_map'] == coverage_map
+        assert result['is_complete'] == (not uncovered)
+        assert result['uncovered_count'] == len(uncovered)
+
+
+def test_prepared_row_reused_without_details():
+    """Una riga preparata serve tutti i candidati; senza dettaglio niente mappe"""
+    rng = random.Random(5)
+    validator = MoralettiCoverageValidator(CONFIG)
+    below = _row(rng, 4000)
+    prepared = validator.prepare_row(below)
+
+    assert isinstance(prepared, RowMoraletti)
+    assert list(prepared.centers) == sorted(validator.get_moraletti_positions_for_row(below))
+
+    for _ in range(50):
+        above = _row(rng, 4000, gaps=True)
+        quick = validator.validate_complete_coverage(prepared, above, detailed=False)
+        full = validator.validate_complete_coverage(below, above)
+        assert 'coverage_map' not in quick and 'uncovered_moraletti' not in quick
+        assert {k: full[k] for k in quick} == quick
+
+    empty = validator.validate_complete_coverage([], [{'x': 0, 'width': 100}], detailed=False)
+    assert empty['is_complete'] and empty['total_moraletti'] == 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
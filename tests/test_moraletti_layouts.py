@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test layout moraletti precompilati
+==================================
+
+Testa:
+1. Posizioni identiche al calcolo per blocco (standard e custom casuali)
+2. Tabella immutabile e memorizzata, errori per custom fuori regola
+3. Card del preview con gli stessi conteggi del packer
+"""
+
+import sys
+sys.path.append('.')
+
+import math
+import random
+
+import pytest
+
+import utils.moraletti_alignment as alignment
+from utils.moraletti_alignment import DEFAULT_MORALETTI_CONFIG, DynamicMoralettiConfiguration
+
+
+def _reference_centers(config, width, x):
+    """Regola originale: primo moraletto sul bordo destro, poi ogni spacing verso sinistra."""
+    count = min(math.floor(width / config.spacing) + 1, config.get_block_info(width)['max_moraletti'])
+    return [x + (width - i * config.spacing) for i in range(count)]
+
+
+def test_layout_positions_match_rule():
+    """Centri e range uguali alla formula per blocco, in qualsiasi posizione"""
+    config = DynamicMoralettiConfiguration(DEFAULT_MORALETTI_CONFIG)
+    rng = random.Random(4)
+    widths = [1239, 826, 413] + [rng.uniform(1, 1238.9) for _ in range(200)]
+    for width in widths:
+        x = rng.uniform(0, 10000)
+        block = config.calculate_moraletti_for_block(width, x, "b")
+        centers = [m.center_x for m in block.positions]
+        assert centers == _reference_centers(config, width, x)
+        assert all(m.range_end - m.range_start == pytest.approx(config.thickness) for m in block.positions)
+        assert config.layouts.layout(width).centers(x) == centers
+
+    assert config.calculate_moraletti_for_block(1239).block_type == "large"
+    assert config.calculate_moraletti_for_block(650).moraletti_count == 1
+
+
+def test_table_is_memoised_and_immutable():
+    """Stesso layout per la stessa larghezza; info restituite come copia"""
+    config = DynamicMoralettiConfiguration(DEFAULT_MORALETTI_CONFIG)
+    layout = config.layouts.layout(700.5)
+    assert config.layouts.layout(700.5) is layout
+    with pytest.raises(Exception):
+        layout.count = 5
+
+    info = config.get_block_info(700.5)
+    info['max_moraletti'] = 99
+    assert config.get_block_info(700.5)['max_moraletti'] == 1
+
+    with pytest.raises(ValueError):
+        config.get_block_info(1500)
+    assert config.layouts.count(2600) == 3  # custom di emergenza: massimo del Grande
+
+
+def test_cache_is_bounded(monkeypatch):
+    """Oltre il limite la cache custom si svuota, le standard restano"""
+    monkeypatch.setattr(alignment, "LAYOUT_CACHE_SIZE", 10)
+    config = DynamicMoralettiConfiguration(DEFAULT_MORALETTI_CONFIG)
+    standard = config.layouts.layout(826)
+    for width in range(100, 130):
+        config.layouts.layout(float(width))
+    assert len(config.layouts._cache) <= 10
+    assert config.layouts.layout(826) is standard
+
+
+def test_preview_card_uses_packer_counts():
+    """Totale della card = somma dei conteggi della configurazione"""
+    from utils.preview_generator import _calculate_moraletti_info
+
+    config = DynamicMoralettiConfiguration(DEFAULT_MORALETTI_CONFIG)
+    placed = [{"width": w, "height": 495} for w in (1239, 1239, 826, 413)]
+    customs = [{"width": w, "height": 495} for w in (650, 650, 380, 1000)]
+    info = _calculate_moraletti_info({"config": dict(DEFAULT_MORALETTI_CONFIG)}, placed, customs)
+
+    expected = sum(config.calculate_moraletti_for_block(b["width"]).moraletti_count for b in placed + customs)
+    assert info["Quantità Totale"] == f"{expected} pezzi"
+    assert info["moraletti_per_blocco"]["custom_650×495"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
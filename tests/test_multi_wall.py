@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test estrazione multi-parete
+============================
+
+Testa:
+1. Più contorni disgiunti nel layer MURO → più pareti ordinate
+2. Assegnazione delle aperture alla parete che le contiene
+3. Disegni senza layer: contorni annidati trattati come aperture
+4. DXF con più pareti (ezdxf)
+"""
+
+import sys
+sys.path.append('.')
+
+import io
+from pathlib import Path
+
+import ezdxf
+from shapely.geometry import box
+
+from parsers import parse_wall_file_multi, split_walls
+
+MULTI_WALL_SVG = b"""<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="30000" height="5000">
+  <g id="layer_MURO">
+    <rect x="12000" y="0" width="6000" height="2500"/>
+    <rect x="0" y="0" width="8000" height="2700"/>
+    <rect x="20000" y="0" width="3000" height="2500"/>
+    <rect x="21000" y="0" width="4000" height="2500"/>
+  </g>
+  <g id="layer_BUCHI">
+    <rect x="1000" y="0" width="900" height="2100"/>
+    <rect x="14000" y="800" width="1200" height="1000"/>
+    <rect x="5000" y="800" width="1200" height="1000"/>
+    <rect x="40000" y="0" width="100" height="100"/>
+  </g>
+</svg>
+"""
+
+
+def test_svg_disjoint_walls_ordered():
+    """Tre pareti disgiunte (due contorni sovrapposti uniti) in ordine sinistra→destra"""
+    walls = parse_wall_file_multi(MULTI_WALL_SVG, "piano.svg")
+
+    assert len(walls) == 3
+    assert [wall.bounds[0] for wall, _ in walls] == [0.0, 12000.0, 20000.0]
+    assert walls[2][0].bounds == (20000.0, 0.0, 25000.0, 2500.0)
+
+    assert len(walls[0][1]) == 2
+    assert len(walls[1][1]) == 1
+    assert walls[2][1] == []
+
+
+def test_aperture_goes_to_largest_overlap():
+    """Un'apertura a cavallo di due pareti va a quella con più sovrapposizione"""
+    left, right = box(0, 0, 1000, 1000), box(1050, 0, 2000, 1000)
+    aperture = box(800, 0, 1100, 500)
+
+    walls = split_walls([right, left], [aperture])
+
+    assert walls[0][0].equals(left)
+    assert walls[0][1] == [aperture]
+    assert walls[1][1] == []
+
+
+def test_generic_svg_nested_outlines_are_apertures():
+    """Senza layer i rettangoli annidati diventano aperture, non pareti"""
+    svg = (Path(__file__).parent.parent / "test" / "test_wall_simple.svg").read_bytes()
+    walls = parse_wall_file_multi(svg, "test_wall_simple.svg")
+
+    assert len(walls) == 1
+    assert walls[0][0].bounds == (0.0, 0.0, 10000.0, 3000.0)
+    assert len(walls[0][1]) == 3
+
+
+def test_dxf_multi_wall():
+    """DXF con due polilinee chiuse nel layer MURO"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (5000, 0), (5000, 2500), (0, 2500)], close=True, dxfattribs={"layer": "MURO"})
+    msp.add_lwpolyline([(8000, 0), (12000, 0), (12000, 2500), (8000, 2500)], close=True,
+                       dxfattribs={"layer": "MURO"})
+    msp.add_lwpolyline([(9000, 500), (10000, 500), (10000, 1500), (9000, 1500)], close=True,
+                       dxfattribs={"layer": "BUCHI"})
+    stream = io.StringIO()
+    doc.write(stream)
+
+    walls = parse_wall_file_multi(stream.getvalue().encode("utf-8"), "piano.dxf")
+
+    assert len(walls) == 2
+    assert walls[0][0].bounds == (0.0, 0.0, 5000.0, 2500.0)
+    assert walls[0][1] == []
+    assert len(walls[1][1]) == 1
+
+
+if __name__ == "__main__":
+    test_svg_disjoint_walls_ordered()
+    test_aperture_goes_to_largest_overlap()
+    test_generic_svg_nested_outlines_are_apertures()
+    test_dxf_multi_wall()
+    print("✅ Tutti i test multi-parete passati")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test regressione corpus parser
+==============================
+
+Testa:
+1. Tutte le strategie di parsing sul corpus tests/ e test/ contro i golden
+2. Generatore di disegni di stress (entità, spline, linee esplose)
+"""
+
+import sys
+sys.path.append('.')
+
+from parser_corpus import (
+    STRESS_KINDS,
+    compare_with_golden,
+    generate_stress_dxf,
+    generate_stress_svg,
+    load_golden,
+    run_corpus,
+    run_strategy,
+)
+
+
+def test_corpus_matches_golden():
+    """Area, aperture e validità invariati rispetto ai golden salvati"""
+    golden = load_golden()
+    assert golden, "golden mancanti: esegui python tests/parser_corpus.py run --update"
+
+    differences, latency = compare_with_golden(run_corpus(), golden)
+
+    for line in latency:
+        print(f"⏱️  {line}")
+    assert differences == []
+
+
+def test_stress_svg_generator():
+    """I disegni SVG di stress vengono parsati con i valori attesi"""
+    entities = run_strategy("svg_stream", generate_stress_svg("entities", 40), "stress.svg")
+    assert entities["status"] == "ok"
+    assert entities["aperture_count"] == 40
+    assert entities["wall_area"] == 12000.0 * 3000.0
+
+    for kind in STRESS_KINDS:
+        record = run_strategy("svg_stream", generate_stress_svg(kind, 40), "stress.svg")
+        assert record["status"] == "ok" and record["valid"], (kind, record)
+
+
+def test_stress_dxf_generator():
+    """I disegni DXF di stress vengono parsati dal parser diretto"""
+    for kind in STRESS_KINDS:
+        record = run_strategy("universal", generate_stress_dxf(kind, 40), "stress.dxf")
+        assert record["status"] == "ok" and record["valid"], (kind, record)
+
+
+if __name__ == "__main__":
+    test_corpus_matches_golden()
+    test_stress_svg_generator()
+    test_stress_dxf_generator()
+    print("✅ Corpus parser conforme")
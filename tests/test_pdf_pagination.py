@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test assemblaggio PDF multipagina
+=================================
+
+Testa:
+1. Paginazione calcolata dal contenuto ("Pag. X/N" coerente col documento)
+2. Parti delle pagine restituite nell'ordine dei task
+"""
+
+import sys
+sys.path.append('.')
+
+import base64
+import re
+import zlib
+
+from shapely.geometry import box
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _project(n_customs):
+    wall = box(0, 0, 30000, 990)
+    placed = [{"type": "std_1239x495", "x": x * 1239, "y": y * 495, "width": 1239, "height": 495}
+              for y in (0, 1) for x in range(20)]
+    # Larghezze tutte diverse: una riga di distinta per pezzo custom
+    customs = [{"type": "custom", "ctype": 2, "x": 24780, "y": 0, "width": 90 + i * 7, "height": 495,
+                "geometry": box(24780, 0, 24870 + i * 7, 495).__geo_interface__}
+               for i in range(n_customs)]
+    return {"std_1239x495": len(placed)}, customs, placed, wall
+
+
+def _page_texts(data):
+    """Testo dei content stream (ASCII85 + Flate) del PDF reportlab."""
+    text = b""
+    for match in re.finditer(rb"stream\r?\n(.*?)endstream", data, re.S):
+        raw = match.group(1).strip()
+        try:
+            if raw.endswith(b"~>"):
+                raw = base64.a85decode(raw, adobe=True)
+            text += zlib.decompress(raw)
+        except Exception:
+            continue
+    return text
+
+
+def test_page_count_follows_content(tmp_path, monkeypatch):
+    """Tabelle custom lunghe: più di 4 pagine, footer con il totale reale"""
+    from exporters.pdf_exporter import export_to_pdf_professional_multipage
+
+    monkeypatch.chdir(tmp_path)
+    summary, customs, placed, wall = _project(150)
+    path = export_to_pdf_professional_multipage(
+        summary, customs, placed, wall, [], out_path="lunga.pdf",
+        block_config={"size_to_letter": SIZE_TO_LETTER},
+    )
+    data = open(path, "rb").read()
+    total = int(re.search(rb"/Count (\d+)", data).group(1))
+    assert total > 4
+
+    footers = re.findall(rb"Pag\. (\d+)/(\d+)", _page_texts(data))
+    assert [int(n) for n, _ in footers] == list(range(1, total + 1))
+    assert {int(t) for _, t in footers} == {total}
+
+
+def test_page_parts_in_task_order():
+    """Le parti tornano nell'ordine dei task, una per builder"""
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Table
+
+    import exporters.pdf_exporter as pdf_exporter
+
+    summary, customs, placed, wall = _project(12)
+    styles = getSampleStyleSheet()
+    parts = pdf_exporter._build_parts_sequential([
+        (pdf_exporter._build_full_summary_table, (summary, customs, wall, styles)),
+        (pdf_exporter._generate_efficiency_pie_chart_large, (summary, customs)),
+        (pdf_exporter._build_compact_custom_table, (customs, styles)),
+    ])
+
+    assert [type(part) for part in parts] == [Table, Drawing, Table]
+    assert len(parts[2]._cellvalues) == 12 + 3  # titolo, intestazione, totale
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
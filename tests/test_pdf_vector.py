@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test grafica vettoriale PDF
+===========================
+
+Testa:
+1. Schema costruttivo come Drawing reportlab con etichette testuali
+2. Grafico a torta vettoriale
+3. Report multipagina senza immagini raster incorporate
+"""
+
+import sys
+sys.path.append('.')
+
+import os
+
+from shapely.geometry import box
+
+from utils.scene_graph import build_scene_graph
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _sample():
+    wall = box(0, 0, 3000, 990)
+    placed = [{"type": "std_1239x495", "x": x, "y": y, "width": 1239, "height": 495}
+              for y in (0, 495) for x in (0, 1239)]
+    customs = [{"type": "custom", "ctype": 2, "x": 2478, "y": 0, "width": 522, "height": 495,
+                "geometry": box(2478, 0, 3000, 495).__geo_interface__}]
+    return wall, placed, customs, [box(2600, 495, 2900, 990)]
+
+
+def _strings(node):
+    from reportlab.graphics.shapes import Group, String
+    for item in getattr(node, "contents", []):
+        if isinstance(item, String):
+            yield item.text
+        elif isinstance(item, Group):
+            yield from _strings(item)
+
+
+def test_schema_drawing_has_text_labels():
+    """Etichette A1.. come testo, non pixel"""
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib.units import mm
+    from exporters.pdf_vector import SCHEMA_COMPACT, SCHEMA_FULLPAGE, wall_schema_drawing
+
+    wall, placed, customs, apertures = _sample()
+    graph = build_scene_graph(wall, placed, customs, apertures, SIZE_TO_LETTER)
+
+    full = wall_schema_drawing(graph, 260, 120, SCHEMA_FULLPAGE)
+    assert isinstance(full, Drawing)
+    assert abs(full.width - 260 * mm) < 1e-6
+    texts = set(_strings(full))
+    assert {"A1", "A2", "A3", "A4"} <= texts
+    assert SCHEMA_FULLPAGE.title in texts and "Aperture" in texts
+
+    compact = set(_strings(wall_schema_drawing(graph, 170, 110, SCHEMA_COMPACT)))
+    assert "A" in compact and "1" in compact
+
+
+def test_pie_chart_drawing():
+    """Percentuali ed etichette della torta come testo"""
+    from exporters.pdf_vector import pie_chart_drawing
+
+    drawing = pie_chart_drawing([3, 1], ["Standard\n3 pz", "Custom\n1 pz"], ("#4A90E2", "#50C878"),
+                                size_mm=80, title="Standard vs Custom", pct_decimals=1)
+    texts = list(_strings(drawing))
+    assert "75.0%" in texts and "25.0%" in texts and "3 pz" in texts
+    assert pie_chart_drawing([0, 0], ["a", "b"], ("#000000", "#FFFFFF"), 50, "vuoto") is None
+
+
+def test_multipage_pdf_without_raster_images(tmp_path, monkeypatch):
+    """Nessun XObject immagine nel PDF: schema e torta sono vettoriali"""
+    from exporters.pdf_exporter import export_to_pdf_professional_multipage
+
+    monkeypatch.chdir(tmp_path)
+    wall, placed, customs, apertures = _sample()
+    path = export_to_pdf_professional_multipage(
+        {"std_1239x495": len(placed)}, customs, placed, wall, apertures,
+        out_path="vettoriale.pdf", block_config={"size_to_letter": SIZE_TO_LETTER},
+    )
+    data = open(path, "rb").read()
+    assert os.path.getsize(path) < 100_000
+    assert b"/Subtype /Image" not in data
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
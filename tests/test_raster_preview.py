@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test renderer raster dei preview
+================================
+
+Testa:
+1. Contratto data URI PNG base64 di entrambi i generatori di preview
+2. Dimensioni immagine indipendenti dal numero di blocchi
+3. Tick degli assi "arrotondati"
+"""
+
+import sys
+sys.path.append('.')
+
+import base64
+import io
+
+from PIL import Image
+from shapely.geometry import box
+
+from exporters.image_exporter import generate_preview_image as export_preview_image
+from utils.preview_generator import generate_preview_image
+from utils.raster_preview import nice_ticks
+
+BLOCK_CONFIG = {"size_to_letter": {1239: "A", 826: "B", 413: "C"}, "block_widths": [1239, 826, 413], "block_height": 495}
+
+
+def _decode(uri: str) -> Image.Image:
+    assert uri.startswith("data:image/png;base64,")
+    return Image.open(io.BytesIO(base64.b64decode(uri.split(",", 1)[1])))
+
+
+def _grid_blocks(columns: int, rows: int):
+    return [
+        {"type": "std_1239x495", "x": c * 1239.0, "y": r * 495.0, "width": 1239, "height": 495}
+        for r in range(rows) for c in range(columns)
+    ]
+
+
+def _custom(x: float, y: float, w: float, h: float):
+    return {"type": "custom", "ctype": 2, "x": x, "y": y, "width": w, "height": h,
+            "geometry": box(x, y, x + w, y + h).__geo_interface__}
+
+
+def test_png_contract_both_generators():
+    """Entrambi i generatori restituiscono un PNG valido in data URI"""
+    wall = box(0, 0, 4956, 1485)
+    placed = _grid_blocks(3, 3)
+    customs = [_custom(3717, 0, 1239, 495)]
+    apertures = [box(4000, 600, 4600, 1200)]
+
+    for generator in (generate_preview_image, export_preview_image):
+        image = _decode(generator(wall, placed, customs, apertures, {}, BLOCK_CONFIG))
+        assert image.format == "PNG"
+        assert image.width <= 800 and image.height <= 600
+
+
+def test_size_independent_of_block_count():
+    """Stessa parete, da 1 a 400 blocchi: stessa immagine di output"""
+    wall = box(0, 0, 1239 * 20, 495 * 20)
+    few = _decode(generate_preview_image(wall, _grid_blocks(1, 1), [], [], {}, BLOCK_CONFIG))
+    many = _decode(generate_preview_image(wall, _grid_blocks(20, 20), [], [], {}, BLOCK_CONFIG))
+
+    assert few.size == many.size
+    assert few.tobytes() != many.tobytes()
+
+
+def test_nice_ticks():
+    assert nice_ticks(0, 8000) == [0, 2000, 4000, 6000, 8000]
+    assert nice_ticks(-80, 2780)[0] == 0
+    assert nice_ticks(5, 5) == [5]
+
+
+if __name__ == "__main__":
+    test_png_contract_both_generators()
+    test_size_independent_of_block_count()
+    test_nice_ticks()
+    print("✅ Tutti i test renderer raster passati")
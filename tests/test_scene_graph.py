@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test grafo di scena condiviso
+=============================
+
+Testa:
+1. Un solo build per sessione: chiave invariata → grafo riutilizzato
+2. Cambio tema senza ricostruire geometrie ed etichette
+3. Layer in ordine di disegno (z-order)
+4. Backend PNG, vettoriale, PDF e DXF alimentati dallo stesso grafo
+"""
+
+import sys
+sys.path.append('.')
+
+import os
+
+from shapely.geometry import box
+
+import exporters.labels as labels
+from utils.scene_graph import (
+    LAYER_BLOCKS,
+    LAYER_LABELS,
+    LAYER_WALL,
+    LAYER_WALL_OFFSET,
+    LAYER_WALL_ORIGINAL,
+    Z_ORDER,
+    build_scene_graph,
+    get_scene_graph,
+)
+from utils.vector_scene import build_vector_scene, scene_to_vector
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _block(x, y, width):
+    return {"type": f"std_{width}x495", "x": x, "y": y, "width": width, "height": 495}
+
+
+def _custom(x, y, w, h):
+    return {"type": "custom", "ctype": 2, "x": x, "y": y, "width": w, "height": h,
+            "geometry": box(x, y, x + w, y + h).__geo_interface__}
+
+
+def _sample():
+    wall = box(0, 0, 3000, 990)
+    placed = [_block(0, 0, 1239), _block(1239, 0, 826), _block(0, 495, 1239)]
+    customs = [_custom(2065, 0, 300, 495)]
+    apertures = [box(2000, 495, 2800, 990)]
+    return wall, placed, customs, apertures
+
+
+def test_session_graph_built_once(monkeypatch):
+    """La seconda richiesta con gli stessi blocchi non ricalcola le etichette"""
+    wall, placed, customs, apertures = _sample()
+    calls = []
+    original = labels.create_detailed_block_labels
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr("exporters.labels.create_detailed_block_labels", counting)
+
+    session = {}
+    first = get_scene_graph(session, wall, placed, customs, apertures, SIZE_TO_LETTER)
+    second = get_scene_graph(session, wall, placed, customs, apertures, SIZE_TO_LETTER)
+    assert first is second
+    assert session["scene_graph"] is first
+    assert len(calls) == 1
+
+    # Spostamento: nuovo grafo, stesse etichette dalla sessione
+    moved = [dict(placed[0], x=10)] + placed[1:]
+    third = get_scene_graph(session, wall, moved, customs, apertures, SIZE_TO_LETTER)
+    assert third is not first and third.key != first.key
+    assert third.labels is first.labels is session["block_labels"]
+    assert len(calls) == 1
+
+    resized = [dict(placed[0], width=826)] + placed[1:]
+    get_scene_graph(session, wall, resized, customs, apertures, SIZE_TO_LETTER)
+    assert len(calls) == 2
+
+
+def test_restyle_shares_geometry():
+    """Il cambio tema produce un grafo con stili nuovi e primitive condivise"""
+    wall, placed, customs, apertures = _sample()
+    graph = build_scene_graph(wall, placed, customs, apertures, SIZE_TO_LETTER)
+    themed = graph.restyle({"blockAColor": "#ff0000", "wallOutlineColor": "#00ff00"})
+
+    assert themed.blocks is graph.blocks and themed.customs is graph.customs
+    assert themed.key == graph.key
+    assert themed.styles.block_style(0).fill == "#ff0000"
+    assert themed.styles.wall.stroke == "#00ff00"
+    assert graph.styles.block_style(0).fill != "#ff0000"
+
+    assert [b.kind for b in graph.blocks] == [0, 1, 0]
+    assert {b.label.category for b in graph.blocks} == {"A", "B"}
+    assert graph.customs[0].label is not None
+    assert graph.block_rects.shape == (3, 4)
+
+
+def test_layers_in_z_order():
+    """Patch sotto, contorni sopra, etichette in cima"""
+    wall, placed, customs, apertures = _sample()
+    graph = build_scene_graph(wall, placed, customs, apertures, starting_point="left")
+    names = [name for name, _ in graph.layers()]
+    assert names == sorted(names, key=Z_ORDER.get)
+    assert names.index(LAYER_BLOCKS) < names.index(LAYER_WALL) < names.index(LAYER_LABELS)
+    assert graph.start is not None and graph.start.tip == (0, 0)
+
+    offset = build_scene_graph(wall.buffer(-10, join_style=2), placed, customs, apertures, wall_original=wall)
+    offset_names = [name for name, _ in offset.layers()]
+    assert LAYER_WALL not in offset_names
+    assert offset_names[0] == LAYER_WALL_OFFSET and LAYER_WALL_ORIGINAL in offset_names
+
+
+def test_backends_consume_same_graph(tmp_path, monkeypatch):
+    """PNG, scena vettoriale, PDF e DXF usano il grafo passato senza ricalcolare etichette"""
+    from utils.preview_generator import generate_preview_image
+    from exporters.dxf_exporter import EZDXF_AVAILABLE, export_to_dxf
+    from exporters.pdf_exporter import REPORTLAB_AVAILABLE, export_to_pdf_professional_multipage
+
+    wall, placed, customs, apertures = _sample()
+    graph = build_scene_graph(wall, placed, customs, apertures, SIZE_TO_LETTER)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("etichette ricalcolate")
+
+    monkeypatch.setattr("exporters.labels.create_detailed_block_labels", fail)
+    monkeypatch.chdir(tmp_path)
+
+    image = generate_preview_image(wall, placed, customs, apertures, {}, {}, scene_graph=graph)
+    assert image.startswith("data:image/png;base64,")
+    assert scene_to_vector(graph)["blocks"][:6] == [0, 0, 1239, 495, 0, 0]
+
+    summary = {"std_1239x495": 2, "std_826x495": 1}
+    if EZDXF_AVAILABLE:
+        path = export_to_dxf(summary, customs, placed, wall, apertures, out_path="graph.dxf", scene_graph=graph)
+        assert os.path.exists(path)
+    if REPORTLAB_AVAILABLE:
+        path = export_to_pdf_professional_multipage(
+            summary, customs, placed, wall, apertures, out_path="graph.pdf",
+            block_config={"size_to_letter": SIZE_TO_LETTER}, scene_graph=graph,
+        )
+        assert os.path.exists(path)
+
+
+def test_vector_scene_matches_graph():
+    """build_vector_scene è la serializzazione del grafo"""
+    wall, placed, customs, apertures = _sample()
+    graph = build_scene_graph(wall, placed, customs, apertures, SIZE_TO_LETTER, starting_point="right")
+    assert build_vector_scene(wall, placed, customs, apertures, SIZE_TO_LETTER,
+                              starting_point="right") == scene_to_vector(graph)
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
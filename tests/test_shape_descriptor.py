@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test descrittore forma parete
+=============================
+
+Testa:
+1. Rettilinearità, lati inclinati e tratti curvi
+2. Profilo per righe e disposizione aperture
+3. Cache in sessione (ricalcolo solo se cambia la geometria)
+4. Percorso rapido del packer per pareti rettangolari piene
+"""
+
+import sys
+sys.path.append('.')
+
+from shapely.geometry import Point, Polygon, box
+
+from core.wall_builder import pack_wall
+from utils.shape_descriptor import describe_wall, get_shape_descriptor
+
+
+def test_rectangle_with_aperture():
+    """Rettangolo con porta: rettilineo, righe attraversate dall'apertura"""
+    wall = box(0, 0, 5000, 2700)
+    door = box(1000, 0, 2000, 2100)
+
+    descriptor = describe_wall(wall, [door], row_height=495)
+
+    assert descriptor.geometry_type == "rettangolo"
+    assert descriptor.is_rectangle and not descriptor.is_plain_rectangle
+    assert descriptor.slope_edges == ()
+    assert len(descriptor.row_profile) == 6
+    assert descriptor.row_profile[0].spans == ((0.0, 1000.0), (2000.0, 5000.0))
+    assert descriptor.row_profile[-1].rectangular
+    assert descriptor.rows_with_apertures() == [0, 1, 2, 3, 4]
+    assert descriptor.apertures_rectangular
+
+
+def test_slope_and_curvature():
+    """Trapezio con lato inclinato e arco approssimato"""
+    trapezoid = describe_wall(Polygon([(0, 0), (6000, 0), (6000, 2000), (0, 3000)]))
+    assert not trapezoid.is_rectilinear
+    assert trapezoid.slope_edges == ((6000.0, 2000.0, 0.0, 3000.0),)
+    assert trapezoid.curvature_runs == ()
+
+    arch = describe_wall(box(-2000, -3000, 2000, 0).union(Point(0, 0).buffer(2000)))
+    assert arch.has_curves
+    assert arch.slope_edges == ()
+
+
+def test_session_cache():
+    """Il descrittore in sessione viene riusato finché la geometria non cambia"""
+    session = {}
+    wall = box(0, 0, 4000, 2500)
+
+    first = get_shape_descriptor(session, wall, [], 495)
+    assert session["shape_descriptor"] is first
+    assert get_shape_descriptor(session, box(0, 0, 4000, 2500), [], 495) is first
+
+    other_height = get_shape_descriptor(session, wall, [], 400)
+    assert other_height is not first
+    assert session["shape_descriptor"] is other_height
+
+
+def test_fast_path_matches_full_packing():
+    """Il percorso rapido produce lo stesso packing del percorso geometrico"""
+    wall = box(0, 0, 5000, 2700)
+    fast = describe_wall(wall, None, 495)
+    slow = fast.__class__(**{**fast.__dict__, "is_rectangle": False})
+
+    fast_result = pack_wall(wall, [1239, 826, 413], 495, shape_descriptor=fast)
+    slow_result = pack_wall(wall, [1239, 826, 413], 495, shape_descriptor=slow)
+
+    key = lambda b: (round(b["x"], 6), round(b["y"], 6), b["width"], b["height"])
+    assert sorted(map(key, fast_result[0])) == sorted(map(key, slow_result[0]))
+    assert sorted(map(key, fast_result[1])) == sorted(map(key, slow_result[1]))
+
+
+if __name__ == "__main__":
+    test_rectangle_with_aperture()
+    test_slope_and_curvature()
+    test_session_cache()
+    test_fast_path_matches_full_packing()
+    print("✅ Tutti i test descrittore forma passati")
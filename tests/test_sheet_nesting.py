@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test nesting a ghigliottina per il taglio da lastra
+===================================================
+
+Testa:
+1. Pezzi dentro il foglio, senza sovrapposizioni, distanziati dalla lama
+2. Tagli del piano che non attraversano mai un pezzo
+3. Rotazione, venatura, pezzi fuori misura e riuso dei fogli già aperti
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+
+from core.auto_measurement import AutoMeasurementCalculator
+from core.sheet_nesting import NestingOptions, nest_pieces
+
+SHEET = {"width_mm": 2500, "height_mm": 1250}
+
+
+def _random_pieces(seed, n):
+    rng = random.Random(seed)
+    return [{"width_mm": rng.randint(80, 1300), "height_mm": rng.choice([495, 250, 200, 150])}
+            for _ in range(n)]
+
+
+def _gap(a0, a1, b0, b1):
+    """Distanza tra due intervalli (negativa se si sovrappongono)."""
+    return max(b0 - a1, a0 - b1)
+
+
+def test_layout_is_valid_with_kerf():
+    """Ogni coppia di pezzi dello stesso foglio è separata da almeno un kerf"""
+    kerf = 4
+    pieces = _random_pieces(1, 150)
+    result = AutoMeasurementCalculator().calculate_cutting_optimization(pieces, SHEET, kerf_mm=kerf)
+
+    placed = [p for sheet in result["sheets_layout"] for p in sheet["pieces"]]
+    assert len(placed) == result["total_pieces"] == 150
+    for sheet in result["sheets_layout"]:
+        items = sheet["pieces"]
+        for p in items:
+            assert 0 <= p["x"] and p["x"] + p["placed_width_mm"] <= 2500
+            assert 0 <= p["y"] and p["y"] + p["placed_height_mm"] <= 1250
+        for i, a in enumerate(items):
+            for b in items[i + 1:]:
+                gap_x = _gap(a["x"], a["x"] + a["placed_width_mm"], b["x"], b["x"] + b["placed_width_mm"])
+                gap_y = _gap(a["y"], a["y"] + a["placed_height_mm"], b["y"], b["y"] + b["placed_height_mm"])
+                assert max(gap_x, gap_y) >= kerf
+
+    used = sum(p["width_mm"] * p["height_mm"] for p in pieces)
+    assert result["efficiency_percent"] == round(used / (result["sheets_needed"] * 2500 * 1250) * 100, 1)
+    assert result["efficiency_percent"] > 80
+
+
+def test_cut_plan_never_crosses_a_piece():
+    """Tagli passanti: nessun pezzo ha il taglio al proprio interno"""
+    result = AutoMeasurementCalculator().calculate_cutting_optimization(_random_pieces(2, 80), SHEET)
+    assert result["cut_plan"]
+
+    for cut in result["cut_plan"]:
+        pieces = result["sheets_layout"][cut["sheet"] - 1]["pieces"]
+        for p in pieces:
+            if cut["axis"] == "x":
+                across = p["x"] < cut["position"] < p["x"] + p["placed_width_mm"]
+                along = p["y"] < cut["end"] and cut["start"] < p["y"] + p["placed_height_mm"]
+            else:
+                across = p["y"] < cut["position"] < p["y"] + p["placed_height_mm"]
+                along = p["x"] < cut["end"] and cut["start"] < p["x"] + p["placed_width_mm"]
+            assert not (across and along), (cut, p)
+
+
+def test_rotation_grain_and_oversize():
+    """Venatura blocca la rotazione; pezzi troppo grandi restano fuori dal layout"""
+    tall = {"width_mm": 400, "height_mm": 2000}
+    result = AutoMeasurementCalculator().calculate_cutting_optimization(
+        [tall, dict(tall, grain=True), {"width_mm": 3000, "height_mm": 300}], SHEET)
+
+    assert result["sheets_needed"] == 1
+    assert [p["rotated"] for p in result["sheets_layout"][0]["pieces"]] == [True]
+    assert len(result["unplaced_pieces"]) == 2
+    assert any("non entrano" in note for note in result["optimization_notes"])
+
+
+def test_earlier_sheets_are_revisited():
+    """Pezzi piccoli finiscono negli avanzi dei fogli già aperti"""
+    pieces = [(2400, 1000, True), (2400, 1000, True)] + [(500, 200, True)] * 8
+    result = nest_pieces(pieces, NestingOptions(kerf_mm=2, time_budget_s=0))
+
+    assert len(result.sheets) == 2
+    assert result.heuristics_tried == 1
+    assert sorted(len(sheet.placements) for sheet in result.sheets) == [5, 5]
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test calcolo sfalsamento incrementale
+=====================================
+
+Testa:
+1. Score identico al confronto giunto × giunto
+2. Prefisso incrementale con push/pop e limite superiore monotono
+3. Pruning in pack_row senza effetti sulla combinazione scelta
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+
+from core.packing_algorithms.small_algorithm import SmallAlgorithmPacker
+from utils.moraletti_alignment import (
+    STAGGER_TOLERANCE_MM,
+    DynamicMoralettiConfiguration,
+    StaggeringCalculator,
+    StaggerPrefix,
+)
+
+CONFIG = DynamicMoralettiConfiguration({
+    'block_large_width': 1239, 'block_large_height': 495,
+    'block_medium_width': 826, 'block_medium_height': 495,
+    'block_small_width': 413, 'block_small_height': 495,
+    'moraletti_thickness': 58, 'moraletti_height': 495,
+    'moraletti_height_from_ground': 95, 'moraletti_spacing': 420,
+    'moraletti_count_large': 3, 'moraletti_count_medium': 2, 'moraletti_count_small': 1,
+})
+
+
+def _row(rng, wall_width):
+    row, x = [], 0.0
+    while x < wall_width:
+        width = min(rng.choice([1239, 826, 413, rng.uniform(5, 400)]), wall_width - x)
+        row.append({'x': x, 'width': width})
+        x += width
+    return row
+
+
+def _reference_aligned(row_above, row_below):
+    """Conteggio originale: ogni giunto sopra confrontato con tutti quelli sotto."""
+    below = [b['x'] + b['width'] for b in row_below[:-1]]
+    above = [b['x'] + b['width'] for b in row_above[:-1]]
+    return sum(1 for a in above if any(abs(a - b) < STAGGER_TOLERANCE_MM for b in below))
+
+
+def test_score_matches_quadratic_reference():
+    """Righe casuali (anche giunti a cavallo della tolleranza): stesso conteggio"""
+    rng = random.Random(21)
+    calc = StaggeringCalculator()
+    for _ in range(400):
+        wall = rng.uniform(400, 9000)
+        below, above = _row(rng, wall), _row(rng, wall)
+        if rng.random() < 0.3:
+            # Giunti sopra spostati esattamente di ±tolleranza o poco meno
+            above = [dict(b, width=b['width']) for b in below]
+            shift = rng.choice([STAGGER_TOLERANCE_MM, -STAGGER_TOLERANCE_MM, 9.99, 0])
+            above[0]['width'] += shift
+            for prev, block in zip(above, above[1:]):
+                block['x'] = prev['x'] + prev['width']
+
+        result = calc.calculate_stagger_score(above, below)
+        prepared = calc.calculate_stagger_score(above, calc.prepare_row(below))
+        assert result == prepared
+        assert result['aligned_borders'] == _reference_aligned(above, below)
+
+
+def test_prefix_push_pop_and_bound():
+    """Il limite superiore non cresce mai e il pop ripristina lo stato"""
+    joints = StaggeringCalculator.prepare_row([{'x': 0, 'width': 1239}, {'x': 1239, 'width': 826},
+                                               {'x': 2065, 'width': 413}])
+    prefix = StaggerPrefix(joints)
+    bounds = [prefix.upper_bound(3)]
+    for border in (413.0, 1241.0, 2070.0):
+        prefix.push(border)
+        bounds.append(prefix.upper_bound(3))
+    assert prefix.aligned == 2 and bounds == sorted(bounds, reverse=True)
+
+    prefix.pop()
+    assert (prefix.aligned, prefix.count) == (1, 2)
+    assert prefix.push(2100.0) is False
+
+
+def test_pruning_keeps_best_combination():
+    """Stessa riga scelta con e senza scarto anticipato dei candidati"""
+    rng = random.Random(8)
+    pruned = SmallAlgorithmPacker(CONFIG)
+    exhaustive = SmallAlgorithmPacker(CONFIG)
+    evaluate = exhaustive._evaluate_combination
+    exhaustive._evaluate_combination = lambda *args, min_score=None: evaluate(*args)
+
+    for width in (2478, 3000, 4130, 5555):
+        below = pruned.pack_row(width, 0)['all_blocks']
+        for _ in range(2):
+            expected = exhaustive.pack_row(width, 495, below)
+            result = pruned.pack_row(width, 495, below)
+            assert result == expected
+            below = _row(rng, width)
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
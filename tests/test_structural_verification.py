@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test verifica strutturale della parete finita
+=============================================
+
+Testa:
+1. Moraletti scoperti e giunti allineati identici al confronto riga per riga
+2. Moraletti sotto aperture, fuori parete e in sommità non richiesti
+3. Risultato finale di entrambi gli algoritmi verificato (small sempre integro)
+4. Larghezze in ordine qualsiasi: packer e verifica con la stessa configurazione
+"""
+
+import sys
+sys.path.append('.')
+
+import contextlib
+import io
+import random
+
+import pytest
+from shapely.geometry import Polygon, box
+
+from core.structural_verification import (
+    GIUNTO_ALLINEATO,
+    MORALETTO_SCOPERTO,
+    moraletti_backend_config,
+    verify_wall_structure,
+)
+from core.wall_builder import pack_wall
+from utils.moraletti_alignment import STAGGER_TOLERANCE_MM, DynamicMoralettiConfiguration
+
+WIDTHS = [1239, 826, 413]
+FRONTEND = {'spacing_mm': 420, 'max_moraletti_large': 3, 'max_moraletti_medium': 2, 'max_moraletti_small': 1}
+CONFIG = DynamicMoralettiConfiguration(moraletti_backend_config(FRONTEND, WIDTHS, 495))
+
+
+def _wall(rng, rows, wall_width):
+    """Righe da 495 contigue o con buchi, blocchi standard e custom."""
+    placed, customs = [], []
+    for r in range(rows):
+        x = 0.0
+        while x < wall_width:
+            width = min(rng.choice(WIDTHS + [rng.uniform(30, 1200)]), wall_width - x)
+            target = placed if width in WIDTHS else customs
+            target.append({'x': x, 'y': r * 495.0, 'width': width, 'height': 495})
+            x += width + rng.choice([0, 0, 0, 60])
+    return placed, customs
+
+
+def _reference(placed, customs):
+    """Per ogni coppia di righe adiacenti: moraletti × blocchi sopra, giunti × giunti sotto."""
+    blocks = placed + customs
+    rows = sorted({b['y'] for b in blocks})
+    uncovered, aligned = 0, 0
+    for below_y, above_y in zip(rows, rows[1:]):
+        below = sorted((b for b in blocks if b['y'] == below_y), key=lambda b: b['x'])
+        above = sorted((b for b in blocks if b['y'] == above_y), key=lambda b: b['x'])
+        for block in below:
+            for m in CONFIG.calculate_moraletti_for_block(block['width'], block['x']).positions:
+                if not any(b['x'] - CONFIG.thickness / 2 <= m.center_x <= b['x'] + b['width'] + CONFIG.thickness / 2
+                           for b in above):
+                    uncovered += 1
+
+        def joints(row):
+            return [a['x'] + a['width'] for a, b in zip(row, row[1:]) if abs(b['x'] - a['x'] - a['width']) <= 1]
+
+        joints_below = joints(below)
+        aligned += sum(any(abs(j - k) < STAGGER_TOLERANCE_MM for k in joints_below) for j in joints(above))
+    return uncovered, aligned
+
+
+def test_matches_row_by_row_reference():
+    """Pareti casuali con buchi: stessi conteggi del confronto per coppie di righe"""
+    rng = random.Random(45)
+    for _ in range(60):
+        placed, customs = _wall(rng, rng.randint(1, 6), rng.uniform(1000, 9000))
+        report = verify_wall_structure(placed, customs, moraletti_config=CONFIG)
+
+        assert (report.uncovered_moraletti, report.aligned_joints) == _reference(placed, customs)
+        kinds = [v.kind for v in report.violations]
+        assert kinds.count(MORALETTO_SCOPERTO) == report.uncovered_moraletti
+        assert kinds.count(GIUNTO_ALLINEATO) == report.aligned_joints
+        assert report.is_sound == (report.uncovered_moraletti == 0)
+        assert [row.y for row in report.rows] == sorted({b['y'] for b in placed + customs})
+
+
+def test_openings_and_wall_top_are_exempt():
+    """Buco sotto una finestra: errore senza parete, nessun errore con la finestra"""
+    wall = box(0, 0, 2478, 990)
+    window = box(1239, 495, 2478, 990)
+    placed = [{'x': 0, 'y': 0, 'width': 1239, 'height': 495},
+              {'x': 1239, 'y': 0, 'width': 1239, 'height': 495},
+              {'x': 0, 'y': 495, 'width': 1239, 'height': 495}]
+
+    bare = verify_wall_structure(placed, [], moraletti_config=CONFIG)
+    assert not bare.is_sound and bare.uncovered_moraletti == 3
+    assert {v.block for v in bare.violations} == {"standard #1"}
+
+    report = verify_wall_structure(placed, [], wall, [window], moraletti_config=CONFIG)
+    assert report.is_sound
+    assert report.rows[1].exempt == 3 and report.rows[1].moraletti == 3
+
+    # Pezzo tagliato sotto una falda: la sua sommità non regge nulla
+    slope = Polygon([(0, 0), (1239, 0), (1239, 700), (0, 990)])
+    custom = [{'x': 0, 'y': 495, 'width': 1239, 'height': 495, 'type': 'custom'}]
+    clipped = verify_wall_structure(placed[:1], custom, slope, moraletti_config=CONFIG)
+    assert clipped.is_sound and len(clipped.rows) == 2
+
+
+@pytest.mark.parametrize("algorithm", ["small", "bidirectional"])
+def test_final_layout_of_both_algorithms(algorithm):
+    """Parete con finestra: report per ogni riga, small senza moraletti scoperti"""
+    wall = box(0, 0, 6000, 2970)
+    window = box(1500, 990, 2700, 2200)
+    with contextlib.redirect_stdout(io.StringIO()):
+        placed, customs = pack_wall(wall, WIDTHS, 495, apertures=[window],
+                                    algorithm_type=algorithm, moraletti_config=FRONTEND)
+    report = verify_wall_structure(placed, customs, wall, [window], FRONTEND, WIDTHS, 495)
+
+    data = report.to_dict()
+    assert data["rows_checked"] == len({b['y'] for b in placed + customs})
+    assert sum(row["blocks"] for row in data["rows"]) == len(placed) + len(customs)
+    assert data["exempt_moraletti"] > 0
+    if algorithm == "small":
+        assert report.is_sound and report.aligned_joints == 0
+
+    with pytest.raises(ValueError):
+        verify_wall_structure(placed, customs, block_widths=[1239, 826])
+
+
+def test_unsorted_widths_share_configuration():
+    """Grande/Medio/Piccolo non dipendono dall'ordine delle larghezze ricevute"""
+    unsorted = [413, 1239, 826]
+    assert moraletti_backend_config(FRONTEND, unsorted, 495) == moraletti_backend_config(FRONTEND, WIDTHS, 495)
+
+    wall = box(0, 0, 6000, 2970)
+    with contextlib.redirect_stdout(io.StringIO()):
+        placed, customs = pack_wall(wall, unsorted, 495, algorithm_type="small", moraletti_config=FRONTEND)
+        expected, _ = pack_wall(wall, WIDTHS, 495, algorithm_type="small", moraletti_config=FRONTEND)
+    assert [(b["type"], b["x"], b["y"]) for b in placed] == [(b["type"], b["x"], b["y"]) for b in expected]
+
+    report = verify_wall_structure(placed, customs, wall, [], FRONTEND, unsorted, 495)
+    assert report.is_sound and report.aligned_joints == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test del parser SVG in streaming (iterparse a passata singola)
+==============================================================
+
+Testa:
+1. Estrazione layer MURO/BUCHI in una sola passata
+2. Applicazione delle transform annidate e della scala
+3. Fallback su geometrie generiche quando i layer mancano
+"""
+
+import sys
+sys.path.append('.')
+
+from pathlib import Path
+
+from parsers.svg import parse_svg_wall, stream_svg_layers
+
+TEST_DIR = Path(__file__).parent
+
+LAYERED_SVG = b"""<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="20000" height="5000">
+  <g id="layer_MURO" transform="translate(1000,500)">
+    <g transform="scale(2)">
+      <rect x="0" y="0" width="5000" height="1500"/>
+    </g>
+  </g>
+  <g id="layer_BUCHI">
+    <rect x="2000" y="0" width="1000" height="2000" transform="translate(100,0)"/>
+  </g>
+  <g id="ALTRO"><rect x="0" y="0" width="1" height="1"/></g>
+</svg>
+"""
+
+
+def test_layers_single_pass_with_transforms():
+    """Transform annidate applicate a tutte le coordinate del layer"""
+    walls, holes, generic = stream_svg_layers(LAYERED_SVG)
+
+    assert not generic
+    assert len(walls) == 1
+    assert len(holes) == 1
+    assert walls[0][0] == (1000.0, 500.0)
+    assert walls[0][2] == (11000.0, 3500.0)
+    assert holes[0][0] == (2100.0, 0.0)
+
+    wall, apertures = parse_svg_wall(LAYERED_SVG)
+    assert wall.bounds == (1000.0, 500.0, 11000.0, 3500.0)
+    assert len(apertures) == 1
+
+
+def test_generic_fallback_without_layers():
+    """Senza layer dedicati si usano tutte le geometrie del documento"""
+    walls, holes, generic = stream_svg_layers((TEST_DIR.parent / "test" / "test_wall_minimal.svg").read_bytes())
+
+    assert generic
+    assert len(walls) == 2
+    assert len(holes) == 2
+    assert walls[0] is not holes[0]
+
+
+def test_real_file_matches_layers():
+    """File reale con layer_MURO/layer_BUCHI"""
+    wall, apertures = parse_svg_wall((TEST_DIR / "ROTTINI_LAY_REV0.svg").read_bytes())
+
+    assert wall.bounds == (0.0, 0.0, 8000.0, 2700.0)
+    assert len(apertures) == 2
+
+
+if __name__ == "__main__":
+    test_layers_single_pass_with_transforms()
+    test_generic_fallback_without_layers()
+    test_real_file_matches_layers()
+    print("✅ Tutti i test streaming SVG passati")
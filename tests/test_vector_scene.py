@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test scena vettoriale del preview
+=================================
+
+Testa:
+1. Coordinate relative all'origine parete e rettangoli in array piatto
+2. Tabella etichette, pezzi custom e quote
+3. Formato 'scene' dell'endpoint preview senza render PNG
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import json
+
+import pytest
+from shapely.geometry import box
+
+from utils.vector_scene import build_vector_scene, normalize_preview_format
+
+SIZE_TO_LETTER = {1239: "A", 826: "B", 413: "C"}
+
+
+def _block(x, y, width):
+    return {"type": f"std_{width}x495", "x": x, "y": y, "width": width, "height": 495}
+
+
+def _custom(x, y, w, h):
+    return {"type": "custom", "ctype": 2, "x": x, "y": y, "width": w, "height": h,
+            "geometry": box(x, y, x + w, y + h).__geo_interface__}
+
+
+def test_blocks_relative_to_wall_origin():
+    """Blocchi come [x, y, w, h, label, kind] relativi all'angolo parete"""
+    wall = box(1000, 500, 4304, 1490)
+    placed = [_block(1000, 500, 1239), _block(2239, 500, 826), _block(3065.25, 500, 413)]
+
+    scene = build_vector_scene(wall, placed, [], [], SIZE_TO_LETTER)
+
+    assert scene["version"] == 1
+    assert scene["origin"] == [1000, 500]
+    assert scene["bounds"] == [0, 0, 3304, 990]
+    assert scene["wall"] == [[3304, 0, 3304, 990, 0, 990, 0, 0]]
+    blocks = scene["blocks"]
+    assert len(blocks) == 3 * 6
+    assert blocks[:6] == [0, 0, 1239, 495, 0, 0]
+    assert blocks[12:14] == [2065.2, 0]  # 0.1 mm
+    assert [blocks[i + 5] for i in range(0, len(blocks), 6)] == [0, 1, 2]
+    json.dumps(scene)
+
+
+def test_labels_customs_and_dimensions():
+    """Etichette categoria/numero, custom con etichetta propria, quote di parete e aperture"""
+    wall = box(0, 0, 3000, 990)
+    placed = [_block(0, 0, 1239), _block(1239, 0, 1239), _block(0, 495, 1239)]
+    customs = [_custom(2478, 0, 300, 495)]
+    aperture = box(2000, 495, 2800, 990)
+
+    scene = build_vector_scene(wall, placed, customs, [aperture], SIZE_TO_LETTER, starting_point="right")
+
+    label_ids = [scene["blocks"][i + 4] for i in range(0, len(scene["blocks"]), 6)]
+    assert {scene["labels"][i][0] for i in label_ids} == {"A"}
+    assert len({scene["labels"][i][1] for i in label_ids}) == 3
+    assert scene["customs"][0]["label"] >= 0
+    assert scene["customs"][0]["rings"][0][:2] in ([2778, 0], [2478, 0], [2778, 495], [2478, 495])
+    assert len(scene["apertures"]) == 1
+
+    sides = [(d["side"], d["value"]) for d in scene["dimensions"]]
+    assert sides == [("bottom", 3000), ("left", 990), ("top", 800), ("right", 495)]
+    assert scene["start"]["tip"] == [3000, 0]
+
+
+def test_preview_endpoint_scene_format():
+    """format=scene restituisce solo la scena, format non valido → 400"""
+    from fastapi import HTTPException
+    from main import SESSIONS
+    from api.routes.packing import get_preview_image
+
+    wall = box(0, 0, 2478, 495)
+    SESSIONS["test-vector-scene"] = {
+        "wall_polygon": wall,
+        "placed": [_block(0, 0, 1239), _block(1239, 0, 1239)],
+        "customs": [],
+        "apertures": [],
+        "config": {"size_to_letter": SIZE_TO_LETTER},
+    }
+    try:
+        scene_only = asyncio.run(get_preview_image("test-vector-scene", None, format="scene"))
+        both = asyncio.run(get_preview_image("test-vector-scene", None, format="both"))
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(get_preview_image("test-vector-scene", None, format="svg"))
+    finally:
+        del SESSIONS["test-vector-scene"]
+
+    assert set(scene_only) == {"scene"}
+    assert len(scene_only["scene"]["blocks"]) == 12
+    assert both["image"].startswith("data:image/png;base64,")
+    assert both["scene"] == scene_only["scene"]
+    assert exc.value.status_code == 400
+    assert normalize_preview_format(None, default="both") == "both"
+
+
+if __name__ == "__main__":
+    test_blocks_relative_to_wall_origin()
+    test_labels_customs_and_dimensions()
+    test_preview_endpoint_scene_format()
+    print("✅ Tutti i test scena vettoriale passati")
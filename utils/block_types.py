@@ -0,0 +1,195 @@
+"""
+Registro tipi blocco standard
+Ogni tipo ("std_WxH") viene internato una sola volta per configurazione in un
+id intero compatto che porta dimensioni, lettera e layout moraletti.
+Packer, riassunti, etichette ed exporter condividono lo stesso registro:
+i nomi vengono interpretati una volta e la mappatura lettere non si ricostruisce.
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.config import BLOCK_HEIGHT, BLOCK_WIDTHS, _create_size_to_letter_mapping
+from utils.moraletti_alignment import DynamicMoralettiConfiguration, MoralettiLayout
+
+__all__ = [
+    "SMALL_ALGORITHM_TYPES",
+    "BlockType",
+    "BlockTypeRegistry",
+    "get_block_type_registry",
+]
+
+Number = Union[int, float]
+
+# Nomi dei tipi prodotti dallo Small Algorithm, nell'ordine di block_widths
+SMALL_ALGORITHM_TYPES = ("large", "medium", "small")
+
+# Registri memorizzati (uno per configurazione) e nomi interpretati per registro
+REGISTRY_CACHE_SIZE = 64
+NAME_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class BlockType:
+    """Tipo blocco standard internato."""
+    id: int
+    name: str                              # "std_1239x495"
+    width: Number
+    height: Number
+    letter: Optional[str]                  # None se la larghezza non è nella mappatura
+    moraletti: Optional[MoralettiLayout]   # None senza configurazione moraletti
+
+    @property
+    def size(self) -> str:
+        return f"{self.width} x {self.height}"
+
+    @property
+    def area_m2(self) -> float:
+        return self.width * self.height / 1_000_000
+
+
+def _dimension(value: Number) -> Number:
+    """Intero se la misura è intera (495.0 -> 495), altrimenti float."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class BlockTypeRegistry:
+    """
+    Tipi standard di una configurazione (larghezze, altezza, lettere, moraletti).
+
+    Gli id sono assegnati in ordine di internamento: prima i tipi della
+    mappatura lettere (nel suo ordine), poi quelli incontrati nei risultati.
+    Usare ``get_block_type_registry`` per condividere il registro.
+    """
+
+    def __init__(self, block_widths: Sequence[Number], block_height: Number,
+                 size_to_letter: Optional[Dict] = None, moraletti_config: Optional[Dict] = None):
+        self.block_widths = tuple(_dimension(w) for w in block_widths)
+        self.block_height = _dimension(block_height)
+        letters = size_to_letter or _create_size_to_letter_mapping(list(self.block_widths))
+        self.size_to_letter: Dict[Number, str] = {_dimension(w): letter for w, letter in letters.items()}
+        self.moraletti_config = DynamicMoralettiConfiguration(moraletti_config) if moraletti_config else None
+
+        self._types: List[BlockType] = []
+        self._by_size: Dict[Tuple[Number, Number], int] = {}
+        self._by_name: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+        self._standard = tuple(self.intern(w, self.block_height) for w in self.size_to_letter)
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __getitem__(self, type_id: int) -> BlockType:
+        return self._types[type_id]
+
+    def intern(self, width: Number, height: Number) -> int:
+        """Id del tipo ``width`` × ``height`` (creato alla prima richiesta)."""
+        key = (_dimension(width), _dimension(height))
+        type_id = self._by_size.get(key)
+        if type_id is None:
+            with self._lock:
+                type_id = self._by_size.get(key)
+                if type_id is None:
+                    type_id = len(self._types)
+                    self._types.append(BlockType(
+                        id=type_id,
+                        name=f"std_{key[0]}x{key[1]}",
+                        width=key[0],
+                        height=key[1],
+                        letter=self.size_to_letter.get(key[0]),
+                        moraletti=self._layout(key[0])
+                    ))
+                    self._by_size[key] = type_id
+        return type_id
+
+    def resolve(self, type_name: str) -> Optional[int]:
+        """Id di un nome "std_WxH" (None per custom e nomi non standard)."""
+        try:
+            return self._by_name[type_name]
+        except KeyError:
+            pass
+        type_id = None
+        if type_name.startswith("std_"):
+            try:
+                width, height = (float(part) for part in type_name[len("std_"):].split("x"))
+                type_id = self.intern(width, height)
+            except ValueError:
+                pass
+        if len(self._by_name) >= NAME_CACHE_SIZE:
+            self._by_name = {}
+        self._by_name[type_name] = type_id
+        return type_id
+
+    def resolve_block(self, block: Dict) -> Optional[int]:
+        """Id del tipo di un blocco, compresi i nomi dello Small Algorithm (large/medium/small)."""
+        block_type = block.get("type", "")
+        if block_type in SMALL_ALGORITHM_TYPES:
+            width = self.block_widths[SMALL_ALGORITHM_TYPES.index(block_type)]
+            return self.intern(width, block.get("height", self.block_height))
+        return self.resolve(block_type)
+
+    def standard_types(self) -> List[BlockType]:
+        """Tipi della mappatura lettere, nel suo ordine."""
+        return [self._types[type_id] for type_id in self._standard]
+
+    def letter_for_width(self, width: Number, tolerance: float = 0) -> Optional[str]:
+        """Lettera per larghezza: esatta, altrimenti la prima voce entro ``tolerance``."""
+        letter = self.size_to_letter.get(_dimension(width))
+        if letter is None and tolerance > 0:
+            letter = next((l for w, l in self.size_to_letter.items() if abs(width - w) <= tolerance), None)
+        return letter
+
+    def type_map(self) -> Dict[str, Dict]:
+        """Tabella nome tipo → categoria come nella tabella HTML dello step 5."""
+        return {
+            block_type.name: {
+                'name': f'Categoria {block_type.letter}',
+                'size': block_type.size,
+                'category': block_type.letter,
+                'width': block_type.width,
+                'height': block_type.height
+            }
+            for block_type in self.standard_types()
+        }
+
+    def _layout(self, width: Number) -> Optional[MoralettiLayout]:
+        if self.moraletti_config is None:
+            return None
+        try:
+            return self.moraletti_config.layouts.layout(width)
+        except ValueError:
+            return None  # fuori regola (>= Grande): nessun layout
+
+
+@lru_cache(maxsize=REGISTRY_CACHE_SIZE)
+def _shared_registry(block_widths: Tuple, block_height: Number, letters: Optional[Tuple],
+                     moraletti: Optional[Tuple]) -> BlockTypeRegistry:
+    return BlockTypeRegistry(block_widths, block_height, dict(letters) if letters else None,
+                             dict(moraletti) if moraletti else None)
+
+
+def get_block_type_registry(block_widths: Optional[Sequence[Number]] = None,
+                            block_height: Optional[Number] = None,
+                            size_to_letter: Optional[Dict] = None,
+                            moraletti_config: Optional[Dict] = None) -> BlockTypeRegistry:
+    """
+    Registro condiviso per una configurazione.
+
+    Args:
+        block_widths: Larghezze standard (default: chiavi di ``size_to_letter`` o BLOCK_WIDTHS)
+        block_height: Altezza blocchi (default BLOCK_HEIGHT)
+        size_to_letter: Mappatura larghezza -> lettera (default: A, B, C... per larghezza decrescente)
+        moraletti_config: Configurazione moraletti backend (vedi ``moraletti_backend_config``)
+    """
+    if block_widths is None:
+        block_widths = list(size_to_letter) if size_to_letter else BLOCK_WIDTHS
+    letters = tuple((_dimension(w), l) for w, l in size_to_letter.items()) if size_to_letter else None
+    return _shared_registry(
+        tuple(_dimension(w) for w in block_widths),
+        _dimension(BLOCK_HEIGHT if block_height is None else block_height),
+        letters,
+        tuple(sorted(moraletti_config.items())) if moraletti_config else None
+    )
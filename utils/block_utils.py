@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from utils.config import SIZE_TO_LETTER
+from utils.block_types import get_block_type_registry
 
 
 __all__ = ["summarize_blocks"]
@@ -23,52 +23,33 @@ def summarize_blocks(placed: List[Dict], size_to_letter: Optional[Dict[int, str]
         placed: Lista blocchi piazzati
         size_to_letter: Mapping opzionale da larghezza a lettera per dimensioni personalizzate
     """
-    summary: Dict[str, int] = {}
+    registry = get_block_type_registry(size_to_letter=size_to_letter)
+    type_ids = [registry.resolve(blk["type"]) for blk in placed]
     
-    # Se abbiamo un mapping personalizzato, usa quello per correggere i tipi
+    # Se abbiamo un mapping personalizzato, associa la larghezza effettiva più grande
+    # con quella logica più grande, etc. (es. 1239 -> 1500)
+    width_mapping = {}
     if size_to_letter:
-        # Crea mapping intelligente: da larghezza effettiva a larghezza logica
-        logical_widths = [int(w) for w in size_to_letter.keys()]
-        logical_widths.sort(reverse=True)  # Ordina per dimensione decrescente [1500, 826, 413]
-        
-        # Trova tutte le larghezze effettive usate nei blocchi
-        actual_widths = set()
-        for blk in placed:
-            if blk["type"].startswith("std_"):
-                try:
-                    parts = blk["type"].split("_")[1].split("x")
-                    actual_width = int(parts[0])
-                    actual_widths.add(actual_width)
-                except (ValueError, IndexError):
-                    pass
-        
-        actual_widths = sorted(actual_widths, reverse=True)  # Ordina per dimensione decrescente
-        
-        # Crea mapping: associa la larghezza effettiva più grande con quella logica più grande, etc.
-        width_mapping = {}
-        for i, actual_width in enumerate(actual_widths):
-            if i < len(logical_widths):
-                width_mapping[actual_width] = logical_widths[i]
-                print(f"[DEBUG] Mapping: {actual_width}mm -> {logical_widths[i]}mm (logica)")
+        logical_widths = sorted(registry.size_to_letter, reverse=True)
+        actual_widths = sorted({registry[t].width for t in type_ids if t is not None}, reverse=True)
+        for actual_width, logical_width in zip(actual_widths, logical_widths):
+            width_mapping[actual_width] = logical_width
+            print(f"[DEBUG] Mapping: {actual_width}mm -> {logical_width}mm (logica)")
     
-    for blk in placed:
-        block_type = blk["type"]
-        
-        # Se abbiamo mapping personalizzato, correggi il tipo
-        if size_to_letter and block_type.startswith("std_"):
-            try:
-                # Estrai larghezza dal tipo esistente (es. "std_1239x495" -> 1239)
-                parts = block_type.split("_")[1].split("x")
-                actual_width = int(parts[0])
-                height = int(parts[1])
-                
-                # Usa il mapping per trovare la larghezza logica
-                if actual_width in width_mapping:
-                    logical_width = width_mapping[actual_width]
-                    block_type = f"std_{logical_width}x{height}"
-            except (ValueError, IndexError):
-                pass  # Mantieni tipo originale se parsing fallisce
+    # Nome finale per tipo: un solo calcolo per id
+    names: Dict[int, str] = {}
+    summary: Dict[str, int] = {}
+    for blk, type_id in zip(placed, type_ids):
+        if type_id is None:
+            block_type = blk["type"]
+        else:
+            block_type = names.get(type_id)
+            if block_type is None:
+                std = registry[type_id]
+                if std.width in width_mapping:
+                    std = registry[registry.intern(width_mapping[std.width], std.height)]
+                block_type = names[type_id] = std.name
         
         summary[block_type] = summary.get(block_type, 0) + 1
     
-    return summary
\ No newline at end of file
+    return summary
@@ -60,6 +60,7 @@ SCARTO_CUSTOM_MM = get_env_int('SCARTO_CUSTOM_MM', 5)          # tolleranza matc
 AREA_EPS = get_env_float('AREA_EPS', 1e-3)                     # area minima per considerare una geometria
 COORD_EPS = get_env_float('COORD_EPS', 1e-6)                   # precisione coordinate
 DISPLAY_MM_PER_M = get_env_float('DISPLAY_MM_PER_M', 1000.0)   # conversione mm per metro
+LOCAL_ORIGIN_THRESHOLD_MM = get_env_float('LOCAL_ORIGIN_THRESHOLD_MM', 100000.0)  # oltre questa distanza dall'origine la geometria viene riportata in coordinate locali
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -264,6 +265,7 @@ JWT_EXPIRE_MINUTES = get_env_int('JWT_EXPIRE_MINUTES', 30)
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/wallbuild.db')
 DATABASE_TIMEOUT = get_env_int('DATABASE_TIMEOUT', 20)
 DATABASE_ECHO = get_env_bool('DATABASE_ECHO', False)
+CATALOGUE_CACHE_TTL_S = get_env_float('CATALOGUE_CACHE_TTL_S', 1.0)  # intervallo max tra due controlli della versione catalogo
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -371,14 +373,10 @@ def create_custom_block_schema(custom_widths: List[int], custom_height: int = No
     if custom_moraletto_height_from_ground is None:
         custom_moraletto_height_from_ground = MORALETTO_HEIGHT_FROM_GROUND_MM
     
-    # Crea mapping personalizzato dimensione -> lettera
-    # Ordina per dimensione decrescente e assegna A, B, C...
-    sorted_widths = sorted(custom_widths, reverse=True)
-    custom_size_to_letter = {}
-    
-    for i, width in enumerate(sorted_widths):
-        letter = chr(ord('A') + i)  # A, B, C, D, E...
-        custom_size_to_letter[width] = letter
+    # Mapping dimensione -> lettera dal registro tipi condiviso
+    # (dimensione decrescente → A, B, C...)
+    from utils.block_types import get_block_type_registry
+    custom_size_to_letter = dict(get_block_type_registry(custom_widths, custom_height).size_to_letter)
     
     return {
         "block_height": custom_height,
@@ -506,6 +504,7 @@ def get_default_config() -> Dict:
         "database_url": DATABASE_URL,
         "database_timeout": DATABASE_TIMEOUT,
         "database_echo": DATABASE_ECHO,
+        "catalogue_cache_ttl_s": CATALOGUE_CACHE_TTL_S,
         # CORS
         "cors_origins": CORS_ORIGINS,
         # Logging
@@ -0,0 +1,134 @@
+"""
+Coordinate Frame Utilities
+Normalizzazione delle geometrie georeferenziate in un sistema di riferimento locale.
+
+I disegni reali (es. MARINA_ROTTINI_A1,2) arrivano con coordinate dell'ordine di
+1e6-1e7 mm: a quella scala intersection/difference/buffer(0) perdono precisione.
+Subito dopo il parsing la geometria viene traslata vicino all'origine; la
+traslazione inversa viene applicata solo dagli exporter (DXF/PDF/JSON).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from shapely import affinity
+from shapely.geometry import Polygon
+
+from utils.config import LOCAL_ORIGIN_THRESHOLD_MM
+
+
+@dataclass(frozen=True)
+class LocalFrame:
+    """Traslazione tra coordinate mondo (disegno) e coordinate locali (packing)."""
+
+    origin_x: float = 0.0
+    origin_y: float = 0.0
+
+    @property
+    def is_identity(self) -> bool:
+        return self.origin_x == 0.0 and self.origin_y == 0.0
+
+    def to_local(self, geom):
+        """Porta una geometria Shapely dal mondo al sistema locale."""
+        if self.is_identity or geom is None:
+            return geom
+        return affinity.translate(geom, xoff=-self.origin_x, yoff=-self.origin_y)
+
+    def to_world(self, geom):
+        """Riporta una geometria Shapely dal sistema locale al mondo."""
+        if self.is_identity or geom is None:
+            return geom
+        return affinity.translate(geom, xoff=self.origin_x, yoff=self.origin_y)
+
+    def point_to_world(self, x: float, y: float) -> Tuple[float, float]:
+        return x + self.origin_x, y + self.origin_y
+
+    def block_to_world(self, block: Dict) -> Dict:
+        """
+        Copia superficiale di un blocco (standard o custom) in coordinate mondo.
+
+        Vengono traslati 'x', 'y' e, se presente, la 'geometry' GeoJSON.
+        """
+        if self.is_identity:
+            return block
+
+        world = dict(block)
+        world["x"] = block["x"] + self.origin_x
+        world["y"] = block["y"] + self.origin_y
+
+        geometry = block.get("geometry")
+        if isinstance(geometry, dict) and "coordinates" in geometry:
+            world["geometry"] = {
+                **geometry,
+                "coordinates": _translate_coordinates(geometry["coordinates"], self.origin_x, self.origin_y),
+            }
+        return world
+
+    def blocks_to_world(self, blocks: List[Dict]) -> List[Dict]:
+        if self.is_identity:
+            return blocks
+        return [self.block_to_world(block) for block in blocks]
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"origin_x": self.origin_x, "origin_y": self.origin_y}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "LocalFrame":
+        if not data:
+            return IDENTITY_FRAME
+        return cls(float(data.get("origin_x", 0.0)), float(data.get("origin_y", 0.0)))
+
+
+IDENTITY_FRAME = LocalFrame()
+
+
+def normalize_to_local_origin(
+    wall: Polygon,
+    apertures: Optional[List[Polygon]] = None,
+    threshold_mm: float = LOCAL_ORIGIN_THRESHOLD_MM,
+) -> Tuple[Polygon, List[Polygon], LocalFrame]:
+    """
+    Trasla parete e aperture in modo che l'angolo minimo della parete sia in (0, 0).
+
+    La traslazione viene applicata solo se la parete dista dall'origine più di
+    ``threshold_mm``: i disegni già locali restano invariati bit per bit.
+
+    Returns:
+        (parete_locale, aperture_locali, frame)
+    """
+    apertures = list(apertures or [])
+    if wall is None or wall.is_empty:
+        return wall, apertures, IDENTITY_FRAME
+
+    minx, miny, _, _ = wall.bounds
+    if max(abs(minx), abs(miny)) <= threshold_mm:
+        return wall, apertures, IDENTITY_FRAME
+
+    frame = LocalFrame(minx, miny)
+    print(f"📍 Coordinate georeferenziate rilevate: origine locale in ({minx:.3f}, {miny:.3f})")
+    return frame.to_local(wall), [frame.to_local(ap) for ap in apertures], frame
+
+
+def frame_from_session(session: Optional[Dict]) -> LocalFrame:
+    """Recupera il LocalFrame salvato in una sessione (identità se assente)."""
+    if not session:
+        return IDENTITY_FRAME
+    frame = session.get("local_frame")
+    if isinstance(frame, LocalFrame):
+        return frame
+    return LocalFrame.from_dict(frame)
+
+
+def _translate_coordinates(coords, dx: float, dy: float):
+    """Trasla ricorsivamente liste di coordinate GeoJSON."""
+    if coords and isinstance(coords[0], (int, float)):
+        return [coords[0] + dx, coords[1] + dy, *coords[2:]]
+    return [_translate_coordinates(c, dx, dy) for c in coords]
+
+
+__all__ = [
+    "LocalFrame",
+    "IDENTITY_FRAME",
+    "normalize_to_local_origin",
+    "frame_from_session",
+]
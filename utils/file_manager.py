@@ -25,6 +25,7 @@ def setup_output_directories() -> Dict[str, str]:
         'svg': os.path.join(base_output, 'svg'),
         'reports': os.path.join(base_output, 'reports'),
         'schemas': os.path.join(base_output, 'schemas'),
+        'bundles': os.path.join(base_output, 'bundles'),
         'temp': os.path.join(base_output, 'temp')
     }
     
@@ -60,7 +61,8 @@ def get_organized_output_path(filename: str, file_type: str = None) -> str:
             '.jpeg': 'images',
             '.svg': 'svg',
             '.gif': 'images',
-            '.bmp': 'images'
+            '.bmp': 'images',
+            '.zip': 'bundles'
         }
         file_type = type_mapping.get(ext, 'temp')
     
@@ -10,7 +10,7 @@ REGOLE FONDAMENTALI:
 """
 
 import math
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 
 
@@ -35,6 +35,101 @@ class BlockMoraletti:
     positions: List[MoralettoPosition]
 
 
+# Configurazione di riferimento (blocchi 1239/826/413, spacing 420)
+DEFAULT_MORALETTI_CONFIG = {
+    'block_large_width': 1239,
+    'block_large_height': 495,
+    'block_medium_width': 826,
+    'block_medium_height': 495,
+    'block_small_width': 413,
+    'block_small_height': 495,
+    'moraletti_thickness': 58,
+    'moraletti_height': 495,
+    'moraletti_height_from_ground': 95,
+    'moraletti_spacing': 420,
+    'moraletti_count_large': 3,
+    'moraletti_count_medium': 2,
+    'moraletti_count_small': 1,
+}
+
+
+@dataclass(frozen=True)
+class MoralettiLayout:
+    """Layout moraletti precompilato per una larghezza di blocco"""
+    width: float
+    block_type: str  # 'large', 'medium', 'small', 'custom'
+    is_standard: bool
+    info: Tuple[Tuple[str, object], ...]  # voci di get_block_info (immutabili)
+    count: int
+    offsets: Tuple[float, ...]  # centri dal bordo SINISTRO del blocco, il primo sul bordo destro
+    
+    def centers(self, block_x: float) -> List[float]:
+        """Posizioni assolute dei centri per un blocco in ``block_x``"""
+        return [block_x + offset for offset in self.offsets]
+
+
+# Larghezze custom diverse memorizzate per configurazione prima di svuotare la cache
+LAYOUT_CACHE_SIZE = 4096
+
+
+class MoralettiLayoutTable:
+    """
+    Layout moraletti compilati per una configurazione: tabelle fisse per le tre
+    larghezze standard e lookup memorizzato per le larghezze custom.
+    Unica fonte per packer, validatori e preview.
+    """
+    
+    def __init__(self, config: 'DynamicMoralettiConfiguration'):
+        self._config = config
+        self._cache: Dict[float, MoralettiLayout] = {}
+        for width in config.block_sizes.values():
+            self.layout(width)
+        self._standard = dict(self._cache)
+    
+    def layout(self, block_width: float) -> MoralettiLayout:
+        """
+        Layout per una larghezza esatta.
+        Raises ValueError per custom >= Grande (come ``get_block_info``).
+        """
+        layout = self._cache.get(block_width)
+        if layout is None:
+            layout = self._compile(block_width)
+            if len(self._cache) >= LAYOUT_CACHE_SIZE:
+                self._cache = dict(self._standard)
+            self._cache[block_width] = layout
+        return layout
+    
+    def count(self, block_width: float) -> int:
+        """
+        Numero moraletti per una larghezza qualsiasi. Per i pezzi fuori regola
+        (>= Grande, es. custom di emergenza) usa il massimo del blocco Grande.
+        """
+        try:
+            return self.layout(block_width).count
+        except ValueError:
+            config = self._config
+            return min(math.floor(block_width / config.spacing) + 1, config.moraletti_counts['large'])
+    
+    def _compile(self, block_width: float) -> MoralettiLayout:
+        config = self._config
+        block_info = config._classify_block(block_width)
+        
+        # Numero moraletti teorici con spacing, limitato al MAX del tipo
+        theoretical_count = math.floor(block_width / config.spacing) + 1
+        actual_count = min(theoretical_count, block_info['max_moraletti'])
+        
+        # Distanza dal bordo DESTRO: i * spacing verso SINISTRA
+        offsets = tuple(block_width - i * config.spacing for i in range(actual_count))
+        return MoralettiLayout(
+            width=block_width,
+            block_type=block_info['type'],
+            is_standard=block_info['is_standard'],
+            info=tuple(block_info.items()),
+            count=actual_count,
+            offsets=offsets
+        )
+
+
 class DynamicMoralettiConfiguration:
     """
     Configurazione dinamica moraletti caricata dall'utente
@@ -88,6 +183,9 @@ class DynamicMoralettiConfiguration:
         
         # Validazione configurazione
         self._validate_configuration()
+        
+        # Layout precompilati (standard) e memorizzati (custom)
+        self.layouts = MoralettiLayoutTable(self)
     
     def _validate_configuration(self):
         """Valida che la configurazione sia consistente"""
@@ -122,8 +220,12 @@ class DynamicMoralettiConfiguration:
     def get_block_info(self, block_width: float) -> Dict:
         """
         Determina tipo e proprietà del blocco basandosi sulla larghezza
-        DINAMICO - usa valori configurati
+        DINAMICO - usa valori configurati (dal layout compilato)
         """
+        return dict(self.layouts.layout(block_width).info)
+    
+    def _classify_block(self, block_width: float) -> Dict:
+        """Classificazione del blocco, eseguita una volta per larghezza da ``MoralettiLayoutTable``"""
         
         # Arrotondamento per confronto
         block_width = round(block_width, 2)
@@ -223,51 +325,49 @@ class DynamicMoralettiConfiguration:
         - Max moraletti: da configurazione o range
         """
         
-        # Ottieni info blocco
-        block_info = self.get_block_info(block_width)
-        
-        # Calcola numero moraletti teorici con spacing
-        theoretical_count = math.floor(block_width / self.spacing) + 1
-        
-        # Applica limite MAX
-        actual_count = min(theoretical_count, block_info['max_moraletti'])
+        # Layout precompilato per questa larghezza
+        layout = self.layouts.layout(block_width)
         
         # Calcola posizioni
         positions = []
         half_thickness = self.thickness / 2
+        block_id = block_id or f"block_{block_x}"
         
-        for i in range(actual_count):
-            # Distanza dal bordo DESTRO del blocco
-            distance_from_right = i * self.spacing
-            
-            # Posizione centro dal bordo SINISTRO del blocco (relativa)
-            center_relative = block_width - distance_from_right
-            
+        for i, center_relative in enumerate(layout.offsets):
             # Posizione assoluta nella parete
             center_absolute = block_x + center_relative
             
             # Range occupato
-            range_start = center_absolute - half_thickness
-            range_end = center_absolute + half_thickness
-            
             positions.append(MoralettoPosition(
                 center_x=center_absolute,
-                range_start=range_start,
-                range_end=range_end,
-                block_id=block_id or f"block_{block_x}",
+                range_start=center_absolute - half_thickness,
+                range_end=center_absolute + half_thickness,
+                block_id=block_id,
                 moraletto_index=i
             ))
         
         return BlockMoraletti(
             block_x=block_x,
             block_width=block_width,
-            block_type=block_info['type'],
-            is_standard=block_info['is_standard'],
-            moraletti_count=actual_count,
+            block_type=layout.block_type,
+            is_standard=layout.is_standard,
+            moraletti_count=layout.count,
             positions=positions
         )
 
 
+@dataclass(frozen=True)
+class RowMoraletti:
+    """
+    Moraletti di una riga calcolati una volta sola.
+    ``positions`` è nell'ordine dei blocchi (come il calcolo per blocco),
+    ``order``/``centers`` lo stesso insieme ordinato per centro crescente.
+    """
+    positions: Tuple[MoralettoPosition, ...]
+    order: Tuple[int, ...]
+    centers: Tuple[float, ...]
+
+
 class MoralettiCoverageValidator:
     """
     Valida che TUTTI i moraletti siano coperti
@@ -277,15 +377,41 @@ class MoralettiCoverageValidator:
     def __init__(self, config: DynamicMoralettiConfiguration):
         self.config = config
     
+    def prepare_row(self, row: List[Dict]) -> RowMoraletti:
+        """
+        Calcola i moraletti di una riga una volta sola, da riusare per
+        validare tutte le combinazioni candidate della riga sopra
+        """
+        
+        positions = []
+        for block in row:
+            block_moraletti = self.config.calculate_moraletti_for_block(
+                block_width=block['width'],
+                block_x=block['x'],
+                block_id=block.get('id', f"block_{block['x']}")
+            )
+            positions.extend(block_moraletti.positions)
+        
+        order = tuple(sorted(range(len(positions)), key=lambda i: positions[i].center_x))
+        return RowMoraletti(
+            positions=tuple(positions),
+            order=order,
+            centers=tuple(positions[i].center_x for i in order)
+        )
+    
     def validate_complete_coverage(self, 
-                                   row_below: List[Dict],
-                                   row_above: List[Dict]) -> Dict:
+                                   row_below: Union[List[Dict], RowMoraletti],
+                                   row_above: List[Dict],
+                                   detailed: bool = True) -> Dict:
         """
         Verifica che TUTTI i moraletti della riga sotto siano coperti dalla riga sopra
         
         Args:
             row_below: Lista blocchi riga sotto [{'x': 0, 'width': 1239}, ...]
+                       oppure i suoi moraletti già calcolati (``prepare_row``)
             row_above: Lista blocchi riga sopra
+            detailed: Se False non costruisce lista scoperti e coverage_map
+                      (solo esito e conteggi, per la valutazione dei candidati)
             
         Returns:
             {
@@ -296,17 +422,10 @@ class MoralettiCoverageValidator:
             }
         """
         
-        # 1. Calcola TUTTI i moraletti della riga sotto
-        all_moraletti_below = []
-        for block in row_below:
-            block_moraletti = self.config.calculate_moraletti_for_block(
-                block_width=block['width'],
-                block_x=block['x'],
-                block_id=block.get('id', f"block_{block['x']}")
-            )
-            all_moraletti_below.extend(block_moraletti.positions)
+        # 1. Moraletti della riga sotto, ordinati per centro
+        below = row_below if isinstance(row_below, RowMoraletti) else self.prepare_row(row_below)
         
-        if not all_moraletti_below:
+        if not below.positions:
             # Nessun moraletto da coprire (prima riga)
             return {
                 'is_complete': True,
@@ -316,49 +435,53 @@ class MoralettiCoverageValidator:
                 'total_moraletti': 0
             }
         
-        # 2. Per OGNI moraletto, verifica che sia coperto da blocco sopra
-        uncovered = []
-        coverage_map = {}
-        
-        for moraletto in all_moraletti_below:
-            is_covered = False
-            covering_block = None
-            
-            for block_above in row_above:
-                block_left = block_above['x']
-                block_right = block_above['x'] + block_above['width']
-                
-                # Moraletto coperto se il suo CENTRO è dentro il blocco sopra
-                # Include piccola tolleranza per bordi
-                tolerance = self.config.thickness / 2
-                
-                if (block_left - tolerance) <= moraletto.center_x <= (block_right + tolerance):
-                    is_covered = True
-                    covering_block = block_above
-                    break
-            
-            if is_covered:
-                coverage_map[moraletto.center_x] = {
-                    'moraletto': moraletto,
-                    'covered_by': covering_block
-                }
+        # 2. Sweep: moraletti e blocchi sopra in ordine di x, un solo passaggio.
+        # Moraletto coperto se il suo CENTRO è dentro un blocco sopra
+        # (con piccola tolleranza per i bordi)
+        tolerance = self.config.thickness / 2
+        blocks = sorted(row_above, key=lambda b: b['x'])
+        covering = [None] * len(below.positions) if detailed else None
+        uncovered_count = 0
+        j = 0
+        
+        for index, center in zip(below.order, below.centers):
+            # Blocchi che finiscono prima del moraletto non coprono nemmeno i successivi
+            while j < len(blocks) and blocks[j]['x'] + blocks[j]['width'] + tolerance < center:
+                j += 1
+            if j < len(blocks) and blocks[j]['x'] - tolerance <= center:
+                if detailed:
+                    covering[index] = blocks[j]
             else:
-                uncovered.append(moraletto)
+                uncovered_count += 1
         
         # 3. Calcola statistiche
-        total_count = len(all_moraletti_below)
-        covered_count = total_count - len(uncovered)
+        total_count = len(below.positions)
+        covered_count = total_count - uncovered_count
         coverage_percent = (covered_count / total_count * 100) if total_count > 0 else 100
         
-        return {
-            'is_complete': len(uncovered) == 0,
+        result = {
+            'is_complete': uncovered_count == 0,
             'coverage_percent': coverage_percent,
-            'uncovered_moraletti': uncovered,
-            'uncovered_count': len(uncovered),
+            'uncovered_count': uncovered_count,
             'total_moraletti': total_count,
-            'covered_count': covered_count,
-            'coverage_map': coverage_map
+            'covered_count': covered_count
         }
+        
+        if detailed:
+            uncovered = []
+            coverage_map = {}
+            for moraletto, covering_block in zip(below.positions, covering):
+                if covering_block is not None:
+                    coverage_map[moraletto.center_x] = {
+                        'moraletto': moraletto,
+                        'covered_by': covering_block
+                    }
+                else:
+                    uncovered.append(moraletto)
+            result['uncovered_moraletti'] = uncovered
+            result['coverage_map'] = coverage_map
+        
+        return result
     
     def get_moraletti_positions_for_row(self, row: List[Dict]) -> List[float]:
         """
@@ -368,15 +491,65 @@ class MoralettiCoverageValidator:
         
         all_positions = []
         for block in row:
-            block_moraletti = self.config.calculate_moraletti_for_block(
-                block_width=block['width'],
-                block_x=block['x']
-            )
-            all_positions.extend([m.center_x for m in block_moraletti.positions])
+            all_positions.extend(self.config.layouts.layout(block['width']).centers(block['x']))
         
         return sorted(all_positions)
 
 
+# Distanza sotto la quale due giunti di righe adiacenti sono "allineati"
+STAGGER_TOLERANCE_MM = 10
+
+
+@dataclass(frozen=True)
+class RowJoints:
+    """Giunti (bordi tra blocchi) di una riga in ordine crescente: indice per lo sfalsamento"""
+    borders: Tuple[float, ...]
+
+
+class StaggerPrefix:
+    """
+    Conteggio incrementale dei giunti allineati di una riga costruita da
+    sinistra a destra rispetto ai giunti della riga sotto (merge a due puntatori).
+    ``push``/``pop`` permettono l'uso dentro un backtracking; ``upper_bound``
+    è lo score massimo ancora raggiungibile, utilizzabile per il pruning.
+    """
+    
+    def __init__(self, joints_below: RowJoints, tolerance: float = STAGGER_TOLERANCE_MM):
+        self._below = joints_below.borders
+        self._tolerance = tolerance
+        self._pointer = 0
+        self._stack = []
+        self.aligned = 0
+        self.count = 0
+    
+    def push(self, border: float) -> bool:
+        """Aggiunge un giunto (non minore dei precedenti); True se allineato"""
+        below = self._below
+        j = self._pointer
+        self._stack.append((j, self.aligned))
+        
+        # Giunti sotto troppo a sinistra di questo lo sono anche per i successivi
+        while j < len(below) and below[j] < border and border - below[j] >= self._tolerance:
+            j += 1
+        aligned = j < len(below) and abs(border - below[j]) < self._tolerance
+        
+        self._pointer = j
+        self.count += 1
+        self.aligned += aligned
+        return aligned
+    
+    def pop(self) -> None:
+        """Annulla l'ultimo ``push``"""
+        self._pointer, self.aligned = self._stack.pop()
+        self.count -= 1
+    
+    def upper_bound(self, total_borders: int) -> float:
+        """Score massimo (0-1) se i giunti mancanti fino a ``total_borders`` fossero tutti sfalsati"""
+        if total_borders <= 0:
+            return 1.0
+        return (total_borders - self.aligned) / total_borders * 100 / 100
+
+
 class StaggeringCalculator:
     """
     Calcola metriche di sfalsamento tra righe
@@ -384,24 +557,28 @@ class StaggeringCalculator:
     """
     
     @staticmethod
-    def calculate_stagger_score(row_above: List[Dict], row_below: List[Dict]) -> Dict:
+    def get_borders(row: List[Dict]) -> List[float]:
+        """Giunti di una riga: bordo destro di ogni blocco tranne l'ultimo (bordo parete)"""
+        return [block['x'] + block['width'] for block in row[:-1]]
+    
+    @staticmethod
+    def prepare_row(row_below: List[Dict]) -> RowJoints:
+        """Indice ordinato dei giunti della riga sotto, da riusare per tutti i candidati"""
+        return RowJoints(tuple(sorted(StaggeringCalculator.get_borders(row_below))))
+    
+    @staticmethod
+    def calculate_stagger_score(row_above: List[Dict],
+                                row_below: Union[List[Dict], RowJoints]) -> Dict:
         """
         Calcola quanto è sfalsata una riga rispetto a quella sotto
         
         Score alto = molto sfalsamento (buono)
         Score basso = poco sfalsamento (cattivo - colonne verticali)
-        """
         
-        # Trova tutti i bordi (giunti tra blocchi)
-        def get_borders(row):
-            borders = []
-            for i, block in enumerate(row[:-1]):  # Escludi ultimo (bordo parete)
-                border_x = block['x'] + block['width']
-                borders.append(border_x)
-            return borders
+        ``row_below`` può essere già indicizzata con ``prepare_row``.
+        """
         
-        borders_below = get_borders(row_below)
-        borders_above = get_borders(row_above)
+        borders_above = StaggeringCalculator.get_borders(row_above)
         
         if not borders_above:
             # Riga sopra ha un solo blocco - sfalsamento N/A
@@ -413,18 +590,19 @@ class StaggeringCalculator:
                 'is_good': True
             }
         
-        # Conta bordi allineati (cattivo!)
-        aligned_count = 0
-        tolerance = 10  # mm - tolleranza per considerare allineato
+        # Conta bordi allineati (cattivo!) con un solo passaggio sui giunti ordinati
+        joints_below = row_below if isinstance(row_below, RowJoints) else StaggeringCalculator.prepare_row(row_below)
+        prefix = StaggerPrefix(joints_below)
+        for border_above in sorted(borders_above):
+            prefix.push(border_above)
         
-        for border_above in borders_above:
-            for border_below in borders_below:
-                if abs(border_above - border_below) < tolerance:
-                    aligned_count += 1
-                    break
+        return StaggeringCalculator.stagger_result(prefix.aligned, len(borders_above))
+    
+    @staticmethod
+    def stagger_result(aligned_count: int, total_borders: int) -> Dict:
+        """Metriche di sfalsamento dai conteggi dei giunti"""
         
         # Score: percentuale di bordi NON allineati
-        total_borders = len(borders_above)
         staggered_borders = total_borders - aligned_count
         stagger_percent = (staggered_borders / total_borders * 100) if total_borders > 0 else 100
         
@@ -451,7 +629,7 @@ def validate_row_coverage(row_below: List[Dict], row_above: List[Dict],
     Returns: True se TUTTI i moraletti coperti, False altrimenti
     """
     validator = MoralettiCoverageValidator(config)
-    result = validator.validate_complete_coverage(row_below, row_above)
+    result = validator.validate_complete_coverage(row_below, row_above, detailed=False)
     return result['is_complete']
 
 
@@ -467,11 +645,18 @@ def calculate_moraletti_positions_list(blocks: List[Dict],
 
 # Export principali
 __all__ = [
+    'DEFAULT_MORALETTI_CONFIG',
     'DynamicMoralettiConfiguration',
     'MoralettiCoverageValidator',
     'StaggeringCalculator',
+    'StaggerPrefix',
+    'RowJoints',
+    'STAGGER_TOLERANCE_MM',
     'MoralettoPosition',
     'BlockMoraletti',
+    'MoralettiLayout',
+    'MoralettiLayoutTable',
+    'RowMoraletti',
     'create_moraletti_config_from_dict',
     'validate_row_coverage',
     'calculate_moraletti_positions_list'
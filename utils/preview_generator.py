@@ -4,33 +4,17 @@ Generazione di immagini preview per la visualizzazione delle pareti costruite.
 Estratto da main.py per migliorare la modularità.
 """
 
-import io
-import base64
 from typing import List, Dict, Optional
 
 from shapely.geometry import Polygon
-from shapely.ops import unary_union
-from shapely.validation import explain_validity
-from shapely.geometry import shape
+
+from utils.moraletti_alignment import DEFAULT_MORALETTI_CONFIG, DynamicMoralettiConfiguration
 
 # Logging strutturato
 from utils.logging_config import get_logger, log_operation, info, warning, error
 
-# Optional plotting dependencies (guarded)
-try:
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as patches
-    from matplotlib.backends.backend_agg import FigureCanvasAgg
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    MATPLOTLIB_AVAILABLE = True
-except Exception:  # pragma: no cover
-    plt = None
-    patches = None
-    MATPLOTLIB_AVAILABLE = False
-
-# Import labels from exporters
-from exporters.labels import create_block_labels, create_detailed_block_labels
+from utils.raster_preview import PIL_AVAILABLE, render_scene_png
+from utils.scene_graph import SceneGraph, get_scene_graph
 
 
 def _extract_configuration_info(enhanced_info: Dict, placed: List[Dict] = None, customs: List[Dict] = None) -> Dict:
@@ -122,7 +106,6 @@ def _calculate_moraletti_info(enhanced_info: Dict, placed: List[Dict], customs:
     Returns:
         Dizionario con informazioni moraletti formattate
     """
-    import math
     from collections import defaultdict
     
     # Estrai configurazione moraletti dalle impostazioni
@@ -159,12 +142,26 @@ def _calculate_moraletti_info(enhanced_info: Dict, placed: List[Dict], customs:
     medium_width = block_widths[1]
     small_width = block_widths[2]
     
-    # Mappatura larghezza -> max moraletti
-    width_to_max_moraletti = {
-        large_width: max_moraletti_large,
-        medium_width: max_moraletti_medium,
-        small_width: max_moraletti_small
+    # Layout moraletti compilati: stessi conteggi usati dal packer e dai validatori
+    moraletti_values = {
+        'block_large_width': large_width,
+        'block_medium_width': medium_width,
+        'block_small_width': small_width,
+        'moraletti_thickness': moraletti_thickness,
+        'moraletti_height': moraletti_height,
+        'moraletti_height_from_ground': moraletti_height_from_ground,
+        'moraletti_spacing': moraletti_spacing,
+        'moraletti_count_large': max_moraletti_large,
+        'moraletti_count_medium': max_moraletti_medium,
+        'moraletti_count_small': max_moraletti_small,
     }
+    for size in ('large', 'medium', 'small'):
+        moraletti_values[f'block_{size}_height'] = config_data.get("block_height", moraletti_height)
+    try:
+        layouts = DynamicMoralettiConfiguration(moraletti_values).layouts
+    except ValueError as e:
+        print(f"⚠️ Configurazione moraletti non valida ({e}), uso i valori predefiniti")
+        layouts = DynamicMoralettiConfiguration(DEFAULT_MORALETTI_CONFIG).layouts
     
     # Mappatura larghezza -> lettera (A, B, C)
     size_to_letter = config_data.get("size_to_letter", {})
@@ -175,23 +172,8 @@ def _calculate_moraletti_info(enhanced_info: Dict, placed: List[Dict], customs:
             str(small_width): 'C'
         }
     
-    # Funzione per calcolare moraletti per un blocco
-    def calculate_moraletti_count(width: float) -> int:
-        """Calcola numero moraletti per una larghezza blocco"""
-        # Teorico: floor(width / spacing) + 1
-        theoretical_count = math.floor(width / moraletti_spacing) + 1
-        
-        # Applica max per blocchi standard
-        if width in width_to_max_moraletti:
-            return min(theoretical_count, width_to_max_moraletti[width])
-        
-        # Per custom, cerca il range più vicino
-        for std_width, max_count in width_to_max_moraletti.items():
-            if abs(width - std_width) < 50:  # Tolleranza 50mm
-                return min(theoretical_count, max_count)
-        
-        # Fallback: usa theoretical con limite massimo ragionevole
-        return min(theoretical_count, 5)
+    # Numero moraletti per un blocco
+    calculate_moraletti_count = layouts.count
     
     # Conta blocchi standard per tipo
     standard_counts = defaultdict(int)
@@ -244,7 +226,7 @@ def _calculate_moraletti_info(enhanced_info: Dict, placed: List[Dict], customs:
     lines.append(f"<strong>Totale Moraletti:</strong> {total_moraletti} pezzi")
     lines.append("<em style='color: #6b7280; font-size: 0.85rem;'>(Dettagli per blocco nelle tabelle sottostanti)</em>")
     
-    # Converti in dizionario per compatibilità con _add_configuration_info_box
+    # Converti in dizionario (righe pre-formattate + valori per il frontend)
     return {
         '_raw_lines': lines,  # Usa chiave speciale per gestione custom
         'Configurazione': f"{moraletti_thickness}mm × {moraletti_height}mm",
@@ -254,116 +236,6 @@ def _calculate_moraletti_info(enhanced_info: Dict, placed: List[Dict], customs:
     }
 
 
-def _add_configuration_info_box(ax, config_info: Dict, bounds):
-    """
-    Aggiunge una card integrata nel plot con le informazioni di configurazione.
-    
-    Args:
-        ax: Asse matplotlib per il disegno
-        config_info: Dizionario con le informazioni di configurazione
-        bounds: Bounds del plot (minx, miny, maxx, maxy)
-    """
-    print(f"DEBUG: _add_configuration_info_box chiamata con config_info: {config_info}")
-    
-    if not config_info:
-        print("DEBUG: Nessuna config_info fornita")
-        return
-    
-    minx, miny, maxx, maxy = bounds
-    
-    # Crea le righe per la card
-    card_lines = []
-    
-    # Titolo principale
-    card_lines.append("CONFIGURAZIONE")
-    card_lines.append("-" * 20)
-    
-    # Ogni sezione con le sue informazioni
-    for section_name, section_data in config_info.items():
-        if isinstance(section_data, dict) and section_data:
-            # Nome sezione
-            card_lines.append(f"{section_name.upper()}:")
-            
-            # Gestione speciale per Moraletti con formato custom
-            if '_raw_lines' in section_data:
-                # Usa le righe pre-formattate
-                for line in section_data['_raw_lines']:
-                    if line:  # Salta righe vuote iniziali
-                        card_lines.append(f"  {line}")
-            else:
-                # Dati della sezione standard
-                for key, value in section_data.items():
-                    if value and value != 'Non specificato' and value != 'N/A':
-                        card_lines.append(f"  {key}: {value}")
-            
-            # Spaziatura tra sezioni
-            card_lines.append("")
-    
-    # Rimuove l'ultima riga vuota se presente
-    if card_lines and card_lines[-1] == "":
-        card_lines.pop()
-    
-    print(f"DEBUG: Card lines create: {card_lines}")
-    
-    # Crea la card solo se ci sono informazioni da mostrare
-    if card_lines:
-        # Posizionamento della card in basso a destra del plot
-        card_width = (maxx - minx) * 0.35  # 35% della larghezza
-        card_height = len(card_lines) * 50  # Altezza proporzionale al numero di righe
-        
-        card_x = maxx - card_width - ((maxx - minx) * 0.05)  # 5% di margine da destra
-        card_y = miny + ((maxy - miny) * 0.05)  # 5% di margine dal basso
-        
-        # Disegna il rettangolo di sfondo della card
-        card_rect = patches.Rectangle(
-            (card_x, card_y),
-            card_width,
-            card_height,
-            facecolor='white',
-            edgecolor='#333333',
-            linewidth=1.5,
-            alpha=0.95,
-            zorder=1000
-        )
-        ax.add_patch(card_rect)
-        
-        # Aggiungi il testo riga per riga
-        line_height = card_height / len(card_lines)
-        for i, line in enumerate(card_lines):
-            text_y = card_y + card_height - (i + 0.5) * line_height
-            
-            # Stile diverso per il titolo
-            if i == 0:  # Titolo principale
-                fontweight = 'bold'
-                fontsize = 12
-            elif line.endswith(':'):  # Titoli delle sezioni
-                fontweight = 'bold'
-                fontsize = 10
-            elif line.startswith('-'):  # Linea separatrice
-                fontweight = 'normal'
-                fontsize = 8
-            else:  # Contenuto normale
-                fontweight = 'normal'
-                fontsize = 9
-            
-            ax.text(
-                card_x + card_width / 2,  # Centrato orizzontalmente
-                text_y,
-                line,
-                fontsize=fontsize,
-                fontweight=fontweight,
-                ha='center',
-                va='center',
-                color='#333333',
-                zorder=1001,
-                family='monospace'
-            )
-        
-        print(f"DEBUG: Card integrata creata alle coordinate ({card_x}, {card_y})")
-    else:
-        print("DEBUG: Nessuna sezione da mostrare nella card")
-
-
 def generate_preview_image(
     wall_polygon: Polygon,
     placed: List[Dict],
@@ -374,6 +246,7 @@ def generate_preview_image(
     width: int = 800,
     height: int = 600,
     enhanced_info: Optional[Dict] = None,
+    scene_graph: Optional[SceneGraph] = None,
 ) -> str:
     """
     Genera immagine preview come stringa base64.
@@ -388,349 +261,77 @@ def generate_preview_image(
         width: Larghezza immagine in pixel
         height: Altezza immagine in pixel
         enhanced_info: Informazioni per preview enhanced (frecce, titolo, info aggiuntive)
+        scene_graph: Grafo di scena già calcolato (es. dalla sessione); se presente
+            geometrie ed etichette non vengono ricalcolate
         
     Returns:
         String base64 dell'immagine PNG o stringa vuota se errore
     """
-    if not MATPLOTLIB_AVAILABLE:
-        warning("Matplotlib non disponibile - preview disabilitato")
+    if not PIL_AVAILABLE:
+        warning("Pillow non disponibile - preview disabilitato")
         return ""
 
-    color_theme = color_theme or {}
-
-    if block_config:
-        size_to_letter = block_config.get("size_to_letter", {})
-        info("Preview block config loaded", 
-             block_widths=block_config.get("block_widths", "N/A"),
-             block_height=block_config.get("block_height", "N/A"))
-    else:
-        size_to_letter = {}
-        warning("Preview using default block config - no custom config provided")
-
-    # Configurazione colori con fallback
-    wall_color = color_theme.get("wallOutlineColor", "#1E40AF")
-    wall_line_width = color_theme.get("wallLineWidth", 2)
-    
-    # Colori per i tre tipi di blocco standard
-    block_a_color = color_theme.get("blockAColor", "#E5E7EB")
-    block_a_border = color_theme.get("blockABorder", "#374151")
-    block_b_color = color_theme.get("blockBColor", "#DBEAFE")
-    block_b_border = color_theme.get("blockBBorder", "#1E40AF")
-    block_c_color = color_theme.get("blockCColor", "#FEF3C7")
-    block_c_border = color_theme.get("blockCBorder", "#D97706")
-    
-    custom_piece_color = color_theme.get("customPieceColor", "#F3E8FF")
-    custom_piece_border = color_theme.get("customPieceBorder", "#7C3AED")
-    door_window_color = color_theme.get("doorWindowColor", "#FEE2E2")
-    door_window_border = color_theme.get("doorWindowBorder", "#DC2626")
-
-    info("Preview colors configured", 
-         wall_color=wall_color, 
-         block_a_color=block_a_color,
-         block_b_color=block_b_color,
-         block_c_color=block_c_color)
-
     try:
-        fig, ax = plt.subplots(figsize=(width / 100, height / 100), dpi=100)
-        ax.set_aspect("equal")
-
-        # Calcola bounds originali e normalizza coordinate
-        orig_minx, orig_miny, orig_maxx, orig_maxy = wall_polygon.bounds
-        
-        # Trasla tutto all'origine per coordinate più gestibili
-        from shapely.affinity import translate
-        
-        # Normalizza la parete
-        wall_normalized = translate(wall_polygon, -orig_minx, -orig_miny)
-        
-        # Normalizza aperture se presenti
-        apertures_normalized = []
-        if apertures:
-            for aperture in apertures:
-                apertures_normalized.append(translate(aperture, -orig_minx, -orig_miny))
-        
-        # Normalizza blocchi posizionati
-        placed_normalized = []
-        for blk in placed:
-            placed_normalized.append({
-                **blk,
-                'x': blk['x'] - orig_minx,
-                'y': blk['y'] - orig_miny
-            })
-            
-        # Normalizza pezzi custom
-        customs_normalized = []
-        for custom in customs:
-            customs_normalized.append({
-                **custom,
-                'x': custom['x'] - orig_minx,
-                'y': custom['y'] - orig_miny
-            })
-
-        # Calcola bounds normalizzati e margini (salvali per dopo)
-        norm_minx, norm_miny, norm_maxx, norm_maxy = wall_normalized.bounds
-        # RIDUCO DRASTICAMENTE I MARGINI - da 5% a 1%
-        margin = max((norm_maxx - norm_minx), (norm_maxy - norm_miny)) * 0.01
-        # NON impostiamo i limiti ancora - li impostiamo alla fine dopo aver disegnato tutto
-
-        # Se c'è un offset applicato, disegna PRIMA il poligono originale in blu tratteggiato
-        if enhanced_info and "wall_original" in enhanced_info:
-            wall_original = enhanced_info["wall_original"]
-            wall_original_normalized = translate(wall_original, -orig_minx, -orig_miny)
-            orig_x, orig_y = wall_original_normalized.exterior.xy
-            ax.plot(orig_x, orig_y, color='#3B82F6', linestyle='--', linewidth=5, alpha=0.8, label='Perimetro Originale')
-            info(f"Drawing original wall polygon with offset {enhanced_info.get('offset_mm', 0)}mm")
-
-        # Disegna il contorno della parete normalizzato (con offset se applicato)
-        x, y = wall_normalized.exterior.xy
-        if enhanced_info and "wall_original" in enhanced_info:
-            # Se c'è offset, disegna il poligono offset con riempimento verde
-            coords = list(wall_normalized.exterior.coords)
-            # Usa patches.Polygon con tupla RGBA (R, G, B, Alpha) normalizzati [0-1]
-            patch = patches.Polygon(coords, facecolor=(34/255, 197/255, 94/255, 0.15), 
-                                   edgecolor='#22C55E', linewidth=3, label='Area Packing (offset)')
-            ax.add_patch(patch)
-        else:
-            # Se non c'è offset, disegna normalmente
-            ax.plot(x, y, color=wall_color, linewidth=wall_line_width, label="Parete")
-
-        # Crea labels dettagliate per i blocchi (usando quelli originali per le labels)
-        if block_config and size_to_letter:
-            detailed_std_labels, detailed_custom_labels = create_detailed_block_labels(
-                placed,
-                customs,
-                size_to_letter,
-            )
-            info("Preview using custom size_to_letter", mapping=size_to_letter)
-        else:
-            detailed_std_labels, detailed_custom_labels = create_detailed_block_labels(placed, customs)
-            info("Preview using default size_to_letter mapping")
-
-        # Helper function per determinare il colore in base alla larghezza
-        def get_block_colors(width):
-            """Determina i colori fill e border in base alla larghezza del blocco."""
-            # Tolleranza di 5mm per matching
-            tolerance = 5
-            
-            # Blocco A: 1239mm
-            if abs(width - 1239) <= tolerance:
-                return block_a_color, block_a_border
-            # Blocco B: 826mm
-            elif abs(width - 826) <= tolerance:
-                return block_b_color, block_b_border
-            # Blocco C: 413mm
-            elif abs(width - 413) <= tolerance:
-                return block_c_color, block_c_border
-            else:
-                # Fallback: usa colore blocco A per dimensioni custom
-                return block_a_color, block_a_border
-        
-        # Disegna blocchi standard (con coordinate normalizzate)
-        for i, blk in enumerate(placed_normalized):
-            # Ottieni blocco originale per larghezza corretta
-            orig_blk = placed[i]
-            fill_color, border_color = get_block_colors(orig_blk["width"])
-            
-            rect = patches.Rectangle(
-                (blk["x"], blk["y"]),
-                blk["width"],
-                blk["height"],
-                facecolor=fill_color,
-                edgecolor=border_color,
-                linewidth=0.5,
-            )
-            ax.add_patch(rect)
-
-            # Aggiungi etichette ai blocchi
-            label_info = detailed_std_labels.get(i)
-            if not label_info:
-                continue
-
-            bl_x = blk["x"] + blk["width"] * 0.1
-            bl_y = blk["y"] + blk["height"] * 0.2
-            tr_x = blk["x"] + blk["width"] * 0.9
-            tr_y = blk["y"] + blk["height"] * 0.8
-
-            category = label_info["display"]["bottom_left"]
-            number = label_info["display"]["top_right"]
-
-            fontsize_cat = min(12, max(6, blk["width"] / 150))
-            ax.text(
-                bl_x,
-                bl_y,
-                category,
-                ha="left",
-                va="bottom",
-                fontsize=fontsize_cat,
-                fontweight="bold",
-                color="#dc2626",
+        if scene_graph is None:
+            scene_graph = build_preview_scene_graph(
+                wall_polygon, placed, customs, apertures, block_config, enhanced_info
             )
+        graph = scene_graph.restyle(color_theme)
 
-            fontsize_num = min(10, max(4, blk["width"] / 200))
-            ax.text(
-                tr_x,
-                tr_y,
-                number,
-                ha="right",
-                va="top",
-                fontsize=fontsize_num,
-                fontweight="normal",
-                color="#2563eb",
-            )
-
-        # Disegna pezzi custom (con coordinate normalizzate)
-        for i, cust in enumerate(customs_normalized):
-            try:
-                # Usa la geometria originale ma trasla le coordinate per le etichette
-                orig_cust = customs[i]
-                poly = shape(orig_cust["geometry"])
-                # Trasla la geometria
-                poly_normalized = translate(poly, -orig_minx, -orig_miny)
-            except Exception:
-                continue
-
-            patch = patches.Polygon(
-                list(poly_normalized.exterior.coords),
-                facecolor=custom_piece_color,
-                edgecolor=custom_piece_border,
-                linewidth=0.8,
-                hatch="//",
-                alpha=0.8,
+        # Configurazione titolo con supporto enhanced
+        if enhanced_info and enhanced_info.get("enhanced", False):
+            measurements = enhanced_info.get("automatic_measurements", {})
+            thickness_mm = measurements.get("closure_calculation", {}).get("closure_thickness_mm", "N/A")
+            starting_pos = measurements.get("mounting_strategy", {}).get("starting_point", "bottom")
+            graph = graph.with_title(
+                f"Enhanced Preview - Spessore: {thickness_mm}mm - Start: {starting_pos}", "#059669"
             )
-            ax.add_patch(patch)
-
-            # Aggiungi etichette ai pezzi custom (con coordinate normalizzate)
-            label_info = detailed_custom_labels.get(i)
-            if not label_info:
-                continue
 
-            bl_x = cust["x"] + cust["width"] * 0.1
-            bl_y = cust["y"] + cust["height"] * 0.2
-            tr_x = cust["x"] + cust["width"] * 0.9
-            tr_y = cust["y"] + cust["height"] * 0.8
+        info("Preview scene ready",
+             blocks=len(graph.blocks), customs=len(graph.customs), cached=graph.key == scene_graph.key)
 
-            category = label_info["display"]["bottom_left"]
-            number = label_info["display"]["top_right"]
+        # Le coordinate mostrate sugli assi partono da (0, 0) nell'angolo della parete
+        return render_scene_png(graph, width=width, height=height, margin_ratio=0.01)
 
-            fontsize_cat = min(10, max(5, cust["width"] / 120))
-            ax.text(
-                bl_x,
-                bl_y,
-                category,
-                ha="left",
-                va="bottom",
-                fontsize=fontsize_cat,
-                fontweight="bold",
-                color="#16a34a",
-            )
-
-            fontsize_num = min(8, max(4, cust["width"] / 150))
-            ax.text(
-                tr_x,
-                tr_y,
-                number,
-                ha="right",
-                va="top",
-                fontsize=fontsize_num,
-                fontweight="normal",
-                color="#065f46",
-            )
-
-        # Disegna aperture (porte/finestre) - con coordinate normalizzate
-        if apertures_normalized:
-            for ap in apertures_normalized:
-                x, y = ap.exterior.xy
-                ax.plot(x, y, color=door_window_border, linestyle="--", linewidth=2)
-                ax.fill(x, y, color=door_window_color, alpha=0.15)
+    except Exception as exc:
+        error("Errore generazione preview", error=str(exc), exception_type=type(exc).__name__)
+        return ""
 
-        # Configurazione grafico con supporto enhanced
-        if enhanced_info and enhanced_info.get("enhanced", False):
-            # Enhanced title and arrows
-            thickness_mm = enhanced_info.get("automatic_measurements", {}).get("closure_calculation", {}).get("closure_thickness_mm", "N/A")
-            starting_pos = enhanced_info.get("automatic_measurements", {}).get("mounting_strategy", {}).get("starting_point", "bottom")
-            
-            title = f"Enhanced Preview - Spessore: {thickness_mm}mm - Start: {starting_pos}"
-            ax.set_title(title, fontsize=11, fontweight="bold", color="#059669")
-            
-            # Add directional arrows for starting position (usa coordinate normalizzate)
-            if starting_pos:
-                norm_minx, norm_miny, norm_maxx, norm_maxy = wall_normalized.bounds
-                arrow_props = dict(arrowstyle='->', lw=2, color='#dc2626')
-                
-                if starting_pos.lower() == "left":
-                    # Arrow pointing to bottom-left (start laying from left side of bottom row)
-                    ax.annotate("INIZIO", xy=(norm_minx, norm_miny), 
-                               xytext=(norm_minx - (norm_maxx - norm_minx) * 0.1, norm_miny - (norm_maxy - norm_miny) * 0.15),
-                               fontsize=10, fontweight='bold', color='#dc2626',
-                               ha='center', va='center',
-                               arrowprops=arrow_props)
-                elif starting_pos.lower() == "right":
-                    # Arrow pointing to bottom-right (start laying from right side of bottom row)
-                    ax.annotate("INIZIO", xy=(norm_maxx, norm_miny),
-                               xytext=(norm_maxx + (norm_maxx - norm_minx) * 0.1, norm_miny - (norm_maxy - norm_miny) * 0.15),
-                               fontsize=10, fontweight='bold', color='#dc2626', 
-                               ha='center', va='center',
-                               arrowprops=arrow_props)
-                elif starting_pos.lower() == "bottom":
-                    # Arrow pointing to bottom-center (start laying from center of bottom row)
-                    ax.annotate("INIZIO", xy=((norm_minx + norm_maxx) / 2, norm_miny),
-                               xytext=((norm_minx + norm_maxx) / 2, norm_miny - (norm_maxy - norm_miny) * 0.15),
-                               fontsize=10, fontweight='bold', color='#dc2626',
-                               ha='center', va='center',
-                               arrowprops=arrow_props)
-        else:
-            # Standard title
-            ax.set_title("Preview Costruzione Parete", fontsize=12, fontweight="bold", color="#1f2937")
-        
-        ax.grid(True, alpha=0.3, color="#9ca3af")
-        ax.tick_params(axis="both", which="major", labelsize=8, colors="#6b7280")
-        
-        # IMPORTANTE: Impostiamo i limiti degli assi ALLA FINE per evitare che le frecce espandano l'area
-        # Questo mantiene il focus sulla parete e evita spazi bianchi indesiderati
-        # Se c'è offset, usa il poligono ORIGINALE per i bounds (così include sia blu che verde)
-        if enhanced_info and "wall_original" in enhanced_info:
-            wall_original = enhanced_info["wall_original"]
-            wall_original_normalized = translate(wall_original, -orig_minx, -orig_miny)
-            final_minx, final_miny, final_maxx, final_maxy = wall_original_normalized.bounds
-        else:
-            # Altrimenti usa il poligono normalizzato
-            final_minx, final_miny, final_maxx, final_maxy = wall_normalized.bounds
-        
-        tiny_margin = max((final_maxx - final_minx), (final_maxy - final_miny)) * 0.01
-        ax.set_xlim(final_minx - tiny_margin, final_maxx + tiny_margin)
-        ax.set_ylim(final_miny - tiny_margin, final_maxy + tiny_margin)
 
-        # Add comprehensive configuration info box if enhanced
-        if enhanced_info and enhanced_info.get("enhanced", False):
-            # Gather all configuration information
-            # Estrai informazioni di configurazione (per uso futuro)
-            config_info = _extract_configuration_info(enhanced_info, placed, customs)
+def build_preview_scene_graph(
+    wall_polygon: Polygon,
+    placed: List[Dict],
+    customs: List[Dict],
+    apertures: Optional[List[Polygon]] = None,
+    block_config: Optional[Dict] = None,
+    enhanced_info: Optional[Dict] = None,
+    session: Optional[Dict] = None,
+) -> SceneGraph:
+    """
+    Grafo di scena del preview: mappatura lettere dal block_config, poligono
+    originale (offset) e freccia INIZIO dall'enhanced_info. Con ``session``
+    il grafo viene riutilizzato/memorizzato in sessione.
+    """
+    size_to_letter = (block_config or {}).get("size_to_letter") or None
+    if size_to_letter:
+        info("Preview using custom size_to_letter", mapping=size_to_letter)
+    else:
+        info("Preview using default size_to_letter mapping")
 
-        # Genera immagine PNG with extra space for comprehensive configuration card
-        img_buffer = io.BytesIO()
-        
-        # Add more bottom padding for the comprehensive configuration card
-        extra_pad = 0.5 if (enhanced_info and enhanced_info.get("enhanced", False)) else 0.1
-        
-        fig.savefig(
-            img_buffer,
-            format="png",
-            dpi=100,
-            bbox_inches="tight",
-            facecolor="white",
-            edgecolor="none",
-            pad_inches=extra_pad,
-        )
-        img_buffer.seek(0)
-        plt.close(fig)
+    enhanced_info = enhanced_info or {}
+    wall_original = enhanced_info.get("wall_original")
+    if wall_original is not None:
+        info(f"Drawing original wall polygon with offset {enhanced_info.get('offset_mm', 0)}mm")
 
-        # Codifica in base64
-        encoded = base64.b64encode(img_buffer.getvalue()).decode("utf-8")
-        return f"data:image/png;base64,{encoded}"
+    starting_point = None
+    if enhanced_info.get("enhanced", False):
+        measurements = enhanced_info.get("automatic_measurements", {}) or {}
+        starting_point = measurements.get("mounting_strategy", {}).get("starting_point", "bottom")
 
-    except Exception as exc:
-        error("Errore generazione preview", error=str(exc), exception_type=type(exc).__name__)
-        return ""
+    return get_scene_graph(
+        session, wall_polygon, placed, customs, apertures, size_to_letter,
+        wall_original=wall_original, starting_point=starting_point,
+    )
 
 
 def is_preview_available() -> bool:
@@ -738,6 +339,6 @@ def is_preview_available() -> bool:
     Verifica se la generazione preview è disponibile.
     
     Returns:
-        True se matplotlib è disponibile, False altrimenti
+        True se Pillow (renderer raster) è disponibile, False altrimenti
     """
-    return MATPLOTLIB_AVAILABLE
\ No newline at end of file
+    return PIL_AVAILABLE
\ No newline at end of file
@@ -0,0 +1,459 @@
+"""
+Raster Preview Renderer
+=======================
+
+Disegna il preview della parete direttamente su un canvas raster (Pillow):
+blocchi standard, pezzi custom, aperture ed etichette vengono rasterizzati in
+blocco invece di creare un artist matplotlib per ogni elemento. Il costo è
+proporzionale ai pixel dell'immagine e non al numero di blocchi.
+
+È il backend PNG del grafo di scena (``utils/scene_graph.py``); il risultato
+mantiene il contratto storico: stringa ``data:image/png;base64,...``.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import Polygon
+
+from utils.scene_graph import (
+    LAYER_APERTURE_FILL,
+    LAYER_APERTURE_OUTLINE,
+    LAYER_BLOCKS,
+    LAYER_CUSTOMS,
+    LAYER_LABELS,
+    LAYER_START,
+    LAYER_WALL,
+    LAYER_WALL_OFFSET,
+    LAYER_WALL_ORIGINAL,
+    SceneGraph,
+    StartArrow,
+)
+
+try:
+    from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    Image = ImageChops = ImageColor = ImageDraw = ImageFont = None  # type: ignore
+    PIL_AVAILABLE = False
+
+# Supersampling: si disegna a risoluzione doppia e si riduce (antialiasing)
+SUPERSAMPLE = 2
+
+# 1 punto tipografico a 100 dpi (stessa resa dei preview matplotlib)
+PX_PER_PT = 100 / 72
+
+# Spazi per titolo e assi (pixel finali)
+TITLE_HEIGHT = 28
+AXIS_LEFT = 52
+AXIS_BOTTOM = 24
+PAD = 10
+
+RGBA = Tuple[int, int, int, int]
+Label = Tuple[float, float, str, str, float, bool, str]  # x, y, testo, anchor, pt, bold, colore
+
+
+def parse_color(value, default: str = "#000000", alpha: float = 1.0) -> RGBA:
+    """Converte colori CSS/hex o tuple RGBA normalizzate in RGBA 0-255."""
+    if isinstance(value, (tuple, list)):
+        comps = [float(v) for v in value]
+        if len(comps) == 3:
+            comps.append(alpha)
+        return tuple(int(round(c * 255)) for c in comps[:4])  # type: ignore[return-value]
+    try:
+        rgb = ImageColor.getrgb(str(value))
+    except (ValueError, AttributeError):
+        rgb = ImageColor.getrgb(default)
+    a = rgb[3] if len(rgb) == 4 else 255
+    return rgb[0], rgb[1], rgb[2], int(round(a * alpha))
+
+
+@lru_cache(maxsize=64)
+def _font(size_px: int, bold: bool = False):
+    """Font TrueType (DejaVu di matplotlib se presente) con cache per dimensione."""
+    names = ("DejaVuSans-Bold.ttf", "DejaVuSans.ttf") if bold else ("DejaVuSans.ttf",)
+    for directory in _font_dirs():
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return ImageFont.truetype(path, max(1, size_px))
+    try:
+        return ImageFont.load_default(size=max(1, size_px))
+    except TypeError:  # pragma: no cover - Pillow < 10.1
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _font_dirs() -> Tuple[str, ...]:
+    dirs = []
+    try:
+        import matplotlib
+        dirs.append(os.path.join(matplotlib.get_data_path(), "fonts", "ttf"))
+    except Exception:  # pragma: no cover
+        pass
+    dirs.extend(["/usr/share/fonts/truetype/dejavu", "/usr/share/fonts/dejavu"])
+    return tuple(dirs)
+
+
+def nice_ticks(lo: float, hi: float, max_ticks: int = 8) -> List[float]:
+    """Tick "arrotondati" (1, 2, 2.5, 5 × 10^n) nell'intervallo [lo, hi]."""
+    span = hi - lo
+    if span <= 0:
+        return [lo]
+    raw = span / max(1, max_ticks - 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(lo / step) * step
+    count = int(math.floor((hi - first) / step + 1e-9)) + 1
+    return [first + i * step for i in range(max(0, count))]
+
+
+def _format_tick(value: float) -> str:
+    return f"{value:.0f}" if abs(value - round(value)) < 1e-9 else f"{value:g}"
+
+
+class RasterCanvas:
+    """Canvas raster con trasformazione mondo (mm) → pixel e primitive in blocco."""
+
+    def __init__(
+        self,
+        view_bounds: Tuple[float, float, float, float],
+        width: int = 800,
+        height: int = 600,
+        origin: Tuple[float, float] = (0.0, 0.0),
+        title: Optional[str] = None,
+        title_color: str = "#1f2937",
+    ):
+        minx, miny, maxx, maxy = view_bounds
+        span_x = max(maxx - minx, 1e-9)
+        span_y = max(maxy - miny, 1e-9)
+
+        top = PAD + (TITLE_HEIGHT if title else 0)
+        avail_w = max(50, width - AXIS_LEFT - PAD)
+        avail_h = max(50, height - top - AXIS_BOTTOM)
+        # Aspetto uguale su x e y, area di disegno "tight" attorno alla parete
+        scale = min(avail_w / span_x, avail_h / span_y)
+        plot_w = span_x * scale
+        plot_h = span_y * scale
+
+        self.width = min(width, int(math.ceil(AXIS_LEFT + plot_w + PAD - 1e-6)))
+        self.height = min(height, int(math.ceil(top + plot_h + AXIS_BOTTOM - 1e-6)))
+        self.view_bounds = view_bounds
+        self.origin = origin
+        self.title = title
+        self.title_color = title_color
+
+        ss = SUPERSAMPLE
+        self._scale = scale * ss
+        self._plot = (AXIS_LEFT * ss, top * ss, (AXIS_LEFT + plot_w) * ss, (top + plot_h) * ss)
+        self._minx = minx
+        self._maxy = maxy
+
+        self.image = Image.new("RGBA", (self.width * ss, self.height * ss), (255, 255, 255, 255))
+        self.draw = ImageDraw.Draw(self.image)
+
+    # ----- trasformazioni -------------------------------------------------
+
+    def to_px(self, xy) -> np.ndarray:
+        """Coordinate mondo (N, 2) → pixel del canvas supercampionato."""
+        pts = np.asarray(xy, dtype=float).reshape(-1, 2)
+        px = self._plot[0] + (pts[:, 0] - self._minx) * self._scale
+        py = self._plot[1] + (self._maxy - pts[:, 1]) * self._scale
+        return np.column_stack((px, py))
+
+    def _width(self, linewidth_pt: float) -> int:
+        return max(1, int(round(linewidth_pt * PX_PER_PT * SUPERSAMPLE)))
+
+    def _overlay(self):
+        layer = Image.new("RGBA", self.image.size, (0, 0, 0, 0))
+        return layer, ImageDraw.Draw(layer)
+
+    def _flush(self, layer) -> None:
+        self.image.alpha_composite(layer)
+
+    # ----- primitive ------------------------------------------------------
+
+    def grid(self, color: str = "#9ca3af", alpha: float = 0.3) -> None:
+        rgba = parse_color(color, alpha=alpha)
+        layer, draw = self._overlay()
+        x0, y0, x1, y1 = self._plot
+        for tx in self._ticks_x():
+            px = self.to_px([(tx, self._maxy)])[0, 0]
+            draw.line([(px, y0), (px, y1)], fill=rgba, width=SUPERSAMPLE)
+        for ty in self._ticks_y():
+            py = self.to_px([(self._minx, ty)])[0, 1]
+            draw.line([(x0, py), (x1, py)], fill=rgba, width=SUPERSAMPLE)
+        self._flush(layer)
+
+    def rects(
+        self,
+        rects: np.ndarray,
+        fills: Sequence[str],
+        borders: Sequence[str],
+        linewidth: float = 0.5,
+    ) -> None:
+        """Rettangoli (N, 4: x, y, w, h) raggruppati per colore."""
+        if len(rects) == 0:
+            return
+        rects = np.asarray(rects, dtype=float)
+        corners = self.to_px(np.column_stack((rects[:, 0], rects[:, 1] + rects[:, 3])))
+        extents = rects[:, 2:4] * self._scale
+        boxes = np.column_stack((corners, corners + extents)).round().astype(int)
+        width = self._width(linewidth)
+
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for index, key in enumerate(zip(fills, borders)):
+            groups.setdefault(key, []).append(index)
+
+        for (fill, border), indices in groups.items():
+            fill_rgba = parse_color(fill)
+            border_rgba = parse_color(border)
+            for x0, y0, x1, y1 in boxes[indices].tolist():
+                self.draw.rectangle((x0, y0, x1, y1), fill=fill_rgba, outline=border_rgba, width=width)
+
+    def polygons(
+        self,
+        polygons: Iterable[Polygon],
+        fill,
+        border,
+        linewidth: float = 0.8,
+        alpha: float = 1.0,
+        hatch: bool = False,
+    ) -> None:
+        """Poligoni con riempimento semitrasparente e tratteggio opzionale, su un unico layer."""
+        rings = [self.to_px(poly.exterior.coords) for poly in polygons if not poly.is_empty]
+        if not rings:
+            return
+        fill_rgba = parse_color(fill, alpha=alpha)
+        border_rgba = parse_color(border, alpha=alpha)
+        width = self._width(linewidth)
+
+        layer, draw = self._overlay()
+        for ring in rings:
+            draw.polygon([tuple(p) for p in ring.tolist()], fill=fill_rgba)
+
+        if hatch:
+            mask = Image.new("L", self.image.size, 0)
+            mask_draw = ImageDraw.Draw(mask)
+            for ring in rings:
+                mask_draw.polygon([tuple(p) for p in ring.tolist()], fill=255)
+            pattern = _hatch_layer(self.image.size, border_rgba, SUPERSAMPLE)
+            pattern.putalpha(ImageChops.multiply(pattern.getchannel("A"), mask))
+            layer.alpha_composite(pattern)
+
+        if linewidth > 0:
+            for ring in rings:
+                draw.line([tuple(p) for p in ring.tolist()], fill=border_rgba, width=width, joint="curve")
+        self._flush(layer)
+
+    def path(
+        self,
+        coords,
+        color,
+        linewidth: float = 1.0,
+        dashed: bool = False,
+        alpha: float = 1.0,
+    ) -> None:
+        pts = self.to_px(coords)
+        rgba = parse_color(color, alpha=alpha)
+        width = self._width(linewidth)
+        layer, draw = self._overlay()
+        if dashed:
+            dash = 3.7 * linewidth * PX_PER_PT * SUPERSAMPLE
+            for segment in _dash_segments(pts, dash, dash * 0.45):
+                draw.line(segment, fill=rgba, width=width)
+        else:
+            draw.line([tuple(p) for p in pts.tolist()], fill=rgba, width=width, joint="curve")
+        self._flush(layer)
+
+    def labels(self, labels: Sequence[Label]) -> None:
+        """Etichette (x, y, testo, anchor PIL, punti, grassetto, colore) in una passata."""
+        if not labels:
+            return
+        anchors = self.to_px([(lbl[0], lbl[1]) for lbl in labels])
+        for (px, py), (_, _, text, anchor, size_pt, bold, color) in zip(anchors.tolist(), labels):
+            font = _font(int(round(size_pt * PX_PER_PT * SUPERSAMPLE)), bold)
+            self.draw.text((px, py), str(text), fill=parse_color(color), font=font, anchor=anchor)
+
+    def arrow(self, arrow: StartArrow) -> None:
+        (tx, ty), (sx, sy) = self.to_px([arrow.tip, arrow.tail]).tolist()
+        rgba = parse_color(arrow.color)
+        width = self._width(2)
+        self.draw.line([(sx, sy), (tx, ty)], fill=rgba, width=width)
+        angle = math.atan2(ty - sy, tx - sx)
+        head = 10 * SUPERSAMPLE
+        left = (tx - head * math.cos(angle - 0.4), ty - head * math.sin(angle - 0.4))
+        right = (tx - head * math.cos(angle + 0.4), ty - head * math.sin(angle + 0.4))
+        self.draw.polygon([(tx, ty), left, right], fill=rgba)
+        font = _font(int(round(10 * PX_PER_PT * SUPERSAMPLE)), True)
+        self.draw.text((sx, sy), arrow.text, fill=rgba, font=font, anchor="mm")
+
+    def axes(self, tick_color: str = "#6b7280") -> None:
+        """Cornice, tick con etichette e titolo."""
+        rgba = parse_color(tick_color)
+        x0, y0, x1, y1 = self._plot
+        self.draw.rectangle((x0, y0, x1, y1), outline=(0, 0, 0, 255), width=SUPERSAMPLE)
+
+        font = _font(int(round(8 * PX_PER_PT * SUPERSAMPLE)))
+        tick = 3.5 * SUPERSAMPLE
+        for tx in self._ticks_x():
+            px = self.to_px([(tx, self._maxy)])[0, 0]
+            self.draw.line([(px, y1), (px, y1 + tick)], fill=rgba, width=SUPERSAMPLE)
+            self.draw.text((px, y1 + tick * 1.5), _format_tick(tx - self.origin[0]), fill=rgba, font=font, anchor="mt")
+        for ty in self._ticks_y():
+            py = self.to_px([(self._minx, ty)])[0, 1]
+            self.draw.line([(x0 - tick, py), (x0, py)], fill=rgba, width=SUPERSAMPLE)
+            self.draw.text((x0 - tick * 1.5, py), _format_tick(ty - self.origin[1]), fill=rgba, font=font, anchor="rm")
+
+        if self.title:
+            title_font = _font(int(round(12 * PX_PER_PT * SUPERSAMPLE)), True)
+            self.draw.text(
+                ((x0 + x1) / 2, y0 - 6 * SUPERSAMPLE), self.title,
+                fill=parse_color(self.title_color), font=title_font, anchor="md",
+            )
+
+    def _ticks_x(self) -> List[float]:
+        minx, _, maxx, _ = self.view_bounds
+        return [t + self.origin[0] for t in nice_ticks(minx - self.origin[0], maxx - self.origin[0])]
+
+    def _ticks_y(self) -> List[float]:
+        _, miny, _, maxy = self.view_bounds
+        return [t + self.origin[1] for t in nice_ticks(miny - self.origin[1], maxy - self.origin[1])]
+
+    # ----- output ---------------------------------------------------------
+
+    def to_png_bytes(self) -> bytes:
+        final = self.image.resize((self.width, self.height), Image.LANCZOS).convert("RGB")
+        buffer = io.BytesIO()
+        final.save(buffer, format="PNG", optimize=False, compress_level=6)
+        return buffer.getvalue()
+
+    def to_data_uri(self) -> str:
+        encoded = base64.b64encode(self.to_png_bytes()).decode("utf-8")
+        return f"data:image/png;base64,{encoded}"
+
+
+def _hatch_layer(size: Tuple[int, int], color: RGBA, ss: int):
+    """Tratteggio diagonale "//" a piena pagina (costo proporzionale ai pixel)."""
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    step = 8 * ss
+    w, h = size
+    for offset in range(-h, w, step):
+        draw.line([(offset, h), (offset + h, 0)], fill=color, width=max(1, ss // 2 + 1))
+    return layer
+
+
+def _dash_segments(points: np.ndarray, dash: float, gap: float) -> List[List[Tuple[float, float]]]:
+    """Divide una polilinea in trattini di lunghezza ``dash`` separati da ``gap``."""
+    segments: List[List[Tuple[float, float]]] = []
+    period = dash + gap
+    phase = 0.0
+    for (ax, ay), (bx, by) in zip(points[:-1].tolist(), points[1:].tolist()):
+        length = math.hypot(bx - ax, by - ay)
+        if length == 0:
+            continue
+        ux, uy = (bx - ax) / length, (by - ay) / length
+        pos = -phase
+        while pos < length:
+            start = max(pos, 0.0)
+            end = min(pos + dash, length)
+            if end > start:
+                segments.append([(ax + ux * start, ay + uy * start), (ax + ux * end, ay + uy * end)])
+            pos += period
+        phase = (phase + length) % period
+    return segments
+
+
+def scene_labels(graph: SceneGraph) -> List[Label]:
+    """
+    Etichette categoria (basso-sinistra) e numero (alto-destra) dei blocchi
+    del grafo; i blocchi con sola etichetta legacy la mostrano al centro.
+    """
+    styles = graph.styles
+    labels: List[Label] = []
+    items = [(blk, styles.std_category, styles.std_number, styles.std_fallback) for blk in graph.blocks]
+    items += [(cust, styles.custom_category, styles.custom_number, styles.custom_fallback) for cust in graph.customs]
+    for item, category, number, fallback in items:
+        label = item.label
+        if label is None:
+            continue
+        x, y, w, h = item.x, item.y, item.width, item.height
+        if label.has_corners:
+            labels.append((x + w * 0.1, y + h * 0.2, label.category, "ls",
+                           category.size(w), category.bold, category.color))
+            labels.append((x + w * 0.9, y + h * 0.8, label.number, "ra",
+                           number.size(w), number.bold, number.color))
+        else:
+            labels.append((x + w / 2, y + h / 2, label.text, "mm",
+                           fallback.size(w), fallback.bold, fallback.color))
+    return labels
+
+
+def render_scene_png(
+    graph: SceneGraph,
+    width: int = 800,
+    height: int = 600,
+    margin_ratio: float = 0.01,
+    origin: Optional[Tuple[float, float]] = None,
+) -> str:
+    """
+    Backend PNG del grafo di scena: rasterizza i layer in ordine di z e
+    restituisce il data URI PNG.
+
+    ``origin`` è il punto mostrato come (0, 0) sugli assi (default: angolo
+    della parete).
+    """
+    minx, miny, maxx, maxy = graph.view_bounds
+    margin = max(maxx - minx, maxy - miny) * margin_ratio
+    canvas = RasterCanvas(
+        (minx - margin, miny - margin, maxx + margin, maxy + margin),
+        width, height, origin=graph.origin if origin is None else origin,
+        title=graph.title, title_color=graph.title_color,
+    )
+    canvas.grid()
+
+    for layer, style in graph.layers():
+        if layer == LAYER_WALL_OFFSET:
+            canvas.polygons([graph.wall], style.fill, style.stroke, linewidth=style.line_width)
+        elif layer == LAYER_BLOCKS:
+            block_styles = [graph.styles.block_style(blk.kind) for blk in graph.blocks]
+            canvas.rects(graph.block_rects, [st.fill for st in block_styles], [st.stroke for st in block_styles],
+                         linewidth=block_styles[0].line_width)
+        elif layer == LAYER_CUSTOMS:
+            canvas.polygons(list(graph.custom_polygons), style.fill, style.stroke,
+                            linewidth=style.line_width, alpha=style.alpha, hatch=style.hatch)
+        elif layer == LAYER_APERTURE_FILL:
+            canvas.polygons(list(graph.apertures), style.fill, style.stroke,
+                            linewidth=style.line_width, alpha=style.alpha)
+        elif layer == LAYER_WALL_ORIGINAL:
+            canvas.path(graph.wall_original.exterior.coords, style.stroke, linewidth=style.line_width,
+                        dashed=style.dashed, alpha=style.alpha)
+        elif layer == LAYER_WALL:
+            canvas.path(graph.wall.exterior.coords, style.stroke, linewidth=style.line_width)
+        elif layer == LAYER_APERTURE_OUTLINE:
+            for ap in graph.apertures:
+                canvas.path(ap.exterior.coords, style.stroke, linewidth=style.line_width, dashed=style.dashed)
+        elif layer == LAYER_LABELS:
+            canvas.labels(scene_labels(graph))
+        elif layer == LAYER_START:
+            canvas.arrow(graph.start)
+
+    canvas.axes()
+    return canvas.to_data_uri()
+
+
+__all__ = [
+    "PIL_AVAILABLE",
+    "RasterCanvas",
+    "nice_ticks",
+    "render_scene_png",
+    "scene_labels",
+]
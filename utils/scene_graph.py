@@ -0,0 +1,490 @@
+"""
+Scene Graph
+===========
+
+Grafo di scena immutabile di un risultato di packing, costruito una sola volta
+e condiviso da tutti i renderer (PNG, scena vettoriale, PDF, DXF).
+
+Il grafo contiene geometrie, etichette risolte (categoria + numero), stili e
+ordine di disegno (z-order) e annotazioni (quote, freccia INIZIO, titolo). I
+backend si limitano a tradurre le primitive nel proprio formato: etichette,
+traslazioni e bounds non vengono più ricalcolati da ogni exporter.
+
+Il grafo viene memorizzato in sessione (``session["scene_graph"]``) con una
+chiave derivata dalla geometria: un cambio di tema colori produce solo una
+copia con stili diversi (``restyle``), senza ricostruire il grafo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, shape
+
+from exporters.labels import BlockLabels, create_block_labels, get_block_labels
+
+# Larghezze standard associate ai colori A, B, C del tema
+BLOCK_KINDS = (1239, 826, 413)
+BLOCK_KIND_TOLERANCE = 5
+
+DEFAULT_TITLE = "Preview Costruzione Parete"
+DEFAULT_TITLE_COLOR = "#1f2937"
+
+# Layer di disegno
+LAYER_WALL_OFFSET = "wall_offset"
+LAYER_BLOCKS = "blocks"
+LAYER_CUSTOMS = "customs"
+LAYER_APERTURE_FILL = "aperture_fill"
+LAYER_WALL_ORIGINAL = "wall_original"
+LAYER_WALL = "wall"
+LAYER_APERTURE_OUTLINE = "aperture_outline"
+LAYER_LABELS = "labels"
+LAYER_START = "start"
+
+# Z-order: patch sotto, contorni sopra, poi etichette e frecce
+Z_ORDER = {
+    LAYER_WALL_OFFSET: 1,
+    LAYER_BLOCKS: 5,
+    LAYER_CUSTOMS: 6,
+    LAYER_APERTURE_FILL: 7,
+    LAYER_WALL_ORIGINAL: 8,
+    LAYER_WALL: 10,
+    LAYER_APERTURE_OUTLINE: 11,
+    LAYER_LABELS: 15,
+    LAYER_START: 20,
+}
+
+
+@dataclass(frozen=True)
+class LayerStyle:
+    """Stile risolto di un layer (colori CSS/hex)."""
+
+    fill: Optional[str] = None
+    stroke: Optional[str] = None
+    line_width: float = 1.0
+    alpha: float = 1.0
+    dashed: bool = False
+    hatch: bool = False
+
+
+@dataclass(frozen=True)
+class LabelStyle:
+    """Dimensione (punti) proporzionale alla larghezza del blocco e colore."""
+
+    max_pt: float
+    min_pt: float
+    width_divisor: float
+    color: str
+    bold: bool = False
+
+    def size(self, width: float) -> float:
+        return min(self.max_pt, max(self.min_pt, width / self.width_divisor))
+
+
+@dataclass(frozen=True)
+class SceneStyles:
+    """Stili di tutti i layer, risolti dal color_theme del frontend."""
+
+    wall: LayerStyle
+    wall_offset: LayerStyle
+    wall_original: LayerStyle
+    blocks: Tuple[LayerStyle, ...]  # stesso ordine di BLOCK_KINDS
+    block_default: LayerStyle
+    custom: LayerStyle
+    aperture_fill: LayerStyle
+    aperture_outline: LayerStyle
+    std_category: LabelStyle = LabelStyle(12, 6, 150, "#dc2626", bold=True)
+    std_number: LabelStyle = LabelStyle(10, 4, 200, "#2563eb")
+    custom_category: LabelStyle = LabelStyle(10, 5, 120, "#16a34a", bold=True)
+    custom_number: LabelStyle = LabelStyle(8, 4, 150, "#065f46")
+    std_fallback: LabelStyle = LabelStyle(8, 4, 200, "#1f2937", bold=True)
+    custom_fallback: LabelStyle = LabelStyle(8, 4, 200, "#15803d", bold=True)
+
+    @classmethod
+    def from_theme(cls, theme: Optional[Dict] = None) -> "SceneStyles":
+        theme = theme or {}
+
+        def block(letter: str, fill: str, border: str) -> LayerStyle:
+            return LayerStyle(
+                fill=theme.get(f"block{letter}Color", fill),
+                stroke=theme.get(f"block{letter}Border", border),
+                line_width=0.5,
+            )
+
+        blocks = (
+            block("A", "#E5E7EB", "#374151"),
+            block("B", "#DBEAFE", "#1E40AF"),
+            block("C", "#FEF3C7", "#D97706"),
+        )
+        aperture_fill = theme.get("doorWindowColor", "#FEE2E2")
+        return cls(
+            wall=LayerStyle(stroke=theme.get("wallOutlineColor", "#1E40AF"),
+                            line_width=theme.get("wallLineWidth", 2)),
+            wall_offset=LayerStyle(fill=(34 / 255, 197 / 255, 94 / 255, 0.15), stroke="#22C55E", line_width=3),
+            wall_original=LayerStyle(stroke="#3B82F6", line_width=5, alpha=0.8, dashed=True),
+            blocks=blocks,
+            # Blocchi fuori standard: colori del blocco A
+            block_default=blocks[0],
+            custom=LayerStyle(fill=theme.get("customPieceColor", "#F3E8FF"),
+                              stroke=theme.get("customPieceBorder", "#7C3AED"),
+                              line_width=0.8, alpha=0.8, hatch=True),
+            aperture_fill=LayerStyle(fill=aperture_fill, stroke=aperture_fill, line_width=0, alpha=0.15),
+            aperture_outline=LayerStyle(stroke=theme.get("doorWindowBorder", "#DC2626"), line_width=2, dashed=True),
+        )
+
+    def block_style(self, kind: int) -> LayerStyle:
+        return self.blocks[kind] if 0 <= kind < len(self.blocks) else self.block_default
+
+
+@dataclass(frozen=True)
+class BlockLabel:
+    """Etichetta risolta: categoria (basso-sinistra) + numero (alto-destra)."""
+
+    category: str
+    number: str
+    text: str  # etichetta completa (A1) o legacy centrata se manca la categoria
+
+    @property
+    def has_corners(self) -> bool:
+        return bool(self.category)
+
+
+@dataclass(frozen=True)
+class SceneBlock:
+    index: int
+    x: float
+    y: float
+    width: float
+    height: float
+    block_type: str
+    kind: int  # indice in BLOCK_KINDS, -1 se fuori standard
+    label: Optional[BlockLabel]
+
+
+@dataclass(frozen=True)
+class SceneCustom:
+    index: int
+    x: float
+    y: float
+    width: float
+    height: float
+    ctype: int
+    polygons: Tuple[Polygon, ...]
+    label: Optional[BlockLabel]
+
+
+@dataclass(frozen=True)
+class SceneDimension:
+    """Quota tra due punti; ``side`` indica dove disegnarla rispetto all'oggetto."""
+
+    a: Tuple[float, float]
+    b: Tuple[float, float]
+    value: float
+    side: str
+
+
+@dataclass(frozen=True)
+class StartArrow:
+    """Freccia "INIZIO" del preview enhanced (coordinate mondo)."""
+
+    tip: Tuple[float, float]
+    tail: Tuple[float, float]
+    text: str = "INIZIO"
+    color: str = "#dc2626"
+
+
+@dataclass(frozen=True)
+class SceneGraph:
+    """Grafo di scena immutabile di una parete con blocchi, custom e aperture."""
+
+    key: str
+    wall: Polygon
+    wall_original: Optional[Polygon]
+    apertures: Tuple[Polygon, ...]
+    blocks: Tuple[SceneBlock, ...]
+    customs: Tuple[SceneCustom, ...]
+    dimensions: Tuple[SceneDimension, ...]
+    start: Optional[StartArrow]
+    starting_point: Optional[str]
+    title: str = DEFAULT_TITLE
+    title_color: str = DEFAULT_TITLE_COLOR
+    styles: SceneStyles = field(default_factory=SceneStyles.from_theme)
+    labels: Optional[BlockLabels] = None  # etichette dettagliate condivise (tabelle, JSON)
+
+    @property
+    def origin(self) -> Tuple[float, float]:
+        """Angolo in basso a sinistra della parete (origine degli assi mostrati)."""
+        return self.wall.bounds[0], self.wall.bounds[1]
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        return self.wall.bounds
+
+    @property
+    def view_bounds(self) -> Tuple[float, float, float, float]:
+        """Area da inquadrare: include il contorno originale prima dell'offset."""
+        view = self.wall_original if self.wall_original is not None else self.wall
+        return view.bounds
+
+    @cached_property
+    def block_rects(self) -> np.ndarray:
+        """Rettangoli dei blocchi standard come array (n, 4) di x, y, w, h."""
+        if not self.blocks:
+            return np.empty((0, 4), dtype=float)
+        return np.array([(b.x, b.y, b.width, b.height) for b in self.blocks], dtype=float)
+
+    @cached_property
+    def custom_polygons(self) -> Tuple[Polygon, ...]:
+        return tuple(poly for custom in self.customs for poly in custom.polygons)
+
+    def layers(self) -> List[Tuple[str, object]]:
+        """Layer presenti nella scena con il loro stile, in ordine di disegno."""
+        styles = self.styles
+        layers: List[Tuple[str, object]] = []
+        if self.wall_original is not None:
+            layers.append((LAYER_WALL_OFFSET, styles.wall_offset))
+            layers.append((LAYER_WALL_ORIGINAL, styles.wall_original))
+        else:
+            layers.append((LAYER_WALL, styles.wall))
+        if self.blocks:
+            layers.append((LAYER_BLOCKS, styles.blocks))
+        if self.customs:
+            layers.append((LAYER_CUSTOMS, styles.custom))
+        if self.apertures:
+            layers.append((LAYER_APERTURE_FILL, styles.aperture_fill))
+            layers.append((LAYER_APERTURE_OUTLINE, styles.aperture_outline))
+        if self.blocks or self.customs:
+            layers.append((LAYER_LABELS, None))
+        if self.start is not None:
+            layers.append((LAYER_START, None))
+        return sorted(layers, key=lambda item: Z_ORDER[item[0]])
+
+    def restyle(self, color_theme: Optional[Dict] = None) -> "SceneGraph":
+        """Copia del grafo con gli stili di un altro tema (geometrie ed etichette condivise)."""
+        return replace(self, styles=SceneStyles.from_theme(color_theme))
+
+    def with_title(self, title: str, title_color: str = DEFAULT_TITLE_COLOR) -> "SceneGraph":
+        return replace(self, title=title, title_color=title_color)
+
+
+def build_scene_graph(
+    wall_polygon: Polygon,
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    apertures: Optional[Sequence[Polygon]] = None,
+    size_to_letter: Optional[Dict] = None,
+    wall_original: Optional[Polygon] = None,
+    starting_point: Optional[str] = None,
+    color_theme: Optional[Dict] = None,
+    key: Optional[str] = None,
+    labels: Optional[BlockLabels] = None,
+) -> SceneGraph:
+    """Costruisce il grafo di scena: etichette, geometrie custom e annotazioni."""
+    placed = list(placed)
+    customs = list(customs)
+    aperture_list = tuple(ap for ap in (apertures or []) if not ap.is_empty)
+
+    if labels is None:
+        labels = get_block_labels(None, placed, customs, size_to_letter)
+    std_labels, custom_labels = labels.standard, labels.custom
+    std_fallback, custom_fallback = _fallback_labels(placed, customs, std_labels, custom_labels)
+
+    blocks = tuple(
+        SceneBlock(
+            index=i,
+            x=float(blk["x"]),
+            y=float(blk["y"]),
+            width=float(blk["width"]),
+            height=float(blk["height"]),
+            block_type=str(blk.get("type", "")),
+            kind=block_kind(blk["width"]),
+            label=_resolve_label(std_labels.get(i), std_fallback.get(i)),
+        )
+        for i, blk in enumerate(placed)
+    )
+
+    scene_customs = []
+    for i, cust in enumerate(customs):
+        try:
+            polygons = tuple(_polygon_parts(shape(cust["geometry"])))
+        except Exception:
+            continue
+        scene_customs.append(SceneCustom(
+            index=i,
+            x=float(cust["x"]),
+            y=float(cust["y"]),
+            width=float(cust["width"]),
+            height=float(cust["height"]),
+            ctype=int(cust.get("ctype", 2)),
+            polygons=polygons,
+            label=_resolve_label(custom_labels.get(i), custom_fallback.get(i)),
+        ))
+
+    position = starting_point.lower() if starting_point else None
+    return SceneGraph(
+        key=key or scene_graph_key(wall_polygon, placed, customs, aperture_list, size_to_letter,
+                                   wall_original, starting_point),
+        wall=wall_polygon,
+        wall_original=wall_original,
+        apertures=aperture_list,
+        blocks=blocks,
+        customs=tuple(scene_customs),
+        dimensions=_dimensions(wall_polygon, aperture_list),
+        start=start_arrow_for(wall_polygon, position) if position else None,
+        starting_point=position,
+        styles=SceneStyles.from_theme(color_theme),
+        labels=labels,
+    )
+
+
+def get_scene_graph(
+    session: Optional[Dict],
+    wall_polygon: Polygon,
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    apertures: Optional[Sequence[Polygon]] = None,
+    size_to_letter: Optional[Dict] = None,
+    wall_original: Optional[Polygon] = None,
+    starting_point: Optional[str] = None,
+) -> SceneGraph:
+    """
+    Restituisce il grafo salvato in sessione, ricostruendolo solo se blocchi,
+    geometrie, mappatura lettere o punto di partenza sono cambiati. Le
+    etichette arrivano dalla cache di sessione e sopravvivono alla ricostruzione.
+    """
+    key = scene_graph_key(wall_polygon, placed, customs, apertures, size_to_letter,
+                          wall_original, starting_point)
+    cached = session.get("scene_graph") if session is not None else None
+    if isinstance(cached, SceneGraph) and cached.key == key:
+        return cached
+
+    labels = get_block_labels(session, placed, customs, size_to_letter)
+    graph = build_scene_graph(wall_polygon, placed, customs, apertures, size_to_letter,
+                              wall_original, starting_point, key=key, labels=labels)
+    if session is not None:
+        session["scene_graph"] = graph
+    return graph
+
+
+def scene_graph_key(
+    wall_polygon: Polygon,
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    apertures: Optional[Sequence[Polygon]] = None,
+    size_to_letter: Optional[Dict] = None,
+    wall_original: Optional[Polygon] = None,
+    starting_point: Optional[str] = None,
+) -> str:
+    """Impronta del risultato di packing (senza tema colori)."""
+    digest = hashlib.sha1(shapely.to_wkb(wall_polygon, output_dimension=2))
+    for aperture in apertures or []:
+        digest.update(shapely.to_wkb(aperture, output_dimension=2))
+    if wall_original is not None:
+        digest.update(b"original")
+        digest.update(shapely.to_wkb(wall_original, output_dimension=2))
+    if placed:
+        rects = np.array([(b["x"], b["y"], b["width"], b["height"]) for b in placed], dtype=float)
+        digest.update(rects.tobytes())
+        digest.update("|".join(str(b.get("type", "")) for b in placed).encode())
+    for cust in customs:
+        digest.update(repr((cust.get("x"), cust.get("y"), cust.get("width"), cust.get("height"),
+                            cust.get("ctype"), cust.get("geometry"))).encode())
+    digest.update(repr(sorted((str(k), v) for k, v in (size_to_letter or {}).items())).encode())
+    digest.update(str(starting_point or "").lower().encode())
+    return digest.hexdigest()
+
+
+def block_kind(width: float) -> int:
+    """Indice del tipo standard (A, B, C) per larghezza, -1 se fuori standard."""
+    for index, ref_width in enumerate(BLOCK_KINDS):
+        if abs(width - ref_width) <= BLOCK_KIND_TOLERANCE:
+            return index
+    return -1
+
+
+def start_arrow_for(wall_polygon: Polygon, starting_pos: str) -> Optional[StartArrow]:
+    """Freccia INIZIO verso l'angolo/centro della riga di partenza."""
+    minx, miny, maxx, maxy = wall_polygon.bounds
+    dx = (maxx - minx) * 0.1
+    dy = (maxy - miny) * 0.15
+    position = starting_pos.lower()
+    if position == "left":
+        return StartArrow(tip=(minx, miny), tail=(minx + dx, miny + dy))
+    if position == "right":
+        return StartArrow(tip=(maxx, miny), tail=(maxx - dx, miny + dy))
+    if position == "bottom":
+        return StartArrow(tip=((minx + maxx) / 2, miny), tail=((minx + maxx) / 2, miny + dy))
+    return None
+
+
+def _resolve_label(detailed: Optional[Dict], fallback: Optional[str]) -> Optional[BlockLabel]:
+    if detailed:
+        display = detailed["display"]
+        category = str(display["bottom_left"])
+        number = str(display["top_right"])
+        return BlockLabel(category=category, number=number, text=f"{category}{number}")
+    if fallback:
+        return BlockLabel(category="", number="", text=fallback)
+    return None
+
+
+def _fallback_labels(
+    placed: List[Dict],
+    customs: List[Dict],
+    std_labels: Dict[int, Dict],
+    custom_labels: Dict[int, Dict],
+) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """Etichette legacy centrate, calcolate solo per i blocchi senza categoria/numero."""
+    std_fallback = {i: f"STD{i + 1}" for i in range(len(placed)) if i not in std_labels}
+    if std_fallback:
+        legacy, _ = create_block_labels(placed, customs)
+        std_fallback = {i: legacy.get(i, label) for i, label in std_fallback.items()}
+    custom_fallback = {i: f"CU{i + 1}" for i in range(len(customs)) if i not in custom_labels}
+    if custom_fallback:
+        _, legacy = create_block_labels([], customs)
+        custom_fallback = {i: legacy.get(i, label) for i, label in custom_fallback.items()}
+    return std_fallback, custom_fallback
+
+
+def _dimensions(wall: Polygon, apertures: Sequence[Polygon]) -> Tuple[SceneDimension, ...]:
+    """Quote: larghezza/altezza parete e larghezza/altezza di ogni apertura."""
+    minx, miny, maxx, maxy = wall.bounds
+    dims = [
+        SceneDimension((minx, miny), (maxx, miny), maxx - minx, "bottom"),
+        SceneDimension((minx, miny), (minx, maxy), maxy - miny, "left"),
+    ]
+    for ap in apertures:
+        ax0, ay0, ax1, ay1 = ap.bounds
+        dims.append(SceneDimension((ax0, ay1), (ax1, ay1), ax1 - ax0, "top"))
+        dims.append(SceneDimension((ax1, ay0), (ax1, ay1), ay1 - ay0, "right"))
+    return tuple(dims)
+
+
+def _polygon_parts(geometry) -> List[Polygon]:
+    if isinstance(geometry, Polygon):
+        return [geometry] if not geometry.is_empty else []
+    return [part for part in getattr(geometry, "geoms", []) if isinstance(part, Polygon) and not part.is_empty]
+
+
+__all__ = [
+    "BLOCK_KINDS",
+    "BlockLabel",
+    "LabelStyle",
+    "LayerStyle",
+    "SceneBlock",
+    "SceneCustom",
+    "SceneDimension",
+    "SceneGraph",
+    "SceneStyles",
+    "StartArrow",
+    "block_kind",
+    "build_scene_graph",
+    "get_scene_graph",
+    "scene_graph_key",
+    "start_arrow_for",
+]
@@ -0,0 +1,291 @@
+"""
+Shape Descriptor per pareti parsate
+===================================
+
+Calcola una sola volta per parete le caratteristiche geometriche usate da
+packer e renderer (classificazione, rettilinearità, lati inclinati, tratti
+curvi, profilo per righe e disposizione aperture) e le memorizza in sessione.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
+
+from utils.config import AREA_EPS, BLOCK_HEIGHT
+from utils.geometry_parser import classify_polygon_geometry, format_geometry_label
+
+# Tolleranza (mm) per considerare un lato orizzontale/verticale
+AXIS_TOLERANCE_MM = 0.5
+
+# Cambio di direzione massimo (rad) per un vertice che approssima una curva (~20°)
+CURVE_ANGLE_MAX = 0.35
+
+# Numero minimo di vertici consecutivi per un tratto curvo
+CURVE_MIN_RUN = 3
+
+# Segmento orientato (x1, y1, x2, y2)
+Edge = Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class RowStripe:
+    """Profilo di una riga di blocchi: tratti orizzontali disponibili."""
+
+    y0: float
+    y1: float
+    spans: Tuple[Tuple[float, float], ...]
+    coverage: float  # area disponibile / area della striscia
+    rectangular: bool  # la riga è un unico rettangolo pieno
+
+    def to_dict(self) -> Dict:
+        return {
+            "y0": self.y0,
+            "y1": self.y1,
+            "spans": [list(span) for span in self.spans],
+            "coverage": round(self.coverage, 4),
+            "rectangular": self.rectangular,
+        }
+
+
+@dataclass(frozen=True)
+class ShapeDescriptor:
+    """Descrittore immutabile di una parete con le sue aperture."""
+
+    fingerprint: str
+    geometry_type: str
+    geometry_label: str
+    bounds: Tuple[float, float, float, float]
+    vertex_count: int
+    is_rectilinear: bool
+    is_rectangle: bool
+    slope_edges: Tuple[Edge, ...]
+    curvature_runs: Tuple[Tuple[int, int], ...]  # (indice vertice iniziale, lunghezza)
+    row_height: float
+    row_profile: Tuple[RowStripe, ...]
+    aperture_bounds: Tuple[Tuple[float, float, float, float], ...]
+    apertures_rectangular: bool
+
+    @property
+    def has_apertures(self) -> bool:
+        return bool(self.aperture_bounds)
+
+    @property
+    def is_plain_rectangle(self) -> bool:
+        """Parete rettangolare senza aperture: il packing non richiede intersezioni."""
+        return self.is_rectangle and not self.aperture_bounds
+
+    @property
+    def has_curves(self) -> bool:
+        return bool(self.curvature_runs)
+
+    def rows_with_apertures(self) -> List[int]:
+        """Indici delle righe attraversate da almeno un'apertura."""
+        rows = []
+        for index, stripe in enumerate(self.row_profile):
+            if any(ay0 < stripe.y1 and ay1 > stripe.y0 for _, ay0, _, ay1 in self.aperture_bounds):
+                rows.append(index)
+        return rows
+
+    def matches(self, wall: Polygon, apertures: Optional[Sequence[Polygon]], row_height: float) -> bool:
+        return self.row_height == row_height and self.fingerprint == shape_fingerprint(wall, apertures)
+
+    def to_dict(self) -> Dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "geometry_type": self.geometry_type,
+            "geometry_label": self.geometry_label,
+            "bounds": list(self.bounds),
+            "vertex_count": self.vertex_count,
+            "is_rectilinear": self.is_rectilinear,
+            "is_rectangle": self.is_rectangle,
+            "slope_edges": [list(edge) for edge in self.slope_edges],
+            "curvature_runs": [list(run) for run in self.curvature_runs],
+            "row_height": self.row_height,
+            "row_profile": [stripe.to_dict() for stripe in self.row_profile],
+            "aperture_bounds": [list(b) for b in self.aperture_bounds],
+            "apertures_rectangular": self.apertures_rectangular,
+        }
+
+
+def shape_fingerprint(wall: Polygon, apertures: Optional[Sequence[Polygon]] = None) -> str:
+    """Impronta stabile della geometria (parete + aperture) usata come chiave di cache."""
+    digest = hashlib.sha1(shapely.to_wkb(wall, output_dimension=2))
+    for aperture in apertures or []:
+        digest.update(shapely.to_wkb(aperture, output_dimension=2))
+    return digest.hexdigest()
+
+
+def describe_wall(
+    wall: Polygon,
+    apertures: Optional[Sequence[Polygon]] = None,
+    row_height: float = BLOCK_HEIGHT,
+) -> ShapeDescriptor:
+    """Calcola il descrittore completo di una parete."""
+    apertures = list(apertures or [])
+
+    geometry_type = classify_polygon_geometry(wall)
+    exterior = list(wall.exterior.coords)[:-1]
+
+    curvature_runs = _curvature_runs(exterior)
+    curved_vertices = {
+        (start + offset) % len(exterior)
+        for start, length in curvature_runs
+        for offset in range(length)
+    }
+
+    rings = [exterior] + [list(ring.coords)[:-1] for ring in wall.interiors]
+    slope_edges: List[Edge] = []
+    rectilinear = True
+    for ring_index, ring in enumerate(rings):
+        for i, start in enumerate(ring):
+            end = ring[(i + 1) % len(ring)]
+            if _is_axis_aligned(start, end):
+                continue
+            rectilinear = False
+            if ring_index == 0 and i in curved_vertices and (i + 1) % len(ring) in curved_vertices:
+                continue  # lato di un tratto curvo, non un lato inclinato
+            slope_edges.append((start[0], start[1], end[0], end[1]))
+
+    bounds = tuple(float(v) for v in wall.bounds)
+    bbox_area = (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+    is_rectangle = (
+        rectilinear
+        and not wall.interiors
+        and bbox_area > 0
+        and abs(wall.area - bbox_area) <= max(AREA_EPS, bbox_area * 1e-9)
+    )
+
+    aperture_bounds = tuple(
+        sorted(tuple(float(v) for v in ap.bounds) for ap in apertures)
+    )
+    apertures_rectangular = all(
+        abs(ap.area - (ap.bounds[2] - ap.bounds[0]) * (ap.bounds[3] - ap.bounds[1])) <= AREA_EPS
+        for ap in apertures
+    )
+
+    return ShapeDescriptor(
+        fingerprint=shape_fingerprint(wall, apertures),
+        geometry_type=geometry_type,
+        geometry_label=format_geometry_label(geometry_type),
+        bounds=bounds,
+        vertex_count=len(exterior),
+        is_rectilinear=rectilinear,
+        is_rectangle=is_rectangle,
+        slope_edges=tuple(slope_edges),
+        curvature_runs=tuple(curvature_runs),
+        row_height=row_height,
+        row_profile=_row_profile(wall, apertures, row_height),
+        aperture_bounds=aperture_bounds,
+        apertures_rectangular=apertures_rectangular,
+    )
+
+
+def get_shape_descriptor(
+    session: Optional[Dict],
+    wall: Polygon,
+    apertures: Optional[Sequence[Polygon]] = None,
+    row_height: float = BLOCK_HEIGHT,
+) -> ShapeDescriptor:
+    """
+    Restituisce il descrittore salvato in sessione, ricalcolandolo solo se la
+    geometria o l'altezza riga sono cambiate.
+    """
+    cached = session.get("shape_descriptor") if session is not None else None
+    if isinstance(cached, ShapeDescriptor) and cached.matches(wall, apertures, row_height):
+        return cached
+
+    descriptor = describe_wall(wall, apertures, row_height)
+    if session is not None:
+        session["shape_descriptor"] = descriptor
+    return descriptor
+
+
+def _is_axis_aligned(start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+    return abs(end[0] - start[0]) <= AXIS_TOLERANCE_MM or abs(end[1] - start[1]) <= AXIS_TOLERANCE_MM
+
+
+def _curvature_runs(coords: List[Tuple[float, float]]) -> List[Tuple[int, int]]:
+    """Sequenze di vertici consecutivi con piccoli cambi di direzione (curve approssimate)."""
+    n = len(coords)
+    if n < CURVE_MIN_RUN + 2:
+        return []
+
+    points = np.asarray(coords, dtype=float)
+    incoming = points - np.roll(points, 1, axis=0)
+    outgoing = np.roll(points, -1, axis=0) - points
+    turn = np.abs(
+        np.arctan2(outgoing[:, 1], outgoing[:, 0]) - np.arctan2(incoming[:, 1], incoming[:, 0])
+    )
+    turn = np.where(turn > math.pi, 2 * math.pi - turn, turn)
+    # Vertici allineati (turn≈0) non sono curve: sono punti ridondanti su un lato dritto
+    curved = (turn > 1e-3) & (turn < CURVE_ANGLE_MAX)
+
+    if curved.all():
+        return [(0, n)]
+
+    runs: List[Tuple[int, int]] = []
+    # Parti da un vertice non curvo così le sequenze non vengono spezzate a fine anello
+    first = int(np.argmin(curved))
+    length = 0
+    start = 0
+    for step in range(1, n + 1):
+        index = (first + step) % n
+        if curved[index]:
+            if length == 0:
+                start = index
+            length += 1
+        else:
+            if length >= CURVE_MIN_RUN:
+                runs.append((start, length))
+            length = 0
+    return sorted(runs)
+
+
+def _row_profile(wall: Polygon, apertures: List[Polygon], row_height: float) -> Tuple[RowStripe, ...]:
+    """Intersezione vettoriale della parete con tutte le strisce di riga."""
+    minx, miny, maxx, maxy = wall.bounds
+    if row_height <= 0 or maxy <= miny:
+        return ()
+
+    area = wall
+    if apertures:
+        area = wall.difference(unary_union(apertures))
+
+    rows = int(math.ceil((maxy - miny) / row_height - 1e-9))
+    y0 = miny + np.arange(rows) * row_height
+    y1 = np.minimum(y0 + row_height, maxy)
+    stripes = shapely.box(minx, y0, maxx, y1)
+    pieces = shapely.intersection(area, stripes)
+
+    profile = []
+    for bottom, top, stripe, piece in zip(y0, y1, stripes, pieces):
+        parts = [] if piece.is_empty else [
+            part for part in getattr(piece, "geoms", [piece]) if part.geom_type == "Polygon"
+        ]
+        spans = tuple(sorted((float(p.bounds[0]), float(p.bounds[2])) for p in parts if p.area > AREA_EPS))
+        coverage = piece.area / stripe.area if stripe.area > 0 else 0.0
+        profile.append(RowStripe(
+            y0=float(bottom),
+            y1=float(top),
+            spans=spans,
+            coverage=float(coverage),
+            rectangular=len(spans) == 1 and abs(piece.area - stripe.area) <= AREA_EPS,
+        ))
+    return tuple(profile)
+
+
+__all__ = [
+    "RowStripe",
+    "ShapeDescriptor",
+    "describe_wall",
+    "get_shape_descriptor",
+    "shape_fingerprint",
+]
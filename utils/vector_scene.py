@@ -0,0 +1,170 @@
+"""
+Vector Scene
+============
+
+Formato vettoriale compatto del preview parete, disegnato direttamente dal
+browser (``static/js/scene-renderer.js``): cambi di tema e zoom non richiedono
+un nuovo render PNG sul server.
+
+Tutte le coordinate sono in mm, relative all'angolo in basso a sinistra della
+parete (``origin``) e arrotondate a ``SCENE_PRECISION`` decimali. Anelli e
+rettangoli sono array piatti per ridurre il peso del JSON::
+
+    {
+        "version": 1,
+        "units": "mm",
+        "origin": [x0, y0],
+        "bounds": [minx, miny, maxx, maxy],
+        "wall": [[x, y, x, y, ...], ...],          # esterno + fori
+        "wall_original": [[...]] | null,           # contorno prima dell'offset
+        "apertures": [[x, y, ...], ...],
+        "labels": [["A", "1"], ...],               # categoria, numero
+        "block_kinds": [1239, 826, 413],           # colori A, B, C del tema
+        "blocks": [x, y, w, h, label_id, kind, ...],
+        "customs": [{"label": id, "rings": [[...]]}, ...],
+        "dimensions": [{"a": [x, y], "b": [x, y], "value": mm, "side": "bottom"}, ...],
+        "start": {"position": "left", "tip": [x, y], "tail": [x, y]} | null
+    }
+
+La scena è una serializzazione del grafo di scena (``utils.scene_graph``),
+lo stesso usato dal preview PNG e dagli export PDF/DXF.
+
+``label_id`` e ``kind`` valgono -1 quando il blocco non ha etichetta o la sua
+larghezza non è tra quelle standard.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+from utils.scene_graph import BLOCK_KINDS, BlockLabel, SceneGraph, build_scene_graph
+
+SCENE_VERSION = 1
+
+# Decimali delle coordinate (0.1 mm)
+SCENE_PRECISION = 1
+
+# Valori ammessi per il parametro ``format`` delle API di preview
+PREVIEW_FORMATS = ("png", "scene", "both")
+
+
+def build_vector_scene(
+    wall_polygon: Polygon,
+    placed: Sequence[Dict],
+    customs: Sequence[Dict],
+    apertures: Optional[Sequence[Polygon]] = None,
+    size_to_letter: Optional[Dict] = None,
+    wall_original: Optional[Polygon] = None,
+    starting_point: Optional[str] = None,
+) -> Dict:
+    """Costruisce la scena vettoriale di una parete con blocchi e aperture."""
+    return scene_to_vector(build_scene_graph(
+        wall_polygon, placed, customs, apertures, size_to_letter, wall_original, starting_point
+    ))
+
+
+def scene_to_vector(graph: SceneGraph) -> Dict:
+    """Serializza un grafo di scena nel formato vettoriale del browser."""
+    origin = graph.origin
+    label_table: List[List[str]] = []
+    label_ids: Dict[Tuple[str, str], int] = {}
+
+    def label_id(label: Optional[BlockLabel]) -> int:
+        if label is None or not label.has_corners:
+            return -1
+        key = (label.category, label.number)
+        if key not in label_ids:
+            label_ids[key] = len(label_table)
+            label_table.append(list(key))
+        return label_ids[key]
+
+    blocks: List = []
+    if graph.blocks:
+        rects = graph.block_rects.copy()
+        rects[:, 0] -= origin[0]
+        rects[:, 1] -= origin[1]
+        for block, (x, y, w, h) in zip(graph.blocks, _rounded(rects.ravel()).reshape(-1, 4).tolist()):
+            blocks.extend((_num(x), _num(y), _num(w), _num(h), label_id(block.label), block.kind))
+
+    scene_customs = []
+    for custom in graph.customs:
+        rings = [_flat_ring(part.exterior, origin) for part in custom.polygons]
+        if rings:
+            scene_customs.append({"label": label_id(custom.label), "rings": rings})
+
+    start = None
+    if graph.start is not None:
+        start = {
+            "position": graph.starting_point,
+            "tip": _point(graph.start.tip, origin),
+            "tail": _point(graph.start.tail, origin),
+        }
+
+    minx, miny, maxx, maxy = graph.view_bounds
+    return {
+        "version": SCENE_VERSION,
+        "units": "mm",
+        "origin": [_num(v) for v in _rounded(origin)],
+        "bounds": [_num(v) for v in _rounded([minx - origin[0], miny - origin[1],
+                                               maxx - origin[0], maxy - origin[1]])],
+        "wall": _polygon_rings(graph.wall, origin),
+        "wall_original": _polygon_rings(graph.wall_original, origin) if graph.wall_original is not None else None,
+        "apertures": [_flat_ring(ap.exterior, origin) for ap in graph.apertures],
+        "labels": label_table,
+        "block_kinds": list(BLOCK_KINDS),
+        "blocks": blocks,
+        "customs": scene_customs,
+        "dimensions": [_dimension(d.a, d.b, d.value, d.side, origin) for d in graph.dimensions],
+        "start": start,
+    }
+
+
+def normalize_preview_format(value: Optional[str], default: str = "png") -> str:
+    """Valida il formato richiesto per il preview (``png``, ``scene`` o ``both``)."""
+    fmt = (value or default).strip().lower()
+    if fmt not in PREVIEW_FORMATS:
+        raise ValueError(f"Formato preview non valido: {value} (ammessi: {', '.join(PREVIEW_FORMATS)})")
+    return fmt
+
+
+def _dimension(a, b, value: float, side: str, origin: Sequence[float]) -> Dict:
+    return {"a": _point(a, origin), "b": _point(b, origin), "value": _num(round(value, SCENE_PRECISION)), "side": side}
+
+
+def _polygon_rings(polygon: Polygon, origin: Sequence[float]) -> List[List]:
+    return [_flat_ring(polygon.exterior, origin)] + [_flat_ring(ring, origin) for ring in polygon.interiors]
+
+
+def _flat_ring(ring, origin: Sequence[float]) -> List:
+    """Anello come array piatto [x, y, x, y, ...] senza il vertice di chiusura."""
+    coords = shapely.get_coordinates(ring)[:-1] - np.asarray(origin, dtype=float)
+    return [_num(v) for v in _rounded(coords.ravel())]
+
+
+def _point(point, origin: Sequence[float]) -> List:
+    return [_num(v) for v in _rounded([point[0] - origin[0], point[1] - origin[1]])]
+
+
+def _rounded(values) -> np.ndarray:
+    # +0.0 elimina gli zeri negativi (-0.0) prodotti dall'arrotondamento
+    return np.round(np.asarray(values, dtype=float), SCENE_PRECISION) + 0.0
+
+
+def _num(value: float):
+    """Interi senza decimali nel JSON (1239 invece di 1239.0)."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+__all__ = [
+    "BLOCK_KINDS",
+    "PREVIEW_FORMATS",
+    "SCENE_VERSION",
+    "build_vector_scene",
+    "normalize_preview_format",
+    "scene_to_vector",
+]